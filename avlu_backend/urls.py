@@ -17,13 +17,28 @@ urlpatterns = [
     path('sablon-indir/', views.download_excel_template, name='download_excel_template'),
     path('personel/<int:personel_id>/', views.personel_detay, name='personel_detay'),
     path('yoklama/', views.yoklama_al, name='yoklama_al'),
+    path('yoklama/kaydet/', views.yoklama_kaydet, name='yoklama_kaydet'),
+    path('yoklama/cevrimdisi/', views.yoklama_cevrimdisi, name='yoklama_cevrimdisi'),
+    path('yoklama/senkron/', views.yoklama_senkron, name='yoklama_senkron'),
+    path('yoklama/sw.js', views.yoklama_servis_calisani, name='yoklama_servis_calisani'),
+    path('yoklama/kart-okuyucu/', views.pdks_import, name='pdks_import'),
     path('personel/<int:personel_id>/toplu-puantaj/', views.toplu_puantaj, name='toplu_puantaj'),
     path('maas-raporu/', views.maas_raporu, name='maas_raporu'),
     path('maas-raporu-indir/', views.maas_raporu_indir, name='maas_raporu_indir'),
+    path('maas-gecmisi/', views.maas_gecmisi, name='maas_gecmisi'),
+    path('maas-gecmisi/indir/', views.maas_gecmisi_indir, name='maas_gecmisi_indir'),
+    path('maas-gecmisi/json/', views.maas_gecmisi_json, name='maas_gecmisi_json'),
     path('personel/<int:personel_id>/pusula/', views.personel_pusula, name='personel_pusula'),
+    path('maas-raporu/pusulalar/', views.toplu_pusula, name='toplu_pusula'),
+    path('maas-raporu/banka-odeme/', views.banka_odeme_dosyasi, name='banka_odeme_dosyasi'),
     path('giris-cikis-raporu/', views.giris_cikis_raporu, name='giris_cikis_raporu'),
     path('giris-cikis-raporu-indir/', views.giris_cikis_raporu_indir, name='giris_cikis_raporu_indir'),
     path('maas-bordrosu-olustur/', views.maas_bordrosu_olustur, name='maas_bordrosu_olustur'),
     path('islem-sil/<int:islem_id>/', views.finansal_hareket_sil, name='finansal_hareket_sil'),
+    path('is/<int:is_id>/', views.is_durumu, name='is_durumu'),
+    path('is/<int:is_id>/durum/', views.is_durumu_json, name='is_durumu_json'),
+    path('is/<int:is_id>/indir/', views.is_dosyasi_indir, name='is_dosyasi_indir'),
+    path('islem-gecmisi/', views.islem_gecmisi, name='islem_gecmisi'),
+    path('islem-gecmisi/indir/', views.islem_gecmisi_indir, name='islem_gecmisi_indir'),
     path('update_server/', views.update_server, name='update_server'),
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.contrib import admin
 # DİKKAT: Aşağıdaki satıra 'IslemLog' eklendi.
-from .models import Personel, TaksitliAvans, FinansalHareket, Puantaj, MaasBordrosu, IslemLog
+from .models import (Personel, TaksitliAvans, TaksitOdemesi, FinansalHareket, Puantaj, MaasBordrosu, IslemLog,
+                     ArkaPlanIsi, YoklamaSenkronu, ArsivDonemi, ArsivPuantaj, ArsivIslemLog)
 
 @admin.register(Personel)
 class PersonelAdmin(admin.ModelAdmin):
@@ -21,7 +22,9 @@ class FinansalHareketAdmin(admin.ModelAdmin):
 
 @admin.register(TaksitliAvans)
 class TaksitliAvansAdmin(admin.ModelAdmin):
-    list_display = ('personel', 'toplam_tutar', 'taksit_sayisi', 'tamamlandi')
+    list_display = ('personel', 'toplam_tutar', 'taksit_sayisi', 'odenen_taksit', 'odenen_tutar', 'tamamlandi')
+    # Dönem kapanışında taksit defterinden güncellenir (core/bordro.py)
+    readonly_fields = ('odenen_tutar', 'odenen_taksit')
 
 @admin.register(MaasBordrosu)
 class MaasBordrosuAdmin(admin.ModelAdmin):
@@ -35,6 +38,9 @@ class IslemLogAdmin(admin.ModelAdmin):
     list_display = ('tarih', 'kullanici', 'islem_turu', 'konu', 'ilgili_personel')
     list_filter = ('islem_turu', 'kullanici', 'tarih')
     search_fields = ('detay', 'kullanici__username', 'ilgili_personel__ad')
+    list_select_related = ('kullanici', 'ilgili_personel')
+    # Büyük tabloda her sayfada ikinci bir COUNT(*) yapılmasın; asıl tarayıcı: /islem-gecmisi/
+    show_full_result_count = False
     
     # Loglar değiştirilemez, sadece okunabilir olmalı (Güvenlik)
     readonly_fields = ('tarih', 'kullanici', 'islem_turu', 'konu', 'detay', 'ilgili_personel')
@@ -43,4 +49,53 @@ class IslemLogAdmin(admin.ModelAdmin):
         return False # Elle log eklenemesin
     
     def has_delete_permission(self, request, obj=None):
-        return False # Loglar silinemesin (Güvenlik)
\ No newline at end of file
+        return False # Loglar silinemesin (Güvenlik)
+
+@admin.register(ArkaPlanIsi)
+class ArkaPlanIsiAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tur', 'durum', 'ilerleme', 'olusturan', 'olusturulma_tarihi', 'bitis_tarihi')
+    list_filter = ('tur', 'durum')
+    readonly_fields = ('olusturulma_tarihi', 'baslama_tarihi', 'bitis_tarihi')
+
+# --- ARŞİV (core/arsiv.py) ---
+# Arşiv ayrı veritabanında: personel/kullanıcı JOIN'lenemez, id olarak gösterilir.
+class SaltOkunurAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ArsivDonemi)
+class ArsivDonemiAdmin(SaltOkunurAdmin):
+    list_display = ('donem', 'puantaj_sayisi', 'arsivlenme_tarihi')
+
+@admin.register(ArsivPuantaj)
+class ArsivPuantajAdmin(SaltOkunurAdmin):
+    list_display = ('id', 'personel_id', 'tarih', 'durum', 'giris_saati', 'cikis_saati', 'hesaplanan_mesai_saati')
+    list_filter = ('durum',)
+    date_hierarchy = 'tarih'
+    show_full_result_count = False
+
+@admin.register(ArsivIslemLog)
+class ArsivIslemLogAdmin(SaltOkunurAdmin):
+    list_display = ('tarih', 'kullanici_id', 'islem_turu', 'konu', 'ilgili_personel_id')
+    list_filter = ('islem_turu',)
+    search_fields = ('detay',)
+    show_full_result_count = False
+
+@admin.register(TaksitOdemesi)
+class TaksitOdemesiAdmin(SaltOkunurAdmin):
+    list_display = ('donem', 'personel', 'taksit', 'taksit_no', 'tutar', 'odenen_toplam')
+    list_filter = ('donem',)
+    list_select_related = ('personel', 'taksit__personel')
+
+@admin.register(YoklamaSenkronu)
+class YoklamaSenkronuAdmin(SaltOkunurAdmin):
+    list_display = ('alinma_tarihi', 'kullanici', 'personel', 'tarih', 'durum', 'istemci_zamani', 'sonuc')
+    list_filter = ('sonuc', 'tarih')
+    list_select_related = ('kullanici', 'personel')
+    show_full_result_count = False
@@ -0,0 +1,173 @@
+"""
+Kapanmış dönemlerin arşivlenmesi ve saklama süreleri.
+
+Bordrosu kesilmiş (MaasBordrosu'su olan) ve ARSIV_PUANTAJ_AY aydan eski
+dönemlerin Puantaj satırları arşiv veritabanına (DATABASES['arsiv'], varsayılan
+arsiv.sqlite3) id'leri korunarak toplu kopyalanır, sonra asıl tablodan silinir
+ve dönem ArsivDonemi'ne yazılır. İki veritabanı ayrı transaction'lardır: arşive
+kopya commit edilip silme geri alınırsa satırlar iki yerde kalır, dönem ise
+arşivlenmemiş görünür; tekrar çalıştırmada kopyalar ignore_conflicts ile atlanıp
+silme tamamlanır. ARSIV_LOG_GUN günden eski
+IslemLog kayıtları da parça parça taşınır. Arşivde ARSIV_SAKLAMA_YIL yıldan
+eski kayıtlar silinir. Böylece günlük sorgular ve yedekler küçük tablolarla çalışır.
+
+Okuma: donem_puantajlari() / aralik_puantajlari() dönemin arşivde olup
+olmadığına bakıp doğru tabloyu döner; raporlar bunları kullanır. İçinde
+bulunulan ay hiçbir zaman arşivde olmadığından onun için sorgu atılmaz.
+AylikOzet ve MaasBordrosu asıl veritabanında kalır; bordro ve rapor toplamları
+arşivlemeden etkilenmez. Arşivlenmiş bir döneme yoklama yazılamaz; gerekirse
+donemi_geri_al() ile dönem asıl tabloya geri taşınır.
+
+Komut: 'python manage.py arsivle'.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .donem import donem_baslangici, donem_filtresi
+from .models import ArsivDonemi, ArsivIslemLog, ArsivPuantaj, IslemLog, MaasBordrosu, Puantaj
+from .router import ARSIV_DB
+
+PUANTAJ_ALANLARI = ('id', 'personel_id', 'tarih', 'durum', 'giris_saati', 'cikis_saati',
+                    'hesaplanan_mesai_saati', 'manuel_mesai_saati')
+LOG_ALANLARI = ('id', 'kullanici_id', 'islem_turu', 'konu', 'detay', 'tarih', 'ilgili_personel_id')
+
+
+def _bu_ay():
+    return timezone.localdate().replace(day=1)
+
+
+def _ay_once(donem, ay_sayisi):
+    mutlak = donem.year * 12 + donem.month - 1 - ay_sayisi
+    return donem_baslangici(mutlak // 12, mutlak % 12 + 1)
+
+
+def donem_arsivde_mi(yil, ay):
+    donem = donem_baslangici(yil, ay)
+    if donem >= _bu_ay():
+        return False
+    return ArsivDonemi.objects.filter(donem=donem).exists()
+
+
+def arsivlenmis_donemler(baslangic=None, bitis=None):
+    """[baslangic, bitis] aralığına düşen arşivlenmiş dönemler (ayın 1'i)."""
+    qs = ArsivDonemi.objects.all()
+    if baslangic:
+        qs = qs.filter(donem__gte=baslangic.replace(day=1))
+    if bitis:
+        qs = qs.filter(donem__lte=bitis)
+    return set(qs.values_list('donem', flat=True))
+
+
+def donem_puantajlari(yil, ay):
+    """Dönemin puantajları: arşivlendiyse arşiv veritabanından, değilse asıl tablodan."""
+    model = ArsivPuantaj if donem_arsivde_mi(yil, ay) else Puantaj
+    return model.objects.filter(donem_filtresi(yil, ay))
+
+
+def aralik_puantajlari(baslangic, bitis):
+    """[baslangic, bitis] (dahil) aralığının puantaj sorguları: asıl tablo ve gerekiyorsa arşiv."""
+    sorgular = [Puantaj.objects.filter(tarih__gte=baslangic, tarih__lte=bitis)]
+    if baslangic < _bu_ay() and arsivlenmis_donemler(baslangic, bitis):
+        sorgular.append(ArsivPuantaj.objects.filter(tarih__gte=baslangic, tarih__lte=bitis))
+    return sorgular
+
+
+def personelli(qs):
+    """Arşiv başka veritabanında olduğundan personel JOIN yerine ayrı sorguyla yüklenir."""
+    return qs.select_related('personel') if qs.model is Puantaj else qs.prefetch_related('personel')
+
+
+def _parca_parca(qs, alanlar, parca):
+    """Sorguyu id sırasıyla parça parça sözlük listeleri olarak okur."""
+    son_id = None
+    while True:
+        satirlar = list((qs.filter(id__gt=son_id) if son_id is not None else qs)
+                        .order_by('id').values(*alanlar)[:parca])
+        if not satirlar:
+            return
+        yield satirlar
+        son_id = satirlar[-1]['id']
+
+
+def arsivlenecek_donemler():
+    """Bordrosu kesilmiş, ARSIV_PUANTAJ_AY aydan eski ve henüz arşivlenmemiş dönemler."""
+    sinir = _ay_once(_bu_ay(), settings.ARSIV_PUANTAJ_AY)
+    kapali = set(MaasBordrosu.objects.filter(donem__lt=sinir).values_list('donem', flat=True).distinct())
+    return sorted(kapali - arsivlenmis_donemler())
+
+
+def donemi_arsivle(donem, parca=5000):
+    """
+    Dönemin puantajlarını arşive taşır. Dönüş: taşınan satır sayısı.
+    Kesinleşmemiş veya içinde bulunulan dönem için ValueError.
+    """
+    donem = donem.replace(day=1)
+    if donem >= _bu_ay():
+        raise ValueError(f"{donem:%m.%Y} dönemi henüz bitmedi.")
+    if not MaasBordrosu.objects.filter(donem=donem).exists():
+        raise ValueError(f"{donem:%m.%Y} döneminin bordrosu kesilmemiş.")
+
+    from .ozet import ozet_sinyalleri_kapali  # ozet bu modülü içe aktarır
+
+    qs = Puantaj.objects.filter(donem_filtresi(donem.year, donem.month))
+    # Asıl veritabanındaki transaction kopyalamadan silmeye kadar açık kalır (SQLite: yazma
+    # kilidi). Arşiv kopyası ondan önce, ayrı transaction'da commit edilir; silme geri alınırsa
+    # tekrar çalıştırma kopyaları ignore_conflicts ile atlar ve silmeyi tamamlar.
+    with transaction.atomic():
+        toplam = 0
+        with transaction.atomic(using=ARSIV_DB):
+            for satirlar in _parca_parca(qs, PUANTAJ_ALANLARI, parca):
+                # Yarıda kalmış bir önceki çalıştırmanın kopyaladıkları atlanır
+                ArsivPuantaj.objects.bulk_create([ArsivPuantaj(**s) for s in satirlar],
+                                                 batch_size=500, ignore_conflicts=True)
+                toplam += len(satirlar)
+
+        # AylikOzet dönemin toplamlarını korumalı; silme sinyali özeti sıfırlamasın
+        with ozet_sinyalleri_kapali():
+            qs.delete()
+        ArsivDonemi.objects.update_or_create(donem=donem, defaults={'puantaj_sayisi': toplam})
+    return toplam
+
+
+def donemi_geri_al(donem, parca=5000):
+    """Arşivlenmiş dönemin puantajlarını asıl tabloya geri taşır. Dönüş: taşınan satır sayısı."""
+    donem = donem.replace(day=1)
+    qs = ArsivPuantaj.objects.filter(donem_filtresi(donem.year, donem.month))
+    with transaction.atomic():
+        toplam = 0
+        for satirlar in _parca_parca(qs, PUANTAJ_ALANLARI, parca):
+            Puantaj.objects.bulk_create([Puantaj(**s) for s in satirlar], batch_size=500, ignore_conflicts=True)
+            toplam += len(satirlar)
+        ArsivDonemi.objects.filter(donem=donem).delete()
+    qs.delete()
+    return toplam
+
+
+def loglari_arsivle(gun=None, parca=5000):
+    """gun (varsayılan ARSIV_LOG_GUN) günden eski işlem loglarını arşive taşır. Dönüş: taşınan sayı."""
+    sinir = timezone.now() - timedelta(days=settings.ARSIV_LOG_GUN if gun is None else gun)
+    qs = IslemLog.objects.filter(tarih__lt=sinir)
+    toplam = 0
+    for satirlar in _parca_parca(qs, LOG_ALANLARI, parca):
+        ArsivIslemLog.objects.bulk_create([ArsivIslemLog(**s) for s in satirlar],
+                                          batch_size=500, ignore_conflicts=True)
+        IslemLog.objects.filter(id__in=[s['id'] for s in satirlar]).delete()
+        toplam += len(satirlar)
+    return toplam
+
+
+def arsivi_temizle(yil=None):
+    """
+    Arşivde yil (varsayılan ARSIV_SAKLAMA_YIL) yıldan eski puantaj ve logları siler; 0: silinmez.
+    Dönüş: {'puantaj': n, 'log': n}
+    """
+    yil = settings.ARSIV_SAKLAMA_YIL if yil is None else yil
+    if not yil:
+        return {'puantaj': 0, 'log': 0}
+    sinir = _ay_once(_bu_ay(), yil * 12)
+    puantaj, _ = ArsivPuantaj.objects.filter(tarih__lt=sinir).delete()
+    log, _ = ArsivIslemLog.objects.filter(tarih__lt=timezone.make_aware(datetime.combine(sinir, time.min))).delete()
+    return {'puantaj': puantaj, 'log': log}
@@ -0,0 +1,217 @@
+"""
+Banka toplu ödeme (EFT / havale) dosyaları.
+
+Kapanmış dönemin MaasBordrosu kayıtlarından, bankaya yüklenecek toplu ödeme
+dosyaları üretilir. Personel bankasına göre gruplanır ve her banka için ayrı
+bir dosya yazılır; dosyalar tek bir ZIP içinde akış halinde döner:
+  - <banka>_<yyyymm>.<uzantı>: bankanın şablonuyla ödeme satırları
+  - hatali_ibanlar.csv       : IBAN'ı olmayan / kontrol basamağı tutmayan personel ve
+                               sabit genişlikli şablonun sağa hizalı alanına (sıra,
+                               tutar) sığmayan satırlar (ödeme dosyalarına yazılmaz)
+  - ozet.csv                 : banka başına kişi sayısı ve toplam tutar
+Geçerli satırı kalmayan bankanın dosyası yazılmaz. Satırlar akış başlamadan önce
+doğrulandığından dosya yazılırken hata çıkmaz (ZIP yarıda kesilmez).
+
+Bütün satırlar MaasBordrosu + Personel üzerinde, banka sırasıyla tek sorguda
+okunur (iterator); personel başına sorgu yapılmaz ve dosya bellekte biriktirilmez.
+
+Şablonlar settings.BANKA_ODEME_SABLONLARI'nda tanımlıdır; bankaya özel şablon
+BANKA_SABLONLARI (banka adı -> şablon) ile seçilir, eşleşmeyenler
+BANKA_VARSAYILAN_SABLON ile yazılır. Şablon alanları: ALANLAR.
+"""
+import codecs
+import re
+import unicodedata
+from decimal import Decimal
+from itertools import chain, groupby
+
+from django.conf import settings
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Trim, Upper
+from django.utils.text import slugify
+
+from .disa_aktar import csv_parcalari, zip_parcalari
+from .donem import donem_filtresi
+from .models import MaasBordrosu
+
+ALANLAR = ('sira', 'ad_soyad', 'tc_no', 'iban', 'banka_adi', 'tutar', 'tutar_kurus', 'aciklama', 'donem')
+BANKASIZ = 'BANKA BELİRTİLMEMİŞ'
+
+_IBAN_BICIMI = re.compile(r'[A-Z]{2}\d{2}[A-Z0-9]{11,30}')
+# Ülke kodu -> IBAN uzunluğu (bilinmeyen ülkelerde yalnızca kontrol basamağına bakılır)
+_IBAN_UZUNLUKLARI = {'TR': 26}
+_TURKCE_ASCII = str.maketrans('çğıöşüÇĞİÖŞÜ', 'cgiosuCGIOSU')
+
+
+def iban_temizle(iban):
+    return re.sub(r'\s+', '', iban or '').upper()
+
+
+def iban_hatasi(iban):
+    """IBAN geçerliyse None, değilse hata mesajı döner (ISO 13616 mod-97 kontrolü)."""
+    iban = iban_temizle(iban)
+    if not iban:
+        return "IBAN girilmemiş."
+    if not _IBAN_BICIMI.fullmatch(iban):
+        return "IBAN biçimi geçersiz."
+    uzunluk = _IBAN_UZUNLUKLARI.get(iban[:2])
+    if uzunluk is not None and len(iban) != uzunluk:
+        return f"IBAN {uzunluk} karakter olmalı."
+    # İlk dört karakter sona alınır, harfler sayıya çevrilir (A=10 ... Z=35)
+    if int(''.join(str(int(k, 36)) for k in iban[4:] + iban[:4])) % 97 != 1:
+        return "IBAN kontrol basamağı hatalı."
+    return None
+
+
+def _banka_anahtari(banka):
+    return ' '.join((banka or '').split()).upper() or BANKASIZ
+
+
+def odeme_satirlari(yil, ay):
+    """Dönemin ödenecek bordroları (banka, ad, soyad sırasıyla); tek sorgu, iterator."""
+    return (
+        MaasBordrosu.objects.filter(donem_filtresi(yil, ay, 'donem'), net_odenecek__gt=0)
+        .annotate(banka=Upper(Trim(Coalesce('personel__banka_adi', Value('')))))
+        .order_by('banka', 'personel__ad', 'personel__soyad', 'personel_id')
+        .values('personel_id', 'personel__ad', 'personel__soyad', 'personel__tc_no', 'personel__iban',
+                'personel__banka_adi', 'banka', 'net_odenecek')
+        .iterator(chunk_size=2000)
+    )
+
+
+def _alanlar(satir, sira, yil, ay):
+    tutar = satir['net_odenecek'].quantize(Decimal('0.01'))
+    return {
+        'sira': sira,
+        'ad_soyad': f"{satir['personel__ad']} {satir['personel__soyad']}",
+        'tc_no': satir['personel__tc_no'] or '',
+        'iban': iban_temizle(satir['personel__iban']),
+        'banka_adi': satir['personel__banka_adi'] or '',
+        'tutar': f'{tutar:.2f}',
+        'tutar_kurus': int(tutar * 100),
+        'aciklama': f'{ay:02d}/{yil} MAAS ODEMESI',
+        'donem': f'{yil}{ay:02d}',
+    }
+
+
+def _sadelestir(metin):
+    metin = unicodedata.normalize('NFKD', str(metin).translate(_TURKCE_ASCII))
+    return metin.encode('ascii', 'ignore').decode().upper()
+
+
+def _sabit_deger(sablon, deger):
+    deger = str(deger)
+    return _sadelestir(deger) if sablon.get('ascii') else deger
+
+
+def _sigmayan_alan(sablon, alanlar):
+    """Sabit genişlikli şablonda sağa hizalı (kırpılamayan) bir alan sığmıyorsa hata mesajı, yoksa None."""
+    if sablon['bicim'] != 'sabit':
+        return None
+    for alan, genislik, hiza, _ in sablon['alanlar']:
+        if hiza == 'sag' and len(_sabit_deger(sablon, alanlar[alan])) > genislik:
+            return f"'{alan}' alanı {genislik} karaktere sığmıyor."
+    return None
+
+
+def _sabit_satir(sablon, alanlar):
+    # Sağa hizalı alanların sığdığı _sigmayan_alan ile önceden doğrulanır; sola hizalılar kırpılır
+    parcalar = []
+    for alan, genislik, hiza, dolgu in sablon['alanlar']:
+        deger = _sabit_deger(sablon, alanlar[alan])
+        if hiza == 'sag':
+            parcalar.append(deger.rjust(genislik, dolgu))
+        else:
+            parcalar.append(deger[:genislik].ljust(genislik, dolgu))
+    return ''.join(parcalar) + '\r\n'
+
+
+def _csv_satiri(sablon, alanlar):
+    ayirici = sablon.get('ayirici', ';')
+    degerler = (str(alanlar[alan]).replace(ayirici, ' ') for _, alan in sablon['alanlar'])
+    return ayirici.join(degerler) + '\r\n'
+
+
+def _dosya_parcalari(sablon, satirlar, parca_satir=500):
+    """Şablona göre dosya baytlarını parça parça üretir."""
+    kodlayici = codecs.getincrementalencoder(sablon.get('kodlama', 'utf-8'))(errors='replace')
+    parca = []
+    if sablon['bicim'] == 'csv':
+        parca.append(sablon.get('ayirici', ';').join(baslik for baslik, _ in sablon['alanlar']) + '\r\n')
+    satir_yaz = _csv_satiri if sablon['bicim'] == 'csv' else _sabit_satir
+    for alanlar in satirlar:
+        parca.append(satir_yaz(sablon, alanlar))
+        if len(parca) >= parca_satir:
+            yield kodlayici.encode(''.join(parca))
+            parca = []
+    yield kodlayici.encode(''.join(parca), final=True)
+
+
+def sablon_sec(banka, sablon_adi=None):
+    """Bankanın şablon adı: verilen sablon_adi, yoksa BANKA_SABLONLARI eşlemesi, yoksa varsayılan."""
+    if sablon_adi:
+        return sablon_adi
+    # 'Garanti' / 'GARANTİ' gibi yazımlar aynı sayılsın diye karşılaştırma sadeleştirilmiş adla yapılır
+    eslemeler = {_sadelestir(_banka_anahtari(ad)): sablon for ad, sablon in settings.BANKA_SABLONLARI.items()}
+    return eslemeler.get(_sadelestir(_banka_anahtari(banka)), settings.BANKA_VARSAYILAN_SABLON)
+
+
+def odeme_dosyasi_parcalari(yil, ay, sablon_adi=None):
+    """Dönemin banka ödeme dosyalarını içeren ZIP'i bayt parçaları halinde üretir (generator)."""
+    if sablon_adi is not None and sablon_adi not in settings.BANKA_ODEME_SABLONLARI:
+        raise ValueError(f"Bilinmeyen ödeme şablonu: {sablon_adi}")
+
+    hatalar = []
+    ozet = []
+
+    def banka_satirlari(satirlar, sablon, toplam):
+        sira = 0
+        for satir in satirlar:
+            hata = iban_hatasi(satir['personel__iban'])
+            if not hata:
+                alanlar = _alanlar(satir, sira + 1, yil, ay)
+                hata = _sigmayan_alan(sablon, alanlar)
+            if hata:
+                hatalar.append([f"{satir['personel__ad']} {satir['personel__soyad']}", satir['personel__tc_no'],
+                                satir['personel__banka_adi'] or '', satir['personel__iban'] or '',
+                                satir['net_odenecek'], hata])
+                continue
+            sira += 1
+            toplam['kisi'] += 1
+            toplam['tutar'] += satir['net_odenecek']
+            yield alanlar
+
+    def dosyalar():
+        kullanilan = set()
+        for banka, satirlar in groupby(odeme_satirlari(yil, ay), key=lambda s: _banka_anahtari(s['banka'])):
+            sablon = settings.BANKA_ODEME_SABLONLARI[sablon_sec(banka, sablon_adi)]
+            toplam = {'kisi': 0, 'tutar': Decimal('0')}
+            gecerliler = banka_satirlari(satirlar, sablon, toplam)
+            # İlk geçerli satıra kadar okunur; hiç yoksa (hepsi hatalı) bankanın dosyası yazılmaz
+            ilk = next(gecerliler, None)
+            if ilk is None:
+                continue
+
+            kok = f"{slugify(_sadelestir(banka)) or 'banka'}_{yil}{ay:02d}"
+            ad, sayac = kok, 1
+            while ad in kullanilan:  # Veritabanının büyük harfe çeviremediği yazım farkları
+                sayac += 1
+                ad = f'{kok}_{sayac}'
+            kullanilan.add(ad)
+
+            yield f"{ad}.{sablon.get('uzanti', 'txt')}", _dosya_parcalari(sablon, chain([ilk], gecerliler))
+            # zip_parcalari dosyayı bitirmeden sonrakini istemez; toplam artık tamdır
+            ozet.append([banka, toplam['kisi'], toplam['tutar']])
+
+        if hatalar:
+            yield 'hatali_ibanlar.csv', _csv_baytlari(
+                ['Ad Soyad', 'TC No', 'Banka', 'IBAN', 'Tutar', 'Hata'], hatalar)
+        yield 'ozet.csv', _csv_baytlari(
+            ['Banka', 'Kişi', 'Toplam Tutar'],
+            ozet + [['TOPLAM', sum(o[1] for o in ozet), sum((o[2] for o in ozet), Decimal('0'))]])
+
+    return zip_parcalari(dosyalar())
+
+
+def _csv_baytlari(basliklar, satirlar):
+    return ''.join(csv_parcalari(basliklar, satirlar)).encode()
@@ -0,0 +1,442 @@
+"""
+Maaş hesaplama motoru.
+
+maas_raporu, maas_bordrosu_olustur, personel_pusula ve maaş geçmişi aynı hesabı
+buradan alır.
+Canlı hesap puantaj ve finansal hareket toplamlarını AylikOzet tablosundan
+(personel başına tek satır, core/ozet.py) okur. Python tarafında puantaj ve
+hareket satırları dolaşılmaz; bellek kullanımı personel sayısıyla orantılıdır.
+
+Taksitler: avans, verildiği aydan itibaren kesilir. Kapanmış dönemin kesintisi
+taksit defterinden (TaksitOdemesi) okunur; açık dönemde avansın yürüyen
+toplamından (TaksitliAvans.odenen_tutar) kalan tutar kadar, en fazla aylık
+kesinti (son taksitte kalanın tamamı) düşülür. donemi_kapat() kesilen
+taksitleri deftere yazar ve ödemesi biten avansları aynı transaction'da kapatır.
+"""
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Sum, Value, When
+
+from .arsiv import donem_arsivde_mi
+from .donem import donem_baslangici, donem_filtresi, sonraki_ay
+from .models import (Personel, Puantaj, FinansalHareket, TaksitliAvans, TaksitOdemesi, MaasBordrosu, AylikOzet,
+                     ArsivPuantaj)
+from .onbellek import donem_raporlarini_gecersiz_kil, taslak_raporlari_gecersiz_kil
+
+CALISILAN_DURUMLAR = ('geldi', 'hafta_tatili')
+GELINMEYEN_DURUMLAR = ('gelmedi', 'ucretsiz_izin')
+
+
+def _personel_filtresi(queryset, personel_ids, alan='personel_id'):
+    if personel_ids is None:
+        return queryset
+    return queryset.filter(**{f'{alan}__in': list(personel_ids)})
+
+
+def puantaj_toplamlari(yil, ay, personel_ids=None):
+    """
+    {personel_id: {'calistigi_gun', 'gelmedigi_gun', 'toplam_mesai'}} döner.
+    Tek GROUP BY sorgusu; asıl tabloda dönemin kaydı yoksa arşive de bakılır.
+    """
+    def toplamlar(qs):
+        satirlar = _personel_filtresi(qs, personel_ids).values('personel_id').annotate(
+            calistigi_gun=Count('id', filter=Q(durum__in=CALISILAN_DURUMLAR)),
+            gelmedigi_gun=Count('id', filter=Q(durum__in=GELINMEYEN_DURUMLAR)),
+            toplam_mesai=Sum('hesaplanan_mesai_saati'),
+        ).order_by()
+        return {s['personel_id']: s for s in satirlar}
+
+    sonuc = toplamlar(Puantaj.objects.filter(donem_filtresi(yil, ay)))
+    # Arşivlenmiş dönemin asıl tabloda satırı kalmaz (yazma da engellenir); sıcak yolda ek sorgu olmasın
+    if not sonuc and donem_arsivde_mi(yil, ay):
+        sonuc = toplamlar(ArsivPuantaj.objects.filter(donem_filtresi(yil, ay)))
+    return sonuc
+
+
+def hareket_toplamlari(yil, ay, personel_ids=None):
+    """
+    {personel_id: {'toplam_prim', 'diger_kesintiler'}} döner.
+    Tek GROUP BY sorgusu.
+    """
+    qs = _personel_filtresi(FinansalHareket.objects.filter(donem_filtresi(yil, ay)), personel_ids)
+    satirlar = qs.values('personel_id').annotate(
+        toplam_prim=Sum('tutar', filter=Q(islem_tipi='prim')),
+        diger_kesintiler=Sum('tutar', filter=~Q(islem_tipi='prim')),
+    ).order_by()
+    return {s['personel_id']: s for s in satirlar}
+
+
+TAKSIT_ALANLARI = ('id', 'personel_id', 'tarih', 'toplam_tutar', 'taksit_sayisi', 'aylik_kesinti',
+                   'odenen_tutar', 'odenen_taksit')
+
+
+def _siradaki_taksit(avans):
+    """Açık avansın bir sonraki taksiti: son taksitte veya kalan daha azsa kalanın tamamı."""
+    kalan = avans['toplam_tutar'] - avans['odenen_tutar']
+    if kalan <= 0:
+        return Decimal('0.00')
+    if avans['odenen_taksit'] + 1 >= avans['taksit_sayisi'] or kalan < avans['aylik_kesinti']:
+        return kalan
+    return avans['aylik_kesinti']
+
+
+def taksit_kesintileri(yil, ay, personel_ids=None):
+    """
+    Dönemde kesilecek (kapanmış dönemde kesilmiş) taksitler, avans başına bir sözlük:
+    TAKSIT_ALANLARI + 'kesinti' (Decimal), 'taksit_no' ve 'deftere_yazildi'. Tek sorgu.
+    """
+    donem = donem_baslangici(yil, ay)
+    defter = TaksitOdemesi.objects.filter(taksit=OuterRef('pk'), donem=donem)
+    qs = TaksitliAvans.objects.filter(tarih__lt=sonraki_ay(donem)).annotate(
+        defter_tutari=Subquery(defter.values('tutar')[:1]),
+        defter_taksit_no=Subquery(defter.values('taksit_no')[:1]),
+    ).filter(Q(tamamlandi=False) | Q(defter_tutari__isnull=False))
+
+    kesintiler = []
+    for avans in _personel_filtresi(qs, personel_ids).values(*TAKSIT_ALANLARI, 'defter_tutari', 'defter_taksit_no').order_by('id'):
+        avans['deftere_yazildi'] = avans['defter_tutari'] is not None
+        if avans['deftere_yazildi']:
+            avans['kesinti'], avans['taksit_no'] = avans['defter_tutari'], avans['defter_taksit_no']
+        else:
+            avans['kesinti'], avans['taksit_no'] = _siradaki_taksit(avans), avans['odenen_taksit'] + 1
+        if avans['kesinti'] > 0:
+            kesintiler.append(avans)
+    return kesintiler
+
+
+def _personel_toplamlari(kesintiler):
+    toplamlar = {}
+    for avans in kesintiler:
+        toplamlar[avans['personel_id']] = toplamlar.get(avans['personel_id'], 0.0) + float(avans['kesinti'])
+    return toplamlar
+
+
+def taksit_toplamlari(yil, ay, personel_ids=None):
+    """
+    {personel_id: dönemin taksit kesintisi toplamı} döner.
+    Tek sorgu (taksit_kesintileri).
+    """
+    return _personel_toplamlari(taksit_kesintileri(yil, ay, personel_ids))
+
+
+def maas_satiri(p, calistigi_gun=0, gelmedigi_gun=0, toplam_mesai=0.0,
+                toplam_prim=0.0, diger_kesintiler=0.0, taksit_kesintisi=0.0):
+    """
+    Tek personelin toplamlarından rapor satırını üretir (saf fonksiyon, sorgu yok).
+    """
+    mesai_ucreti = toplam_mesai * float(p.ozel_mesai_ucreti)
+
+    # Ana Hakediş
+    if p.calisma_tipi == 'aylik':
+        gunluk_maliyet = float(p.maas_tutari) / 30
+        maas_kesintisi = gunluk_maliyet * gelmedigi_gun
+        ana_hakedis = float(p.maas_tutari) - maas_kesintisi
+    else:
+        ana_hakedis = float(p.maas_tutari) * calistigi_gun
+
+    toplam_kesinti = diger_kesintiler + taksit_kesintisi
+    net_maas = ana_hakedis + mesai_ucreti + toplam_prim - toplam_kesinti
+
+    return {
+        'personel': p,
+        'calistigi_gun': calistigi_gun,
+        'gelmedigi_gun': gelmedigi_gun,
+        'ana_hakedis': ana_hakedis,
+        'toplam_mesai': toplam_mesai,
+        'mesai_ucreti': mesai_ucreti,
+        'toplam_prim': toplam_prim,
+        'diger_kesintiler': diger_kesintiler,
+        'taksit_kesintisi': taksit_kesintisi,
+        'toplam_kesinti': toplam_kesinti,
+        'net_maas': net_maas,
+        'durum': 'taslak'
+    }
+
+
+def canli_hesapla(yil, ay, personel_ids=None, taksitler=None):
+    """
+    Dönemin canlı (taslak) maaş listesini hesaplar.
+    personel_ids verilmezse tüm aktif personel hesaplanır.
+    taksitler (taksit_toplamlari() sonucu) verilirse yeniden sorgulanmaz.
+    Personel sayısından bağımsız olarak 3 sorgu çalışır.
+    """
+    if personel_ids is None:
+        personeller = Personel.objects.filter(aktif_mi=True)
+    else:
+        personel_ids = list(personel_ids)
+        personeller = Personel.objects.filter(id__in=personel_ids)
+
+    ozetler = {
+        o.personel_id: o
+        for o in _personel_filtresi(AylikOzet.objects.filter(donem=donem_baslangici(yil, ay)), personel_ids)
+    }
+    if taksitler is None:
+        taksitler = taksit_toplamlari(yil, ay, personel_ids)
+
+    return [_ozet_satiri(p, ozetler.get(p.id), taksitler.get(p.id, 0.0)) for p in personeller]
+
+
+def _ozet_satiri(p, o, taksit_kesintisi):
+    """AylikOzet satırından (yoksa sıfır toplamlarla) canlı maaş satırı."""
+    if o is None:
+        return maas_satiri(p, taksit_kesintisi=taksit_kesintisi)
+    return maas_satiri(
+        p,
+        calistigi_gun=o.calistigi_gun,
+        gelmedigi_gun=o.gelmedigi_gun,
+        toplam_mesai=float(o.toplam_mesai),
+        toplam_prim=float(o.toplam_prim),
+        diger_kesintiler=float(o.diger_kesintiler),
+        taksit_kesintisi=taksit_kesintisi,
+    )
+
+
+def bordro_satiri(b):
+    """Kesinleşmiş MaasBordrosu kaydını rapor satırına çevirir."""
+    # Geriye dönük ana hakediş tahmini (Gösterim tutarlılığı için)
+    ana_hakedis_tahmini = float(b.net_odenecek) + float(b.toplam_kesinti) - float(b.toplam_prim) - float(b.mesai_ucreti)
+
+    return {
+        'personel': b.personel,
+        'calistigi_gun': b.calistigi_gun,
+        'gelmedigi_gun': b.gelmedigi_gun,
+        'ana_hakedis': ana_hakedis_tahmini,
+        'toplam_mesai': float(b.mesai_saati),
+        'mesai_ucreti': float(b.mesai_ucreti),
+        'toplam_prim': float(b.toplam_prim),
+        'toplam_kesinti': float(b.toplam_kesinti),
+        'net_maas': float(b.net_odenecek),
+        'durum': 'kesinlesmis'
+    }
+
+
+def donem_hesapla(yil, ay, personel_ids=None, taksitler=None):
+    """
+    Verilen yıl ve ay için maaş verilerini getirir.
+    Önce MaasBordrosu tablosuna bakar (Sabitlenmiş mi?),
+    Yoksa canlı hesaplama yapar (taksitler: bkz. canli_hesapla).
+
+    Dönüş: (bordro_var_mi, rapor_listesi)
+    """
+    kayitli_bordrolar = _personel_filtresi(
+        MaasBordrosu.objects.filter(donem_filtresi(yil, ay, 'donem')), personel_ids
+    ).select_related('personel')
+
+    rapor_listesi = [bordro_satiri(b) for b in kayitli_bordrolar]
+    if rapor_listesi:
+        return True, rapor_listesi
+
+    return False, canli_hesapla(yil, ay, personel_ids, taksitler)
+
+
+def donemler_hesapla(baslangic, bitis, personel_ids=None):
+    """
+    [baslangic, bitis] (ay başları, dahil) aralığındaki her dönemin maaş satırları.
+
+    Her dönem için donem_hesapla() ile aynı sonucu verir: bordrosu kesilmiş
+    dönemde bordro kayıtları, diğerlerinde canlı hesap. Dönemler tek tek
+    sorgulanmaz; bordrolar, özetler, personel ve taksitler aralık için birer
+    sorguyla okunur (dönem sayısından bağımsız en fazla 4 sorgu).
+
+    Dönüş: satırlar ('donem' anahtarıyla), dönem ve personel sırasıyla
+    """
+    donemler = []
+    donem = baslangic.replace(day=1)
+    while donem <= bitis:
+        donemler.append(donem)
+        donem = sonraki_ay(donem)
+    if not donemler:
+        return []
+    if personel_ids is not None:
+        personel_ids = list(personel_ids)
+
+    bordrolar = {}
+    for b in _personel_filtresi(
+        MaasBordrosu.objects.filter(donem__gte=donemler[0], donem__lte=donemler[-1]), personel_ids
+    ).select_related('personel').order_by('donem', 'personel_id'):
+        bordrolar.setdefault(b.donem, []).append(b)
+
+    acik_donemler = [d for d in donemler if d not in bordrolar]
+    if acik_donemler:
+        personeller = list(
+            Personel.objects.filter(aktif_mi=True) if personel_ids is None
+            else Personel.objects.filter(id__in=personel_ids)
+        )
+        ozetler = {
+            (o.personel_id, o.donem): o
+            for o in _personel_filtresi(AylikOzet.objects.filter(donem__in=acik_donemler), personel_ids)
+        }
+        # canli_hesapla ile aynı: her açık dönemde, o aya kadar verilmiş açık avansların sıradaki
+        # taksiti. Defter yalnızca kapanışta yazıldığından açık dönemlerin defter satırı olmaz.
+        avanslar = list(_personel_filtresi(
+            TaksitliAvans.objects.filter(tamamlandi=False, tarih__lt=sonraki_ay(acik_donemler[-1])), personel_ids
+        ).values(*TAKSIT_ALANLARI))
+        taksitler = {
+            donem: _personel_toplamlari(
+                [{**a, 'kesinti': _siradaki_taksit(a)} for a in avanslar if a['tarih'] < sonraki_ay(donem)]
+            )
+            for donem in acik_donemler
+        }
+
+    satirlar = []
+    for donem in donemler:
+        if donem in bordrolar:
+            donem_satirlari = [bordro_satiri(b) for b in bordrolar[donem]]
+        else:
+            donem_satirlari = [
+                _ozet_satiri(p, ozetler.get((p.id, donem)), taksitler[donem].get(p.id, 0.0)) for p in personeller
+            ]
+        for satir in donem_satirlari:
+            satir['donem'] = donem
+        satirlar.extend(donem_satirlari)
+    return satirlar
+
+
+YILLIK_TOPLAM_ALANLARI = ('net_maas', 'toplam_mesai', 'mesai_ucreti', 'toplam_prim', 'toplam_kesinti')
+
+
+def yillik_toplamlar(satirlar):
+    """
+    donemler_hesapla() satırlarından personel ve yıl bazında toplamlar.
+    Dönüş: [{'personel', 'yil', 'donem_sayisi', 'kesinlesmis', alan: toplam}] (personel, yıl sırasıyla)
+    """
+    toplamlar = {}
+    for satir in satirlar:
+        anahtar = (satir['personel'].id, satir['donem'].year)
+        toplam = toplamlar.get(anahtar)
+        if toplam is None:
+            toplam = toplamlar[anahtar] = {
+                'personel': satir['personel'], 'yil': satir['donem'].year,
+                'donem_sayisi': 0, 'kesinlesmis': 0, **{alan: 0.0 for alan in YILLIK_TOPLAM_ALANLARI},
+            }
+        toplam['donem_sayisi'] += 1
+        toplam['kesinlesmis'] += satir['durum'] == 'kesinlesmis'
+        for alan in YILLIK_TOPLAM_ALANLARI:
+            toplam[alan] += satir[alan]
+    return sorted(toplamlar.values(), key=lambda t: (t['personel'].ad, t['personel'].soyad, t['personel'].id, t['yil']))
+
+
+BORDRO_ALANLARI = (
+    'brut_maas', 'calistigi_gun', 'gelmedigi_gun', 'mesai_saati', 'mesai_ucreti',
+    'toplam_prim', 'toplam_kesinti', 'net_odenecek',
+)
+
+
+def _kurus(deger):
+    """Float tutarı 2 haneli Decimal'e çevirir (DecimalField ile aynı yuvarlama)."""
+    return Decimal(repr(float(deger))).quantize(Decimal('0.01'))
+
+
+def _bordro_degerleri(satir):
+    p = satir['personel']
+    return {
+        'brut_maas': p.maas_tutari,
+        'calistigi_gun': satir['calistigi_gun'],
+        'gelmedigi_gun': satir['gelmedigi_gun'],
+        'mesai_saati': _kurus(satir['toplam_mesai']),
+        'mesai_ucreti': _kurus(satir['mesai_ucreti']),
+        'toplam_prim': _kurus(satir['toplam_prim']),
+        'toplam_kesinti': _kurus(satir['toplam_kesinti']),
+        'net_odenecek': _kurus(satir['net_maas']),
+    }
+
+
+def _bordrolari_guncelle(bordrolar, batch_size):
+    """
+    Değişen bordroları yazar. Destekleyen veritabanlarında (SQLite, PostgreSQL)
+    (personel, donem) anahtarı üzerinden tek INSERT ... ON CONFLICT DO UPDATE
+    kullanılır; bulk_update'in ürettiği büyük CASE ifadelerinden çok daha hızlıdır.
+    """
+    if not bordrolar:
+        return
+    if connection.features.supports_update_conflicts_with_target:
+        MaasBordrosu.objects.bulk_create(
+            [MaasBordrosu(personel_id=b.personel_id, donem=b.donem,
+                          **{alan: getattr(b, alan) for alan in BORDRO_ALANLARI})
+             for b in bordrolar],
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=('personel', 'donem'),
+            update_fields=BORDRO_ALANLARI,
+        )
+    else:
+        MaasBordrosu.objects.bulk_update(bordrolar, BORDRO_ALANLARI, batch_size=batch_size)
+
+
+def _taksitleri_deftere_yaz(donem, kesintiler, batch_size):
+    """
+    Dönemde kesilen ve henüz deftere yazılmamış taksitleri TaksitOdemesi'ne toplu
+    yazar; avansların yürüyen toplamını günceller, ödemesi bitenleri kapatır.
+    Dönüş: yazılan satır sayısı.
+    """
+    yeniler = [a for a in kesintiler if not a['deftere_yazildi']]
+    if not yeniler:
+        return 0
+    TaksitOdemesi.objects.bulk_create([
+        TaksitOdemesi(taksit_id=a['id'], personel_id=a['personel_id'], donem=donem,
+                      taksit_no=a['taksit_no'], tutar=a['kesinti'],
+                      odenen_toplam=a['odenen_tutar'] + a['kesinti'])
+        for a in yeniler
+    ], batch_size=batch_size)
+
+    odenen_toplam = Subquery(
+        TaksitOdemesi.objects.filter(taksit=OuterRef('pk'), donem=donem).values('odenen_toplam')[:1]
+    )
+    for i in range(0, len(yeniler), batch_size):
+        TaksitliAvans.objects.filter(id__in=[a['id'] for a in yeniler[i:i + batch_size]]).update(
+            odenen_tutar=odenen_toplam,
+            odenen_taksit=F('odenen_taksit') + 1,
+            tamamlandi=Case(When(toplam_tutar__lte=odenen_toplam, then=Value(True)), default=Value(False)),
+        )
+    return len(yeniler)
+
+
+def donemi_kapat(yil, ay, personel_ids=None, batch_size=500):
+    """
+    Canlı hesaplanan verileri MaasBordrosu tablosuna toplu olarak sabitler.
+
+    Mevcut bordrolar tek sorguda okunur; yeni kayıtlar bulk_create, değişenler
+    toplu upsert (veya bulk_update) ile tek bir transaction içinde yazılır.
+    Değişmeyen kayıtlara dokunulmaz. Aynı transaction'da dönemin taksitleri
+    deftere yazılır; tekrar kapatmada deftere yazılmış taksit yeniden kesilmez.
+
+    Dönüş: (yeni_sayisi, guncellenen_sayisi) - önceden bordrosu olan her personel
+    "güncellendi" sayılır (eski update_or_create davranışıyla aynı).
+    """
+    donem_tarihi = donem_baslangici(yil, ay)
+
+    with transaction.atomic():
+        kesintiler = taksit_kesintileri(yil, ay, personel_ids)
+        satirlar = canli_hesapla(yil, ay, personel_ids, taksitler=_personel_toplamlari(kesintiler))
+        mevcutlar = {
+            b.personel_id: b
+            for b in _personel_filtresi(MaasBordrosu.objects.filter(donem=donem_tarihi), personel_ids)
+        }
+
+        yeniler = []
+        degisenler = []
+        for satir in satirlar:
+            degerler = _bordro_degerleri(satir)
+            bordro = mevcutlar.get(satir['personel'].id)
+            if bordro is None:
+                yeniler.append(MaasBordrosu(personel=satir['personel'], donem=donem_tarihi, **degerler))
+            elif any(getattr(bordro, alan) != deger for alan, deger in degerler.items()):
+                for alan, deger in degerler.items():
+                    setattr(bordro, alan, deger)
+                degisenler.append(bordro)
+
+        MaasBordrosu.objects.bulk_create(yeniler, batch_size=batch_size)
+        _bordrolari_guncelle(degisenler, batch_size)
+        # Bordrosu yazılmayan (pasif) personelin taksiti kesilmez
+        bordrolular = {satir['personel'].id for satir in satirlar}
+        yazilan = _taksitleri_deftere_yaz(
+            donem_tarihi, [a for a in kesintiler if a['personel_id'] in bordrolular], batch_size
+        )
+        if yeniler or degisenler:
+            donem_raporlarini_gecersiz_kil([donem_tarihi])
+        if yazilan:
+            # Kalan tutarlar değişti: taslak dönemlerin taksit kesintisi de değişir
+            taslak_raporlari_gecersiz_kil()
+
+    return len(yeniler), len(satirlar) - len(yeniler)
@@ -0,0 +1,229 @@
+"""
+Asenkron, toplu denetim (audit) kaydı.
+
+İstek içinde IslemLog'a doğrudan yazılmaz: denetim_kaydi() kaydı süreç içi bir
+kuyruğa bırakır ve hemen döner. Arka plandaki tek bir thread kuyruğu toplar ve
+DENETIM_PARTI kayıt dolduğunda ya da ilk kayıttan DENETIM_ARALIK saniye
+geçtiğinde tek bir bulk_create ile yazar. Süreç kapanırken (atexit) kuyrukta
+kalanlar yazılır.
+
+Veritabanına yazılamazsa (kilit, bağlantı hatası) kayıtlar kaybolmaz:
+DENETIM_TASMA_DOSYASI'na satır başına bir JSON olarak eklenir. Bir sonraki
+başarılı yazmadan sonra (veya 'python manage.py denetim_yukle' ile) bu dosya
+tek transaction'da veritabanına aktarılıp silinir.
+
+Kayıt, çağıran transaction commit edildikten sonra kuyruğa girer; geri alınan
+işlemler loglanmaz. DENETIM_SENKRON=True ise kayıt çağıran thread'de hemen yazılır.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: dosya kilidi yalnızca süreç içinde
+    fcntl = None
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import IslemLog, Personel
+
+logger = logging.getLogger(__name__)
+
+_ALANLAR = ('kullanici_id', 'islem_turu', 'konu', 'detay', 'ilgili_personel_id', 'tarih')
+_DUR = object()
+_tasma_thread_kilidi = threading.Lock()
+
+
+def denetim_kaydi(kullanici, islem_turu, konu, detay, ilgili_personel=None):
+    """IslemLog kaydını kuyruğa ekler; veritabanına yazmayı beklemez."""
+    kayit = {
+        'kullanici_id': kullanici.pk if kullanici is not None and kullanici.is_authenticated else None,
+        'islem_turu': islem_turu,
+        'konu': konu,
+        'detay': detay,
+        'ilgili_personel_id': ilgili_personel.pk if ilgili_personel is not None else None,
+        'tarih': timezone.now(),
+    }
+    # Transaction dışında hemen çalışır
+    transaction.on_commit(lambda: _kuyruk.ekle(kayit))
+
+
+def _veritabanina_yaz(kayitlar):
+    # Kuyrukta beklerken silinen kullanıcı/personel: modeldeki SET_NULL davranışı
+    personel_idler = {k['ilgili_personel_id'] for k in kayitlar} - {None}
+    kullanici_idler = {k['kullanici_id'] for k in kayitlar} - {None}
+    if personel_idler:
+        personel_idler = set(Personel.objects.filter(id__in=personel_idler).values_list('id', flat=True))
+    if kullanici_idler:
+        kullanici_idler = set(User.objects.filter(id__in=kullanici_idler).values_list('id', flat=True))
+
+    IslemLog.objects.bulk_create([
+        IslemLog(**{
+            **k,
+            'kullanici_id': k['kullanici_id'] if k['kullanici_id'] in kullanici_idler else None,
+            'ilgili_personel_id': k['ilgili_personel_id'] if k['ilgili_personel_id'] in personel_idler else None,
+        })
+        for k in kayitlar
+    ], batch_size=500)
+
+
+@contextmanager
+def _tasma_kilidi():
+    """Taşma dosyasına yazma/aktarma için süreç ve (destekleniyorsa) sistem geneli kilit."""
+    with _tasma_thread_kilidi:
+        if fcntl is None:
+            yield
+            return
+        yol = settings.DENETIM_TASMA_DOSYASI
+        os.makedirs(os.path.dirname(os.path.abspath(yol)), exist_ok=True)
+        with open(f'{yol}.kilit', 'a') as kilit:
+            fcntl.flock(kilit, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(kilit, fcntl.LOCK_UN)
+
+
+def tasmaya_yaz(kayitlar):
+    """Kayıtları taşma dosyasının sonuna ekler (append-only, fsync)."""
+    with _tasma_kilidi():
+        with open(settings.DENETIM_TASMA_DOSYASI, 'a', encoding='utf-8') as f:
+            for k in kayitlar:
+                f.write(json.dumps({**k, 'tarih': k['tarih'].isoformat()}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def tasmayi_yukle():
+    """
+    Taşma dosyasındaki kayıtları tek transaction'da veritabanına yazar ve dosyayı
+    siler. Yazılamazsa dosya olduğu gibi kalır (hata yukarı iletilir).
+    Dönüş: aktarılan kayıt sayısı
+    """
+    yol = settings.DENETIM_TASMA_DOSYASI
+    if not os.path.exists(yol):
+        return 0
+
+    with _tasma_kilidi():
+        if not os.path.exists(yol):
+            return 0
+        kayitlar = []
+        with open(yol, encoding='utf-8') as f:
+            for satir_no, satir in enumerate(f, start=1):
+                if not satir.strip():
+                    continue
+                try:
+                    k = json.loads(satir)
+                    k['tarih'] = parse_datetime(k['tarih'])
+                    kayitlar.append({alan: k[alan] for alan in _ALANLAR})
+                except (ValueError, KeyError, TypeError):
+                    # Çökme anında yarım kalmış satır
+                    logger.error('Denetim taşma dosyasında okunamayan satır %s: %r', satir_no, satir)
+
+        with transaction.atomic():
+            _veritabanina_yaz(kayitlar)
+        os.remove(yol)
+    return len(kayitlar)
+
+
+def yaz(kayitlar):
+    """Kayıtları veritabanına yazar; olmazsa taşma dosyasına ekler."""
+    try:
+        _veritabanina_yaz(kayitlar)
+    except Exception:
+        logger.exception('Denetim kaydı veritabanına yazılamadı, %s kayıt taşma dosyasına alındı.', len(kayitlar))
+        tasmaya_yaz(kayitlar)
+        return
+
+    if os.path.exists(settings.DENETIM_TASMA_DOSYASI):
+        try:
+            tasmayi_yukle()
+        except Exception:
+            logger.exception('Denetim taşma dosyası aktarılamadı, sonra tekrar denenecek.')
+
+
+class DenetimKuyrugu:
+    def __init__(self):
+        self._kuyruk = queue.Queue()
+        self._thread = None
+        self._kilit = threading.Lock()
+
+    def ekle(self, kayit):
+        if settings.DENETIM_SENKRON:
+            yaz([kayit])
+            return
+        self._baslat()
+        self._kuyruk.put(kayit)
+
+    def _baslat(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._kilit:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._calis, name='denetim-kaydi', daemon=True)
+                self._thread.start()
+
+    def _parti_topla(self):
+        """İlk kaydı bekler; sonra parti dolana ya da süre dolana kadar toplar."""
+        parti = [self._kuyruk.get()]
+        bitis = time.monotonic() + settings.DENETIM_ARALIK
+        while parti[-1] is not _DUR and len(parti) < settings.DENETIM_PARTI:
+            kalan = bitis - time.monotonic()
+            if kalan <= 0:
+                break
+            try:
+                parti.append(self._kuyruk.get(timeout=kalan))
+            except queue.Empty:
+                break
+        return parti
+
+    def _calis(self):
+        while True:
+            parti = self._parti_topla()
+            durdur = parti[-1] is _DUR
+            parti = [k for k in parti if k is not _DUR]
+            if parti:
+                close_old_connections()
+                yaz(parti)
+            if durdur:
+                close_old_connections()
+                return
+
+    def kapat(self, bekle=10):
+        """Thread'i durdurur ve kuyrukta kalan her şeyi yazar (süreç kapanışı)."""
+        if self._thread is not None and self._thread.is_alive():
+            self._kuyruk.put(_DUR)
+            self._thread.join(bekle)
+        self.bosalt()
+
+    def bosalt(self):
+        """Kuyruktakileri çağıran thread'de hemen yazar."""
+        parti = []
+        while True:
+            try:
+                kayit = self._kuyruk.get_nowait()
+            except queue.Empty:
+                break
+            if kayit is not _DUR:
+                parti.append(kayit)
+        if parti:
+            yaz(parti)
+        return len(parti)
+
+
+_kuyruk = DenetimKuyrugu()
+atexit.register(_kuyruk.kapat)
+
+
+def kuyrugu_bosalt():
+    return _kuyruk.bosalt()
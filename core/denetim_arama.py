@@ -0,0 +1,174 @@
+"""
+İşlem geçmişi (IslemLog) tarayıcısı: filtreler, tam metin arama ve keyset sayfalama.
+
+Sayfalar OFFSET ve COUNT(*) kullanmaz: her sayfa bir önceki sayfanın son
+satırının (tarih, id) değerinden "daha eski" koşuluyla (tarih, id) indeksinden
+okunur ve sayfa boyutunun bir fazlası çekilerek sonraki sayfanın varlığı anlaşılır.
+Tablo milyonlarca satıra ulaşsa da her sayfa aynı sürede gelir.
+
+'detay' araması SQLite'ta FTS5 dizinini (core_islemlog_fts), PostgreSQL'de
+to_tsvector GIN indeksini kullanır (migration 0009); dizin yoksa LIKE'a düşer.
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import IslemLog
+
+FTS_TABLOSU = 'core_islemlog_fts'
+SAYFA_BOYUTU = 50
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_fts_durumu = {}
+
+DISA_AKTARIM_BASLIKLARI = ['Tarih', 'Kullanıcı', 'İşlem Türü', 'Konu', 'İlgili Personel', 'Detay']
+
+
+def _tarih_coz(deger):
+    try:
+        return datetime.strptime(deger or '', '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _gun_basi(gun):
+    return timezone.make_aware(datetime.combine(gun, time.min))
+
+
+def _fts_tablosu_var(baglanti):
+    anahtar = (baglanti.alias, str(baglanti.settings_dict['NAME']))
+    if anahtar not in _fts_durumu:
+        _fts_durumu[anahtar] = FTS_TABLOSU in baglanti.introspection.table_names()
+    return _fts_durumu[anahtar]
+
+
+def fts_sorgusu(metin):
+    """Kullanıcının yazdığı kelimeleri FTS5 sorgusuna çevirir: her kelime önek olarak aranır (VE)."""
+    kelimeler = metin.split()
+    return ' '.join('"{}"*'.format(k.replace('"', '""')) for k in kelimeler)
+
+
+def metin_filtresi(qs, metin):
+    """'detay' alanında tam metin araması."""
+    metin = metin.strip()
+    if not metin:
+        return qs
+    baglanti = connections[qs.db]
+    if baglanti.vendor == 'sqlite' and _fts_tablosu_var(baglanti):
+        return qs.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLOSU} WHERE {FTS_TABLOSU} MATCH %s', [fts_sorgusu(metin)]
+        ))
+    if baglanti.vendor == 'postgresql':
+        # İfade, GIN indeksindekiyle birebir aynı olmalı
+        return qs.filter(RawSQL(
+            "to_tsvector('simple', core_islemlog.detay) @@ plainto_tsquery('simple', %s)", [metin],
+            output_field=BooleanField(),
+        ))
+    return qs.filter(detay__icontains=metin)
+
+
+def islem_gecmisi_sorgusu(parametreler):
+    """
+    GET parametrelerine göre filtrelenmiş IslemLog sorgusu ve formda gösterilecek seçimler.
+    Parametreler: kullanici, personel, tur, baslangic, bitis (YYYY-AA-GG, dahil), q
+    """
+    qs = IslemLog.objects.all()
+    secimler = {}
+
+    for parametre, alan in (('kullanici', 'kullanici_id'), ('personel', 'ilgili_personel_id')):
+        deger = parametreler.get(parametre, '')
+        if deger.isdigit():
+            qs = qs.filter(**{alan: int(deger)})
+            secimler[parametre] = int(deger)
+
+    tur = parametreler.get('tur', '')
+    if tur in dict(IslemLog.ISLEM_TURLERI):
+        qs = qs.filter(islem_turu=tur)
+        secimler['tur'] = tur
+
+    baslangic = _tarih_coz(parametreler.get('baslangic'))
+    if baslangic:
+        qs = qs.filter(tarih__gte=_gun_basi(baslangic))
+        secimler['baslangic'] = baslangic
+    bitis = _tarih_coz(parametreler.get('bitis'))
+    if bitis:
+        qs = qs.filter(tarih__lt=_gun_basi(bitis + timedelta(days=1)))
+        secimler['bitis'] = bitis
+
+    metin = parametreler.get('q', '').strip()
+    if metin:
+        qs = metin_filtresi(qs, metin)
+        secimler['q'] = metin
+
+    return qs, secimler
+
+
+def imlec(kayit):
+    """Kaydın (tarih, id) konumunu URL'de taşınabilir bir metne çevirir."""
+    return f'{(kayit.tarih - _EPOCH) // timedelta(microseconds=1)}.{kayit.id}'
+
+
+def imlec_coz(deger):
+    try:
+        mikrosaniye, kayit_id = deger.split('.')
+        return _EPOCH + timedelta(microseconds=int(mikrosaniye)), int(kayit_id)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def sayfa_getir(qs, sonra=None, once=None, boyut=SAYFA_BOYUTU):
+    """
+    En yeniden eskiye bir sayfa kayıt döner.
+    sonra: bu imleçten daha eski kayıtlar (sonraki sayfa)
+    once: bu imleçten daha yeni kayıtlar (önceki sayfa)
+
+    Dönüş: {'kayitlar', 'sonraki', 'onceki'} (imleçler; sayfa yoksa None)
+    """
+    qs = qs.select_related('kullanici', 'ilgili_personel')
+    sonra, once = imlec_coz(sonra), imlec_coz(once)
+
+    if once:
+        tarih, kayit_id = once
+        satirlar = list(qs.filter(Q(tarih__gt=tarih) | Q(id__gt=kayit_id), tarih__gte=tarih)
+                        .order_by('tarih', 'id')[:boyut + 1])
+        daha_yeni_var = len(satirlar) > boyut
+        kayitlar = satirlar[:boyut][::-1]
+        return {
+            'kayitlar': kayitlar,
+            'sonraki': imlec(kayitlar[-1]) if kayitlar else None,
+            'onceki': imlec(kayitlar[0]) if daha_yeni_var else None,
+        }
+
+    if sonra:
+        tarih, kayit_id = sonra
+        # Ayrı tarih__lte koşulu indekste doğrudan imlecin konumuna atlanmasını sağlar;
+        # sadece VEYA'lı koşulla SQLite indeksi baştan tarar.
+        qs = qs.filter(Q(tarih__lt=tarih) | Q(id__lt=kayit_id), tarih__lte=tarih)
+    satirlar = list(qs.order_by('-tarih', '-id')[:boyut + 1])
+    kayitlar = satirlar[:boyut]
+    return {
+        'kayitlar': kayitlar,
+        'sonraki': imlec(kayitlar[-1]) if len(satirlar) > boyut else None,
+        'onceki': imlec(kayitlar[0]) if sonra and kayitlar else None,
+    }
+
+
+def disa_aktarim_satirlari(qs):
+    """Filtrelenmiş kayıtları veritabanından parça parça okuyup dışa aktarım satırı olarak üretir."""
+    tur_adlari = dict(IslemLog.ISLEM_TURLERI)
+    alanlar = ('tarih', 'kullanici__username', 'islem_turu', 'konu',
+               'ilgili_personel__ad', 'ilgili_personel__soyad', 'detay')
+    for tarih, kullanici, tur, konu, ad, soyad, detay in (
+        qs.order_by('-tarih', '-id').values_list(*alanlar).iterator(chunk_size=2000)
+    ):
+        yield (
+            timezone.localtime(tarih).strftime('%d.%m.%Y %H:%M:%S'),
+            kullanici or '-',
+            tur_adlari.get(tur, tur),
+            konu,
+            f'{ad} {soyad}' if ad else '-',
+            detay,
+        )
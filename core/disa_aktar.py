@@ -0,0 +1,256 @@
+"""
+Akış (streaming) tabanlı Excel dışa aktarımı.
+
+Satırlar bir iterable/generator'dan tek tek okunur, sayfa XML'i satır satır
+üretilip sıkıştırılarak doğrudan yanıta akıtılır. Çalışma kitabı hiçbir
+zaman bütün olarak bellekte tutulmaz; satır sayısı ne olursa olsun bellek
+kullanımı sabit kalır.
+
+Not: openpyxl'in write-only modu lxml kurulu değilse hücreleri bellekte
+biriktirdiği için burada küçük, bağımlılıksız bir yazıcı kullanılır.
+
+csv_yanit() aynı akış mantığıyla CSV, zip_parcalari() çok dosyalı ZIP üretir.
+"""
+import csv
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Excel sayfa adında kullanılamayan karakterler
+_YASAK_KARAKTERLER = str.maketrans({k: '_' for k in '[]:*?/\\'})
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sayfa_adi}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SAYFA_BASI = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SAYFA_SONU = '</sheetData></worksheet>'
+
+
+class _AkisTamponu:
+    """zipfile'ın yazdığı baytları toplayan, konumlanamayan (non-seekable) dosya nesnesi."""
+
+    def __init__(self):
+        self._parcalar = []
+
+    def write(self, veri):
+        self._parcalar.append(bytes(veri))
+        return len(veri)
+
+    def flush(self):
+        pass
+
+    def bosalt(self):
+        veri = b''.join(self._parcalar)
+        self._parcalar.clear()
+        return veri
+
+
+def _hucre(sutun, satir_no, deger):
+    ref = f'{sutun}{satir_no}'
+    if deger is None:
+        return ''
+    if isinstance(deger, bool):
+        return f'<c r="{ref}" t="b"><v>{int(deger)}</v></c>'
+    if isinstance(deger, (int, float, Decimal)):
+        return f'<c r="{ref}"><v>{deger}</v></c>'
+    metin = escape(ILLEGAL_CHARACTERS_RE.sub('', str(deger)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{metin}</t></is></c>'
+
+
+def xlsx_parcalari(sayfa_adi, basliklar, satirlar, parca_satir=500):
+    """
+    xlsx dosyasını bayt parçaları halinde üretir (generator).
+    Her parca_satir satırda bir sıkıştırılmış parça dışarı verilir.
+    """
+    sayfa_adi = escape(sayfa_adi.translate(_YASAK_KARAKTERLER)[:31], {'"': '&quot;'})
+    tampon = _AkisTamponu()
+
+    with zipfile.ZipFile(tampon, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _ROOT_RELS)
+        zf.writestr('xl/workbook.xml', _WORKBOOK.format(sayfa_adi=sayfa_adi))
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sayfa:
+            sayfa.write(_SAYFA_BASI.encode())
+            sutunlar = []
+            for satir_no, satir in enumerate(_satirlar_ile_baslik(basliklar, satirlar), start=1):
+                satir = list(satir)
+                while len(sutunlar) < len(satir):
+                    sutunlar.append(get_column_letter(len(sutunlar) + 1))
+                hucreler = ''.join(_hucre(sutunlar[i], satir_no, d) for i, d in enumerate(satir))
+                sayfa.write(f'<row r="{satir_no}">{hucreler}</row>'.encode())
+                if satir_no % parca_satir == 0:
+                    veri = tampon.bosalt()
+                    if veri:
+                        yield veri
+            sayfa.write(_SAYFA_SONU.encode())
+
+    yield tampon.bosalt()
+
+
+def _satirlar_ile_baslik(basliklar, satirlar):
+    yield basliklar
+    yield from satirlar
+
+
+def xlsx_yaz(dosya, sayfa_adi, basliklar, satirlar):
+    """Satırları tek tek okuyarak dosya benzeri nesneye xlsx yazar."""
+    for parca in xlsx_parcalari(sayfa_adi, basliklar, satirlar):
+        dosya.write(parca)
+
+
+def xlsx_yanit(dosya_adi, sayfa_adi, basliklar, satirlar):
+    """xlsx dosyasını üretildikçe istemciye akıtan StreamingHttpResponse döner."""
+    response = StreamingHttpResponse(
+        xlsx_parcalari(sayfa_adi, basliklar, satirlar), content_type=XLSX_CONTENT_TYPE
+    )
+    response['Content-Disposition'] = f'attachment; filename="{dosya_adi}"'
+    return response
+
+
+def zip_parcalari(dosyalar):
+    """
+    (ad, içerik) çiftlerinden ZIP arşivini bayt parçaları halinde üretir (generator).
+    İçerik bayt veya bayt parçaları üreten bir iterable olabilir; parçalar
+    sıkıştırıldıkça dışarı verilir, arşiv (ve büyük dosyalar) bellekte tutulmaz.
+    """
+    tampon = _AkisTamponu()
+    with zipfile.ZipFile(tampon, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for ad, icerik in dosyalar:
+            if isinstance(icerik, bytes):
+                zf.writestr(ad, icerik)
+            else:
+                with zf.open(ad, 'w', force_zip64=True) as hedef:
+                    for parca in icerik:
+                        hedef.write(parca)
+                        veri = tampon.bosalt()
+                        if veri:
+                            yield veri
+            veri = tampon.bosalt()
+            if veri:
+                yield veri
+    yield tampon.bosalt()
+
+
+class _Yanki:
+    """csv.writer'ın yazdığı satırı saklamadan geri döndüren dosya benzeri nesne."""
+
+    def write(self, deger):
+        return deger
+
+
+def csv_parcalari(basliklar, satirlar, parca_satir=500):
+    """
+    CSV'yi metin parçaları halinde üretir (generator). Excel'in Türkçe ayarlarıyla
+    doğrudan açılabilmesi için UTF-8 BOM ile başlar ve ';' ayırıcı kullanır.
+    """
+    yazici = csv.writer(_Yanki(), delimiter=';')
+    parca = ['\ufeff']
+    for satir in _satirlar_ile_baslik(basliklar, satirlar):
+        parca.append(yazici.writerow(satir))
+        if len(parca) >= parca_satir:
+            yield ''.join(parca)
+            parca = []
+    yield ''.join(parca)
+
+
+def csv_yanit(dosya_adi, basliklar, satirlar):
+    """CSV dosyasını üretildikçe istemciye akıtan StreamingHttpResponse döner."""
+    response = StreamingHttpResponse(csv_parcalari(basliklar, satirlar), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{dosya_adi}"'
+    return response
+
+
+MAAS_RAPORU_BASLIKLARI = [
+    'Ad Soyad', 'Çalışma Tipi', 'Çalıştığı Gün', 'Gelmediği Gün', 'Ana Hakediş',
+    'Mesai Saati', 'Mesai Ücreti', 'Primler', 'Kesintiler', 'NET ÖDENECEK',
+]
+
+
+def maas_raporu_satirlari(rapor_listesi):
+    """core.bordro rapor satırlarını Excel satırlarına çevirir."""
+    for item in rapor_listesi:
+        p = item['personel']
+        yield (
+            f"{p.ad} {p.soyad}",
+            p.get_calisma_tipi_display(),
+            item['calistigi_gun'],
+            item['gelmedigi_gun'],
+            item['ana_hakedis'],
+            item['toplam_mesai'],
+            item['mesai_ucreti'],
+            item['toplam_prim'],
+            item['toplam_kesinti'],
+            item['net_maas'],
+        )
+
+
+MAAS_GECMISI_BASLIKLARI = ['Dönem', 'Durum'] + MAAS_RAPORU_BASLIKLARI
+YILLIK_TOPLAM_BASLIKLARI = [
+    'Ad Soyad', 'Yıl', 'Dönem Sayısı', 'Kesinleşmiş Dönem', 'Mesai Saati', 'Mesai Ücreti',
+    'Primler', 'Kesintiler', 'NET ÖDENECEK',
+]
+
+
+def maas_gecmisi_satirlari(satirlar):
+    """core.bordro.donemler_hesapla satırlarını Excel satırlarına çevirir."""
+    for item, satir in zip(satirlar, maas_raporu_satirlari(satirlar)):
+        yield (item['donem'].strftime('%m.%Y'), 'Kesinleşmiş' if item['durum'] == 'kesinlesmis' else 'Taslak', *satir)
+
+
+def yillik_toplam_satirlari(toplamlar):
+    """core.bordro.yillik_toplamlar satırlarını Excel satırlarına çevirir."""
+    for t in toplamlar:
+        p = t['personel']
+        yield (
+            f"{p.ad} {p.soyad}",
+            t['yil'],
+            t['donem_sayisi'],
+            t['kesinlesmis'],
+            t['toplam_mesai'],
+            t['mesai_ucreti'],
+            t['toplam_prim'],
+            t['toplam_kesinti'],
+            t['net_maas'],
+        )
@@ -0,0 +1,37 @@
+"""
+Dönem (ay) tarih aralıkları.
+
+tarih__year / tarih__month filtreleri SQL'de tarih parçalama ifadelerine
+(SQLite'ta django_date_extract) derlenir ve indeks kullanamaz; her rapor tabloyu
+baştan sona tarar. Bunun yerine ay, [ayın 1'i, sonraki ayın 1'i) yarı açık
+aralığı olarak filtrelenir; bu karşılaştırma tarih içeren indekslerden okunur.
+"""
+from datetime import date
+
+from django.db.models import Q
+
+
+def donem_baslangici(yil, ay):
+    return date(yil, ay, 1)
+
+
+def sonraki_ay(tarih):
+    """Verilen tarihten sonraki ayın 1'i."""
+    if tarih.month == 12:
+        return date(tarih.year + 1, 1, 1)
+    return date(tarih.year, tarih.month + 1, 1)
+
+
+def donem_araligi(yil, ay):
+    """(ayın 1'i, sonraki ayın 1'i) - bitiş hariç."""
+    baslangic = donem_baslangici(yil, ay)
+    return baslangic, sonraki_ay(baslangic)
+
+
+def donem_filtresi(yil, ay, alan='tarih'):
+    """
+    alan'ın verilen aya düştüğü kayıtlar için Q nesnesi.
+    Örn: Puantaj.objects.filter(donem_filtresi(2025, 3))
+    """
+    baslangic, bitis = donem_araligi(yil, ay)
+    return Q(**{f'{alan}__gte': baslangic, f'{alan}__lt': bitis})
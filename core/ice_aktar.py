@@ -0,0 +1,231 @@
+"""
+Excel'den toplu personel içe aktarımı.
+
+Dosya openpyxl read-only modunda satır satır okunur ve parçalara (chunk) bölünür.
+Her parça pandas ile sütun bazında doğrulanıp dönüştürülür; mevcut TC numaraları
+parça başına tek sorguda bulunur ve yeni personel bulk_create ile eklenir.
+"upsert" modunda mevcut personel de toplu olarak güncellenir; seçimli sütunlardan
+(SECIMLI_SUTUNLAR) dosyada olmayanlar güncellenmez, boş hücre mevcut değeri korur.
+"""
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import pandas as pd
+from django.db import connection, transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from .models import Personel
+from .onbellek import personel_raporlarini_gecersiz_kil
+
+ZORUNLU_SUTUNLAR = ['Ad', 'Soyad', 'TC No', 'Telefon', 'Çalışma Tipi', 'Maaş']
+GUNCELLENEN_ALANLAR = ('ad', 'soyad', 'telefon', 'calisma_tipi', 'maas_tutari')
+# Seçimli alan -> sütun; güncellemede yalnızca dosyada olan sütunların alanları yazılır
+SECIMLI_SUTUNLAR = {
+    'ozel_mesai_ucreti': 'Mesai Ücreti',
+    'iban': 'IBAN',
+    'banka_adi': 'Banka',
+    'ise_giris_tarihi': 'Giriş Tarihi',
+}
+VARSAYILAN_MESAI_UCRETI = Decimal('250.00')
+
+
+@dataclass
+class IceAktarimSonucu:
+    eklenen: int = 0
+    guncellenen: int = 0
+    atlanan: int = 0
+    hatalar: list = field(default_factory=list)  # [(satir_no, tc_no, mesaj)]
+
+    def hata_ekle(self, satir_no, tc_no, mesaj):
+        self.hatalar.append((satir_no, tc_no, mesaj))
+        self.atlanan += 1
+
+
+def excel_parcalari(dosya, parca_boyutu=1000):
+    """
+    Excel dosyasını (başlık satırı + veri) okuyup (satir_numaralari, DataFrame)
+    parçaları üretir. Tamamen boş satırlar atlanır.
+    """
+    wb = load_workbook(dosya, read_only=True, data_only=True)
+    try:
+        satirlar = wb.active.iter_rows(values_only=True)
+        baslik = next(satirlar, None)
+        if baslik is None:
+            return
+        sutunlar = [str(b).strip() if b is not None else '' for b in baslik]
+
+        eksikler = [s for s in ZORUNLU_SUTUNLAR if s not in sutunlar]
+        if eksikler:
+            raise ValueError(f"Eksik başlık(lar): {', '.join(eksikler)}")
+
+        numaralar, veriler = [], []
+        for satir_no, satir in enumerate(satirlar, start=2):
+            if all(h is None or str(h).strip() == '' for h in satir):
+                continue
+            numaralar.append(satir_no)
+            veriler.append(list(satir[:len(sutunlar)]) + [None] * (len(sutunlar) - len(satir)))
+            if len(veriler) >= parca_boyutu:
+                yield numaralar, pd.DataFrame(veriler, columns=sutunlar)
+                numaralar, veriler = [], []
+        if veriler:
+            yield numaralar, pd.DataFrame(veriler, columns=sutunlar)
+    finally:
+        wb.close()
+
+
+def _metin(seri):
+    """Sütunu temiz metne çevirir. Excel'in sayıya çevirdiği değerlerdeki '.0' atılır."""
+    return (
+        seri.astype(object).where(seri.notna(), '')
+        .astype(str).str.strip()
+        .str.replace(r'\.0$', '', regex=True)
+    )
+
+
+def _sutun(df, ad):
+    if ad in df.columns:
+        return df[ad]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def parcayi_donustur(df):
+    """
+    Bir parçayı sütun bazında doğrular ve dönüştürür.
+    Dönüş: (temiz DataFrame, {satır index: hata mesajı})
+    """
+    temiz = pd.DataFrame(index=df.index)
+    temiz['tc_no'] = _metin(df['TC No'])
+    temiz['ad'] = _metin(df['Ad'])
+    temiz['soyad'] = _metin(df['Soyad'])
+    temiz['telefon'] = _metin(df['Telefon'])
+    temiz['iban'] = _metin(_sutun(df, 'IBAN')).str.replace(' ', '', regex=False)
+    temiz['banka_adi'] = _metin(_sutun(df, 'Banka'))
+    temiz['calisma_tipi'] = _metin(df['Çalışma Tipi']).str.lower().map(lambda t: 'gunluk' if 'gün' in t else 'aylik')
+
+    temiz['maas_tutari'] = pd.to_numeric(df['Maaş'], errors='coerce')
+    mesai_ham = _sutun(df, 'Mesai Ücreti')
+    temiz['ozel_mesai_ucreti'] = pd.to_numeric(mesai_ham, errors='coerce')
+
+    tarih_ham = _sutun(df, 'Giriş Tarihi')
+    temiz['ise_giris_tarihi'] = pd.to_datetime(tarih_ham, errors='coerce', dayfirst=True, format='mixed')
+
+    hatalar = {}
+
+    def isaretle(maske, mesaj):
+        for idx in temiz.index[maske]:
+            hatalar.setdefault(idx, mesaj)
+
+    isaretle(temiz['tc_no'] == '', "TC No boş.")
+    isaretle(temiz['tc_no'].str.len() > 11, "TC No 11 haneden uzun.")
+    isaretle((temiz['ad'] == '') | (temiz['soyad'] == ''), "Ad/Soyad boş.")
+    isaretle(temiz['telefon'].str.len() > 15, "Telefon 15 karakterden uzun.")
+    isaretle(temiz['iban'].str.len() > 34, "IBAN 34 karakterden uzun.")
+    isaretle(temiz['maas_tutari'].isna(), "Maaş sayısal değil.")
+    isaretle(mesai_ham.notna() & temiz['ozel_mesai_ucreti'].isna(), "Mesai Ücreti sayısal değil.")
+    isaretle(tarih_ham.notna() & temiz['ise_giris_tarihi'].isna(), "Giriş Tarihi okunamadı.")
+
+    return temiz, hatalar
+
+
+def _personel(satir, bugun, mevcut=None):
+    """
+    Satırdan Personel üretir. Seçimli alanın hücresi boşsa yeni personelde varsayılan,
+    güncellenen personelde (mevcut: SECIMLI_SUTUNLAR alanlarının kayıtlı değerleri) mevcut değer kullanılır.
+    """
+    if mevcut is None:
+        mevcut = {'ozel_mesai_ucreti': VARSAYILAN_MESAI_UCRETI, 'iban': '', 'banka_adi': '', 'ise_giris_tarihi': bugun}
+    mesai = satir.ozel_mesai_ucreti
+    tarih = satir.ise_giris_tarihi
+    return Personel(
+        ad=satir.ad,
+        soyad=satir.soyad,
+        tc_no=satir.tc_no,
+        telefon=satir.telefon,
+        calisma_tipi=satir.calisma_tipi,
+        maas_tutari=Decimal(str(satir.maas_tutari)).quantize(Decimal('0.01')),
+        ozel_mesai_ucreti=mevcut['ozel_mesai_ucreti'] if pd.isna(mesai) else Decimal(str(mesai)).quantize(Decimal('0.01')),
+        iban=satir.iban or mevcut['iban'],
+        banka_adi=satir.banka_adi or mevcut['banka_adi'],
+        ise_giris_tarihi=mevcut['ise_giris_tarihi'] if pd.isna(tarih) else tarih.date(),
+    )
+
+
+def personel_ice_aktar(dosya, guncelle=False, parca_boyutu=1000, ilerleme=None):
+    """
+    Excel dosyasındaki personelleri parça parça içe aktarır.
+
+    guncelle=False: TC No'su sistemde olan satırlar atlanır (eski davranış).
+    guncelle=True : mevcut personel dosyadaki değerlerle güncellenir (upsert).
+    ilerleme: her parçadan sonra işlenen satır sayısıyla çağrılan fonksiyon (opsiyonel).
+
+    Dönüş: IceAktarimSonucu (satır bazında hata raporu ile)
+    """
+    sonuc = IceAktarimSonucu()
+    bugun = timezone.now().date()
+    gorulen_tc = set()
+    islenen = 0
+
+    for numaralar, df in excel_parcalari(dosya, parca_boyutu):
+        temiz, hatalar = parcayi_donustur(df)
+
+        mevcutlar = {
+            m['tc_no']: m for m in Personel.objects.filter(tc_no__in=set(temiz['tc_no'])).values(
+                'id', 'tc_no', *SECIMLI_SUTUNLAR)
+        }
+        guncellenen_alanlar = GUNCELLENEN_ALANLAR + tuple(
+            alan for alan, sutun in SECIMLI_SUTUNLAR.items() if sutun in df.columns)
+
+        yeniler, guncellenecekler = [], []
+        for idx, satir in zip(temiz.index, temiz.itertuples(index=False)):
+            satir_no = numaralar[idx]
+            if idx in hatalar:
+                sonuc.hata_ekle(satir_no, satir.tc_no, hatalar[idx])
+                continue
+            if satir.tc_no in gorulen_tc:
+                sonuc.hata_ekle(satir_no, satir.tc_no, "TC No dosyada birden fazla kez geçiyor.")
+                continue
+            gorulen_tc.add(satir.tc_no)
+
+            mevcut = mevcutlar.get(satir.tc_no)
+            if mevcut is None:
+                yeniler.append(_personel(satir, bugun))
+            elif guncelle:
+                personel = _personel(satir, bugun, mevcut)
+                personel.id = mevcut['id']
+                guncellenecekler.append(personel)
+            else:
+                sonuc.hata_ekle(satir_no, satir.tc_no, "Bu TC No ile kayıtlı personel var, atlandı.")
+
+        with transaction.atomic():
+            Personel.objects.bulk_create(yeniler, batch_size=500)
+            _personelleri_guncelle(guncellenecekler, guncellenen_alanlar)
+            if yeniler or guncellenecekler:
+                # bulk_create sinyal üretmez; taslak raporlar burada geçersiz kılınır
+                personel_raporlarini_gecersiz_kil()
+
+        sonuc.eklenen += len(yeniler)
+        sonuc.guncellenen += len(guncellenecekler)
+        islenen += len(df)
+        if ilerleme:
+            ilerleme(islenen)
+
+    return sonuc
+
+
+def _personelleri_guncelle(personeller, alanlar=GUNCELLENEN_ALANLAR):
+    """
+    personellerin verilen alanlarını yazar. Destekleyen veritabanlarında tc_no
+    üzerinden tek INSERT ... ON CONFLICT DO UPDATE, diğerlerinde bulk_update kullanılır.
+    """
+    if not personeller:
+        return
+    if connection.features.supports_update_conflicts_with_target:
+        for p in personeller:
+            p.id = None
+        Personel.objects.bulk_create(
+            personeller, batch_size=500, update_conflicts=True,
+            unique_fields=('tc_no',), update_fields=alanlar,
+        )
+    else:
+        Personel.objects.bulk_update(personeller, alanlar, batch_size=500)
@@ -0,0 +1,241 @@
+"""
+Veritabanı tabanlı hafif arka plan iş kuyruğu.
+
+Uzun işlemler istek içinde çalışmaz: view'lar ArkaPlanIsi kaydı açıp hemen döner,
+'python manage.py is_calistir' worker'ı bekleyen işleri sırayla alıp çalıştırır.
+Harici bir broker (Redis, RabbitMQ) gerekmez. ISLER_SENKRON=True ise (geliştirme)
+iş kuyruğa eklendiği anda aynı istek içinde çalıştırılır. Worker durduğunda
+yarım kalan işler yarim_kalan_isleri_kurtar() ile yeniden kuyruğa alınır.
+"""
+import calendar
+import os
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArkaPlanIsi
+
+IS_TURLERI = {}
+
+
+def is_turu(tur):
+    """Bir fonksiyonu verilen iş türünün çalıştırıcısı olarak kaydeder."""
+    def kaydet(fonksiyon):
+        IS_TURLERI[tur] = fonksiyon
+        return fonksiyon
+    return kaydet
+
+
+def is_klasoru():
+    klasor = settings.ISLER_KLASORU
+    os.makedirs(klasor, exist_ok=True)
+    return klasor
+
+
+def yeni_dosya_yolu(uzanti):
+    """İş klasöründe benzersiz bir dosya adı döner: (tam_yol, dosya_adi)."""
+    dosya_adi = f"{uuid.uuid4().hex}{uzanti}"
+    return os.path.join(is_klasoru(), dosya_adi), dosya_adi
+
+
+def is_kuyruga_ekle(tur, kullanici=None, **parametreler):
+    if tur not in IS_TURLERI:
+        raise ValueError(f"Bilinmeyen iş türü: {tur}")
+
+    is_kaydi = ArkaPlanIsi.objects.create(
+        tur=tur,
+        parametreler=parametreler,
+        olusturan=kullanici if kullanici is not None and kullanici.is_authenticated else None,
+    )
+    if getattr(settings, 'ISLER_SENKRON', False):
+        ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(durum='calisiyor', baslama_tarihi=timezone.now())
+        is_kaydi.refresh_from_db()
+        isi_calistir(is_kaydi)
+    return is_kaydi
+
+
+def siradaki_isi_al():
+    """
+    En eski bekleyen işi 'calisiyor' olarak işaretleyip döner (yoksa None).
+    Koşullu UPDATE sayesinde aynı işi iki worker alamaz.
+    """
+    while True:
+        is_id = (
+            ArkaPlanIsi.objects.filter(durum='bekliyor')
+            .order_by('id').values_list('id', flat=True).first()
+        )
+        if is_id is None:
+            return None
+        alindi = ArkaPlanIsi.objects.filter(id=is_id, durum='bekliyor').update(
+            durum='calisiyor', baslama_tarihi=timezone.now()
+        )
+        if alindi:
+            return ArkaPlanIsi.objects.get(id=is_id)
+
+
+def yarim_kalan_isleri_kurtar(sure=None):
+    """
+    Worker'ı öldürülen (çökme, yeniden başlatma) ve sure saniyeden (varsayılan
+    ISLER_TAKILMA_SURESI) uzun süredir 'calisiyor' görünen işleri ele alır:
+    ilk seferde kuyruğa geri koyar, tekrar yarım kalmışsa (ör. worker'ı her
+    seferinde çökerten iş) 'hata' ile kapatır. Dönüş: (yeniden_kuyrukta, hatali)
+    """
+    sinir = timezone.now() - timedelta(seconds=settings.ISLER_TAKILMA_SURESI if sure is None else sure)
+    yeniden, hatali = 0, 0
+    for is_kaydi in ArkaPlanIsi.objects.filter(
+        Q(baslama_tarihi__lt=sinir) | Q(baslama_tarihi__isnull=True), durum='calisiyor'
+    ):
+        deneme = is_kaydi.parametreler.get('yarim_kalma', 0) + 1
+        is_kaydi.parametreler['yarim_kalma'] = deneme
+        # Koşullu UPDATE: bu arada biten ya da başka worker'ın ele aldığı iş değiştirilmez
+        if deneme > 1:
+            hatali += ArkaPlanIsi.objects.filter(id=is_kaydi.id, durum='calisiyor').update(
+                durum='hata', parametreler=is_kaydi.parametreler, bitis_tarihi=timezone.now(),
+                sonuc_mesaji="İş çalışırken worker durdu ve yeniden denemede de tamamlanamadı.",
+            )
+        else:
+            yeniden += ArkaPlanIsi.objects.filter(id=is_kaydi.id, durum='calisiyor').update(
+                durum='bekliyor', parametreler=is_kaydi.parametreler, baslama_tarihi=None, ilerleme=0,
+            )
+    return yeniden, hatali
+
+
+def ilerleme_kaydet(is_kaydi, yuzde):
+    yuzde = max(0, min(100, int(yuzde)))
+    is_kaydi.ilerleme = yuzde
+    ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(ilerleme=yuzde)
+
+
+def isi_calistir(is_kaydi):
+    """İşi türüne ait fonksiyonla çalıştırır; sonucu veya hatayı kayda yazar."""
+    try:
+        sonuc_mesaji = IS_TURLERI[is_kaydi.tur](is_kaydi) or ''
+    except Exception as e:
+        is_kaydi.durum = 'hata'
+        is_kaydi.sonuc_mesaji = f"{e}\n\n{traceback.format_exc()}"
+    else:
+        is_kaydi.durum = 'tamamlandi'
+        is_kaydi.ilerleme = 100
+        is_kaydi.sonuc_mesaji = sonuc_mesaji
+
+    is_kaydi.bitis_tarihi = timezone.now()
+    is_kaydi.save(update_fields=['durum', 'ilerleme', 'sonuc_mesaji', 'sonuc_dosyasi', 'bitis_tarihi'])
+    return is_kaydi
+
+
+# --- İŞ TÜRLERİ ---
+
+@is_turu('donem_kapat')
+def _donem_kapat(is_kaydi):
+    from .bordro import donemi_kapat
+    from .denetim import denetim_kaydi
+
+    yil, ay = is_kaydi.parametreler['yil'], is_kaydi.parametreler['ay']
+    created_count, updated_count = donemi_kapat(yil, ay)
+
+    denetim_kaydi(
+        is_kaydi.olusturan, 'kritik', 'Bordro Kesinleştirme',
+        f"{calendar.month_name[ay]} {yil} dönemi kapatıldı. ({created_count} yeni, {updated_count} güncellendi)",
+    )
+    return f"{calendar.month_name[ay]} {yil} dönemi için Bordro oluşturuldu. ({created_count} yeni, {updated_count} güncellendi)"
+
+
+@is_turu('maas_raporu')
+def _maas_raporu(is_kaydi):
+    from .bordro import donem_hesapla
+    from .disa_aktar import MAAS_RAPORU_BASLIKLARI, maas_raporu_satirlari, xlsx_yaz
+
+    yil, ay = is_kaydi.parametreler['yil'], is_kaydi.parametreler['ay']
+    _, rapor_listesi = donem_hesapla(yil, ay)
+    ilerleme_kaydet(is_kaydi, 50)
+
+    yol, dosya_adi = yeni_dosya_yolu('.xlsx')
+    with open(yol, 'wb') as f:
+        xlsx_yaz(f, f'{ay}-{yil} Maas Raporu', MAAS_RAPORU_BASLIKLARI, maas_raporu_satirlari(rapor_listesi))
+
+    is_kaydi.sonuc_dosyasi = dosya_adi
+    is_kaydi.parametreler['indirme_adi'] = f"Maas_Raporu_{ay}_{yil}.xlsx"
+    ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(parametreler=is_kaydi.parametreler)
+    return f"{ay}/{yil} maaş raporu hazır ({len(rapor_listesi)} personel)."
+
+
+@is_turu('personel_ice_aktar')
+def _personel_ice_aktar(is_kaydi):
+    from openpyxl import load_workbook
+    from .disa_aktar import xlsx_yaz
+    from .ice_aktar import personel_ice_aktar
+
+    girdi = os.path.join(is_klasoru(), is_kaydi.parametreler['girdi_dosyasi'])
+    try:
+        wb = load_workbook(girdi, read_only=True)
+        toplam_satir = max((wb.active.max_row or 1) - 1, 1)
+        wb.close()
+
+        sonuc = personel_ice_aktar(
+            girdi,
+            guncelle=is_kaydi.parametreler.get('guncelle', False),
+            ilerleme=lambda islenen: ilerleme_kaydet(is_kaydi, islenen * 99 / toplam_satir),
+        )
+    finally:
+        os.remove(girdi)
+
+    mesaj = f"{sonuc.eklenen} personel başarıyla eklendi."
+    if sonuc.guncellenen:
+        mesaj += f" {sonuc.guncellenen} personel güncellendi."
+    mesaj += f" {sonuc.atlanan} kayıt atlandı."
+
+    if sonuc.hatalar:
+        # Satır bazında hata raporu indirilebilir dosya olarak saklanır
+        yol, dosya_adi = yeni_dosya_yolu('.xlsx')
+        with open(yol, 'wb') as f:
+            xlsx_yaz(f, 'Atlanan Satirlar', ['Satır', 'TC No', 'Hata'], sonuc.hatalar)
+        is_kaydi.sonuc_dosyasi = dosya_adi
+        is_kaydi.parametreler['indirme_adi'] = 'personel_import_hatalar.xlsx'
+        ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(parametreler=is_kaydi.parametreler)
+    return mesaj
+
+
+@is_turu('pdks_ice_aktar')
+def _pdks_ice_aktar(is_kaydi):
+    from .disa_aktar import xlsx_yaz
+    from .pdks import pdks_ice_aktar
+
+    girdi = os.path.join(is_klasoru(), is_kaydi.parametreler['girdi_dosyasi'])
+    try:
+        sonuc = pdks_ice_aktar(girdi, ilerleme=lambda yuzde: ilerleme_kaydet(is_kaydi, yuzde))
+    finally:
+        os.remove(girdi)
+
+    mesaj = f"{sonuc.eklenen} yeni, {sonuc.guncellenen} güncellenen yoklama günü. {sonuc.atlanan} okutma atlandı."
+    if sonuc.hatalar:
+        yol, dosya_adi = yeni_dosya_yolu('.xlsx')
+        with open(yol, 'wb') as f:
+            xlsx_yaz(f, 'Atlanan Okutmalar', ['Satır', 'TC No', 'Hata'], sonuc.hatalar)
+        is_kaydi.sonuc_dosyasi = dosya_adi
+        is_kaydi.parametreler['indirme_adi'] = 'pdks_import_hatalar.xlsx'
+        ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(parametreler=is_kaydi.parametreler)
+    return mesaj
+
+
+@is_turu('toplu_pusula')
+def _toplu_pusula(is_kaydi):
+    from .pusula import pusulalari_hesapla, toplu_pusula_yaz
+
+    yil, ay = is_kaydi.parametreler['yil'], is_kaydi.parametreler['ay']
+    bicim = is_kaydi.parametreler.get('bicim', 'html')
+    pusulalar = pusulalari_hesapla(yil, ay)
+    ilerleme_kaydet(is_kaydi, 20)
+
+    uzanti = '.zip' if bicim == 'zip' else '.html'
+    yol, dosya_adi = yeni_dosya_yolu(uzanti)
+    with open(yol, 'wb') as f:
+        toplu_pusula_yaz(f, yil, ay, pusulalar, bicim)
+
+    is_kaydi.sonuc_dosyasi = dosya_adi
+    is_kaydi.parametreler['indirme_adi'] = f"Pusulalar_{ay}_{yil}{uzanti}"
+    ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(parametreler=is_kaydi.parametreler)
+    return f"{ay}/{yil} maaş pusulaları hazır ({len(pusulalar)} personel)."
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from core.arsiv import (arsivi_temizle, arsivlenecek_donemler, donemi_arsivle, donemi_geri_al,
+                        loglari_arsivle)
+from core.router import ARSIV_DB
+from core.senkron import senkron_kayitlarini_temizle
+
+
+def _donem(deger):
+    try:
+        return datetime.strptime(deger, '%Y-%m').date()
+    except ValueError:
+        raise CommandError(f"Dönem YYYY-AA biçiminde olmalıdır: {deger}")
+
+
+class Command(BaseCommand):
+    help = ('Bordrosu kesilmiş eski dönemlerin puantajlarını ve eski işlem loglarını arşiv '
+            'veritabanına taşır, saklama süresini aşan arşiv ve senkron kayıtlarını siler.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--donem', help='Sadece bu dönemi arşivle (YYYY-AA)')
+        parser.add_argument('--geri-al', help='Arşivlenmiş dönemi asıl tabloya geri taşı (YYYY-AA)')
+        parser.add_argument('--log-gun', type=int, help='Bu günden eski loglar taşınır (varsayılan ARSIV_LOG_GUN)')
+        parser.add_argument('--saklama-yil', type=int,
+                            help='Arşivde bu yıldan eskiler silinir (varsayılan ARSIV_SAKLAMA_YIL, 0: silinmez)')
+        parser.add_argument('--kuru', action='store_true', help='Sadece arşivlenecek dönemleri listele')
+        parser.add_argument('--migrate', action='store_true', help='Önce arşiv veritabanının tablolarını oluştur')
+
+    def handle(self, *args, **options):
+        if options['migrate']:
+            call_command('migrate', database=ARSIV_DB, verbosity=0)
+
+        if options['geri_al']:
+            sayi = donemi_geri_al(_donem(options['geri_al']))
+            self.stdout.write(self.style.SUCCESS(f"✅ {options['geri_al']}: {sayi} puantaj geri alındı."))
+            return
+
+        donemler = [_donem(options['donem'])] if options['donem'] else arsivlenecek_donemler()
+        if options['kuru']:
+            for donem in donemler:
+                self.stdout.write(f'{donem:%Y-%m}')
+            return
+
+        for donem in donemler:
+            try:
+                sayi = donemi_arsivle(donem)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'{donem:%Y-%m}: {sayi} puantaj arşivlendi')
+        if options['donem']:
+            return
+
+        log = loglari_arsivle(options['log_gun'])
+        silinen = arsivi_temizle(options['saklama_yil'])
+        senkron = senkron_kayitlarini_temizle()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(donemler)} dönem, {log} log arşivlendi | "
+            f"saklama süresi dolan: {silinen['puantaj']} puantaj, {silinen['log']} log, "
+            f"{senkron} senkron kaydı silindi."
+        ))
@@ -1,53 +1,59 @@
-from django.core.management.base import BaseCommand
-from django.core.mail import EmailMessage
-from django.utils import timezone
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 import os
-import shutil
-from datetime import datetime
+
+from core.yedek import YEDEK_HEDEFLERI, eski_yedekleri_temizle, geri_yukle, hedeflere_gonder, yedek_al
+
 
 class Command(BaseCommand):
-    help = 'Veritabanını (db.sqlite3) e-posta adresine yedek olarak gönderir.'
+    help = ('Veritabanının tutarlı bir anlık görüntüsünü (SQLite çevrimiçi yedekleme API) '
+            'sıkıştırarak yedek klasörüne alır, eski yedekleri temizler ve ayarlı hedeflere gönderir.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kaynak', help='Yedeklenecek SQLite dosyası (varsayılan: aktif veritabanı)')
+        parser.add_argument('--klasor', default=settings.YEDEK_KLASORU, help='Yedeklerin yazılacağı klasör')
+        parser.add_argument('--sakla', type=int, default=settings.YEDEK_SAKLA,
+                            help='Saklanacak tam yedek sayısı (eskiler ve onlara dayanan artımlılar silinir)')
+        parser.add_argument('--artimli', action='store_true',
+                            help='Sadece en son tam yedeğe göre değişen sayfaları yaz')
+        parser.add_argument('--hedef', nargs='*', default=None,
+                            help=f"Gönderim hedefleri ({', '.join(sorted(YEDEK_HEDEFLERI))}); "
+                                 f"verilmezse YEDEK_HEDEFLERI ayarı, '--hedef' tek başına: hiçbiri")
+        parser.add_argument('--geri-yukle', metavar='YEDEK', help='Yedeği açıp --cikti dosyasına yazar')
+        parser.add_argument('--cikti', help='Geri yüklenecek dosya yolu')
 
     def handle(self, *args, **options):
-        # 1. Veritabanı dosyasını bul
-        db_path = os.path.join(settings.BASE_DIR, 'db.sqlite3')
-        
-        if not os.path.exists(db_path):
-            self.stdout.write(self.style.ERROR('Veritabanı dosyası bulunamadı!'))
+        if options['geri_yukle']:
+            if not options['cikti']:
+                raise CommandError('--geri-yukle için --cikti dosyası verilmelidir.')
+            try:
+                geri_yukle(options['geri_yukle'], options['cikti'])
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"✅ Yedek açıldı: {options['cikti']}"))
             return
 
-        # 2. Tarihli dosya ismi oluştur (Ör: db_yedek_2025-10-25.sqlite3)
-        bugun = timezone.now().strftime('%Y-%m-%d')
-        yedek_isim = f"db_yedek_{bugun}.sqlite3"
-        
-        # 3. E-Postayı hazırla
-        konu = f"💾 Otomatik Yedek: Avlu Personel - {bugun}"
-        mesaj = f"""
-        Merhaba,
-        
-        Avlu Personel sisteminin {bugun} tarihli otomatik veritabanı yedeği ektedir.
-        Bu dosyayı güvenli bir yerde saklayınız.
-        
-        Sistem Saati: {datetime.now().strftime('%H:%M:%S')}
-        """
-        
-        gonderen = settings.EMAIL_HOST_USER
-        alici_listesi = [settings.EMAIL_HOST_USER] # Kendine gönder
-
-        mail = EmailMessage(
-            subject=konu,
-            body=mesaj,
-            from_email=gonderen,
-            to=alici_listesi,
-        )
-        
-        # 4. Dosyayı ekle ve gönder
-        with open(db_path, 'rb') as f:
-            mail.attach(yedek_isim, f.read(), 'application/x-sqlite3')
-            
         try:
-            mail.send()
-            self.stdout.write(self.style.SUCCESS(f'✅ Yedek başarıyla {gonderen} adresine gönderildi.'))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'❌ Hata oluştu: {str(e)}'))
\ No newline at end of file
+            sonuc = yedek_al(options['klasor'], kaynak=options['kaynak'], artimli=options['artimli'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if sonuc.tur == 'artimli':
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Artımlı yedek alındı: {os.path.basename(sonuc.yol)} ({sonuc.boyut // 1024} KB, "
+                f"{sonuc.degisen_sayfa}/{sonuc.toplam_sayfa} sayfa değişmiş, temel: {sonuc.temel})"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Tam yedek alındı: {os.path.basename(sonuc.yol)} ({sonuc.boyut // 1024} KB)"
+            ))
+
+        for yol in eski_yedekleri_temizle(options['klasor'], options['sakla']):
+            self.stdout.write(f"🗑️ Eski yedek silindi: {os.path.basename(yol)}")
+
+        hedefler = settings.YEDEK_HEDEFLERI if options['hedef'] is None else options['hedef']
+        for hedef, hata in hedeflere_gonder(sonuc, hedefler).items():
+            if hata:
+                self.stdout.write(self.style.ERROR(f'❌ {hedef}: {hata}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅ Yedek {hedef} hedefine gönderildi.'))
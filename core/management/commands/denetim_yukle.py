@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.denetim import tasmayi_yukle
+
+
+class Command(BaseCommand):
+    help = ('Veritabanına yazılamadığı için denetim taşma dosyasında (DENETIM_TASMA_DOSYASI) '
+            'bekleyen IslemLog kayıtlarını tek transaction\'da aktarır ve dosyayı siler.')
+
+    def handle(self, *args, **options):
+        sayi = tasmayi_yukle()
+        self.stdout.write(self.style.SUCCESS(f'✅ {sayi} denetim kaydı aktarıldı.'))
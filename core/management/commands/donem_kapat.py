@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+import time
+
+from core.bordro import donemi_kapat
+
+
+class _GeriAl(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Verilen dönemin bordrosunu toplu olarak kesinleştirir ve süre/sorgu sayısını raporlar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('yil', type=int)
+        parser.add_argument('ay', type=int)
+        parser.add_argument('--batch-size', type=int, default=500, help='bulk_create/bulk_update parti boyutu')
+        parser.add_argument('--deneme', action='store_true',
+                            help='Ölçüm için çalıştırır, sonunda tüm değişiklikleri geri alır.')
+
+    def handle(self, *args, **options):
+        yil, ay = options['yil'], options['ay']
+        if not 1 <= ay <= 12:
+            raise CommandError('Ay 1-12 arasında olmalıdır.')
+
+        baslangic = time.perf_counter()
+        try:
+            with CaptureQueriesContext(connection) as sorgular, transaction.atomic():
+                yeni, guncellenen = donemi_kapat(yil, ay, batch_size=options['batch_size'])
+                if options['deneme']:
+                    raise _GeriAl()
+        except _GeriAl:
+            pass
+        sure = time.perf_counter() - baslangic
+
+        self.stdout.write(
+            f"{ay}/{yil}: {yeni} yeni, {guncellenen} güncellendi | "
+            f"{len(sorgular.captured_queries)} sorgu | {sure * 1000:.1f} ms"
+        )
+        if options['deneme']:
+            self.stdout.write(self.style.WARNING('Deneme modu: değişiklikler geri alındı.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Dönem kapatıldı.'))
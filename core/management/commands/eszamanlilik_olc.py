@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+import json
+import os
+import tempfile
+
+from core.performans import VARSAYILAN_SQLITE, eszamanlilik_olc, sqlite_ayarlari
+
+
+class Command(BaseCommand):
+    help = ('Eşzamanlı okuyucu/yazıcı thread\'leriyle SQLite verimini ölçer: ayarsız SQLite ile '
+            'settings\'teki ayarları (WAL, busy_timeout, BEGIN IMMEDIATE vb.) karşılaştırır. '
+            'Ölçüm geçici bir dosyada yapılır; uygulama veritabanına dokunulmaz.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--okuyucu', type=int, default=4, help='Okuyucu thread sayısı')
+        parser.add_argument('--yazici', type=int, default=4, help='Yazıcı thread sayısı')
+        parser.add_argument('--sure', type=float, default=5.0, help='Her ölçümün süresi (sn)')
+        parser.add_argument('--personel', type=int, default=200, help='Puantaj tablosundaki personel sayısı')
+        parser.add_argument('--json', help='Sonuçları bu dosyaya JSON olarak yaz')
+
+    def handle(self, *args, **options):
+        olcumler = {'önce (varsayılan)': VARSAYILAN_SQLITE, 'sonra (ayarlı)': sqlite_ayarlari()}
+        rapor = {}
+
+        with tempfile.TemporaryDirectory() as klasor:
+            for ad, ayar in olcumler.items():
+                yol = os.path.join(klasor, f'{len(rapor)}.sqlite3')
+                rapor[ad] = eszamanlilik_olc(
+                    yol, ayar, okuyucu=options['okuyucu'], yazici=options['yazici'],
+                    sure=options['sure'], personel_sayisi=options['personel'],
+                )
+
+        self.stdout.write(f"{options['okuyucu']} okuyucu + {options['yazici']} yazıcı thread, "
+                          f"{options['sure']:g} sn\n")
+        self.stdout.write(f"{'Ayar':<20} {'Okuma/sn':>9} {'Yazma/sn':>9} {'Okuma p95':>10} "
+                          f"{'Yazma p95':>10} {'Kilit hatası':>13}")
+        for ad, s in rapor.items():
+            satir = (f"{ad:<20} {s['okuma']:>9} {s['yazma']:>9} {str(s['okuma_p95_ms']):>10} "
+                     f"{str(s['yazma_p95_ms']):>10} {s['okuma_hata'] + s['yazma_hata']:>13}")
+            self.stdout.write(self.style.ERROR(satir) if s['okuma_hata'] + s['yazma_hata'] else satir)
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(rapor, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+import time
+
+from core.isler import siradaki_isi_al, isi_calistir, yarim_kalan_isleri_kurtar
+
+# Kuyruk boşken yarım kalan işler en fazla bu aralıkla (sn) kontrol edilir
+KURTARMA_ARALIGI = 60
+
+
+class Command(BaseCommand):
+    help = ('Arka plan iş kuyruğundaki (ArkaPlanIsi) bekleyen işleri sırayla çalıştırır. '
+            'Sürekli çalışır; --bir-kez ile kuyruk boşalınca çıkar.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bir-kez', action='store_true', help='Bekleyen işleri bitirip çık')
+        parser.add_argument('--bekleme', type=float, default=2.0, help='Kuyruk boşken bekleme süresi (sn)')
+        parser.add_argument('--takilma-suresi', type=int, default=None,
+                            help="Bu süreden (sn) uzun 'calisiyor' kalan işler yeniden kuyruğa alınır "
+                                 "(varsayılan ISLER_TAKILMA_SURESI)")
+
+    def handle(self, *args, **options):
+        self.stdout.write('İş kuyruğu dinleniyor...')
+        # Önceki worker çalışırken durduysa (çökme, yeniden başlatma) işleri sonsuza dek 'calisiyor' kalmasın
+        self._kurtar(options['takilma_suresi'])
+        son_kurtarma = time.monotonic()
+        while True:
+            close_old_connections()
+            is_kaydi = siradaki_isi_al()
+            if is_kaydi is None:
+                if time.monotonic() - son_kurtarma >= KURTARMA_ARALIGI:
+                    self._kurtar(options['takilma_suresi'])
+                    son_kurtarma = time.monotonic()
+                if options['bir_kez']:
+                    return
+                time.sleep(options['bekleme'])
+                continue
+
+            t0 = time.perf_counter()
+            isi_calistir(is_kaydi)
+            sure = time.perf_counter() - t0
+
+            if is_kaydi.durum == 'hata':
+                self.stderr.write(f'❌ #{is_kaydi.id} {is_kaydi.tur} hata ile bitti ({sure:.2f} sn).')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅ #{is_kaydi.id} {is_kaydi.tur} tamamlandı ({sure:.2f} sn).'))
+
+    def _kurtar(self, sure):
+        yeniden, hatali = yarim_kalan_isleri_kurtar(sure)
+        if yeniden or hatali:
+            self.stderr.write(f'⚠️ Yarım kalan işler: {yeniden} yeniden kuyrukta, {hatali} hata ile kapatıldı.')
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+import os
+import time
+
+from core.tasima import sqlite_kaynagi_ekle, sqlite_kaynagini_kaldir, veritabani_tasi
+
+
+class Command(BaseCommand):
+    help = ('SQLite veritabanındaki kullanıcıları, izinlerini ve tüm core tablolarını DATABASE_URL ile '
+            'tanımlı veritabanına (PostgreSQL) parça parça kopyalar. Hedef tablolar boş olmalıdır.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kaynak', default=os.path.join(settings.BASE_DIR, 'db.sqlite3'),
+                            help='Kaynak SQLite dosyası (varsayılan: proje klasöründeki db.sqlite3)')
+        parser.add_argument('--hedef', default='default', help='Hedef veritabanı alias\'ı')
+        parser.add_argument('--parca', type=int, default=2000, help='Her INSERT\'te yazılacak satır sayısı')
+        parser.add_argument('--migrate', action='store_true', help='Kopyalamadan önce hedefte migrate çalıştır')
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options['kaynak']):
+            raise CommandError(f"Kaynak dosya bulunamadı: {options['kaynak']}")
+
+        hedef = connections[options['hedef']]
+        if hedef.vendor == 'sqlite' and os.path.abspath(str(hedef.settings_dict['NAME'])) == os.path.abspath(options['kaynak']):
+            raise CommandError('Kaynak ve hedef aynı veritabanı. DATABASE_URL ile PostgreSQL hedefini tanımlayın.')
+        if hedef.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING(f'⚠️ Hedef veritabanı {hedef.vendor}, PostgreSQL değil.'))
+
+        if options['migrate']:
+            call_command('migrate', database=options['hedef'], interactive=False, verbosity=0)
+
+        kaynak = sqlite_kaynagi_ekle(options['kaynak'])
+        t0 = time.perf_counter()
+        try:
+            veritabani_tasi(
+                kaynak, options['hedef'], parca=options['parca'],
+                ilerleme=lambda model, sayi: self.stdout.write(f'  {model:<28} {sayi:>9} satır'),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            sqlite_kaynagini_kaldir(kaynak)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Taşıma tamamlandı ({time.perf_counter() - t0:.1f} sn).'
+        ))
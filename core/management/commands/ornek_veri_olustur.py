@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+import time
+
+from core.performans import ornek_veri_olustur, olcum_kullanicisi, OLCUM_KULLANICISI
+
+
+class Command(BaseCommand):
+    help = ('Performans ölçümü ve yük testleri için sentetik veri üretir '
+            '(personel x ay; puantaj, finansal hareket, taksit, kapalı bordrolar). '
+            'SADECE TEST/GELİŞTİRME VERİTABANINDA KULLANIN.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--personel', type=int, default=50, help='Personel sayısı (varsayılan 50)')
+        parser.add_argument('--ay', type=int, default=12, help='Ay sayısı, içinde bulunulan ay dahil (varsayılan 12)')
+        parser.add_argument('--acik-birak', action='store_true', help='Geçmiş dönemleri kesinleştirme')
+        parser.add_argument('--tohum', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['personel'] < 1 or options['ay'] < 1:
+            raise CommandError('Personel ve ay sayısı en az 1 olmalıdır.')
+
+        t0 = time.perf_counter()
+        with transaction.atomic():
+            sayilar = ornek_veri_olustur(
+                options['personel'], options['ay'],
+                kapali_donemler=not options['acik_birak'], tohum=options['tohum'],
+                ilerleme=lambda sira, toplam: self.stdout.write(f'  {sira}/{toplam} ay yazıldı'),
+            )
+            olcum_kullanicisi()
+        sure = time.perf_counter() - t0
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {sayilar['personel']} personel, {sayilar['puantaj']} puantaj, {sayilar['hareket']} hareket, "
+            f"{sayilar['log']} işlem logu, "
+            f"{sayilar['taksit']} taksit oluşturuldu ({sure:.1f} sn). "
+            f"Giriş: {OLCUM_KULLANICISI} / {OLCUM_KULLANICISI}"
+        ))
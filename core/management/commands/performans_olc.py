@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+import json
+import tempfile
+import time
+
+from core.performans import (
+    BUTCE_DOSYASI, OLCUM_RAPOR_ONBELLEGI, ornek_veri_olustur, olcum_kullanicisi, url_senaryolari, senaryolari_olc,
+    butceyi_oku, butceyi_yaz, butce_asimlari,
+)
+
+
+class Command(BaseCommand):
+    help = ('Her URL için sorgu sayısı, süre ve en yüksek bellek kullanımını ölçer. '
+            'Ölçüm geçici bir test veritabanında, sentetik veriyle yapılır (ağ gerekmez). '
+            'Sorgu sayısı core/performans_butcesi.json bütçesini aşarsa hata ile çıkar.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--personel', type=int, nargs='+', default=[50],
+                            help='Ölçülecek veri boyutları (personel sayısı), örn: --personel 50 500 5000')
+        parser.add_argument('--ay', type=int, default=12, help='Ay sayısı (varsayılan 12)')
+        parser.add_argument('--tekrar', type=int, default=3, help='Süre için tekrar sayısı (medyan alınır)')
+        parser.add_argument('--butce', default=BUTCE_DOSYASI, help='Sorgu bütçesi dosyası (JSON)')
+        parser.add_argument('--butceyi-yaz', action='store_true',
+                            help='Ölçülen sorgu sayılarını bütçe olarak kaydet (tüm boyutlardaki en yüksek değerler)')
+        parser.add_argument('--json', help='Sonuçları bu dosyaya JSON olarak yaz')
+
+    def handle(self, *args, **options):
+        butce = {} if options['butceyi_yaz'] else butceyi_oku(options['butce'])
+        rapor = {}
+
+        setup_test_environment()
+        eski_ayarlar = setup_databases(verbosity=0, interactive=False)
+        gecici_klasor = tempfile.TemporaryDirectory()
+        ayar = override_settings(
+            ISLER_KLASORU=gecici_klasor.name, ISLER_SENKRON=False,
+            CACHES={**settings.CACHES, settings.RAPOR_ONBELLEGI: OLCUM_RAPOR_ONBELLEGI},
+        )
+        ayar.enable()
+        try:
+            for boyut in options['personel']:
+                call_command('flush', interactive=False, verbosity=0)
+                t0 = time.perf_counter()
+                ornek_veri_olustur(boyut, options['ay'])
+                self.stdout.write(f'\n▶ {boyut} personel x {options["ay"]} ay '
+                                  f'(veri {time.perf_counter() - t0:.1f} sn)')
+
+                kullanici = olcum_kullanicisi()
+                sonuclar = senaryolari_olc(kullanici, url_senaryolari(kullanici), tekrar=options['tekrar'])
+                rapor[boyut] = sonuclar
+                self._tablo(sonuclar, butce)
+        finally:
+            ayar.disable()
+            gecici_klasor.cleanup()
+            teardown_databases(eski_ayarlar, verbosity=0)
+            teardown_test_environment()
+
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as f:
+                json.dump(rapor, f, indent=2, ensure_ascii=False)
+
+        if options['butceyi_yaz']:
+            butceyi_yaz([s for sonuclar in rapor.values() for s in sonuclar], options['butce'])
+            self.stdout.write(self.style.SUCCESS(f"\n✅ Bütçe yazıldı: {options['butce']}"))
+            return
+
+        hatalar = [f'[{boyut} personel] {hata}' for boyut, sonuclar in rapor.items()
+                   for hata in butce_asimlari(sonuclar, butce)]
+        if hatalar:
+            raise CommandError('Sorgu bütçesi aşıldı:\n' + '\n'.join(hatalar))
+        self.stdout.write(self.style.SUCCESS('\n✅ Tüm URL\'ler sorgu bütçesi içinde.'))
+
+    def _tablo(self, sonuclar, butce):
+        self.stdout.write(f"{'URL':<30} {'HTTP':>4} {'Sorgu':>6} {'Bütçe':>6} {'Süre ms':>9} {'Bellek KB':>10}")
+        for s in sonuclar:
+            sinir = butce.get(s['ad'], '-')
+            satir = (f"{s['ad']:<30} {s['durum_kodu']:>4} {s['sorgu']:>6} {sinir:>6} "
+                     f"{s['sure_ms']:>9} {s['bellek_kb']:>10}")
+            if isinstance(sinir, int) and s['sorgu'] > sinir:
+                satir = self.style.ERROR(satir)
+            self.stdout.write(satir)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.onbellek import sayaclar, sayaclari_sifirla, onbellegi_temizle
+
+
+class Command(BaseCommand):
+    help = 'Maaş raporu önbelleğinin isabet/ıska sayaçlarını gösterir; isteğe bağlı sıfırlar veya temizler.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sifirla', action='store_true', help='Sayaçları sıfırla')
+        parser.add_argument('--temizle', action='store_true', help='Önbellekteki tüm raporları sil')
+
+    def handle(self, *args, **options):
+        s = sayaclar()
+        toplam = s['isabet'] + s['iska']
+        oran = f"{100 * s['isabet'] / toplam:.1f}%" if toplam else '-'
+        self.stdout.write(f"İsabet: {s['isabet']}  Iska: {s['iska']}  İsabet oranı: {oran}")
+
+        if options['sifirla']:
+            sayaclari_sifirla()
+            self.stdout.write(self.style.SUCCESS('✅ Sayaçlar sıfırlandı.'))
+        if options['temizle']:
+            onbellegi_temizle()
+            self.stdout.write(self.style.SUCCESS('✅ Rapor önbelleği temizlendi.'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import datetime
+import time
+
+from core.ozet import ozetleri_dogrula
+
+
+class Command(BaseCommand):
+    help = ('Aylık özet (AylikOzet) tablosunu ham Puantaj ve FinansalHareket kayıtlarıyla '
+            'karşılaştırır; eksik, hatalı ve fazla satırları onarır.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baslangic', help='İlk dönem (YYYY-AA), verilmezse tüm geçmiş')
+        parser.add_argument('--bitis', help='Son dönem (YYYY-AA, dahil)')
+        parser.add_argument('--deneme', action='store_true', help='Sadece raporla, düzeltme yapma')
+
+    def _donem(self, deger):
+        if not deger:
+            return None
+        try:
+            return datetime.strptime(deger, '%Y-%m').date()
+        except ValueError:
+            raise CommandError('Dönem formatı YYYY-AA olmalıdır.')
+
+    def handle(self, *args, **options):
+        baslangic = self._donem(options['baslangic'])
+        bitis = self._donem(options['bitis'])
+        if baslangic and bitis and bitis < baslangic:
+            raise CommandError('Bitiş dönemi başlangıçtan önce olamaz.')
+
+        t0 = time.perf_counter()
+        sonuc = ozetleri_dogrula(baslangic, bitis, onar=not options['deneme'])
+        sure = time.perf_counter() - t0
+
+        ozet = f"eksik: {sonuc['eksik']}, hatalı: {sonuc['hatali']}, fazla: {sonuc['fazla']} ({sure:.2f} sn)"
+        if not any(sonuc.values()):
+            self.stdout.write(self.style.SUCCESS(f'✅ Özet tablosu güncel. {ozet}'))
+        elif options['deneme']:
+            self.stdout.write(self.style.WARNING(f'⚠️ Sapma bulundu (DENEME, düzeltilmedi) - {ozet}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Sapmalar onarıldı - {ozet}'))
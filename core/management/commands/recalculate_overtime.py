@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import datetime
+import time
+
+from core.yoklama import mesaileri_yeniden_hesapla
+
+
+class Command(BaseCommand):
+    help = ('Verilen tarih aralığındaki yoklamaların mesai saatini güncel kurallara göre '
+            'toplu olarak yeniden hesaplar (kural veya günlük çalışma saati değişikliğinden sonra).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('baslangic', help='Başlangıç tarihi (YYYY-AA-GG)')
+        parser.add_argument('bitis', help='Bitiş tarihi (YYYY-AA-GG, dahil)')
+        parser.add_argument('--personel', type=int, nargs='*', help='Sadece bu personel id\'leri')
+        parser.add_argument('--parca-boyutu', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        try:
+            baslangic = datetime.strptime(options['baslangic'], '%Y-%m-%d').date()
+            bitis = datetime.strptime(options['bitis'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('Tarih formatı YYYY-AA-GG olmalıdır.')
+        if bitis < baslangic:
+            raise CommandError('Bitiş tarihi başlangıçtan önce olamaz.')
+
+        t0 = time.perf_counter()
+        incelenen, guncellenen = mesaileri_yeniden_hesapla(
+            baslangic, bitis, personel_ids=options['personel'], parca_boyutu=options['parca_boyutu']
+        )
+        sure = time.perf_counter() - t0
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {incelenen} kayıt incelendi, {guncellenen} kayıt güncellendi ({sure:.2f} sn).'
+        ))
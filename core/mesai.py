@@ -0,0 +1,127 @@
+"""
+Mesai (fazla/eksik çalışma) hesaplama kuralları.
+
+Puantaj.save() ve toplu yoklama kaydı aynı fonksiyonu kullanır; hesap için
+model nesnesine veya veritabanına ihtiyaç yoktur. mesai_hesapla_vektorel()
+aynı kuralları NumPy dizileri üzerinde tek seferde uygular (toplu yeniden hesap).
+"""
+from datetime import datetime, date, timedelta
+
+import numpy as np
+
+MESAI_DURUMLARI = ('geldi', 'hafta_tatili')
+
+_REFERANS_GUN = date(2000, 1, 1)
+
+
+def saat_coz(deger):
+    """
+    'HH:MM' -> datetime.time. Boş/None gelirse None döner.
+    Kullanıcı '0900' gibi girerse '09:00' olarak okunur. Hatalı formatta ValueError.
+    """
+    if not deger:
+        return None
+    if not isinstance(deger, str):
+        return deger
+    deger = deger.strip()
+    if not deger:
+        return None
+    only_digits = ''.join(ch for ch in deger if ch.isdigit())
+    if len(only_digits) == 4 and ':' not in deger:
+        deger = only_digits[:2] + ':' + only_digits[2:]
+    return datetime.strptime(deger, '%H:%M').time()
+
+
+def mesai_hesapla(durum, giris_saati, cikis_saati, standart_saat):
+    """
+    Tek bir günün mesai saatini hesaplar (saf fonksiyon).
+
+    - Sadece 'geldi' ve 'hafta_tatili' durumlarında, giriş ve çıkış varsa hesaplanır.
+    - Çıkış girişten küçükse gece yarısı geçilmiş sayılır.
+    - Hafta tatilinde çalışılan tüm saatler mesaidir.
+    - Normal günde standart saat düşülür; kalan dakika <=15 ise 0, 16-45 ise 0.5,
+      46 ve üzeri ise 1 saat eklenir. Eksik çalışma negatif döner.
+    """
+    if durum not in MESAI_DURUMLARI or not giris_saati or not cikis_saati:
+        return 0
+
+    giris = datetime.combine(_REFERANS_GUN, giris_saati)
+    cikis = datetime.combine(_REFERANS_GUN, cikis_saati)
+
+    # Eğer çıkış saati girişten küçükse (gece yarısını geçtiyse) gün ekle
+    if cikis < giris:
+        cikis += timedelta(days=1)
+
+    calisilan_saat = (cikis - giris).total_seconds() / 3600
+
+    if durum == 'hafta_tatili':
+        # Hafta tatilinde çalışırsa standart saati düşmüyoruz, hepsi mesai.
+        return calisilan_saat
+
+    fark_saat = calisilan_saat - standart_saat
+
+    is_negative = fark_saat < 0
+    abs_fark = abs(fark_saat)
+
+    tam_saat = int(abs_fark)
+    dakika_kismi = (abs_fark - tam_saat) * 60
+
+    eklenen_mesai = 0
+    if dakika_kismi <= 15:
+        eklenen_mesai = 0
+    elif 16 <= dakika_kismi <= 45:
+        eklenen_mesai = 0.5
+    elif dakika_kismi >= 46:
+        eklenen_mesai = 1.0
+
+    sonuc_saat = tam_saat + eklenen_mesai
+    return -sonuc_saat if is_negative else sonuc_saat
+
+
+def saat_saniye(saat):
+    """datetime.time -> gece yarısından itibaren saniye. None ise NaN."""
+    if saat is None:
+        return np.nan
+    return saat.hour * 3600 + saat.minute * 60 + saat.second
+
+
+def mesai_hesapla_vektorel(durumlar, giris_saniye, cikis_saniye, standart_saat):
+    """
+    mesai_hesapla() ile birebir aynı kuralların vektörel hali.
+
+    durumlar: durum kodları dizisi
+    giris_saniye, cikis_saniye: gece yarısından itibaren saniye (boş saat için NaN)
+    standart_saat: günlük çalışma saati (dizi veya tek sayı)
+
+    Dönüş: float64 mesai saatleri dizisi. İşlem sırası skaler fonksiyonla aynı
+    olduğundan sonuçlar bit düzeyinde eşittir.
+    """
+    durumlar = np.asarray(durumlar)
+    giris = np.asarray(giris_saniye, dtype=np.float64)
+    cikis = np.asarray(cikis_saniye, dtype=np.float64)
+    standart = np.asarray(standart_saat, dtype=np.float64)
+
+    hesaplanir = np.isin(durumlar, MESAI_DURUMLARI) & ~np.isnan(giris) & ~np.isnan(cikis)
+    hafta_tatili = durumlar == 'hafta_tatili'
+
+    # Gece yarısını geçen vardiyalar ertesi güne taşınır
+    fark_saniye = cikis - giris
+    fark_saniye = np.where(fark_saniye < 0, fark_saniye + 86400, fark_saniye)
+    calisilan_saat = fark_saniye / 3600
+
+    fark_saat = calisilan_saat - standart
+    is_negative = fark_saat < 0
+    abs_fark = np.abs(fark_saat)
+    tam_saat = np.trunc(abs_fark)
+    dakika_kismi = (abs_fark - tam_saat) * 60
+
+    eklenen_mesai = np.select(
+        [dakika_kismi <= 15, (dakika_kismi >= 16) & (dakika_kismi <= 45), dakika_kismi >= 46],
+        [0.0, 0.5, 1.0],
+        default=0.0,
+    )
+    sonuc_saat = tam_saat + eklenen_mesai
+    normal_gun = np.where(is_negative, -sonuc_saat, sonuc_saat)
+
+    sonuc = np.where(hafta_tatili, calisilan_saat, normal_gun)
+    return np.where(hesaplanir, sonuc, 0.0)
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_islemlog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArkaPlanIsi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tur', models.CharField(choices=[('donem_kapat', 'Bordro Kesinleştirme'), ('maas_raporu', 'Maaş Raporu (Excel)'), ('personel_ice_aktar', 'Personel İçe Aktarımı')], max_length=30, verbose_name='İş Türü')),
+                ('durum', models.CharField(choices=[('bekliyor', 'Bekliyor'), ('calisiyor', 'Çalışıyor'), ('tamamlandi', 'Tamamlandı'), ('hata', 'Hata')], default='bekliyor', max_length=20, verbose_name='Durum')),
+                ('ilerleme', models.PositiveSmallIntegerField(default=0, verbose_name='İlerleme (%)')),
+                ('parametreler', models.JSONField(blank=True, default=dict, verbose_name='Parametreler')),
+                ('sonuc_mesaji', models.TextField(blank=True, default='', verbose_name='Sonuç Mesajı')),
+                ('sonuc_dosyasi', models.CharField(blank=True, default='', max_length=255, verbose_name='Sonuç Dosyası')),
+                ('olusturulma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma')),
+                ('baslama_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Başlama')),
+                ('bitis_tarihi', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş')),
+                ('olusturan', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Başlatan')),
+            ],
+            options={
+                'verbose_name': 'Arka Plan İşi',
+                'verbose_name_plural': 'Arka Plan İşleri',
+                'indexes': [models.Index(fields=['durum', 'id'], name='arkaplanisi_durum_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:12
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def ozetleri_doldur(apps, schema_editor):
+    """Mevcut puantaj ve finansal hareketlerden ilk özet tablosunu oluşturur."""
+    Puantaj = apps.get_model('core', 'Puantaj')
+    FinansalHareket = apps.get_model('core', 'FinansalHareket')
+    AylikOzet = apps.get_model('core', 'AylikOzet')
+
+    ozetler = {}
+
+    def ozet(personel_id, donem):
+        return ozetler.setdefault((personel_id, donem), AylikOzet(personel_id=personel_id, donem=donem))
+
+    puantajlar = Puantaj.objects.annotate(donem=TruncMonth('tarih')).values('personel_id', 'donem').annotate(
+        calistigi_gun=Count('id', filter=Q(durum__in=('geldi', 'hafta_tatili'))),
+        gelmedigi_gun=Count('id', filter=Q(durum__in=('gelmedi', 'ucretsiz_izin'))),
+        toplam_mesai=Sum('hesaplanan_mesai_saati'),
+    ).order_by()
+    for s in puantajlar:
+        o = ozet(s['personel_id'], s['donem'])
+        o.calistigi_gun = s['calistigi_gun']
+        o.gelmedigi_gun = s['gelmedigi_gun']
+        o.toplam_mesai = Decimal(s['toplam_mesai'] or 0).quantize(Decimal('0.01'))
+
+    hareketler = FinansalHareket.objects.annotate(donem=TruncMonth('tarih')).values('personel_id', 'donem').annotate(
+        toplam_prim=Sum('tutar', filter=Q(islem_tipi='prim')),
+        diger_kesintiler=Sum('tutar', filter=~Q(islem_tipi='prim')),
+    ).order_by()
+    for s in hareketler:
+        o = ozet(s['personel_id'], s['donem'])
+        o.toplam_prim = Decimal(s['toplam_prim'] or 0).quantize(Decimal('0.01'))
+        o.diger_kesintiler = Decimal(s['diger_kesintiler'] or 0).quantize(Decimal('0.01'))
+
+    AylikOzet.objects.bulk_create(ozetler.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_arkaplanisi'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AylikOzet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donem', models.DateField(verbose_name="Dönem (Her ayın 1'i)")),
+                ('calistigi_gun', models.IntegerField(default=0, verbose_name='Çalıştığı Gün')),
+                ('gelmedigi_gun', models.IntegerField(default=0, verbose_name='Gelmediği Gün')),
+                ('toplam_mesai', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Toplam Mesai (Saat)')),
+                ('toplam_prim', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Toplam Prim')),
+                ('diger_kesintiler', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Toplam Kesinti')),
+                ('personel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aylik_ozetler', to='core.personel')),
+            ],
+            options={
+                'verbose_name': 'Aylık Özet',
+                'verbose_name_plural': 'Aylık Özetler',
+                'unique_together': {('personel', 'donem')},
+            },
+        ),
+        migrations.RunPython(ozetleri_doldur, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_aylikozet'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aylikozet',
+            index=models.Index(fields=['donem'], name='aylikozet_donem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='finansalhareket',
+            index=models.Index(fields=['personel', 'tarih'], name='hareket_personel_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='islemlog',
+            index=models.Index(fields=['tarih'], name='islemlog_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maasbordrosu',
+            index=models.Index(fields=['donem'], name='bordro_donem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='puantaj',
+            index=models.Index(fields=['tarih', 'durum'], name='puantaj_tarih_durum_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taksitliavans',
+            index=models.Index(fields=['tamamlandi', 'personel'], name='taksit_tamamlandi_idx'),
+        ),
+    ]
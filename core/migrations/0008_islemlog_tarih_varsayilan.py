@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_donem_indeksleri'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='islemlog',
+            name='tarih',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Tarih/Saat'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:49
+
+from django.conf import settings
+from django.db import OperationalError, migrations, models
+
+# 'detay' tam metin dizini. SQLite: tabloya tetikleyicilerle bağlı FTS5 tablosu
+# (FTS5 derlenmemişse atlanır, arama LIKE'a düşer). PostgreSQL: GIN indeksi.
+# Not: SQLite'ta core_islemlog'u yeniden oluşturan bir migration tetikleyicileri de
+# siler; öyle bir migration'dan sonra fts_olustur tekrar çalıştırılmalıdır.
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE core_islemlog_fts USING fts5("
+    "detay, content='core_islemlog', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER core_islemlog_fts_ekle AFTER INSERT ON core_islemlog BEGIN "
+    "INSERT INTO core_islemlog_fts(rowid, detay) VALUES (new.id, new.detay); END",
+    "CREATE TRIGGER core_islemlog_fts_sil AFTER DELETE ON core_islemlog BEGIN "
+    "INSERT INTO core_islemlog_fts(core_islemlog_fts, rowid, detay) VALUES ('delete', old.id, old.detay); END",
+    "CREATE TRIGGER core_islemlog_fts_guncelle AFTER UPDATE OF detay ON core_islemlog BEGIN "
+    "INSERT INTO core_islemlog_fts(core_islemlog_fts, rowid, detay) VALUES ('delete', old.id, old.detay); "
+    "INSERT INTO core_islemlog_fts(rowid, detay) VALUES (new.id, new.detay); END",
+    "INSERT INTO core_islemlog_fts(core_islemlog_fts) VALUES ('rebuild')",
+]
+SQLITE_FTS_KALDIR = [
+    "DROP TRIGGER IF EXISTS core_islemlog_fts_ekle",
+    "DROP TRIGGER IF EXISTS core_islemlog_fts_sil",
+    "DROP TRIGGER IF EXISTS core_islemlog_fts_guncelle",
+    "DROP TABLE IF EXISTS core_islemlog_fts",
+]
+POSTGRES_FTS = ["CREATE INDEX islemlog_detay_fts_idx ON core_islemlog USING GIN (to_tsvector('simple', detay))"]
+POSTGRES_FTS_KALDIR = ["DROP INDEX IF EXISTS islemlog_detay_fts_idx"]
+
+
+def _calistir(schema_editor, sql_listesi):
+    for sql in sql_listesi:
+        schema_editor.execute(sql)
+
+
+def fts_olustur(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_FTS[0])
+        except OperationalError:
+            return  # no such module: fts5
+        _calistir(schema_editor, SQLITE_FTS[1:])
+    elif vendor == 'postgresql':
+        _calistir(schema_editor, POSTGRES_FTS)
+
+
+def fts_kaldir(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _calistir(schema_editor, SQLITE_FTS_KALDIR)
+    elif vendor == 'postgresql':
+        _calistir(schema_editor, POSTGRES_FTS_KALDIR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_islemlog_tarih_varsayilan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='islemlog',
+            name='islemlog_tarih_idx',
+        ),
+        migrations.AddIndex(
+            model_name='islemlog',
+            index=models.Index(fields=['tarih', 'id'], name='islemlog_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='islemlog',
+            index=models.Index(fields=['kullanici', 'tarih', 'id'], name='islemlog_kullanici_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='islemlog',
+            index=models.Index(fields=['ilgili_personel', 'tarih', 'id'], name='islemlog_personel_tarih_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='islemlog',
+            index=models.Index(fields=['islem_turu', 'tarih', 'id'], name='islemlog_tur_tarih_idx'),
+        ),
+        migrations.RunPython(fts_olustur, fts_kaldir),
+    ]
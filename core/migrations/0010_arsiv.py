@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-18 08:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_islemlog_gecmis_indeksleri'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArsivDonemi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donem', models.DateField(unique=True, verbose_name="Dönem (Her ayın 1'i)")),
+                ('puantaj_sayisi', models.PositiveIntegerField(default=0, verbose_name='Taşınan Puantaj')),
+                ('arsivlenme_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Arşivlenme Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Arşivlenmiş Dönem',
+                'verbose_name_plural': 'Arşivlenmiş Dönemler',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArsivIslemLog',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('islem_turu', models.CharField(choices=[('ekleme', 'Ekleme'), ('guncelleme', 'Güncelleme'), ('silme', 'Silme'), ('kritik', 'Kritik İşlem (Bordro vb.)')], max_length=20, verbose_name='İşlem Türü')),
+                ('konu', models.CharField(max_length=100, verbose_name='Konu')),
+                ('detay', models.TextField(verbose_name='İşlem Detayı')),
+                ('tarih', models.DateTimeField(verbose_name='Tarih/Saat')),
+                ('ilgili_personel', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.personel', verbose_name='İlgili Personel')),
+                ('kullanici', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='İşlemi Yapan')),
+            ],
+            options={
+                'verbose_name': 'Arşiv İşlem Logu',
+                'verbose_name_plural': 'Arşiv İşlem Logları',
+                'indexes': [models.Index(fields=['tarih', 'id'], name='arsivislemlog_tarih_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArsivPuantaj',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tarih', models.DateField(verbose_name='Tarih')),
+                ('durum', models.CharField(choices=[('geldi', 'Geldi (Normal)'), ('hafta_tatili', 'Hafta Tatili Çalışması (Tüm Saatler Mesai)'), ('gelmedi', 'Gelmedi'), ('izinli', 'İzinli (Ücretli)'), ('ucretsiz_izin', 'Ücretsiz İzin'), ('raporlu', 'Raporlu')], max_length=20, verbose_name='Durum')),
+                ('giris_saati', models.TimeField(blank=True, null=True, verbose_name='Giriş Saati')),
+                ('cikis_saati', models.TimeField(blank=True, null=True, verbose_name='Çıkış Saati')),
+                ('hesaplanan_mesai_saati', models.DecimalField(decimal_places=2, default=0.0, max_digits=4, verbose_name='Hesaplanan Mesai (Saat)')),
+                ('manuel_mesai_saati', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True, verbose_name='Manuel Düzeltme (Varsa)')),
+                ('personel', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.personel')),
+            ],
+            options={
+                'verbose_name': 'Arşiv Yoklama',
+                'verbose_name_plural': 'Arşiv Yoklamalar',
+                'indexes': [models.Index(fields=['tarih', 'personel'], name='arsivpuantaj_tarih_idx'), models.Index(fields=['personel', 'tarih'], name='arsivpuantaj_personel_idx')],
+            },
+        ),
+    ]
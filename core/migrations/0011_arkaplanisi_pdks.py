@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_arsiv'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='arkaplanisi',
+            name='tur',
+            field=models.CharField(choices=[('donem_kapat', 'Bordro Kesinleştirme'), ('maas_raporu', 'Maaş Raporu (Excel)'), ('personel_ice_aktar', 'Personel İçe Aktarımı'), ('pdks_ice_aktar', 'Kart Okutma (PDKS) İçe Aktarımı')], max_length=30, verbose_name='İş Türü'),
+        ),
+    ]
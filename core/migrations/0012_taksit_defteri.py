@@ -0,0 +1,82 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:08
+
+import django.db.models.deletion
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def taksitleri_doldur(apps, schema_editor):
+    """
+    Defterden önceki bordrolar her kapanmış ayda açık avansların aylık kesintisini
+    düşüyordu. Açık avansların verildiği aydan itibaren personelin kapanmış dönemleri
+    deftere yazılır (toplam tutarla sınırlı) ve yürüyen toplam buradan kurulur.
+    """
+    TaksitliAvans = apps.get_model('core', 'TaksitliAvans')
+    TaksitOdemesi = apps.get_model('core', 'TaksitOdemesi')
+    MaasBordrosu = apps.get_model('core', 'MaasBordrosu')
+
+    kapali_donemler = defaultdict(list)
+    for personel_id, donem in MaasBordrosu.objects.values_list('personel_id', 'donem').distinct().order_by('donem'):
+        kapali_donemler[personel_id].append(donem)
+
+    odemeler, avanslar = [], []
+    for avans in TaksitliAvans.objects.filter(tamamlandi=False, aylik_kesinti__gt=0).order_by('id'):
+        baslangic = avans.tarih.replace(day=1)
+        for donem in kapali_donemler.get(avans.personel_id, ()):
+            kalan = avans.toplam_tutar - avans.odenen_tutar
+            if kalan <= 0:
+                break
+            if donem < baslangic:
+                continue
+            tutar = min(avans.aylik_kesinti, kalan)
+            avans.odenen_tutar += tutar
+            avans.odenen_taksit += 1
+            odemeler.append(TaksitOdemesi(taksit_id=avans.id, personel_id=avans.personel_id, donem=donem,
+                                          taksit_no=avans.odenen_taksit, tutar=tutar,
+                                          odenen_toplam=avans.odenen_tutar))
+        if avans.odenen_taksit:
+            avans.tamamlandi = avans.odenen_tutar >= avans.toplam_tutar
+            avanslar.append(avans)
+
+    TaksitOdemesi.objects.bulk_create(odemeler, batch_size=500)
+    TaksitliAvans.objects.bulk_update(avanslar, ['odenen_tutar', 'odenen_taksit', 'tamamlandi'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_arkaplanisi_pdks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taksitliavans',
+            name='odenen_taksit',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ödenen Taksit'),
+        ),
+        migrations.AddField(
+            model_name='taksitliavans',
+            name='odenen_tutar',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Ödenen Tutar'),
+        ),
+        migrations.CreateModel(
+            name='TaksitOdemesi',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('donem', models.DateField(verbose_name="Dönem (Her ayın 1'i)")),
+                ('taksit_no', models.PositiveIntegerField(verbose_name='Taksit No')),
+                ('tutar', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Kesilen Tutar')),
+                ('odenen_toplam', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Ödenen Toplam')),
+                ('personel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='taksit_odemeleri', to='core.personel')),
+                ('taksit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='odemeler', to='core.taksitliavans')),
+            ],
+            options={
+                'verbose_name': 'Taksit Ödemesi',
+                'verbose_name_plural': 'Taksit Ödemeleri',
+                'indexes': [models.Index(fields=['donem', 'personel'], name='taksit_odemesi_donem_idx')],
+                'unique_together': {('taksit', 'donem')},
+            },
+        ),
+        migrations.RunPython(taksitleri_doldur, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_taksit_defteri'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YoklamaSenkronu',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('islem_id', models.UUIDField(unique=True, verbose_name='İşlem No (İstemci)')),
+                ('tarih', models.DateField(verbose_name='Yoklama Tarihi')),
+                ('durum', models.CharField(choices=[('geldi', 'Geldi (Normal)'), ('hafta_tatili', 'Hafta Tatili Çalışması (Tüm Saatler Mesai)'), ('gelmedi', 'Gelmedi'), ('izinli', 'İzinli (Ücretli)'), ('ucretsiz_izin', 'Ücretsiz İzin'), ('raporlu', 'Raporlu')], max_length=20, verbose_name='Durum')),
+                ('istemci_zamani', models.DateTimeField(verbose_name='İstemci Zamanı')),
+                ('sonuc', models.CharField(choices=[('uygulandi', 'Uygulandı'), ('eski', 'Daha Yeni Kayıt Var'), ('cakisma', 'Çakışma (Reddedildi)')], max_length=20, verbose_name='Sonuç')),
+                ('alinma_tarihi', models.DateTimeField(auto_now_add=True, verbose_name='Alınma Tarihi')),
+                ('kullanici', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Gönderen')),
+                ('personel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.personel')),
+            ],
+            options={
+                'verbose_name': 'Yoklama Senkronu',
+                'verbose_name_plural': 'Yoklama Senkronları',
+                'indexes': [models.Index(fields=['personel', 'tarih', 'istemci_zamani'], name='senkron_anahtar_idx'), models.Index(fields=['alinma_tarihi'], name='senkron_alinma_idx')],
+            },
+        ),
+    ]
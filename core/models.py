@@ -1,8 +1,7 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User  # <-- EKLENDİ
-from datetime import timedelta, datetime       # <-- EKLENDİ (Puantaj hesabı için gerekli)
-import math
+from .mesai import saat_coz, mesai_hesapla
 
 class Personel(models.Model):
     CALISMA_TIPLERI = (
@@ -49,7 +48,9 @@ class TaksitliAvans(models.Model):
     aylik_kesinti = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Aylık Kesilecek Tutar")
     aciklama = models.TextField(blank=True, null=True, verbose_name="Açıklama")
     
-    # Durum takibi
+    # Durum takibi: dönem kapanışında taksit defterinden (TaksitOdemesi) güncellenir
+    odenen_tutar = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Ödenen Tutar")
+    odenen_taksit = models.PositiveIntegerField(default=0, verbose_name="Ödenen Taksit")
     tamamlandi = models.BooleanField(default=False, verbose_name="Borç Bitti mi?")
 
     def save(self, *args, **kwargs):
@@ -61,11 +62,39 @@ class TaksitliAvans(models.Model):
     class Meta:
         verbose_name = "Taksitli Avans"
         verbose_name_plural = "Taksitli Avanslar"
+        indexes = [models.Index(fields=['tamamlandi', 'personel'], name='taksit_tamamlandi_idx')]
     
+    @property
+    def kalan_tutar(self):
+        return self.toplam_tutar - self.odenen_tutar
+
     def __str__(self):
         return f"{self.personel} - {self.toplam_tutar} TL"
 
 
+class TaksitOdemesi(models.Model):
+    """
+    Taksit defteri: dönem kapanışında maaştan düşülen her taksit için bir satır.
+    odenen_toplam bu taksitle birlikte avans için ödenmiş toplamdır (yürüyen toplam);
+    avansın son satırınınki TaksitliAvans.odenen_tutar'a eşittir.
+    """
+    taksit = models.ForeignKey(TaksitliAvans, on_delete=models.CASCADE, related_name='odemeler')
+    personel = models.ForeignKey(Personel, on_delete=models.CASCADE, related_name='taksit_odemeleri')
+    donem = models.DateField(verbose_name="Dönem (Her ayın 1'i)")
+    taksit_no = models.PositiveIntegerField(verbose_name="Taksit No")
+    tutar = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Kesilen Tutar")
+    odenen_toplam = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Ödenen Toplam")
+
+    class Meta:
+        verbose_name = "Taksit Ödemesi"
+        verbose_name_plural = "Taksit Ödemeleri"
+        unique_together = ('taksit', 'donem')
+        indexes = [models.Index(fields=['donem', 'personel'], name='taksit_odemesi_donem_idx')]
+
+    def __str__(self):
+        return f"{self.taksit} - {self.donem.strftime('%m.%Y')} - {self.tutar} TL"
+
+
 class FinansalHareket(models.Model):
     """
     Maaştan tek seferde düşülecek kalemler veya Eklenecek Primler
@@ -86,6 +115,7 @@ class FinansalHareket(models.Model):
     class Meta:
         verbose_name = "Finansal Hareket (Avans/Prim)"
         verbose_name_plural = "Finansal Hareketler"
+        indexes = [models.Index(fields=['personel', 'tarih'], name='hareket_personel_tarih_idx')]
     
     def __str__(self):
         return f"{self.personel} - {self.get_islem_tipi_display()} - {self.tutar}"
@@ -116,80 +146,94 @@ class Puantaj(models.Model):
         verbose_name = "Günlük Yoklama"
         verbose_name_plural = "Günlük Yoklamalar"
         unique_together = ('personel', 'tarih') # Aynı kişiye aynı gün 2 kayıt girilmesin
+        indexes = [models.Index(fields=['tarih', 'durum'], name='puantaj_tarih_durum_idx')]
 
     def save(self, *args, **kwargs):
         """
         Mesai Hesaplama Mantığı (Otomatik)
         Web formundan gelen 'String' (Yazı) formatındaki saati 'Time' objesine çeviriyoruz.
+        Kurallar core/mesai.py içindedir.
         """
         # 1. Veri Tipi Kontrolü ve Dönüştürme
-        if self.giris_saati and isinstance(self.giris_saati, str):
-            try:
-                self.giris_saati = datetime.strptime(self.giris_saati, '%H:%M').time()
-            except ValueError:
-                self.giris_saati = None
-
-        if self.cikis_saati and isinstance(self.cikis_saati, str):
-            try:
-                self.cikis_saati = datetime.strptime(self.cikis_saati, '%H:%M').time()
-            except ValueError:
-                self.cikis_saati = None
-
-        self.hesaplanan_mesai_saati = 0
-
-        # 2. Hesaplama Mantığı
-        if (self.durum == 'geldi' or self.durum == 'hafta_tatili') and self.giris_saati and self.cikis_saati:
-            # Saat farkını hesapla
-            giris = datetime.combine(self.tarih, self.giris_saati)
-            cikis = datetime.combine(self.tarih, self.cikis_saati)
-            
-            # Eğer çıkış saati girişten küçükse (gece yarısını geçtiyse) gün ekle
-            if cikis < giris:
-                cikis += timedelta(days=1)
-            
-            calisilan_sure = cikis - giris
-            calisilan_saat = calisilan_sure.total_seconds() / 3600
-            
-            # MESAİ HESABI:
-            if self.durum == 'hafta_tatili':
-                 # Hafta tatilinde çalışırsa standart saati düşmüyoruz, hepsi mesai.
-                sonuc_saat = calisilan_saat
-                is_negative = False
-            else:
-                 # Normal günde standart saat düşülür.
-                standart_saat = self.personel.gunluk_calisma_saati
-                fark_saat = calisilan_saat - standart_saat
-                
-                is_negative = fark_saat < 0
-                abs_fark = abs(fark_saat)
-                
-                tam_saat = int(abs_fark)
-                dakika_kismi = (abs_fark - tam_saat) * 60
-                
-                eklenen_mesai = 0
-                
-                # Senin belirlediğin kurallar:
-                if dakika_kismi <= 15:
-                    eklenen_mesai = 0 
-                elif 16 <= dakika_kismi <= 45:
-                    eklenen_mesai = 0.5 
-                elif dakika_kismi >= 46:
-                    eklenen_mesai = 1.0 
-                
-                sonuc_saat = tam_saat + eklenen_mesai
-
-            # Sonucu kaydet (Eksi ise eksi olarak)
-            if is_negative:
-                self.hesaplanan_mesai_saati = -sonuc_saat
-            else:
-                self.hesaplanan_mesai_saati = sonuc_saat
-            
+        try:
+            self.giris_saati = saat_coz(self.giris_saati)
+        except ValueError:
+            self.giris_saati = None
+
+        try:
+            self.cikis_saati = saat_coz(self.cikis_saati)
+        except ValueError:
+            self.cikis_saati = None
+
+        # 2. Hesaplama (standart saat sadece normal günde gerekir)
+        standart_saat = self.personel.gunluk_calisma_saati if self.durum == 'geldi' and self.giris_saati and self.cikis_saati else 0
+        self.hesaplanan_mesai_saati = mesai_hesapla(self.durum, self.giris_saati, self.cikis_saati, standart_saat)
+
         super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.personel} - {self.tarih} - {self.durum}"
 
 
+class YoklamaSenkronu(models.Model):
+    """
+    Çevrimdışı yoklama ekranından senkronla gelen işlemlerin kaydı (core/senkron.py).
+    islem_id istemcide üretilir; aynı işlem tekrar gönderilirse yeniden uygulanmaz,
+    kayıtlı sonucu döner. (personel, tarih) için uygulanmış en yeni istemci zamanı
+    son-yazan-kazanır kararında kullanılır.
+    """
+    SONUCLAR = (
+        ('uygulandi', 'Uygulandı'),
+        ('eski', 'Daha Yeni Kayıt Var'),
+        ('cakisma', 'Çakışma (Reddedildi)'),
+    )
+
+    islem_id = models.UUIDField(unique=True, verbose_name="İşlem No (İstemci)")
+    kullanici = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, verbose_name="Gönderen")
+    personel = models.ForeignKey(Personel, on_delete=models.CASCADE, related_name='+')
+    tarih = models.DateField(verbose_name="Yoklama Tarihi")
+    durum = models.CharField(max_length=20, choices=Puantaj.DURUMLAR, verbose_name="Durum")
+    istemci_zamani = models.DateTimeField(verbose_name="İstemci Zamanı")
+    sonuc = models.CharField(max_length=20, choices=SONUCLAR, verbose_name="Sonuç")
+    alinma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Alınma Tarihi")
+
+    class Meta:
+        verbose_name = "Yoklama Senkronu"
+        verbose_name_plural = "Yoklama Senkronları"
+        indexes = [
+            models.Index(fields=['personel', 'tarih', 'istemci_zamani'], name='senkron_anahtar_idx'),
+            models.Index(fields=['alinma_tarihi'], name='senkron_alinma_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.islem_id} - {self.get_sonuc_display()}"
+
+
+class AylikOzet(models.Model):
+    """
+    Personel bazında aylık puantaj ve finansal hareket toplamları.
+    Puantaj / FinansalHareket her kaydedildiğinde veya silindiğinde ilgili satır
+    yeniden hesaplanır (core/ozet.py); canlı maaş raporu ham kayıtlar yerine bu tabloyu okur.
+    """
+    personel = models.ForeignKey(Personel, on_delete=models.CASCADE, related_name='aylik_ozetler')
+    donem = models.DateField(verbose_name="Dönem (Her ayın 1'i)")
+
+    calistigi_gun = models.IntegerField(default=0, verbose_name="Çalıştığı Gün")
+    gelmedigi_gun = models.IntegerField(default=0, verbose_name="Gelmediği Gün")
+    toplam_mesai = models.DecimalField(max_digits=8, decimal_places=2, default=0, verbose_name="Toplam Mesai (Saat)")
+    toplam_prim = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Toplam Prim")
+    diger_kesintiler = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Toplam Kesinti")
+
+    class Meta:
+        verbose_name = "Aylık Özet"
+        verbose_name_plural = "Aylık Özetler"
+        unique_together = ('personel', 'donem')
+        indexes = [models.Index(fields=['donem'], name='aylikozet_donem_idx')]
+
+    def __str__(self):
+        return f"{self.personel} - {self.donem.strftime('%m.%Y')}"
+
+
 class MaasBordrosu(models.Model):
     """
     Ay sonunda hesaplanan maaşların sabitlenmiş (snapshot) halidir.
@@ -218,6 +262,7 @@ class MaasBordrosu(models.Model):
         verbose_name = "Maaş Bordrosu (Kesinleşmiş)"
         verbose_name_plural = "Maaş Bordroları"
         unique_together = ('personel', 'donem') # Bir personelin o aya ait sadece 1 bordrosu olabilir.
+        indexes = [models.Index(fields=['donem'], name='bordro_donem_idx')]
 
     def __str__(self):
         return f"{self.personel.ad} - {self.donem.strftime('%B %Y')}"
@@ -238,7 +283,8 @@ class IslemLog(models.Model):
     islem_turu = models.CharField(max_length=20, choices=ISLEM_TURLERI, verbose_name="İşlem Türü")
     konu = models.CharField(max_length=100, verbose_name="Konu (Örn: Finansal Hareket)")
     detay = models.TextField(verbose_name="İşlem Detayı")
-    tarih = models.DateTimeField(auto_now_add=True, verbose_name="Tarih/Saat")
+    # Kayıt kuyruktan toplu yazıldığında işlemin gerçek zamanı korunur (core/denetim.py)
+    tarih = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Tarih/Saat")
     
     # Hangi personelle ilgili işlem yapıldı? (Opsiyonel)
     ilgili_personel = models.ForeignKey(Personel, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="İlgili Personel")
@@ -247,6 +293,116 @@ class IslemLog(models.Model):
         verbose_name = "İşlem Logu"
         verbose_name_plural = "İşlem Logları (Audit)"
         ordering = ['-tarih'] # En yeni en üstte
+        # İşlem geçmişi ekranı (tarih, id) imleciyle sayfalar (core/denetim_arama.py);
+        # 'detay' için tam metin dizini migration 0009'da kurulur.
+        indexes = [
+            models.Index(fields=['tarih', 'id'], name='islemlog_tarih_idx'),
+            models.Index(fields=['kullanici', 'tarih', 'id'], name='islemlog_kullanici_tarih_idx'),
+            models.Index(fields=['ilgili_personel', 'tarih', 'id'], name='islemlog_personel_tarih_idx'),
+            models.Index(fields=['islem_turu', 'tarih', 'id'], name='islemlog_tur_tarih_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kullanici} - {self.islem_turu} - {self.tarih.strftime('%d.%m.%Y %H:%M')}"
+
+
+class ArkaPlanIsi(models.Model):
+    """
+    Uzun süren işlemlerin (bordro kesinleştirme, büyük Excel raporları, içe aktarım)
+    istek dışında, 'is_calistir' komutuyla çalışan worker tarafından yürütüldüğü iş kuyruğu.
+    """
+    TURLER = (
+        ('donem_kapat', 'Bordro Kesinleştirme'),
+        ('maas_raporu', 'Maaş Raporu (Excel)'),
+        ('personel_ice_aktar', 'Personel İçe Aktarımı'),
+        ('pdks_ice_aktar', 'Kart Okutma (PDKS) İçe Aktarımı'),
+        ('toplu_pusula', 'Toplu Maaş Pusulası'),
+    )
+    DURUMLAR = (
+        ('bekliyor', 'Bekliyor'),
+        ('calisiyor', 'Çalışıyor'),
+        ('tamamlandi', 'Tamamlandı'),
+        ('hata', 'Hata'),
+    )
+
+    tur = models.CharField(max_length=30, choices=TURLER, verbose_name="İş Türü")
+    durum = models.CharField(max_length=20, choices=DURUMLAR, default='bekliyor', verbose_name="Durum")
+    ilerleme = models.PositiveSmallIntegerField(default=0, verbose_name="İlerleme (%)")
+    parametreler = models.JSONField(default=dict, blank=True, verbose_name="Parametreler")
+
+    sonuc_mesaji = models.TextField(blank=True, default='', verbose_name="Sonuç Mesajı")
+    sonuc_dosyasi = models.CharField(max_length=255, blank=True, default='', verbose_name="Sonuç Dosyası")
+
+    olusturan = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Başlatan")
+    olusturulma_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma")
+    baslama_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Başlama")
+    bitis_tarihi = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş")
+
+    class Meta:
+        verbose_name = "Arka Plan İşi"
+        verbose_name_plural = "Arka Plan İşleri"
+        indexes = [models.Index(fields=['durum', 'id'], name='arkaplanisi_durum_idx')]
+
+    def __str__(self):
+        return f"#{self.id} {self.get_tur_display()} - {self.get_durum_display()}"
+
+
+# --- ARŞİV (core/arsiv.py) ---
+# ArsivPuantaj ve ArsivIslemLog ayrı bir veritabanında (DATABASES['arsiv']) durur
+# (core/router.py). Personel/kullanıcı o veritabanında olmadığından ilişkiler
+# veritabanı kısıtı olmadan (db_constraint=False) tutulur; id'ler asıl tablodaki gibidir.
+
+class ArsivDonemi(models.Model):
+    """Puantajları arşiv veritabanına taşınmış dönemler (asıl veritabanında)."""
+    donem = models.DateField(unique=True, verbose_name="Dönem (Her ayın 1'i)")
+    puantaj_sayisi = models.PositiveIntegerField(default=0, verbose_name="Taşınan Puantaj")
+    arsivlenme_tarihi = models.DateTimeField(auto_now_add=True, verbose_name="Arşivlenme Tarihi")
+
+    class Meta:
+        verbose_name = "Arşivlenmiş Dönem"
+        verbose_name_plural = "Arşivlenmiş Dönemler"
+
+    def __str__(self):
+        return self.donem.strftime('%m.%Y')
+
+
+class ArsivPuantaj(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    personel = models.ForeignKey(Personel, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    tarih = models.DateField(verbose_name="Tarih")
+    durum = models.CharField(max_length=20, choices=Puantaj.DURUMLAR, verbose_name="Durum")
+    giris_saati = models.TimeField(blank=True, null=True, verbose_name="Giriş Saati")
+    cikis_saati = models.TimeField(blank=True, null=True, verbose_name="Çıkış Saati")
+    hesaplanan_mesai_saati = models.DecimalField(max_digits=4, decimal_places=2, default=0.00, verbose_name="Hesaplanan Mesai (Saat)")
+    manuel_mesai_saati = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True, verbose_name="Manuel Düzeltme (Varsa)")
+
+    class Meta:
+        verbose_name = "Arşiv Yoklama"
+        verbose_name_plural = "Arşiv Yoklamalar"
+        indexes = [
+            models.Index(fields=['tarih', 'personel'], name='arsivpuantaj_tarih_idx'),
+            models.Index(fields=['personel', 'tarih'], name='arsivpuantaj_personel_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.personel_id} - {self.tarih} - {self.durum}"
+
+
+class ArsivIslemLog(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    kullanici = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True,
+                                  related_name='+', verbose_name="İşlemi Yapan")
+    islem_turu = models.CharField(max_length=20, choices=IslemLog.ISLEM_TURLERI, verbose_name="İşlem Türü")
+    konu = models.CharField(max_length=100, verbose_name="Konu")
+    detay = models.TextField(verbose_name="İşlem Detayı")
+    tarih = models.DateTimeField(verbose_name="Tarih/Saat")
+    ilgili_personel = models.ForeignKey(Personel, on_delete=models.DO_NOTHING, db_constraint=False, null=True,
+                                        blank=True, related_name='+', verbose_name="İlgili Personel")
+
+    class Meta:
+        verbose_name = "Arşiv İşlem Logu"
+        verbose_name_plural = "Arşiv İşlem Logları"
+        indexes = [models.Index(fields=['tarih', 'id'], name='arsivislemlog_tarih_idx')]
 
     def __str__(self):
-        return f"{self.kullanici} - {self.islem_turu} - {self.tarih.strftime('%d.%m.%Y %H:%M')}"
\ No newline at end of file
+        return f"{self.kullanici_id} - {self.islem_turu} - {self.tarih.strftime('%d.%m.%Y %H:%M')}"
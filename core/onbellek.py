@@ -0,0 +1,167 @@
+"""
+Maaş raporu önbelleği.
+
+maas_raporu sayfasının tablo HTML'i ve toplamı Django önbelleğinde (CACHES)
+tutulur. Anahtar (yıl, ay, kapalı/taslak, veri sürümü) bileşenlerinden oluşur;
+veri değiştiğinde önbellek silinmez, ilgili sürüm sayacı artırılır ve eski
+anahtar bir daha okunmaz.
+
+Sürüm sayaçları:
+  - donem:<yıl>-<ay> : o ayın Puantaj / FinansalHareket (AylikOzet üzerinden)
+                       veya MaasBordrosu kayıtları değişti
+  - personel         : herhangi bir Personel kaydı değişti (ad, maaş, aktiflik)
+  - taslak           : TaksitliAvans değişti veya dönem kapanışında taksit defterine
+                       yazıldı (kalan tutarlar tüm taslak ayların kesintisini etkiler)
+  - pano             : yukarıdakilerden herhangi biri arttığında birlikte artar
+
+Ana sayfa metrikleri (core/pano.py) de aynı önbellekte, günün tarihi ve 'pano'
+sürümüyle anahtarlanıp en fazla PANO_ONBELLEK_SURESI saniye tutulur.
+
+Kapalı (MaasBordrosu'su olan) dönemler süresiz, taslak dönemler
+RAPOR_ONBELLEK_SURESI saniye saklanır. İsabet/ıska sayaçları da önbellekte
+tutulur: 'python manage.py rapor_onbellegi'.
+
+Önbellek süreçler arasında paylaşılmalıdır (varsayılan dosya tabanlı):
+arka plan worker'ı (is_calistir) yaptığı değişikliklerle web sürecindeki
+raporları da geçersiz kılar.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+_ON_EK = 'maas_raporu'
+SAYACLAR = ('isabet', 'iska')
+
+
+def _onbellek():
+    return caches[settings.RAPOR_ONBELLEGI]
+
+
+def _surum_anahtari(ad):
+    return f'{_ON_EK}:surum:{ad}'
+
+
+def _donem_adi(yil, ay):
+    return f'donem:{yil}-{ay:02d}'
+
+
+def _ilk_surum():
+    # Sayaç önbellekten düşerse (culling, yeniden başlatma) 0'dan başlasaydı eski
+    # sürümlü raporlar yeniden okunabilirdi; zamana bağlı başlangıç bunu önler.
+    return time.time_ns() // 1000
+
+
+def _artir(anahtar, ilk_deger=1):
+    onbellek = _onbellek()
+    if onbellek.add(anahtar, ilk_deger, timeout=None):
+        return
+    try:
+        onbellek.incr(anahtar)
+    except ValueError:
+        # add ile incr arasında silindiyse
+        onbellek.set(anahtar, ilk_deger, timeout=None)
+
+
+def _surumler(yil, ay):
+    return _surum_degerleri([_donem_adi(yil, ay), 'personel', 'taslak'])
+
+
+def _surum_degerleri(adlar):
+    anahtarlar = [_surum_anahtari(ad) for ad in adlar]
+    onbellek = _onbellek()
+    degerler = onbellek.get_many(anahtarlar)
+    for anahtar in anahtarlar:
+        if anahtar not in degerler:
+            onbellek.add(anahtar, _ilk_surum(), timeout=None)
+            degerler[anahtar] = onbellek.get(anahtar)
+    return [degerler[a] for a in anahtarlar]
+
+
+def _rapor_anahtarlari(yil, ay):
+    donem, personel, taslak = _surumler(yil, ay)
+    return (
+        f'{_ON_EK}:{yil}-{ay:02d}:kapali:{donem}.{personel}',
+        f'{_ON_EK}:{yil}-{ay:02d}:taslak:{donem}.{personel}.{taslak}',
+    )
+
+
+def rapor_getir(yil, ay, hesapla):
+    """
+    Dönemin rapor verisini önbellekten döner; yoksa hesapla() ile üretip saklar.
+
+    hesapla() bir sözlük döner ve 'bordro_var_mi' anahtarı içermelidir.
+    Dönüş: (veri, isabet_mi)
+    """
+    onbellek = _onbellek()
+    # Sürümler hesaplamadan önce okunur: hesap sırasında veri değişirse sonuç
+    # eski sürümün anahtarına yazılır ve bir daha okunmaz.
+    kapali_anahtar, taslak_anahtar = _rapor_anahtarlari(yil, ay)
+    bulunan = onbellek.get_many([kapali_anahtar, taslak_anahtar])
+    veri = bulunan.get(kapali_anahtar) or bulunan.get(taslak_anahtar)
+    if veri is not None:
+        _artir(f'{_ON_EK}:sayac:isabet')
+        return veri, True
+
+    _artir(f'{_ON_EK}:sayac:iska')
+    veri = hesapla()
+    if veri['bordro_var_mi']:
+        onbellek.set(kapali_anahtar, veri, timeout=None)
+    else:
+        onbellek.set(taslak_anahtar, veri, timeout=settings.RAPOR_ONBELLEK_SURESI)
+    return veri, False
+
+
+def pano_getir(bugun, hesapla):
+    """
+    Ana sayfa metriklerini önbellekten döner; yoksa hesapla() ile üretip saklar.
+    Dönüş: (veri, isabet_mi)
+    """
+    onbellek = _onbellek()
+    surum, = _surum_degerleri(['pano'])
+    anahtar = f'{_ON_EK}:pano:{bugun.isoformat()}:{surum}'
+    veri = onbellek.get(anahtar)
+    if veri is not None:
+        return veri, True
+    veri = hesapla()
+    onbellek.set(anahtar, veri, timeout=settings.PANO_ONBELLEK_SURESI)
+    return veri, False
+
+
+def _surumleri_artir(adlar):
+    # Transaction içinde çağrıldıysa commit'ten sonra çalışır (on_commit).
+    # Her veri değişikliği ana sayfa metriklerini de geçersiz kılar.
+    for ad in sorted({*adlar, 'pano'}):
+        _artir(_surum_anahtari(ad), _ilk_surum())
+
+
+def donem_raporlarini_gecersiz_kil(donemler):
+    """Verilen dönemlerin (date veya (yıl, ay)) raporlarını geçersiz kılar."""
+    adlar = {
+        _donem_adi(*d) if isinstance(d, tuple) else _donem_adi(d.year, d.month)
+        for d in donemler
+    }
+    if adlar:
+        transaction.on_commit(lambda: _surumleri_artir(adlar))
+
+
+def personel_raporlarini_gecersiz_kil():
+    transaction.on_commit(lambda: _surumleri_artir(['personel']))
+
+
+def taslak_raporlari_gecersiz_kil():
+    transaction.on_commit(lambda: _surumleri_artir(['taslak']))
+
+
+def sayaclar():
+    degerler = _onbellek().get_many([f'{_ON_EK}:sayac:{ad}' for ad in SAYACLAR])
+    return {ad: degerler.get(f'{_ON_EK}:sayac:{ad}', 0) for ad in SAYACLAR}
+
+
+def sayaclari_sifirla():
+    _onbellek().delete_many([f'{_ON_EK}:sayac:{ad}' for ad in SAYACLAR])
+
+
+def onbellegi_temizle():
+    _onbellek().clear()
@@ -0,0 +1,225 @@
+"""
+Aylık özet (AylikOzet) tablosunun bakımı.
+
+Her (personel, ay) için çalışılan/gelinmeyen gün, toplam mesai, prim ve kesinti
+toplamları ayrı bir tabloda tutulur. Puantaj veya FinansalHareket değiştiğinde
+sadece etkilenen (personel, ay) satırları ham kayıtlardan yeniden hesaplanır
+(core/signals.py ve toplu yazma yolları buradaki ozetleri_yenile'yi çağırır).
+Ham kaydı kalmayan anahtarın özet satırı silinir; böylece tabloda yalnızca
+verisi olan aylar bulunur.
+
+ozetleri_dogrula() tüm tabloyu ham veriyle karşılaştırır ve sapmaları onarır
+('python manage.py rebuild_summaries').
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .arsiv import arsivlenmis_donemler
+from .bordro import CALISILAN_DURUMLAR, GELINMEYEN_DURUMLAR, puantaj_toplamlari, hareket_toplamlari
+from .donem import sonraki_ay
+from .models import Puantaj, FinansalHareket, AylikOzet, ArsivPuantaj
+from .onbellek import donem_raporlarini_gecersiz_kil
+
+OZET_ALANLARI = ('calistigi_gun', 'gelmedigi_gun', 'toplam_mesai', 'toplam_prim', 'diger_kesintiler')
+
+_erteleme = threading.local()
+
+
+def ozet_donemi(tarih):
+    """Tarihin ait olduğu dönem (ayın 1'i)."""
+    if isinstance(tarih, datetime):
+        # DateField varsayılanı timezone.now olduğundan kayıt öncesi datetime gelebilir
+        tarih = timezone.localtime(tarih).date() if timezone.is_aware(tarih) else tarih.date()
+    return tarih.replace(day=1)
+
+
+def _tutar(deger):
+    return Decimal(deger or 0).quantize(Decimal('0.01'))
+
+
+def _ozet_degerleri(puantaj, hareket):
+    return {
+        'calistigi_gun': puantaj.get('calistigi_gun', 0),
+        'gelmedigi_gun': puantaj.get('gelmedigi_gun', 0),
+        'toplam_mesai': _tutar(puantaj.get('toplam_mesai')),
+        'toplam_prim': _tutar(hareket.get('toplam_prim')),
+        'diger_kesintiler': _tutar(hareket.get('diger_kesintiler')),
+    }
+
+
+@contextmanager
+def ozet_guncellemesi_ertelenmis():
+    """
+    Blok içindeki ozetleri_yenile() çağrılarını biriktirir ve blok sonunda
+    tek seferde uygular (çok sayıda kaydı tek tek kaydeden/silen kod için).
+    """
+    bekleyenler = getattr(_erteleme, 'anahtarlar', None)
+    if bekleyenler is not None:
+        # İç içe kullanımda en dıştaki blok uygular
+        yield
+        return
+
+    _erteleme.anahtarlar = set()
+    try:
+        yield
+        anahtarlar = _erteleme.anahtarlar
+    finally:
+        _erteleme.anahtarlar = None
+    ozetleri_yenile(anahtarlar)
+
+
+@contextmanager
+def ozet_sinyalleri_kapali():
+    """
+    Blok içinde Puantaj / FinansalHareket sinyalleri özeti yenilemez (core/signals.py).
+    Ham kaydı bilerek asıl tablodan kaldıran, ama özetin kalması gereken kod için
+    (arşivleme: AylikOzet arşivlenen dönemin toplamlarını korur).
+    """
+    onceki = getattr(_erteleme, 'kapali', False)
+    _erteleme.kapali = True
+    try:
+        yield
+    finally:
+        _erteleme.kapali = onceki
+
+
+def ozet_sinyalleri_kapali_mi():
+    return getattr(_erteleme, 'kapali', False)
+
+
+def ozetleri_yenile(anahtarlar):
+    """
+    Verilen {(personel_id, donem)} anahtarlarının özet satırlarını ham kayıtlardan
+    yeniden hesaplar. Dönem başına iki GROUP BY sorgusu ve tek toplu yazma yapılır.
+    """
+    anahtarlar = set(anahtarlar)
+    if not anahtarlar:
+        return
+
+    bekleyenler = getattr(_erteleme, 'anahtarlar', None)
+    if bekleyenler is not None:
+        bekleyenler.update(anahtarlar)
+        return
+
+    donemler = defaultdict(set)
+    for personel_id, donem in anahtarlar:
+        donemler[ozet_donemi(donem)].add(personel_id)
+
+    # Çağıran transaction içindeyse ek savepoint açılmaz
+    with transaction.atomic(savepoint=False):
+        for donem, personel_ids in donemler.items():
+            puantajlar = puantaj_toplamlari(donem.year, donem.month, personel_ids)
+            hareketler = hareket_toplamlari(donem.year, donem.month, personel_ids)
+
+            ozetler = [
+                AylikOzet(personel_id=pid, donem=donem,
+                          **_ozet_degerleri(puantajlar.get(pid, {}), hareketler.get(pid, {})))
+                for pid in personel_ids
+                if pid in puantajlar or pid in hareketler
+            ]
+            bos_olanlar = personel_ids - {o.personel_id for o in ozetler}
+            if bos_olanlar:
+                AylikOzet.objects.filter(donem=donem, personel_id__in=bos_olanlar).delete()
+            _ozetleri_yaz(ozetler)
+
+        # Özet değişen ayların maaş raporları önbellekten düşer (commit sonrası)
+        donem_raporlarini_gecersiz_kil(donemler)
+
+
+def _ozetleri_yaz(ozetler, batch_size=500):
+    """(personel, donem) üzerinden toplu upsert; desteklemeyen veritabanında sil + ekle."""
+    if not ozetler:
+        return
+    if connection.features.supports_update_conflicts_with_target:
+        AylikOzet.objects.bulk_create(
+            ozetler, batch_size=batch_size, update_conflicts=True,
+            unique_fields=('personel', 'donem'), update_fields=OZET_ALANLARI,
+        )
+    else:
+        q = Q()
+        for o in ozetler:
+            q |= Q(personel_id=o.personel_id, donem=o.donem)
+        AylikOzet.objects.filter(q).delete()
+        AylikOzet.objects.bulk_create(ozetler, batch_size=batch_size)
+
+
+def ham_ozetler(baslangic=None, bitis=None):
+    """
+    Ham kayıtlardan beklenen özetleri hesaplar: {(personel_id, donem): {alan: değer}}.
+    baslangic/bitis (dönem tarihleri, dahil) verilirse sadece o aralık.
+    """
+    def aralik(qs):
+        if baslangic:
+            qs = qs.filter(tarih__gte=ozet_donemi(baslangic))
+        if bitis:
+            qs = qs.filter(tarih__lt=sonraki_ay(bitis))
+        return qs.annotate(donem=TruncMonth('tarih')).values('personel_id', 'donem').order_by()
+
+    def puantaj_ozetleri(qs):
+        return {
+            (s['personel_id'], s['donem']): s
+            for s in aralik(qs).annotate(
+                calistigi_gun=Count('id', filter=Q(durum__in=CALISILAN_DURUMLAR)),
+                gelmedigi_gun=Count('id', filter=Q(durum__in=GELINMEYEN_DURUMLAR)),
+                toplam_mesai=Sum('hesaplanan_mesai_saati'),
+            )
+        }
+
+    puantajlar = puantaj_ozetleri(Puantaj.objects.all())
+    # Arşivlenmiş dönemlerin puantajları arşiv veritabanında (core/arsiv.py)
+    if arsivlenmis_donemler(baslangic, bitis):
+        puantajlar.update(puantaj_ozetleri(ArsivPuantaj.objects.all()))
+    hareketler = {
+        (s['personel_id'], s['donem']): s
+        for s in aralik(FinansalHareket.objects.all()).annotate(
+            toplam_prim=Sum('tutar', filter=Q(islem_tipi='prim')),
+            diger_kesintiler=Sum('tutar', filter=~Q(islem_tipi='prim')),
+        )
+    }
+    return {
+        anahtar: _ozet_degerleri(puantajlar.get(anahtar, {}), hareketler.get(anahtar, {}))
+        for anahtar in puantajlar.keys() | hareketler.keys()
+    }
+
+
+def ozetleri_dogrula(baslangic=None, bitis=None, onar=True):
+    """
+    Özet tablosunu ham kayıtlarla karşılaştırır; onar=True ise sapmaları düzeltir.
+
+    Dönüş: {'eksik': n, 'hatali': n, 'fazla': n}
+    """
+    beklenen = ham_ozetler(baslangic, bitis)
+
+    mevcut_qs = AylikOzet.objects.all()
+    if baslangic:
+        mevcut_qs = mevcut_qs.filter(donem__gte=ozet_donemi(baslangic))
+    if bitis:
+        mevcut_qs = mevcut_qs.filter(donem__lte=ozet_donemi(bitis))
+    mevcut, mevcut_idler = {}, {}
+    for s in mevcut_qs.values_list('personel_id', 'donem', 'id', *OZET_ALANLARI).iterator(chunk_size=5000):
+        mevcut[(s[0], s[1])] = dict(zip(OZET_ALANLARI, s[3:]))
+        mevcut_idler[(s[0], s[1])] = s[2]
+
+    eksik = [a for a in beklenen if a not in mevcut]
+    hatali = [a for a in beklenen if a in mevcut and mevcut[a] != beklenen[a]]
+    fazla = [a for a in mevcut if a not in beklenen]
+
+    if onar:
+        with transaction.atomic():
+            if fazla:
+                AylikOzet.objects.filter(id__in=[mevcut_idler[a] for a in fazla]).delete()
+            _ozetleri_yaz([
+                AylikOzet(personel_id=pid, donem=donem, **beklenen[(pid, donem)])
+                for pid, donem in eksik + hatali
+            ])
+            donem_raporlarini_gecersiz_kil({donem for _, donem in eksik + hatali + fazla})
+
+    return {'eksik': len(eksik), 'hatali': len(hatali), 'fazla': len(fazla)}
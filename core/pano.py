@@ -0,0 +1,93 @@
+"""
+Ana sayfa (pano) metrikleri.
+
+Ana sayfa en sık açılan sayfadır; metrikler her istekte ham tablolardan
+hesaplanmaz. pano_metrikleri() sonucu onbellek.pano_getir() ile günün tarihi
+ve 'pano' sürüm sayacıyla anahtarlanarak saklanır. Puantaj, FinansalHareket,
+Personel, MaasBordrosu veya TaksitliAvans değiştiğinde sayaç commit'ten sonra
+artar (yazma anında geçersiz kılma); değişiklik olmasa da kayıt en fazla
+PANO_ONBELLEK_SURESI saniye tutulur.
+
+Önbellek ıskasında da sorgular geçmişin uzunluğundan bağımsızdır: hepsi tarih /
+dönem aralığıyla indeksten okunur.
+  - Bugün gelen: Puantaj (tarih, durum) indeksi
+  - Bu ay avans: AylikOzet'in bu ayki kesinti toplamı (prim dışı hareketler)
+  - Son 30 gün yoklama: tek gruplu sorgu (tarih, durum)
+  - Son 12 ay bordro: tek gruplu sorgu (donem); bordrosu kesilmemiş aylar boş döner
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Sum
+
+from .bordro import CALISILAN_DURUMLAR
+from .donem import donem_baslangici, sonraki_ay
+from .models import AylikOzet, FinansalHareket, MaasBordrosu, Personel, Puantaj
+from .onbellek import pano_getir
+
+YOKLAMA_TREND_GUN = 30
+BORDRO_TREND_AY = 12
+
+
+def _ay_geri(donem, ay_sayisi):
+    toplam = donem.year * 12 + donem.month - 1 - ay_sayisi
+    return donem_baslangici(toplam // 12, toplam % 12 + 1)
+
+
+def yoklama_trendi(bugun, gun=YOKLAMA_TREND_GUN):
+    """Son gun günün her biri için {'tarih', 'gelen', 'gelmeyen'} (kaydı olmayan gün 0)."""
+    baslangic = bugun - timedelta(days=gun - 1)
+    gunler = {baslangic + timedelta(days=i): {'gelen': 0, 'gelmeyen': 0} for i in range(gun)}
+    for satir in Puantaj.objects.filter(
+        tarih__gte=baslangic, tarih__lte=bugun
+    ).values('tarih', 'durum').annotate(sayi=Count('id')).order_by():
+        gunler[satir['tarih']]['gelen' if satir['durum'] in CALISILAN_DURUMLAR else 'gelmeyen'] += satir['sayi']
+    return [{'tarih': tarih, **sayilar} for tarih, sayilar in gunler.items()]
+
+
+def bordro_trendi(bugun, ay=BORDRO_TREND_AY):
+    """Son ay ayın her biri için {'donem', 'net', 'kisi'}; bordrosu olmayan ayda net None."""
+    bu_ay = donem_baslangici(bugun.year, bugun.month)
+    baslangic = _ay_geri(bu_ay, ay - 1)
+    toplamlar = {
+        satir['donem']: satir
+        for satir in MaasBordrosu.objects.filter(
+            donem__gte=baslangic, donem__lt=sonraki_ay(bu_ay)
+        ).values('donem').annotate(net=Sum('net_odenecek'), kisi=Count('id')).order_by()
+    }
+    seri = []
+    donem = baslangic
+    for _ in range(ay):
+        satir = toplamlar.get(donem)
+        seri.append({'donem': donem, 'net': satir['net'] if satir else None, 'kisi': satir['kisi'] if satir else 0})
+        donem = sonraki_ay(donem)
+    return seri
+
+
+def _oran_ekle(seri, alan):
+    # Şablonda çubuk genişliği için en büyük değere göre yüzde
+    en_buyuk = max((s[alan] or 0 for s in seri), default=0)
+    for s in seri:
+        s['oran'] = round((s[alan] or 0) * 100 / en_buyuk) if en_buyuk else 0
+    return seri
+
+
+def _hesapla(bugun):
+    toplam_personel = Personel.objects.filter(aktif_mi=True).count()
+    bugun_gelen = Puantaj.objects.filter(tarih=bugun, durum__in=CALISILAN_DURUMLAR).count()
+    bu_ay_avans = AylikOzet.objects.filter(
+        donem=donem_baslangici(bugun.year, bugun.month)
+    ).aggregate(toplam=Sum('diger_kesintiler'))['toplam'] or 0
+    return {
+        'toplam_personel': toplam_personel,
+        'bugun_gelen': bugun_gelen,
+        'gelmeyen': toplam_personel - bugun_gelen,
+        'bu_ay_avans': bu_ay_avans,
+        'son_hareketler': list(FinansalHareket.objects.select_related('personel').order_by('-id')[:5]),
+        'yoklama_trendi': _oran_ekle(yoklama_trendi(bugun), 'gelen'),
+        'bordro_trendi': _oran_ekle(bordro_trendi(bugun), 'net'),
+    }
+
+
+def pano_metrikleri(bugun):
+    """Ana sayfa metrikleri. Dönüş: (metrikler, onbellekten_mi)"""
+    return pano_getir(bugun, lambda: _hesapla(bugun))
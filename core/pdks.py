@@ -0,0 +1,293 @@
+"""
+Kart okuyucu / turnike (PDKS) okutma kayıtlarının toplu içe aktarımı.
+
+Cihazların dışa aktardığı CSV veya XLSX dosyası (her satır bir okutma:
+TC No + zaman) satır satır okunur; zamanlar parça parça pandas ile vektörel
+çözülür. Personel, tek sorguyla belleğe alınan TC No -> id sözlüğünden bulunur.
+
+Her personelin okutmaları zaman sırasına dizilir ve sırayla giriş/çıkış olarak
+eşlenir. TEKRAR_ESIGI içinde tekrar okutulan kart tek okutma sayılır; girişten
+sonra AZAMI_VARDIYA içinde çıkış yoksa giriş eşleşmemiş sayılır. Vardiya,
+girişin yapıldığı güne yazılır; gece yarısını geçen vardiyalarda çıkış saati
+girişten küçük kalır ve mesai Puantaj.save() ile aynı kurala göre hesaplanır.
+Aynı gündeki birden çok vardiya (öğle arası çıkışı vb.) ilk giriş - son çıkış
+olarak birleştirilir.
+
+Eşleşen günler 'geldi' durumuyla core/yoklama.py'deki puantajlari_kaydet ile
+YAZMA_PARCASI'lık toplu upsert'ler halinde yazılır (mesai vektörel hesaplanır,
+aylık özetler yenilenir). Sorumlunun 'hafta_tatili' işaretlediği günün durumu
+korunur, yalnızca saatleri güncellenir; izinli, raporlu gibi çalışılmayan bir
+durumla işaretli gün değiştirilmez, okutması hata olarak raporlanır. Kaydedilemeyen her okutma satır numarası ve sebebiyle
+IceAktarimSonucu.hatalar'a eklenir.
+"""
+import csv
+import io
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from .arsiv import arsivlenmis_donemler
+from .ice_aktar import IceAktarimSonucu
+from .models import Personel, Puantaj
+from .yoklama import puantajlari_kaydet
+
+TC_SUTUNU = 'TC No'
+ZAMAN_SUTUNU = 'Zaman'
+# Zaman tek sütunda değilse ayrı 'Tarih' ve 'Saat' sütunları kabul edilir
+TARIH_SUTUNU, SAAT_SUTUNU = 'Tarih', 'Saat'
+
+ZAMAN_BICIMLERI = ('%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M')
+
+TEKRAR_ESIGI = timedelta(minutes=2)
+AZAMI_VARDIYA = timedelta(hours=16)
+YAZMA_PARCASI = 5000
+# Okutmanın üzerine yazabildiği mevcut durumlar; hafta tatilinde durum korunur
+YAZILABILIR_DURUMLAR = ('geldi', 'hafta_tatili')
+DURUM_ADLARI = dict(Puantaj.DURUMLAR)
+
+
+def _xlsx_mi(dosya):
+    if isinstance(dosya, (str, bytes)) or hasattr(dosya, '__fspath__'):
+        with open(dosya, 'rb') as f:
+            return f.read(2) == b'PK'
+    konum = dosya.tell()
+    imza = dosya.read(2)
+    dosya.seek(konum)
+    return imza == b'PK'
+
+
+def _xlsx_satirlari(dosya):
+    wb = load_workbook(dosya, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _csv_satirlari(dosya):
+    if isinstance(dosya, (str, bytes)) or hasattr(dosya, '__fspath__'):
+        with open(dosya, 'rb') as f:
+            yield from _csv_satirlari(f)
+        return
+    metin = io.TextIOWrapper(dosya, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        ornek = metin.read(4096)
+        metin.seek(0)
+        try:
+            lehce = csv.Sniffer().sniff(ornek, delimiters=';,\t')
+        except csv.Error:
+            lehce = csv.excel
+        yield from csv.reader(metin, lehce)
+    finally:
+        # Çağıranın dosyası kapatılmasın
+        metin.detach()
+
+
+def okutma_parcalari(dosya, parca_boyutu=10000):
+    """
+    CSV/XLSX dosyasını okuyup (satir_numaralari, DataFrame['tc_no', 'zaman']) parçaları
+    üretir; 'zaman' ham değerdir (metin veya datetime). Boş satırlar atlanır.
+    """
+    satirlar = _xlsx_satirlari(dosya) if _xlsx_mi(dosya) else _csv_satirlari(dosya)
+    baslik = next(satirlar, None)
+    if baslik is None:
+        return
+    sutunlar = [str(b).strip().casefold() if b is not None else '' for b in baslik]
+
+    def sira(ad):
+        return sutunlar.index(ad.casefold()) if ad.casefold() in sutunlar else None
+
+    tc, zaman, tarih, saat = sira(TC_SUTUNU), sira(ZAMAN_SUTUNU), sira(TARIH_SUTUNU), sira(SAAT_SUTUNU)
+    if tc is None or (zaman is None and (tarih is None or saat is None)):
+        raise ValueError(f"Eksik başlık: '{TC_SUTUNU}' ve '{ZAMAN_SUTUNU}' (veya '{TARIH_SUTUNU}' + '{SAAT_SUTUNU}') gerekli.")
+
+    def hucre(satir, i):
+        return satir[i] if i < len(satir) else None
+
+    numaralar, veriler = [], []
+    for satir_no, satir in enumerate(satirlar, start=2):
+        if all(h is None or str(h).strip() == '' for h in satir):
+            continue
+        if zaman is not None:
+            deger = hucre(satir, zaman)
+        else:
+            deger = _tarih_saat_birlestir(hucre(satir, tarih), hucre(satir, saat))
+        numaralar.append(satir_no)
+        veriler.append((hucre(satir, tc), deger))
+        if len(veriler) >= parca_boyutu:
+            yield numaralar, pd.DataFrame(veriler, columns=['tc_no', 'zaman'])
+            numaralar, veriler = [], []
+    if veriler:
+        yield numaralar, pd.DataFrame(veriler, columns=['tc_no', 'zaman'])
+
+
+def _tarih_saat_birlestir(tarih, saat):
+    if isinstance(tarih, datetime) and saat is not None and not isinstance(saat, str):
+        return datetime.combine(tarih.date(), saat)
+    tarih = tarih.strftime('%d.%m.%Y') if isinstance(tarih, datetime) else str(tarih or '').strip()
+    saat = saat.strftime('%H:%M:%S') if hasattr(saat, 'strftime') else str(saat or '').strip()
+    return f'{tarih} {saat}'
+
+
+def zamanlari_coz(seri):
+    """Ham zaman sütununu datetime64 serisine çevirir; okunamayanlar NaT."""
+    sonuc = pd.Series(pd.NaT, index=seri.index, dtype='datetime64[ns]')
+    tarih_nesnesi = seri.map(lambda d: isinstance(d, datetime))
+    if tarih_nesnesi.any():
+        sonuc[tarih_nesnesi] = pd.to_datetime(seri[tarih_nesnesi])
+    metin = (
+        seri[~tarih_nesnesi].astype(object).where(seri[~tarih_nesnesi].notna(), '')
+        .astype(str).str.strip()
+        .str.replace('/', '.', regex=False).str.replace('T', ' ', regex=False)
+    )
+    for bicim in ZAMAN_BICIMLERI:
+        eksik = metin.index[sonuc[metin.index].isna()]
+        if eksik.empty:
+            break
+        sonuc[eksik] = pd.to_datetime(metin[eksik], format=bicim, errors='coerce')
+    return sonuc
+
+
+def vardiyalari_esle(okutmalar):
+    """
+    Bir personelin [(zaman, satir_no)] okutmalarını vardiyalara eşler.
+    Dönüş: (vardiyalar [(giris, cikis, giris_satiri)], eşleşmeyen satır numaraları)
+    """
+    okutmalar = sorted(okutmalar)
+    temiz = []
+    for zaman, satir_no in okutmalar:
+        if temiz and zaman - temiz[-1][0] < TEKRAR_ESIGI:
+            continue
+        temiz.append((zaman, satir_no))
+
+    vardiyalar, eslesmeyen = [], []
+    i = 0
+    while i < len(temiz):
+        giris, satir_no = temiz[i]
+        if i + 1 < len(temiz) and temiz[i + 1][0] - giris <= AZAMI_VARDIYA:
+            vardiyalar.append((giris, temiz[i + 1][0], satir_no))
+            i += 2
+        else:
+            eslesmeyen.append(satir_no)
+            i += 1
+    return vardiyalar, eslesmeyen
+
+
+def gunlere_birlestir(vardiyalar):
+    """
+    Vardiyaları giriş gününe göre birleştirir (ilk giriş - son çıkış).
+    Birleşince AZAMI_VARDIYA'yı aşan vardiya ayrı bir iş günü sayılamayacağından reddedilir.
+    Dönüş: ({tarih: (giris, cikis, giris_satiri)}, reddedilen satır numaraları)
+    """
+    gunler, reddedilen = {}, []
+    for giris, cikis, satir_no in vardiyalar:
+        gun = giris.date()
+        if gun not in gunler:
+            gunler[gun] = (giris, cikis, satir_no)
+            continue
+        ilk_giris, _, ilk_satir = gunler[gun]
+        if cikis - ilk_giris <= AZAMI_VARDIYA:
+            gunler[gun] = (ilk_giris, cikis, ilk_satir)
+        else:
+            reddedilen.append(satir_no)
+    return gunler, reddedilen
+
+
+def pdks_ice_aktar(dosya, parca_boyutu=10000, yazma_parcasi=YAZMA_PARCASI, ilerleme=None):
+    """
+    Okutma dosyasını içe aktarır; eşleşen günleri Puantaj'a yazar (varsa günceller).
+
+    ilerleme: okuma ve yazma sırasında 0-100 arası yüzdeyle çağrılan fonksiyon (opsiyonel).
+    Dönüş: IceAktarimSonucu (eklenen/guncellenen Puantaj günü, atlanan okutma, satır bazında hatalar)
+    """
+    sonuc = IceAktarimSonucu()
+    personel_idleri = dict(Personel.objects.values_list('tc_no', 'id'))
+    tc_nolari = {}
+    okutmalar = defaultdict(list)
+
+    for numaralar, df in okutma_parcalari(dosya, parca_boyutu):
+        tc = (
+            df['tc_no'].astype(object).where(df['tc_no'].notna(), '')
+            .astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+        )
+        zamanlar = zamanlari_coz(df['zaman'])
+        for satir_no, tc_no, zaman in zip(numaralar, tc.tolist(), zamanlar.tolist()):
+            if zaman is pd.NaT:
+                sonuc.hata_ekle(satir_no, tc_no, "Zaman okunamadı.")
+            elif tc_no not in personel_idleri:
+                sonuc.hata_ekle(satir_no, tc_no, "Bu TC No ile kayıtlı personel yok." if tc_no else "TC No boş.")
+            else:
+                personel_id = personel_idleri[tc_no]
+                tc_nolari[personel_id] = tc_no
+                okutmalar[personel_id].append((zaman.to_pydatetime(), satir_no))
+    if ilerleme:
+        ilerleme(30)
+
+    kayitlar = []
+    for personel_id, liste in okutmalar.items():
+        tc_no = tc_nolari[personel_id]
+        vardiyalar, eslesmeyen = vardiyalari_esle(liste)
+        gunler, reddedilen = gunlere_birlestir(vardiyalar)
+        for satir_no in eslesmeyen:
+            sonuc.hata_ekle(satir_no, tc_no, "Eşleşen giriş/çıkış okutması yok.")
+        for satir_no in reddedilen:
+            sonuc.hata_ekle(satir_no, tc_no, "Aynı gün için ikinci vardiya.")
+        for gun, (giris, cikis, satir_no) in gunler.items():
+            kayitlar.append(({
+                'personel_id': personel_id,
+                'tarih': gun,
+                'durum': 'geldi',
+                'giris_saati': giris.time().replace(microsecond=0),
+                'cikis_saati': cikis.time().replace(microsecond=0),
+            }, satir_no, tc_no))
+    del okutmalar
+
+    if kayitlar:
+        arsivde = arsivlenmis_donemler(min(k['tarih'] for k, _, _ in kayitlar),
+                                       max(k['tarih'] for k, _, _ in kayitlar))
+        if arsivde:
+            for k, satir_no, tc_no in kayitlar:
+                if k['tarih'].replace(day=1) in arsivde:
+                    sonuc.hata_ekle(satir_no, tc_no, "Dönem arşivlendi, yoklama değiştirilemez.")
+            kayitlar = [kayit for kayit in kayitlar if kayit[0]['tarih'].replace(day=1) not in arsivde]
+
+    if kayitlar:
+        kayitlar = _mevcut_durumlara_gore(kayitlar, sonuc)
+
+    for baslangic in range(0, len(kayitlar), yazma_parcasi):
+        yeni, guncellenen = puantajlari_kaydet(
+            [k for k, _, _ in kayitlar[baslangic:baslangic + yazma_parcasi]], batch_size=1000
+        )
+        sonuc.eklenen += yeni
+        sonuc.guncellenen += guncellenen
+        if ilerleme:
+            ilerleme(30 + min(baslangic + yazma_parcasi, len(kayitlar)) * 69 // len(kayitlar))
+
+    sonuc.hatalar.sort()
+    return sonuc
+
+
+def _mevcut_durumlara_gore(kayitlar, sonuc):
+    """
+    Günün mevcut Puantaj durumunu korur: hafta tatili olarak kalır, çalışılmayan durumlu
+    gün (izinli, raporlu ...) yazılmaz ve hata olarak raporlanır. Tek sorgu (süperset, filtre Python'da).
+    """
+    tarihler = [k['tarih'] for k, _, _ in kayitlar]
+    mevcut_durumlar = {
+        (personel_id, tarih): durum
+        for personel_id, tarih, durum in Puantaj.objects.filter(
+            personel_id__in={k['personel_id'] for k, _, _ in kayitlar}, tarih__gte=min(tarihler), tarih__lte=max(tarihler)
+        ).values_list('personel_id', 'tarih', 'durum')
+    }
+    yazilacaklar = []
+    for kayit, satir_no, tc_no in kayitlar:
+        durum = mevcut_durumlar.get((kayit['personel_id'], kayit['tarih']))
+        if durum is not None and durum not in YAZILABILIR_DURUMLAR:
+            sonuc.hata_ekle(satir_no, tc_no, f"Gün '{DURUM_ADLARI[durum]}' olarak işaretli, okutma yazılmadı.")
+            continue
+        if durum == 'hafta_tatili':
+            kayit['durum'] = durum
+        yazilacaklar.append((kayit, satir_no, tc_no))
+    return yazilacaklar
@@ -0,0 +1,496 @@
+"""
+Sentetik veri üretimi ve URL bazında performans ölçümü.
+
+ornek_veri_olustur() verilen boyutta (personel x ay) gerçekçi bir veri seti kurar.
+url_senaryolari() avlu_backend/urls.py'deki her URL için bir istek tanımlar;
+senaryolari_olc() her isteğin sorgu sayısını, süresini ve en yüksek bellek
+kullanımını ölçer ve performans_butcesi.json'daki sorgu bütçesiyle karşılaştırır.
+
+eszamanlilik_olc() SQLite bağlantı ayarlarının (WAL, busy_timeout, BEGIN IMMEDIATE)
+eşzamanlı okuma/yazma altındaki etkisini ölçer.
+
+Komutlar: 'python manage.py ornek_veri_olustur', 'python manage.py performans_olc' ve
+'python manage.py eszamanlilik_olc'.
+"""
+import json
+import os
+import random
+import sqlite3
+import statistics
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import closing
+from datetime import date, datetime, time as saat, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .bordro import donemi_kapat
+from .denetim_arama import imlec
+from .disa_aktar import xlsx_yaz
+from .donem import sonraki_ay
+from .isler import yeni_dosya_yolu
+from .mesai import mesai_hesapla
+from .models import Personel, Puantaj, FinansalHareket, TaksitliAvans, ArkaPlanIsi, IslemLog
+from .onbellek import onbellegi_temizle
+from .ozet import ozetleri_dogrula
+
+BUTCE_DOSYASI = os.path.join(os.path.dirname(__file__), 'performans_butcesi.json')
+
+OLCUM_KULLANICISI = 'performans'
+
+# Ölçüm sırasında rapor önbelleği asıl (dosya tabanlı) önbellek yerine bellekte tutulur
+OLCUM_RAPOR_ONBELLEGI = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'performans'}
+
+# Durumların ağırlıkları: çoğunluk normal mesai
+_DURUM_AGIRLIKLARI = [('geldi', 80), ('hafta_tatili', 4), ('gelmedi', 5), ('izinli', 5),
+                      ('ucretsiz_izin', 3), ('raporlu', 3)]
+_HAREKET_TIPLERI = ['basit_avans', 'kasa_acigi', 'alisveris', 'prim']
+
+
+def _donemler(ay_sayisi, son_donem):
+    donem = son_donem
+    for _ in range(ay_sayisi - 1):
+        donem = (donem.replace(day=1) - timedelta(days=1)).replace(day=1)
+    for _ in range(ay_sayisi):
+        yield donem
+        donem = sonraki_ay(donem)
+
+
+def ornek_veri_olustur(personel_sayisi, ay_sayisi=12, son_donem=None, kapali_donemler=True,
+                       tohum=42, batch_size=2000, ilerleme=None):
+    """
+    Sentetik personel, puantaj, finansal hareket (ve her biri için işlem logu) ve taksit verisi üretir.
+
+    Son dönem (varsayılan: içinde bulunulan ay) bugüne kadar doldurulur ve açık kalır;
+    kapali_donemler=True ise önceki aylar donemi_kapat ile kesinleştirilir.
+    Aynı tohum aynı veriyi üretir. Dönüş: {'personel', 'puantaj', 'hareket', 'log', 'taksit'} sayıları.
+    """
+    rnd = random.Random(tohum)
+    bugun = timezone.now().date()
+    son_donem = (son_donem or bugun).replace(day=1)
+
+    baslangic_no = Personel.objects.count()
+    personeller = Personel.objects.bulk_create([
+        Personel(
+            ad=f'Personel{baslangic_no + i}', soyad='Test', tc_no=f'9{baslangic_no + i:010d}',
+            telefon='5550000000',
+            calisma_tipi='gunluk' if i % 5 == 0 else 'aylik',
+            maas_tutari=Decimal('1500.00') if i % 5 == 0 else Decimal(rnd.randrange(28000, 60000, 500)),
+            iban=f'TR{rnd.randrange(10**23, 10**24)}', banka_adi='Test Bankası',
+            ise_giris_tarihi=date(2020, 1, 1),
+        )
+        for i in range(personel_sayisi)
+    ], batch_size=batch_size)
+    personeller = list(Personel.objects.filter(tc_no__in=[p.tc_no for p in personeller]).only('id', 'gunluk_calisma_saati'))
+
+    durumlar, agirliklar = zip(*_DURUM_AGIRLIKLARI)
+    sayilar = {'personel': len(personeller), 'puantaj': 0, 'hareket': 0, 'log': 0, 'taksit': 0}
+    tip_adlari = dict(FinansalHareket.TIPLER)
+
+    donemler = list(_donemler(ay_sayisi, son_donem))
+    for sira, donem in enumerate(donemler, start=1):
+        son_gun = (sonraki_ay(donem) - donem).days
+        if donem == bugun.replace(day=1):
+            son_gun = bugun.day
+
+        puantajlar, hareketler = [], []
+        for p in personeller:
+            for gun in range(1, son_gun + 1):
+                durum = rnd.choices(durumlar, agirliklar)[0]
+                giris = cikis = None
+                if durum in ('geldi', 'hafta_tatili'):
+                    giris = saat(rnd.choice((7, 8, 8, 9)), rnd.choice((0, 15, 30, 45)))
+                    cikis = saat(rnd.choice((16, 17, 18, 19)), rnd.choice((0, 10, 30, 50)))
+                puantajlar.append(Puantaj(
+                    personel_id=p.id, tarih=donem.replace(day=gun), durum=durum,
+                    giris_saati=giris, cikis_saati=cikis,
+                    hesaplanan_mesai_saati=mesai_hesapla(durum, giris, cikis, p.gunluk_calisma_saati),
+                ))
+            for _ in range(rnd.randint(0, 3)):
+                hareketler.append(FinansalHareket(
+                    personel_id=p.id, tarih=donem.replace(day=rnd.randint(1, son_gun)),
+                    islem_tipi=rnd.choice(_HAREKET_TIPLERI), tutar=Decimal(rnd.randrange(50, 2000, 50)),
+                ))
+
+            if len(puantajlar) >= batch_size * 10:
+                Puantaj.objects.bulk_create(puantajlar, batch_size=batch_size)
+                sayilar['puantaj'] += len(puantajlar)
+                puantajlar = []
+
+        Puantaj.objects.bulk_create(puantajlar, batch_size=batch_size)
+        FinansalHareket.objects.bulk_create(hareketler, batch_size=batch_size)
+        IslemLog.objects.bulk_create([
+            IslemLog(
+                islem_turu='ekleme', konu='Finansal Hareket', ilgili_personel_id=h.personel_id,
+                detay=f"{h.tutar} TL tutarında {tip_adlari[h.islem_tipi]} eklendi.",
+                tarih=timezone.make_aware(datetime.combine(h.tarih, saat(rnd.randint(8, 18), rnd.randint(0, 59)))),
+            )
+            for h in hareketler
+        ], batch_size=batch_size)
+        sayilar['puantaj'] += len(puantajlar)
+        sayilar['hareket'] += len(hareketler)
+        sayilar['log'] += len(hareketler)
+        if ilerleme:
+            ilerleme(sira, len(donemler))
+
+    taksitler = [
+        TaksitliAvans(personel_id=p.id, tarih=donemler[0], toplam_tutar=Decimal('6000.00'),
+                      taksit_sayisi=6, aylik_kesinti=Decimal('1000.00'))
+        for p in personeller if rnd.random() < 0.1
+    ]
+    TaksitliAvans.objects.bulk_create(taksitler, batch_size=batch_size)
+    sayilar['taksit'] = len(taksitler)
+
+    # Toplu eklemeler sinyal üretmez; özet tablosu tek seferde kurulur
+    ozetleri_dogrula(donemler[0], donemler[-1])
+
+    if kapali_donemler:
+        for donem in donemler[:-1]:
+            donemi_kapat(donem.year, donem.month)
+
+    return sayilar
+
+
+def olcum_kullanicisi():
+    kullanici, olusturuldu = User.objects.get_or_create(
+        username=OLCUM_KULLANICISI, defaults={'is_staff': True, 'is_superuser': True}
+    )
+    if olusturuldu:
+        kullanici.set_password(OLCUM_KULLANICISI)
+        kullanici.save()
+    return kullanici
+
+
+def url_senaryolari(kullanici, son_donem=None):
+    """
+    urls.py'deki her isim için ölçülecek istek(ler)i döner:
+    [{'ad', 'url_adi', 'yontem', 'yol', 'veri', 'beklenen'}]. Veri kümesi önceden oluşturulmuş olmalıdır.
+    'beklenen' verilmemişse 4xx/5xx yanıtı hata sayılır.
+    """
+    bugun = timezone.now().date()
+    son_donem = (son_donem or bugun).replace(day=1)
+    onceki_donem = (son_donem - timedelta(days=1)).replace(day=1)
+
+    personel = Personel.objects.filter(aktif_mi=True).order_by('id').first()
+    personel_ids = list(Personel.objects.filter(aktif_mi=True).values_list('id', flat=True))
+    hareket = FinansalHareket.objects.create(
+        personel=personel, tarih=bugun, islem_tipi='alisveris', tutar=Decimal('10.00')
+    )
+    # İndirilebilir sonuç dosyası olan tamamlanmış bir iş (ISLER_KLASORU'na yazılır)
+    yol, dosya_adi = yeni_dosya_yolu('.xlsx')
+    with open(yol, 'wb') as f:
+        xlsx_yaz(f, 'Olcum', ['Kolon'], [[1]])
+    is_kaydi = ArkaPlanIsi.objects.create(tur='maas_raporu', olusturan=kullanici, durum='tamamlandi',
+                                          sonuc_dosyasi=dosya_adi)
+    # İşlem geçmişinde sayfanın ortasından bir imleç
+    son_log = IslemLog.objects.order_by('-tarih', '-id')[IslemLog.objects.count() // 2]
+
+    ay = {'ay': son_donem.month, 'yil': son_donem.year}
+    onceki_ay = {'ay': onceki_donem.month, 'yil': onceki_donem.year}
+    gun = bugun.isoformat()
+
+    yoklama_formu = {'kayit_tarihi': gun, 'personel_id': personel_ids}
+    for pid in personel_ids:
+        yoklama_formu.update({f'durum_{pid}': 'geldi', f'giris_saati_{pid}': '08:00', f'cikis_saati_{pid}': '17:30'})
+
+    degisen_satirlar = {'kayit_tarihi': gun, 'personel_id': personel_ids[:2]}
+    for pid in personel_ids[:2]:
+        degisen_satirlar.update({f'durum_{pid}': 'gelmedi'})
+
+    toplu_puantaj_formu = {}
+    for gun_no in range(1, 29):
+        tarih = son_donem.replace(day=gun_no).isoformat()
+        toplu_puantaj_formu.update({f'durum_{tarih}': 'geldi', f'giris_{tarih}': '08:00', f'cikis_{tarih}': '17:00'})
+
+    # Çevrimdışı kuyruktan iki işlem; id'ler her ölçümde yeni (tekrar gönderim sayılmasın)
+    senkron_partisi = {'politika': 'son_yazan', 'islemler': [
+        {'id': str(uuid.uuid4()), 'zaman': timezone.now().isoformat(), 'personel_id': pid, 'tarih': gun,
+         'durum': 'geldi', 'giris_saati': '08:00', 'cikis_saati': '17:00'}
+        for pid in personel_ids[:2]
+    ]}
+
+    def s(ad, url_adi, yontem='get', args=(), veri=None, sorgu='', beklenen=None, icerik_tipi=None):
+        yol = reverse(url_adi, args=args) + (f'?{sorgu}' if sorgu else '')
+        return {'ad': ad, 'url_adi': url_adi, 'yontem': yontem, 'yol': yol, 'veri': veri or {},
+                'beklenen': beklenen, 'icerik_tipi': icerik_tipi}
+
+    return [
+        s('admin', 'admin:index'),
+        s('login', 'login'),
+        s('ana_sayfa', 'ana_sayfa'),
+        s('personel_listesi', 'personel_listesi'),
+        s('personel_import', 'personel_import'),
+        s('download_excel_template', 'download_excel_template'),
+        s('personel_detay', 'personel_detay', args=[personel.id]),
+        s('yoklama_al', 'yoklama_al', sorgu=f'tarih={gun}'),
+        s('pdks_import', 'pdks_import'),
+        s('yoklama_cevrimdisi', 'yoklama_cevrimdisi', sorgu=f'tarih={gun}'),
+        s('yoklama_servis_calisani', 'yoklama_servis_calisani'),
+        s('yoklama_senkron', 'yoklama_senkron', 'post', veri=senkron_partisi, icerik_tipi='application/json'),
+        s('yoklama_al_toplu_kayit', 'yoklama_al', 'post', veri=yoklama_formu),
+        # Sayfa yenilemeden kayıt: sadece değişen iki satır gönderilir
+        s('yoklama_kaydet', 'yoklama_kaydet', 'post', veri=degisen_satirlar),
+        s('toplu_puantaj', 'toplu_puantaj', args=[personel.id], sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('toplu_puantaj_kayit', 'toplu_puantaj', 'post', args=[personel.id],
+          veri=toplu_puantaj_formu, sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('maas_raporu', 'maas_raporu', sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('maas_raporu_kapali_donem', 'maas_raporu', sorgu=f"ay={onceki_ay['ay']}&yil={onceki_ay['yil']}"),
+        s('maas_raporu_indir', 'maas_raporu_indir', sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('maas_gecmisi', 'maas_gecmisi', sorgu=f"baslangic={onceki_donem:%Y-%m}&bitis={son_donem:%Y-%m}"),
+        s('maas_gecmisi_personel', 'maas_gecmisi', sorgu=f"baslangic={onceki_donem:%Y-%m}&personel={personel.id}"),
+        s('maas_gecmisi_indir', 'maas_gecmisi_indir', sorgu=f"baslangic={onceki_donem:%Y-%m}&bitis={son_donem:%Y-%m}"),
+        s('maas_gecmisi_json', 'maas_gecmisi_json', sorgu=f"baslangic={onceki_donem:%Y-%m}&bitis={son_donem:%Y-%m}"),
+        s('personel_pusula', 'personel_pusula', args=[personel.id], sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('personel_pusula_kapali_donem', 'personel_pusula', args=[personel.id],
+          sorgu=f"ay={onceki_ay['ay']}&yil={onceki_ay['yil']}"),
+        s('toplu_pusula', 'toplu_pusula', sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('toplu_pusula_zip_kapali_donem', 'toplu_pusula', sorgu=f"ay={onceki_ay['ay']}&yil={onceki_ay['yil']}&bicim=zip"),
+        s('banka_odeme_dosyasi', 'banka_odeme_dosyasi', sorgu=f"ay={onceki_ay['ay']}&yil={onceki_ay['yil']}"),
+        s('giris_cikis_raporu', 'giris_cikis_raporu', sorgu=f"ay={ay['ay']}&yil={ay['yil']}&personel_id={personel.id}"),
+        s('giris_cikis_raporu_indir', 'giris_cikis_raporu_indir', sorgu=f"ay={ay['ay']}&yil={ay['yil']}"),
+        s('maas_bordrosu_olustur', 'maas_bordrosu_olustur', 'post', veri=ay),
+        s('finansal_hareket_sil', 'finansal_hareket_sil', args=[hareket.id]),
+        s('is_durumu', 'is_durumu', args=[is_kaydi.id]),
+        s('is_durumu_json', 'is_durumu_json', args=[is_kaydi.id]),
+        s('is_dosyasi_indir', 'is_dosyasi_indir', args=[is_kaydi.id]),
+        s('islem_gecmisi', 'islem_gecmisi'),
+        s('islem_gecmisi_sonraki_sayfa', 'islem_gecmisi', sorgu=f'sonra={imlec(son_log)}'),
+        s('islem_gecmisi_filtreli', 'islem_gecmisi',
+          sorgu=f'personel={personel.id}&tur=ekleme&q=TL&baslangic={onceki_donem.isoformat()}'),
+        s('islem_gecmisi_indir', 'islem_gecmisi_indir', sorgu='q=TL'),
+        s('islem_gecmisi_indir_xlsx', 'islem_gecmisi_indir', sorgu='bicim=xlsx'),
+        # Token tanımlı değilken (ölçüm ortamı) sadece yetki kontrolü ölçülür
+        s('update_server', 'update_server', 'post', beklenen=403),
+        # Oturumu kapattığı için en sonda ölçülür
+        s('logout', 'logout', 'post'),
+    ]
+
+
+def _istek(istemci, senaryo):
+    ek = {'content_type': senaryo['icerik_tipi']} if senaryo.get('icerik_tipi') else {}
+    yanit = getattr(istemci, senaryo['yontem'])(senaryo['yol'], senaryo['veri'], **ek)
+    # Akış yanıtlarında asıl iş içerik okunurken yapılır
+    if getattr(yanit, 'streaming', False):
+        for _ in yanit.streaming_content:
+            pass
+    return yanit
+
+
+def senaryolari_olc(kullanici, senaryolar, tekrar=1):
+    """
+    Her senaryoyu ölçer. Süre 'tekrar' ölçümün medyanıdır; sorgu sayısı ilk
+    ölçümden, en yüksek bellek ayrı bir tracemalloc çalıştırmasından alınır.
+    Rapor önbelleği her senaryodan önce boşaltılır: sorgu sayısı önbelleksiz
+    (en kötü) durumu, tekrarlar önbellekli durumu ölçer.
+
+    Dönüş: [{'ad', 'beklenen', 'durum_kodu', 'sorgu', 'sure_ms', 'bellek_kb'}]
+    """
+    sonuclar = []
+    for senaryo in senaryolar:
+        onbellegi_temizle()
+        istemci = Client()
+        istemci.force_login(kullanici)
+
+        sureler = []
+        sorgu = None
+        for _ in range(max(1, tekrar)):
+            with CaptureQueriesContext(connection) as sorgular:
+                t0 = time.perf_counter()
+                yanit = _istek(istemci, senaryo)
+                sureler.append((time.perf_counter() - t0) * 1000)
+            if sorgu is None:
+                sorgu = len(sorgular)
+                durum_kodu = yanit.status_code
+
+        tracemalloc.start()
+        try:
+            _istek(istemci, senaryo)
+            _, tepe = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        sonuclar.append({
+            'ad': senaryo['ad'],
+            'beklenen': senaryo['beklenen'],
+            'durum_kodu': durum_kodu,
+            'sorgu': sorgu,
+            'sure_ms': round(statistics.median(sureler), 1),
+            'bellek_kb': round(tepe / 1024),
+        })
+    return sonuclar
+
+
+def butceyi_oku(dosya=BUTCE_DOSYASI):
+    with open(dosya, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def butceyi_yaz(sonuclar, dosya=BUTCE_DOSYASI):
+    """
+    Ölçülen sorgu sayılarını bütçe olarak yazar. Birden fazla veri boyutu ölçüldüyse
+    her URL için en yüksek değer alınır (büyük toplu yazmalar SQLite'ın parametre
+    sınırı yüzünden birden fazla INSERT'e bölünür).
+    """
+    butce = {}
+    for s in sonuclar:
+        butce[s['ad']] = max(butce.get(s['ad'], 0), s['sorgu'])
+    with open(dosya, 'w', encoding='utf-8') as f:
+        json.dump(butce, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write('\n')
+    return butce
+
+
+def butce_asimlari(sonuclar, butce):
+    """
+    Bütçesini aşan, bütçesi tanımlı olmayan veya beklenmeyen HTTP durumu dönen
+    senaryolar için hata mesajları.
+    """
+    hatalar = []
+    for s in sonuclar:
+        beklenen = s.get('beklenen')
+        if (beklenen is None and s['durum_kodu'] >= 400) or (beklenen is not None and s['durum_kodu'] != beklenen):
+            hatalar.append(f"{s['ad']}: HTTP {s['durum_kodu']}")
+        sinir = butce.get(s['ad'])
+        if sinir is None:
+            hatalar.append(f"{s['ad']}: sorgu bütçesi tanımlı değil ({s['sorgu']} sorgu)")
+        elif s['sorgu'] > sinir:
+            hatalar.append(f"{s['ad']}: {s['sorgu']} sorgu (bütçe {sinir})")
+    return hatalar
+
+
+# --- SQLITE EŞZAMANLILIK ÖLÇÜMÜ ---
+
+# Ayarsız SQLite: rollback journal, Python'un 5 sn'lik varsayılan beklemesi, BEGIN DEFERRED
+VARSAYILAN_SQLITE = {'pragmalar': {'journal_mode': 'DELETE'}, 'transaction_mode': None}
+
+
+def sqlite_ayarlari():
+    """settings'teki SQLITE_PRAGMALARI ve transaction_mode."""
+    secenekler = settings.DATABASES['default'].get('OPTIONS', {})
+    return {
+        'pragmalar': getattr(settings, 'SQLITE_PRAGMALARI', {}),
+        'transaction_mode': secenekler.get('transaction_mode'),
+    }
+
+
+def _sqlite_baglantisi(yol, ayar):
+    # Django'nun sqlite3 backend'i gibi: autocommit, init_command PRAGMA'ları, BEGIN <mod>
+    baglanti = sqlite3.connect(yol, isolation_level=None, check_same_thread=False)
+    for ad, deger in ayar['pragmalar'].items():
+        baglanti.execute(f'PRAGMA {ad}={deger}')
+    return baglanti
+
+
+def _eszamanlilik_verisi(yol, personel_sayisi, gun_sayisi):
+    with closing(sqlite3.connect(yol)) as db:
+        db.execute('PRAGMA journal_mode=DELETE')
+        db.execute(
+            'CREATE TABLE puantaj (id INTEGER PRIMARY KEY, personel_id INTEGER NOT NULL, tarih TEXT NOT NULL, '
+            'durum TEXT NOT NULL, mesai REAL NOT NULL, UNIQUE (personel_id, tarih))'
+        )
+        db.execute('CREATE INDEX puantaj_tarih ON puantaj (tarih, durum)')
+        baslangic = date(2024, 1, 1)
+        db.executemany(
+            'INSERT INTO puantaj (personel_id, tarih, durum, mesai) VALUES (?, ?, ?, ?)',
+            ((p, (baslangic + timedelta(days=g)).isoformat(), 'geldi', 1.5)
+             for g in range(gun_sayisi) for p in range(1, personel_sayisi + 1)),
+        )
+        db.commit()
+
+
+def eszamanlilik_olc(yol, ayar, okuyucu=4, yazici=4, sure=5.0, personel_sayisi=200, gun_sayisi=60):
+    """
+    Aynı SQLite dosyasında eşzamanlı okuyucu ve yazıcı thread'leri çalıştırır.
+
+    Yazıcı, puantajlari_kaydet gibi bir günün yoklamasını okuyup (SELECT) aynı
+    transaction'da günceller; okuyucu aylık rapordaki GROUP BY toplamını alır.
+    Dosya yoksa personel_sayisi x gun_sayisi puantaj ile oluşturulur.
+
+    Dönüş: {'okuma', 'yazma', 'okuma_hata', 'yazma_hata', 'okuma_p95_ms', 'yazma_p95_ms'}
+    ('okuma'/'yazma' saniyedeki başarılı işlem sayısı)
+    """
+    if not os.path.exists(yol):
+        _eszamanlilik_verisi(yol, personel_sayisi, gun_sayisi)
+
+    baslangic = date(2024, 1, 1)
+    begin = f"BEGIN {ayar['transaction_mode']}" if ayar['transaction_mode'] else 'BEGIN'
+    sonuclar = {'okuma': [], 'yazma': [], 'okuma_hata': 0, 'yazma_hata': 0}
+    kilit = threading.Lock()
+    bitis = time.perf_counter() + sure
+
+    def oku(baglanti, rastgele):
+        ay = baslangic + timedelta(days=rastgele.randrange(gun_sayisi))
+        ilk = ay.replace(day=1).isoformat()
+        baglanti.execute(
+            "SELECT personel_id, SUM(durum = 'geldi'), SUM(mesai) FROM puantaj "
+            "WHERE tarih >= ? AND tarih < date(?, '+1 month') GROUP BY personel_id", (ilk, ilk)
+        ).fetchall()
+
+    def yaz(baglanti, rastgele):
+        gun = (baslangic + timedelta(days=rastgele.randrange(gun_sayisi))).isoformat()
+        baglanti.execute(begin)
+        try:
+            mevcut = baglanti.execute(
+                'SELECT id FROM puantaj WHERE tarih = ? LIMIT 50', (gun,)
+            ).fetchall()
+            baglanti.executemany(
+                'UPDATE puantaj SET mesai = ? WHERE id = ?',
+                [(rastgele.choice((0, 1.5, 2.5)), i) for (i,) in mevcut],
+            )
+            baglanti.execute('COMMIT')
+        except Exception:
+            if baglanti.in_transaction:
+                baglanti.execute('ROLLBACK')
+            raise
+
+    def calistir(islem, anahtar, tohum):
+        rastgele = random.Random(tohum)
+        baglanti = _sqlite_baglantisi(yol, ayar)
+        sureler, hata = [], 0
+        try:
+            while time.perf_counter() < bitis:
+                t0 = time.perf_counter()
+                try:
+                    islem(baglanti, rastgele)
+                except sqlite3.OperationalError:
+                    # "database is locked"
+                    hata += 1
+                else:
+                    sureler.append((time.perf_counter() - t0) * 1000)
+        finally:
+            baglanti.close()
+        with kilit:
+            sonuclar[anahtar].extend(sureler)
+            sonuclar[f'{anahtar}_hata'] += hata
+
+    threadler = (
+        [threading.Thread(target=calistir, args=(oku, 'okuma', i)) for i in range(okuyucu)]
+        + [threading.Thread(target=calistir, args=(yaz, 'yazma', 1000 + i)) for i in range(yazici)]
+    )
+    t0 = time.perf_counter()
+    for t in threadler:
+        t.start()
+    for t in threadler:
+        t.join()
+    gecen = time.perf_counter() - t0
+
+    def p95(sureler):
+        return round(statistics.quantiles(sureler, n=20)[-1], 1) if len(sureler) > 1 else None
+
+    return {
+        'okuma': round(len(sonuclar['okuma']) / gecen, 1),
+        'yazma': round(len(sonuclar['yazma']) / gecen, 1),
+        'okuma_hata': sonuclar['okuma_hata'],
+        'yazma_hata': sonuclar['yazma_hata'],
+        'okuma_p95_ms': p95(sonuclar['okuma']),
+        'yazma_p95_ms': p95(sonuclar['yazma']),
+    }
@@ -0,0 +1,138 @@
+"""
+Maaş hesap pusulaları (tekli ve toplu).
+
+pusulalari_hesapla() dönemin bütün pusulalarını personel sayısından bağımsız,
+sabit sayıda sorguyla üretir:
+  - maaş satırları: donem_hesapla (bordro varsa bordrodan, yoksa AylikOzet'ten)
+  - taksit detayları: taksit_kesintileri (tek sorgu; canlı hesaba da buradan verilir)
+  - prim / kesinti detayları: dönemin FinansalHareket'leri tek sorguda, personele göre gruplanır
+
+Toplu çıktı iki biçimde, pusula pusula üretilerek akıtılır (bellekte bütün
+belge tutulmaz):
+  - html: tarayıcıdan yazdırılabilen (veya PDF olarak kaydedilebilen) tek belge,
+          her pusula ayrı sayfada
+  - zip : personel başına bir HTML dosyası
+Büyük kadrolarda (TOPLU_PUSULA_SENKRON_SINIR) belge worker'da dosyaya yazılır
+(core/isler.py: 'toplu_pusula'); karar pusula_sayisi() ile, hesaplamadan önce verilir.
+"""
+import calendar
+from collections import defaultdict
+
+from django.template.loader import render_to_string
+from django.utils.text import slugify
+
+from .bordro import donem_hesapla, taksit_kesintileri
+from .disa_aktar import zip_parcalari
+from .donem import donem_filtresi
+from .models import FinansalHareket, MaasBordrosu, Personel
+
+BICIMLER = ('html', 'zip')
+ZIP_CONTENT_TYPE = 'application/zip'
+HTML_CONTENT_TYPE = 'text/html; charset=utf-8'
+
+_BELGE_SONU = '</div>\n</body>\n</html>\n'
+
+
+def _hareketler(yil, ay, personel_ids):
+    qs = FinansalHareket.objects.filter(donem_filtresi(yil, ay))
+    if personel_ids is not None:
+        qs = qs.filter(personel_id__in=list(personel_ids))
+    gruplar = defaultdict(lambda: ([], []))
+    for hareket in qs.order_by('personel_id', 'tarih', 'id'):
+        primler, kesintiler = gruplar[hareket.personel_id]
+        (primler if hareket.islem_tipi == 'prim' else kesintiler).append(hareket)
+    return gruplar
+
+
+def pusula_sayisi(yil, ay):
+    """pusulalari_hesapla(yil, ay)'ın üreteceği pusula sayısı; pusula hesaplamadan, sayım sorgusuyla."""
+    bordro_sayisi = MaasBordrosu.objects.filter(donem_filtresi(yil, ay, 'donem')).count()
+    return bordro_sayisi or Personel.objects.filter(aktif_mi=True).count()
+
+
+def pusulalari_hesapla(yil, ay, personel_ids=None):
+    """
+    Dönemin pusula verileri (personel_pusula.html bağlamı), ad-soyad sırasıyla.
+    personel_ids verilmezse dönemin bordrosu olan (kapalı dönem) veya aktif
+    (taslak dönem) bütün personel.
+    """
+    kesintiler = taksit_kesintileri(yil, ay, personel_ids)
+    taksitler = defaultdict(list)
+    taksit_toplamlari = defaultdict(float)
+    for avans in kesintiler:
+        taksitler[avans['personel_id']].append(avans)
+        taksit_toplamlari[avans['personel_id']] += float(avans['kesinti'])
+
+    bordro_var_mi, satirlar = donem_hesapla(yil, ay, personel_ids, taksitler=taksit_toplamlari)
+    hareketler = _hareketler(yil, ay, personel_ids)
+
+    pusulalar = []
+    for satir in satirlar:
+        p = satir['personel']
+        primler, diger = hareketler.get(p.id, ([], []))
+        pusulalar.append({
+            'personel': p,
+            'ay': ay,
+            'yil': yil,
+            'ay_adi': calendar.month_name[ay],
+            'calistigi_gun': satir['calistigi_gun'],
+            'gelmedigi_gun': satir['gelmedigi_gun'],
+            'ana_hakedis': satir['ana_hakedis'],
+            'toplam_mesai': satir['toplam_mesai'],
+            'mesai_ucreti': satir['mesai_ucreti'],
+            'primler_listesi': primler,
+            'toplam_prim': satir['toplam_prim'],
+            'kesintiler_listesi': diger,
+            'taksitler': taksitler.get(p.id, []),
+            # Kesinleşmiş bordroda taksit zaten toplam kesintiye dahil
+            'taksit_kesintisi': 0 if bordro_var_mi else satir['taksit_kesintisi'],
+            'toplam_kesinti': satir['toplam_kesinti'],
+            'net_maas': satir['net_maas'],
+        })
+    return sorted(pusulalar, key=lambda s: (s['personel'].ad, s['personel'].soyad, s['personel'].id))
+
+
+def _belge_basi(yil, ay, baslik):
+    return render_to_string('core/toplu_pusula.html', {'yil': yil, 'ay': ay, 'baslik': baslik})
+
+
+def _pusula_html(pusula):
+    return render_to_string('core/pusula_karti.html', pusula)
+
+
+def toplu_pusula_parcalari(yil, ay, pusulalar, parca_pusula=50):
+    """Bütün pusulaları tek HTML belge olarak, parca_pusula pusulalık metin parçalarıyla üretir."""
+    parca = [_belge_basi(yil, ay, f'{ay}/{yil} Maaş Pusulaları ({len(pusulalar)} personel)')]
+    for sira, pusula in enumerate(pusulalar, start=1):
+        parca.append(f'<section class="pusula-sayfa">{_pusula_html(pusula)}</section>\n')
+        if sira % parca_pusula == 0:
+            yield ''.join(parca)
+            parca = []
+    parca.append(_BELGE_SONU)
+    yield ''.join(parca)
+
+
+def pusula_dosya_adi(pusula):
+    p = pusula['personel']
+    return f"Pusula_{pusula['ay']}_{pusula['yil']}_{slugify(f'{p.ad} {p.soyad}') or 'personel'}_{p.id}.html"
+
+
+def pusula_zip_parcalari(yil, ay, pusulalar):
+    """Personel başına bir HTML dosyası içeren ZIP'i bayt parçaları halinde üretir."""
+    def dosyalar():
+        for pusula in pusulalar:
+            p = pusula['personel']
+            belge = _belge_basi(yil, ay, f'{p.ad} {p.soyad} - {ay}/{yil}') + _pusula_html(pusula) + _BELGE_SONU
+            yield pusula_dosya_adi(pusula), belge.encode()
+
+    return zip_parcalari(dosyalar())
+
+
+def toplu_pusula_yaz(dosya, yil, ay, pusulalar, bicim):
+    """Toplu pusulayı dosya benzeri nesneye (ikili) yazar."""
+    if bicim == 'zip':
+        for parca in pusula_zip_parcalari(yil, ay, pusulalar):
+            dosya.write(parca)
+    else:
+        for parca in toplu_pusula_parcalari(yil, ay, pusulalar):
+            dosya.write(parca.encode())
@@ -0,0 +1,37 @@
+"""
+Veritabanı yönlendirici: arşiv modelleri (ArsivPuantaj, ArsivIslemLog)
+DATABASES['arsiv']'de okunur, yazılır ve migrate edilir; diğer her şey
+varsayılan yönlendirmeyle çalışır. Arşiv veritabanına başka tablo kurulmaz.
+"""
+ARSIV_DB = 'arsiv'
+ARSIV_MODELLERI = {'arsivpuantaj', 'arsivislemlog'}
+
+
+def arsiv_modeli_mi(app_label, model_name):
+    return app_label == 'core' and model_name in ARSIV_MODELLERI
+
+
+class ArsivRouter:
+    def db_for_read(self, model, **hints):
+        if arsiv_modeli_mi(model._meta.app_label, model._meta.model_name):
+            return ARSIV_DB
+        # Arşiv kaydının personeli/kullanıcısı asıl veritabanındadır
+        ornek = hints.get('instance')
+        if ornek is not None and arsiv_modeli_mi(ornek._meta.app_label, ornek._meta.model_name):
+            return 'default'
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if any(arsiv_modeli_mi(o._meta.app_label, o._meta.model_name) for o in (obj1, obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # model_name'siz işlemler (RunPython/RunSQL) arşivde çalışmaz
+        if db == ARSIV_DB:
+            return arsiv_modeli_mi(app_label, model_name)
+        if arsiv_modeli_mi(app_label, model_name):
+            return False
+        return None
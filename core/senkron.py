@@ -0,0 +1,188 @@
+"""
+Çevrimdışı yoklama senkronu.
+
+Bağlantının koptuğu yerde yoklama ekranı (yoklama_cevrimdisi) değişiklikleri
+tarayıcıda kuyruğa alır ve bağlantı gelince toplu gönderir. Her işlem
+istemcinin ürettiği bir id (UUID) ve değişikliğin yapıldığı zamanı taşır:
+
+    {'id', 'zaman', 'personel_id', 'tarih', 'durum', 'giris_saati', 'cikis_saati', 'beklenen'}
+
+islemleri_uygula() partiyi işlem sayısından bağımsız birkaç sorguyla değerlendirir
+ve uygulanacakları puantajlari_kaydet() ile tek transaction'da yazar:
+  - Daha önce alınmış id tekrar uygulanmaz; kayıtlı sonucu döner ('tekrar': True).
+    Aynı id'yi eşzamanlı iki istek getirirse geç kalanın partisi geri alınıp
+    yeniden değerlendirilir; o işlem de böyle döner.
+  - Aynı (personel, tarih) için daha yeni zamanlı bir işlem uygulanmışsa işlem
+    'eski' sayılır (son yazan kazanır). Gelecekteki zamanlar sunucu saatine çekilir.
+  - politika='reddet' ise ayrıca 'beklenen' (istemcinin gördüğü durum, kayıt yoksa
+    '') sunucudaki durumla aynı değilse işlem 'cakisma' ile reddedilir. Yoklama
+    formundan yapılan kayıtların zamanı tutulmadığından onları ezmemek için bu
+    politika kullanılır.
+  - Geçersiz veri, bilinmeyen personel ve arşivlenmiş dönem 'hata' döner ve
+    kaydedilmez (tekrar gönderilse de aynı sonucu verir).
+"""
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .arsiv import arsivlenmis_donemler
+from .models import Personel, Puantaj, YoklamaSenkronu
+from .yoklama import puantajlari_kaydet, yoklama_satiri
+
+POLITIKALAR = ('son_yazan', 'reddet')
+AZAMI_ISLEM = 500
+
+
+def _islemi_coz(islem, simdi):
+    """Ham işlemden (id, zaman, kayıt sözlüğü) üretir; hatalı veride ValueError."""
+    try:
+        islem_id = uuid.UUID(str(islem.get('id')))
+    except ValueError:
+        raise ValueError("İşlem numarası geçersiz.")
+    zaman = parse_datetime(str(islem.get('zaman') or ''))
+    if zaman is None:
+        raise ValueError("İşlem zamanı geçersiz.")
+    if timezone.is_naive(zaman):
+        zaman = timezone.make_aware(zaman)
+    try:
+        tarih = datetime.strptime(str(islem.get('tarih') or ''), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("Tarih geçersiz.")
+    if not str(islem.get('personel_id') or '').isdigit():
+        raise ValueError("Personel geçersiz.")
+    kayit = yoklama_satiri(islem['personel_id'], tarih, islem.get('durum'),
+                           islem.get('giris_saati'), islem.get('cikis_saati'))
+    # İleri kurulmuş bir cihaz saati sonraki tüm değişiklikleri ezmesin
+    return islem_id, min(zaman, simdi), kayit
+
+
+def islemleri_uygula(islemler, kullanici=None, politika='son_yazan'):
+    """
+    Senkron partisini uygular. Dönüş: işlem sırasıyla
+    [{'id', 'sonuc': 'uygulandi' | 'eski' | 'cakisma' | 'hata', 'mesaj'?, 'tekrar'?, 'sunucu'?}]
+    ('sunucu': çakışmada sunucudaki güncel durum).
+    """
+    if politika not in POLITIKALAR:
+        raise ValueError(f"Geçersiz politika: {politika}")
+    if len(islemler) > AZAMI_ISLEM:
+        raise ValueError(f"Bir istekte en fazla {AZAMI_ISLEM} işlem gönderilebilir.")
+
+    simdi = timezone.now()
+    sonuclar = [None] * len(islemler)
+    adaylar = []  # (sira, islem_id, zaman, kayit, beklenen)
+    for sira, islem in enumerate(islemler):
+        try:
+            adaylar.append((sira, *_islemi_coz(islem, simdi), str(islem.get('beklenen') or '')))
+        except (ValueError, TypeError, AttributeError) as e:
+            kimlik = islem.get('id') if isinstance(islem, dict) else None
+            sonuclar[sira] = {'id': kimlik, 'sonuc': 'hata', 'mesaj': str(e) or "İşlem okunamadı."}
+
+    if adaylar:
+        try:
+            _adaylari_uygula(adaylar, sonuclar, kullanici, politika)
+        except IntegrityError:
+            # Aynı işlemi eşzamanlı bir istek (ör. istemcinin yeniden denemesi) bizden önce kaydetti.
+            # Bu partinin yazdıkları geri alındı; yeniden değerlendirmede o işlemler 'tekrar' döner.
+            _adaylari_uygula(adaylar, sonuclar, kullanici, politika)
+    return sonuclar
+
+
+def _alinmis_islemler(islem_ids):
+    """Daha önce alınmış işlemlerin kayıtlı sonuçları: {islem_id: sonuc}"""
+    return dict(YoklamaSenkronu.objects.filter(islem_id__in=islem_ids).values_list('islem_id', 'sonuc'))
+
+
+def _adaylari_uygula(adaylar, sonuclar, kullanici, politika):
+    def sonuc(sira, islem_id, durum, **ek):
+        sonuclar[sira] = {'id': str(islem_id), 'sonuc': durum, **ek}
+
+    # 1) Daha önce alınmış işlemler
+    alinmis = _alinmis_islemler([a[1] for a in adaylar])
+    gorulen = set()
+    yeniler = []
+    for aday in adaylar:
+        sira, islem_id = aday[0], aday[1]
+        if islem_id in alinmis:
+            sonuc(sira, islem_id, alinmis[islem_id], tekrar=True)
+        elif islem_id in gorulen:
+            sonuc(sira, islem_id, 'hata', mesaj="Aynı işlem partide birden fazla kez var.")
+        else:
+            gorulen.add(islem_id)
+            yeniler.append(aday)
+    if not yeniler:
+        return
+
+    # 2) Bilinmeyen personel ve arşivlenmiş dönemler
+    personel_ids = {a[3]['personel_id'] for a in yeniler}
+    tarihler = {a[3]['tarih'] for a in yeniler}
+    mevcut_personel = set(Personel.objects.filter(id__in=personel_ids).values_list('id', flat=True))
+    arsivde = arsivlenmis_donemler(min(tarihler), max(tarihler))
+    gecerliler = []
+    for aday in yeniler:
+        sira, islem_id, _, kayit, _ = aday
+        if kayit['personel_id'] not in mevcut_personel:
+            sonuc(sira, islem_id, 'hata', mesaj=f"Personel bulunamadı ({kayit['personel_id']})")
+        elif kayit['tarih'].replace(day=1) in arsivde:
+            sonuc(sira, islem_id, 'hata', mesaj=f"{kayit['tarih']:%m.%Y} dönemi arşivlendiği için yoklama değiştirilemez.")
+        else:
+            gecerliler.append(aday)
+    if not gecerliler:
+        return
+
+    with transaction.atomic():
+        # 3) Anahtar başına sunucudaki son senkron zamanı ve güncel durum (süperset sorgular, filtre Python'da)
+        personel_ids = {a[3]['personel_id'] for a in gecerliler}
+        tarihler = {a[3]['tarih'] for a in gecerliler}
+        son_zamanlar = {
+            (s['personel_id'], s['tarih']): s['son']
+            for s in YoklamaSenkronu.objects.filter(
+                personel_id__in=personel_ids, tarih__in=tarihler, sonuc='uygulandi'
+            ).values('personel_id', 'tarih').annotate(son=Max('istemci_zamani')).order_by()
+        }
+        durumlar = {
+            (personel_id, tarih): durum
+            for personel_id, tarih, durum in Puantaj.objects.select_for_update().filter(
+                personel_id__in=personel_ids, tarih__in=tarihler
+            ).values_list('personel_id', 'tarih', 'durum')
+        }
+
+        # 4) Anahtar başına zaman sırasıyla: eskiyi ve (reddet) çakışanı ayıkla
+        kayitlar = []
+        gunluk = []
+        for sira, islem_id, zaman, kayit, beklenen in sorted(gecerliler, key=lambda a: a[2]):
+            anahtar = (kayit['personel_id'], kayit['tarih'])
+            son = son_zamanlar.get(anahtar)
+            if son is not None and zaman < son:
+                karar = 'eski'
+            elif politika == 'reddet' and beklenen != durumlar.get(anahtar, ''):
+                karar = 'cakisma'
+            else:
+                karar = 'uygulandi'
+                son_zamanlar[anahtar] = zaman
+                durumlar[anahtar] = kayit['durum']
+                kayitlar.append(kayit)
+
+            if karar == 'cakisma':
+                sonuc(sira, islem_id, karar, sunucu=durumlar.get(anahtar, ''))
+            else:
+                sonuc(sira, islem_id, karar)
+            gunluk.append(YoklamaSenkronu(
+                islem_id=islem_id, kullanici=kullanici, personel_id=kayit['personel_id'], tarih=kayit['tarih'],
+                durum=kayit['durum'], istemci_zamani=zaman, sonuc=karar,
+            ))
+
+        # Aynı anahtarda birden fazla kabul edilen işlem varsa en yenisi yazılır
+        puantajlari_kaydet(kayitlar)
+        YoklamaSenkronu.objects.bulk_create(gunluk, batch_size=500)
+
+
+def senkron_kayitlarini_temizle(gun=None):
+    """gun (varsayılan SENKRON_KAYIT_GUN) günden eski senkron kayıtlarını siler. Dönüş: silinen sayı."""
+    sinir = timezone.now() - timedelta(days=settings.SENKRON_KAYIT_GUN if gun is None else gun)
+    silinen, _ = YoklamaSenkronu.objects.filter(alinma_tarihi__lt=sinir).delete()
+    return silinen
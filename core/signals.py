@@ -0,0 +1,76 @@
+"""
+Aylık özet tablosunu ve maaş raporu önbelleğini güncel tutan sinyaller.
+
+Puantaj ve FinansalHareket tek tek kaydedildiğinde/silindiğinde (formlar, admin,
+finansal_hareket_sil) etkilenen (personel, ay) özeti yeniden hesaplanır.
+Toplu yazma yolları (bulk_create / update) sinyal üretmez; onlar
+core.ozet.ozetleri_yenile'yi doğrudan çağırır. core.ozet.ozet_sinyalleri_kapali()
+bloğu içinde (arşivleme) özet yenilenmez.
+
+Personel, TaksitliAvans ve MaasBordrosu değişiklikleri ilgili önbellek sürümünü
+artırır (core/onbellek.py); Puantaj/FinansalHareket için bunu ozetleri_yenile yapar.
+"""
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Personel, Puantaj, FinansalHareket, TaksitliAvans, MaasBordrosu
+from .onbellek import donem_raporlarini_gecersiz_kil, personel_raporlarini_gecersiz_kil, taslak_raporlari_gecersiz_kil
+from .ozet import ozet_donemi, ozet_sinyalleri_kapali_mi, ozetleri_yenile
+
+
+def _ozet_anahtari(instance):
+    # __dict__ üzerinden okunur: ertelenmiş (defer) alanlar için sorgu atılmasın
+    personel_id = instance.__dict__.get('personel_id')
+    tarih = instance.__dict__.get('tarih')
+    if personel_id is None or tarih is None or isinstance(tarih, str):
+        return None
+    return personel_id, ozet_donemi(tarih)
+
+
+@receiver(post_init, sender=Puantaj)
+@receiver(post_init, sender=FinansalHareket)
+def ilk_anahtari_sakla(sender, instance, **kwargs):
+    # Kayıt başka bir aya/personele taşınırsa eski özet de yenilenmeli
+    instance._ilk_ozet_anahtari = _ozet_anahtari(instance)
+
+
+@receiver(post_save, sender=Puantaj)
+@receiver(post_save, sender=FinansalHareket)
+def kayit_sonrasi_ozeti_yenile(sender, instance, **kwargs):
+    if ozet_sinyalleri_kapali_mi():
+        return
+    anahtarlar = {_ozet_anahtari(instance), getattr(instance, '_ilk_ozet_anahtari', None)} - {None}
+    ozetleri_yenile(anahtarlar)
+    instance._ilk_ozet_anahtari = _ozet_anahtari(instance)
+
+
+@receiver(post_delete, sender=Puantaj)
+@receiver(post_delete, sender=FinansalHareket)
+def silme_sonrasi_ozeti_yenile(sender, instance, origin=None, **kwargs):
+    # Personel silinirken kayıtlar CASCADE ile gider; özeti de CASCADE ile silinir
+    if isinstance(origin, Personel) or getattr(origin, 'model', None) is Personel:
+        return
+    if ozet_sinyalleri_kapali_mi():
+        return
+    anahtar = _ozet_anahtari(instance)
+    if anahtar:
+        ozetleri_yenile({anahtar})
+
+
+@receiver(post_save, sender=Personel)
+@receiver(post_delete, sender=Personel)
+def personel_degisince_raporlari_gecersiz_kil(sender, instance, **kwargs):
+    personel_raporlarini_gecersiz_kil()
+
+
+@receiver(post_save, sender=TaksitliAvans)
+@receiver(post_delete, sender=TaksitliAvans)
+def taksit_degisince_raporlari_gecersiz_kil(sender, instance, **kwargs):
+    # Açık taksitler tüm taslak dönemlerin kesintisine girer
+    taslak_raporlari_gecersiz_kil()
+
+
+@receiver(post_save, sender=MaasBordrosu)
+@receiver(post_delete, sender=MaasBordrosu)
+def bordro_degisince_raporlari_gecersiz_kil(sender, instance, **kwargs):
+    donem_raporlarini_gecersiz_kil([instance.donem])
@@ -0,0 +1,157 @@
+"""
+SQLite veritabanındaki verinin başka bir veritabanına (PostgreSQL) taşınması.
+
+Hedef veritabanı önce 'python manage.py migrate' ile hazırlanır; ardından
+kullanıcılar, gruplar ve core uygulamasının tüm tabloları birincil anahtarlarıyla
+birlikte, yabancı anahtar sırasına göre parça parça kopyalanır. Kullanıcı ve grup
+izinleri de kopyalanır; Permission id'lerini hedefte migrate yeniden ürettiğinden
+izinler doğal anahtarla (app_label, codename) eşlenir, hedefte karşılığı olmayan
+izin varsa taşıma başlamadan hata verilir. Her parça tek bir
+çok satırlı INSERT olarak yazılır; kaynak tablo hiçbir zaman bütün olarak belleğe
+alınmaz. Sonunda hedefteki id dizileri (sequence) en büyük id'ye ayarlanır.
+
+Komut: 'python manage.py migrate_sqlite_to_postgres'.
+"""
+from django.apps import apps
+from django.contrib.auth.models import Group, Permission, User
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.utils import load_backend
+
+KAYNAK_ALIAS = 'sqlite_kaynak'
+# permission_id'si kaynak -> hedef izin eşlemesiyle çevrilerek kopyalanan tablolar
+IZIN_TABLOLARI = (User.user_permissions.through, Group.permissions.through)
+
+
+def sqlite_kaynagi_ekle(yol, alias=KAYNAK_ALIAS):
+    """
+    SQLite dosyasını geçici bir veritabanı bağlantısı olarak tanımlar
+    (settings.DATABASES'e eklenmez, sadece bu thread'de geçerlidir).
+    """
+    ayarlar = {
+        **connections['default'].settings_dict,
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(yol),
+        'OPTIONS': {},
+        'CONN_MAX_AGE': 0,
+    }
+    connections[alias] = load_backend(ayarlar['ENGINE']).DatabaseWrapper(ayarlar, alias)
+    return alias
+
+
+def sqlite_kaynagini_kaldir(alias=KAYNAK_ALIAS):
+    connections[alias].close()
+    del connections[alias]
+
+
+def tasinacak_modeller(hedef='default'):
+    """
+    Kullanıcı/grup tabloları ve core modelleri, bağımlılık sırasına göre.
+    Hedef veritabanında tablosu olmayan modeller (ör. arşiv modelleri) atlanır.
+    """
+    modeller = [
+        m for m in (Group, User, User.groups.through, *apps.get_app_config('core').get_models())
+        if router.allow_migrate_model(hedef, m)
+    ]
+
+    sirali, kalan = [], list(modeller)
+    while kalan:
+        for model in kalan:
+            bagimliliklar = {
+                alan.related_model for alan in model._meta.concrete_fields
+                if alan.is_relation and alan.related_model in modeller and alan.related_model is not model
+            }
+            if bagimliliklar <= set(sirali):
+                sirali.append(model)
+                kalan.remove(model)
+                break
+        else:
+            raise ValueError(f'Modeller arasında döngüsel bağımlılık: {kalan}')
+    return sirali
+
+
+def izin_eslemesi(kaynak, hedef):
+    """
+    Kullanıcı/gruplara verilmiş kaynak izinlerinin {kaynak_id: hedef_id} eşlemesi
+    (content_type.app_label, codename ile). Hedefte karşılığı olmayan izin varsa ValueError.
+    """
+    kullanilan = set()
+    for model in IZIN_TABLOLARI:
+        kullanilan.update(model._base_manager.using(kaynak).values_list('permission_id', flat=True).distinct())
+    if not kullanilan:
+        return {}
+
+    hedef_idleri = {
+        (app_label, codename): pk
+        for pk, app_label, codename in Permission.objects.using(hedef).values_list(
+            'pk', 'content_type__app_label', 'codename')
+    }
+    eslesme, eksik = {}, []
+    for pk, app_label, codename in Permission.objects.using(kaynak).filter(pk__in=kullanilan).values_list(
+            'pk', 'content_type__app_label', 'codename'):
+        if (app_label, codename) in hedef_idleri:
+            eslesme[pk] = hedef_idleri[(app_label, codename)]
+        else:
+            eksik.append(f'{app_label}.{codename}')
+    if eksik:
+        raise ValueError(f"Hedefte bulunmayan izinler (önce migrate çalıştırın): {', '.join(sorted(eksik))}")
+    return eslesme
+
+
+def tabloyu_kopyala(model, kaynak, hedef, parca=2000, donustur=None):
+    """
+    Tabloyu birincil anahtar sırasıyla parça parça kopyalar; kopyalanan satır sayısını döner.
+    donustur verilirse her satır yazılmadan önce onunla değiştirilir.
+    """
+    toplam, son_pk = 0, None
+    qs = model._base_manager.using(kaynak).order_by('pk')
+    while True:
+        satirlar = list((qs.filter(pk__gt=son_pk) if son_pk is not None else qs)[:parca])
+        if not satirlar:
+            return toplam
+        if donustur:
+            for satir in satirlar:
+                donustur(satir)
+        model._base_manager.using(hedef).bulk_create(satirlar, batch_size=parca)
+        toplam += len(satirlar)
+        son_pk = satirlar[-1].pk
+
+
+def veritabani_tasi(kaynak, hedef='default', parca=2000, ilerleme=None):
+    """
+    Taşınacak tüm modelleri ve izin tablolarını kaynaktan hedefe tek bir transaction
+    içinde kopyalar. Hedefte bu tablolardan herhangi birinde veri varsa veya kaynaktaki
+    bir izinin hedefte karşılığı yoksa ValueError verir.
+
+    Dönüş: {'app_label.Model': satir_sayisi}
+    """
+    modeller = tasinacak_modeller(hedef)
+    izin_tablolari = [m for m in IZIN_TABLOLARI if router.allow_migrate_model(hedef, m)]
+    dolu = [m._meta.label for m in modeller + izin_tablolari if m._base_manager.using(hedef).exists()]
+    if dolu:
+        raise ValueError(f"Hedef veritabanı boş değil: {', '.join(dolu)}")
+    eslesme = izin_eslemesi(kaynak, hedef)
+
+    def izni_esle(satir):
+        satir.permission_id = eslesme[satir.permission_id]
+
+    sonuc = {}
+    with transaction.atomic(using=hedef):
+        for model in modeller:
+            sonuc[model._meta.label] = tabloyu_kopyala(model, kaynak, hedef, parca)
+            if ilerleme:
+                ilerleme(model._meta.label, sonuc[model._meta.label])
+        # Kullanıcı ve gruplardan sonra; Permission kopyalanmaz, hedefteki id'ye çevrilir
+        for model in izin_tablolari:
+            sonuc[model._meta.label] = tabloyu_kopyala(model, kaynak, hedef, parca, donustur=izni_esle)
+            if ilerleme:
+                ilerleme(model._meta.label, sonuc[model._meta.label])
+
+        # Açık id verilerek eklenen satırlardan sonra sequence'lar geride kalır
+        hedef_baglanti = connections[hedef]
+        sql_listesi = hedef_baglanti.ops.sequence_reset_sql(no_style(), modeller + izin_tablolari)
+        if sql_listesi:
+            with hedef_baglanti.cursor() as cursor:
+                for sql in sql_listesi:
+                    cursor.execute(sql)
+    return sonuc
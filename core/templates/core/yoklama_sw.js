@@ -0,0 +1,54 @@
+{% load static %}/* Çevrimdışı yoklama servis çalışanı (core/views.py: yoklama_servis_calisani).
+   Sayfa ağdan alınamazsa önbellekteki son kopyası, statik dosyalar önbellekten sunulur.
+   Yoklama değişiklikleri burada değil, sayfada (localStorage) kuyruğa alınır. */
+
+const ONBELLEK = 'avlu-yoklama-v1';
+const SAYFA = "{% url 'yoklama_cevrimdisi' %}";
+const STATIKLER = [
+    "{% static 'js/csrf.js' %}",
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+];
+
+self.addEventListener('install', event => {
+    // Biri indirilemese de (ör. CDN) kurulum sürsün
+    event.waitUntil(caches.open(ONBELLEK).then(onbellek =>
+        Promise.all([SAYFA, ...STATIKLER].map(adres => onbellek.add(adres).catch(() => null)))
+    ));
+    self.skipWaiting();
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys().then(adlar =>
+        Promise.all(adlar.filter(ad => ad !== ONBELLEK).map(ad => caches.delete(ad)))
+    ).then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const istek = event.request;
+    if (istek.method !== 'GET') {
+        return;
+    }
+    const adres = new URL(istek.url);
+
+    // Yoklama sayfası: önce ağ (güncel kayıtlar), olmazsa aynı tarihin ya da son açılan sayfanın kopyası
+    if (istek.mode === 'navigate' && adres.pathname === SAYFA) {
+        event.respondWith(
+            fetch(istek).then(yanit => {
+                if (yanit.ok && !yanit.redirected) {
+                    const kopya = yanit.clone();
+                    caches.open(ONBELLEK).then(onbellek => {
+                        onbellek.put(istek, kopya.clone());
+                        onbellek.put(SAYFA, kopya);
+                    });
+                }
+                return yanit;
+            }).catch(() => caches.match(istek).then(bulunan => bulunan || caches.match(SAYFA)))
+        );
+        return;
+    }
+
+    if (STATIKLER.includes(istek.url) || STATIKLER.includes(adres.pathname)) {
+        event.respondWith(caches.match(istek).then(bulunan => bulunan || fetch(istek)));
+    }
+});
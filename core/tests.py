@@ -1,3 +1,1281 @@
-from django.test import TestCase
+from contextlib import closing
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import gzip
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+import zipfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core import mail
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from unittest import mock, skipUnless
+from openpyxl import Workbook, load_workbook
+
+from .banka import iban_hatasi
+from .arsiv import arsivi_temizle, donem_puantajlari, donemi_arsivle, donemi_geri_al, loglari_arsivle
+from .bordro import canli_hesapla, donem_hesapla, donemi_kapat, donemler_hesapla, taksit_toplamlari, yillik_toplamlar
+from .denetim import DenetimKuyrugu, denetim_kaydi, tasmayi_yukle
+from .denetim_arama import FTS_TABLOSU, imlec, islem_gecmisi_sorgusu, sayfa_getir
+from .disa_aktar import xlsx_parcalari
+from .donem import donem_araligi, donem_filtresi
+from .ice_aktar import personel_ice_aktar
+from .isler import is_kuyruga_ekle, siradaki_isi_al, yarim_kalan_isleri_kurtar
+from .ozet import ozetleri_dogrula, ozetleri_yenile
+from .pdks import pdks_ice_aktar
+from .pusula import pusula_dosya_adi, pusulalari_hesapla
+from .senkron import _alinmis_islemler
+from .performans import (
+    ornek_veri_olustur, olcum_kullanicisi, url_senaryolari, senaryolari_olc, butceyi_oku, butce_asimlari,
+    eszamanlilik_olc, sqlite_ayarlari, OLCUM_RAPOR_ONBELLEGI,
+)
+from .mesai import mesai_hesapla, mesai_hesapla_vektorel, saat_saniye
+from .models import (Personel, Puantaj, FinansalHareket, TaksitliAvans, MaasBordrosu, ArkaPlanIsi, AylikOzet, IslemLog,
+                     ArsivDonemi, ArsivIslemLog, ArsivPuantaj, TaksitOdemesi, YoklamaSenkronu)
+from .yoklama import yoklama_satiri, puantajlari_kaydet
+from .onbellek import onbellegi_temizle, sayaclar
+from .tasima import sqlite_kaynagi_ekle, sqlite_kaynagini_kaldir
+from .yedek import eski_yedekleri_temizle, geri_yukle, hedeflere_gonder, yedek_al
+
+
+def personel_olustur(tc_no, **kwargs):
+    alanlar = {
+        'ad': 'Test', 'soyad': tc_no, 'tc_no': tc_no, 'telefon': '5550000000',
+        'maas_tutari': Decimal('30000.00'), 'ozel_mesai_ucreti': Decimal('250.00'),
+    }
+    alanlar.update(kwargs)
+    return Personel.objects.create(**alanlar)
+
+
+class BordroMotoruTest(TestCase):
+    def setUp(self):
+        self.aylik = personel_olustur('10000000001')
+        self.gunluk = personel_olustur('10000000002', calisma_tipi='gunluk', maas_tutari=Decimal('1000.00'))
+        personel_olustur('10000000003', aktif_mi=False)
+
+        Puantaj.objects.create(personel=self.aylik, tarih=date(2025, 3, 3), durum='geldi',
+                               giris_saati=time(8, 0), cikis_saati=time(18, 0))
+        Puantaj.objects.create(personel=self.aylik, tarih=date(2025, 3, 4), durum='gelmedi')
+        Puantaj.objects.create(personel=self.gunluk, tarih=date(2025, 3, 3), durum='hafta_tatili',
+                               giris_saati=time(9, 0), cikis_saati=time(13, 0))
+        # Başka aya ait kayıt hesaba girmemeli
+        Puantaj.objects.create(personel=self.gunluk, tarih=date(2025, 4, 1), durum='geldi')
+
+        FinansalHareket.objects.create(personel=self.aylik, tarih=date(2025, 3, 5), islem_tipi='prim', tutar=Decimal('500'))
+        FinansalHareket.objects.create(personel=self.aylik, tarih=date(2025, 3, 6), islem_tipi='basit_avans', tutar=Decimal('200'))
+        TaksitliAvans.objects.create(personel=self.aylik, tarih=date(2025, 3, 1), toplam_tutar=Decimal('3000'),
+                                     taksit_sayisi=3)
+
+    def test_canli_hesap(self):
+        with self.assertNumQueries(3):
+            satirlar = {s['personel'].id: s for s in canli_hesapla(2025, 3)}
+
+        self.assertEqual(len(satirlar), 2)
+        aylik = satirlar[self.aylik.id]
+        self.assertEqual(aylik['calistigi_gun'], 1)
+        self.assertEqual(aylik['gelmedigi_gun'], 1)
+        self.assertEqual(aylik['toplam_mesai'], 2.0)
+        self.assertAlmostEqual(aylik['ana_hakedis'], 29000.0)
+        self.assertAlmostEqual(aylik['toplam_kesinti'], 1200.0)
+        self.assertAlmostEqual(aylik['net_maas'], 29000 + 500 + 500 - 1200)
+
+        gunluk = satirlar[self.gunluk.id]
+        self.assertEqual(gunluk['toplam_mesai'], 4.0)
+        self.assertAlmostEqual(gunluk['net_maas'], 1000 + 1000)
+
+    def test_kayitli_bordro_oncelikli(self):
+        MaasBordrosu.objects.create(personel=self.aylik, donem=date(2025, 3, 1), brut_maas=Decimal('30000'),
+                                    net_odenecek=Decimal('123.45'))
+        bordro_var_mi, satirlar = donem_hesapla(2025, 3)
+        self.assertTrue(bordro_var_mi)
+        self.assertEqual([s['net_maas'] for s in satirlar], [123.45])
+
+    def test_donemi_kapat_toplu(self):
+        with self.assertNumQueries(9):  # + taksit defteri INSERT ve avans UPDATE
+            yeni, guncellenen = donemi_kapat(2025, 3)
+        self.assertEqual((yeni, guncellenen), (2, 0))
+
+        bordro = MaasBordrosu.objects.get(personel=self.aylik, donem=date(2025, 3, 1))
+        self.assertEqual(bordro.net_odenecek, Decimal('28800.00'))
+        self.assertEqual(bordro.mesai_saati, Decimal('2.00'))
+
+        # İkinci kapanışta yeni kayıt açılmaz, sadece değişen bordro güncellenir.
+        FinansalHareket.objects.create(personel=self.gunluk, tarih=date(2025, 3, 7), islem_tipi='prim', tutar=Decimal('50'))
+        self.assertEqual(donemi_kapat(2025, 3), (0, 2))
+        self.assertEqual(MaasBordrosu.objects.count(), 2)
+        self.assertEqual(MaasBordrosu.objects.get(personel=self.gunluk).net_odenecek, Decimal('2050.00'))
+
+    def test_taksit_defteri(self):
+        avans = TaksitliAvans.objects.get()
+        # Verildiği aydan önce kesilmez; 1000/3 taksitte son taksit kalanın tamamıdır
+        TaksitliAvans.objects.create(personel=self.gunluk, tarih=date(2025, 4, 20), toplam_tutar=Decimal('1000'),
+                                     taksit_sayisi=3)
+        self.assertEqual(taksit_toplamlari(2025, 3), {self.aylik.id: 1000.0})
+
+        for ay in (3, 4, 5, 6):
+            donemi_kapat(2025, ay)
+        # Tekrar kapatmada deftere yazılmış taksit yeniden kesilmez
+        self.assertEqual(donemi_kapat(2025, 4), (0, 2))
+
+        self.assertEqual(
+            list(TaksitOdemesi.objects.filter(personel=self.gunluk).values_list('donem__month', 'taksit_no', 'tutar')),
+            [(4, 1, Decimal('333.33')), (5, 2, Decimal('333.33')), (6, 3, Decimal('333.34'))],
+        )
+        avans.refresh_from_db()
+        self.assertEqual((avans.odenen_taksit, avans.kalan_tutar, avans.tamamlandi), (3, Decimal('0.00'), True))
+        self.assertFalse(TaksitliAvans.objects.filter(tamamlandi=False).exists())
+        self.assertEqual(taksit_toplamlari(2025, 7), {})
+        # Kapanmış dönemin kesintisi defterden okunur
+        self.assertEqual(taksit_toplamlari(2025, 4), {self.aylik.id: 1000.0, self.gunluk.id: 333.33})
+        self.assertEqual(MaasBordrosu.objects.get(personel=self.aylik, donem=date(2025, 5, 1)).toplam_kesinti,
+                         Decimal('1000.00'))
+
+    def test_donemler_hesapla_aylik_hesapla_ayni(self):
+        donemi_kapat(2025, 3)
+        FinansalHareket.objects.create(personel=self.aylik, tarih=date(2025, 4, 2), islem_tipi='prim', tutar=Decimal('75'))
+
+        with self.assertNumQueries(4):
+            satirlar = donemler_hesapla(date(2025, 2, 1), date(2025, 5, 1))
+        beklenen = []
+        for ay in (2, 3, 4, 5):
+            beklenen += [(ay, s['personel'].id, s['durum'], s['net_maas']) for s in donem_hesapla(2025, ay)[1]]
+        self.assertEqual(sorted((s['donem'].month, s['personel'].id, s['durum'], s['net_maas']) for s in satirlar),
+                         sorted(beklenen))
+
+        toplam = {t['personel'].id: t for t in yillik_toplamlar(satirlar)}[self.aylik.id]
+        self.assertEqual((toplam['yil'], toplam['donem_sayisi'], toplam['kesinlesmis']), (2025, 4, 1))
+        self.assertAlmostEqual(toplam['net_maas'], sum(n for _, pid, _, n in beklenen if pid == self.aylik.id))
+        self.assertAlmostEqual(toplam['toplam_prim'], 575)
+
+    def test_maas_gecmisi_gorunumleri(self):
+        self.client.force_login(User.objects.create_user('muhasebe', password='x'))
+        sorgu = {'baslangic': '2025-03', 'bitis': '2025-04', 'personel': [self.aylik.id]}
+
+        veri = self.client.get('/maas-gecmisi/json/', sorgu).json()
+        self.assertEqual([(d['donem'], d['durum']) for d in veri['donemler']], [('2025-03', 'taslak'), ('2025-04', 'taslak')])
+        self.assertEqual(veri['yillik'][0]['net_maas'], round(sum(d['net_maas'] for d in veri['donemler']), 2))
+
+        self.assertContains(self.client.get('/maas-gecmisi/', sorgu), 'Aylık Döküm')
+        yanit = self.client.get('/maas-gecmisi/indir/', {**sorgu, 'kapsam': 'yillik'})
+        sayfa = load_workbook(io.BytesIO(b''.join(yanit.streaming_content))).active
+        self.assertEqual([c.value for c in sayfa[2]][:3], [f'{self.aylik.ad} {self.aylik.soyad}', 2025, 2])
+
+    def test_toplu_pusula(self):
+        with self.assertNumQueries(5):  # taksit + bordro kontrolü + personel + özet + hareketler
+            pusulalar = pusulalari_hesapla(2025, 3)
+        self.assertEqual([p['personel'].id for p in pusulalar], [self.aylik.id, self.gunluk.id])
+        aylik = pusulalar[0]
+        self.assertEqual([h.tutar for h in aylik['primler_listesi']], [Decimal('500')])
+        self.assertEqual([h.tutar for h in aylik['kesintiler_listesi']], [Decimal('200')])
+        self.assertEqual([(t['taksit_no'], t['kesinti']) for t in aylik['taksitler']], [(1, Decimal('1000.00'))])
+        self.assertAlmostEqual(aylik['net_maas'], 28800)
+
+        self.client.force_login(User.objects.create_user('muhasebe', password='x'))
+        belge = b''.join(self.client.get('/maas-raporu/pusulalar/?ay=3&yil=2025').streaming_content).decode()
+        self.assertEqual(belge.count('class="pusula-sayfa"'), 2)
+        self.assertIn(self.gunluk.soyad, belge)
+
+        donemi_kapat(2025, 3)
+        yanit = self.client.get('/maas-raporu/pusulalar/?ay=3&yil=2025&bicim=zip')
+        self.assertEqual(yanit['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(yanit.streaming_content))) as zf:
+            self.assertEqual(zf.namelist(), [pusula_dosya_adi(p) for p in pusulalar])
+            self.assertIn('Taksitli Avans Kesintisi (1/3)', zf.read(zf.namelist()[0]).decode())
+
+        self.assertContains(self.client.get(f'/personel/{self.aylik.id}/pusula/?ay=3&yil=2025'), 'Taksitli Avans Kesintisi')
+
+
+class TaksitDefteriGocuTest(TransactionTestCase):
+    onceki = [('core', '0011_arkaplanisi_pdks')]
+    sonraki = [('core', '0012_taksit_defteri')]
+
+    def _goc(self, hedef):
+        executor = MigrationExecutor(connection)
+        executor.migrate(hedef)
+        return executor.loader.project_state(hedef).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_kapanmis_donemlerde_odenenler_deftere_yazilir(self):
+        apps = self._goc(self.onceki)
+        Personel = apps.get_model('core', 'Personel')
+        TaksitliAvans = apps.get_model('core', 'TaksitliAvans')
+        MaasBordrosu = apps.get_model('core', 'MaasBordrosu')
+        ali = Personel.objects.create(ad='Ali', soyad='Yılmaz', tc_no='11000000001', telefon='555', maas_tutari=30000)
+        veli = Personel.objects.create(ad='Veli', soyad='Kaya', tc_no='11000000002', telefon='555', maas_tutari=30000)
+        for ay in (1, 2, 3, 4):
+            MaasBordrosu.objects.create(personel=ali, donem=date(2024, ay, 1), brut_maas=30000, net_odenecek=30000)
+
+        def avans(personel, tarih, toplam, aylik, **kwargs):
+            return TaksitliAvans.objects.create(personel=personel, tarih=tarih, toplam_tutar=toplam,
+                                                taksit_sayisi=4, aylik_kesinti=aylik, **kwargs).id
+
+        yarim = avans(ali, date(2024, 2, 10), 1000, 300)     # şubat-nisan
+        biten = avans(ali, date(2023, 12, 1), 500, 200)      # ocak, şubat, mart (kalan 100)
+        kapali = avans(ali, date(2024, 1, 1), 400, 100, tamamlandi=True)
+        bordrosuz = avans(veli, date(2024, 1, 1), 400, 100)
+
+        apps = self._goc(self.sonraki)
+        TaksitliAvans = apps.get_model('core', 'TaksitliAvans')
+        TaksitOdemesi = apps.get_model('core', 'TaksitOdemesi')
+        durumlar = {a.id: (a.odenen_tutar, a.odenen_taksit, a.tamamlandi) for a in TaksitliAvans.objects.all()}
+        self.assertEqual(durumlar, {
+            yarim: (Decimal('900.00'), 3, False),
+            biten: (Decimal('500.00'), 3, True),
+            kapali: (Decimal('0.00'), 0, True),
+            bordrosuz: (Decimal('0.00'), 0, False),
+        })
+        self.assertEqual(
+            list(TaksitOdemesi.objects.filter(taksit_id=biten).order_by('donem').values_list(
+                'donem', 'taksit_no', 'tutar', 'odenen_toplam')),
+            [(date(2024, 1, 1), 1, Decimal('200.00'), Decimal('200.00')),
+             (date(2024, 2, 1), 2, Decimal('200.00'), Decimal('400.00')),
+             (date(2024, 3, 1), 3, Decimal('100.00'), Decimal('500.00'))])
+        self.assertEqual(TaksitOdemesi.objects.filter(taksit_id=yarim).first().donem, date(2024, 2, 1))
+
+
+class DonemFiltresiTest(TestCase):
+    def test_yari_acik_aralik(self):
+        self.assertEqual(donem_araligi(2024, 12), (date(2024, 12, 1), date(2025, 1, 1)))
+        p = personel_olustur('60000000001')
+        for gun in (date(2025, 2, 28), date(2025, 3, 1), date(2025, 3, 31), date(2025, 4, 1)):
+            Puantaj.objects.create(personel=p, tarih=gun, durum='gelmedi')
+        self.assertEqual(Puantaj.objects.filter(donem_filtresi(2025, 3)).count(), 2)
+
+    @skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN çıktısı SQLite\'a özgü')
+    def test_sorgu_plani_indeks_kullanir(self):
+        sorgular = {
+            'puantaj_tarih_durum_idx': Puantaj.objects.filter(donem_filtresi(2025, 3)).values('personel_id')
+                                       .annotate(Sum('hesaplanan_mesai_saati')).order_by(),
+            'hareket_personel_tarih_idx': FinansalHareket.objects.filter(donem_filtresi(2025, 3), personel_id=1),
+            'bordro_donem_idx': MaasBordrosu.objects.filter(donem_filtresi(2025, 3, 'donem')),
+            'taksit_tamamlandi_idx': TaksitliAvans.objects.filter(tamamlandi=False).values_list('personel_id', flat=True),
+            'taksit_odemesi_donem_idx': TaksitOdemesi.objects.filter(donem_filtresi(2025, 3, 'donem')),
+            'islemlog_tarih_idx': IslemLog.objects.filter(tarih__gte=date(2025, 3, 1)),
+        }
+        for indeks, qs in sorgular.items():
+            with self.subTest(indeks=indeks):
+                plan = qs.explain()
+                self.assertIn(f'INDEX {indeks}', plan)
+                self.assertNotIn('django_date_extract', str(qs.query))
+
+
+class AylikOzetTest(TestCase):
+    def setUp(self):
+        self.personel = personel_olustur('50000000001')
+        self.client.force_login(User.objects.create_user('kullanici', password='x'))
+
+    def _ozet(self, donem=date(2025, 3, 1)):
+        return AylikOzet.objects.filter(personel=self.personel, donem=donem).values_list(
+            'calistigi_gun', 'gelmedigi_gun', 'toplam_mesai', 'toplam_prim', 'diger_kesintiler').first()
+
+    def test_kayit_ve_silmede_guncellenir(self):
+        p = Puantaj.objects.create(personel=self.personel, tarih=date(2025, 3, 3), durum='geldi',
+                                   giris_saati=time(8, 0), cikis_saati=time(18, 0))
+        Puantaj.objects.create(personel=self.personel, tarih=date(2025, 3, 4), durum='gelmedi')
+        FinansalHareket.objects.create(personel=self.personel, tarih=date(2025, 3, 5), islem_tipi='prim', tutar=Decimal('500'))
+        avans = FinansalHareket.objects.create(personel=self.personel, tarih=date(2025, 3, 6),
+                                               islem_tipi='basit_avans', tutar=Decimal('200'))
+        self.assertEqual(self._ozet(), (1, 1, Decimal('2.00'), Decimal('500.00'), Decimal('200.00')))
+
+        # Kayıt başka aya taşınınca iki ayın özeti de yenilenir
+        p.tarih = date(2025, 4, 1)
+        p.save()
+        self.assertEqual(self._ozet()[:3], (0, 1, Decimal('0.00')))
+        self.assertEqual(self._ozet(date(2025, 4, 1))[:3], (1, 0, Decimal('2.00')))
+
+        self.client.get(f'/islem-sil/{avans.id}/')
+        self.assertEqual(self._ozet()[4], Decimal('0.00'))
+
+        # Ham kaydı kalmayan ayın özet satırı silinir
+        p.delete()
+        self.assertIsNone(self._ozet(date(2025, 4, 1)))
+
+    def test_sapma_onarimi(self):
+        Puantaj.objects.create(personel=self.personel, tarih=date(2025, 3, 3), durum='gelmedi')
+        AylikOzet.objects.filter(personel=self.personel).update(gelmedigi_gun=5)
+        AylikOzet.objects.create(personel=self.personel, donem=date(2025, 1, 1), calistigi_gun=3)
+        FinansalHareket.objects.bulk_create([
+            FinansalHareket(personel=self.personel, tarih=date(2025, 2, 1), islem_tipi='prim', tutar=Decimal('10'))
+        ])
+
+        self.assertEqual(ozetleri_dogrula(onar=False), {'eksik': 1, 'hatali': 1, 'fazla': 1})
+        call_command('rebuild_summaries', stdout=io.StringIO())
+        self.assertEqual(ozetleri_dogrula(onar=False), {'eksik': 0, 'hatali': 0, 'fazla': 0})
+        self.assertEqual(self._ozet()[1], 1)
+
+        # Personel silinirken CASCADE ile giden kayıtlar özeti yeniden oluşturmaz
+        self.personel.delete()
+        self.assertFalse(AylikOzet.objects.exists())
+
+
+class MesaiHesabiTest(TestCase):
+    def test_yuvarlama_kurallari(self):
+        self.assertEqual(mesai_hesapla('geldi', time(8, 0), time(17, 10), 8), 1)
+        self.assertEqual(mesai_hesapla('geldi', time(8, 0), time(17, 30), 8), 1.5)
+        self.assertEqual(mesai_hesapla('geldi', time(8, 0), time(17, 50), 8), 2.0)
+        self.assertEqual(mesai_hesapla('geldi', time(8, 0), time(15, 30), 8), -0.5)
+
+    def test_gece_vardiyasi_ve_hafta_tatili(self):
+        self.assertEqual(mesai_hesapla('geldi', time(22, 0), time(7, 0), 8), 1)
+        self.assertEqual(mesai_hesapla('hafta_tatili', time(9, 0), time(12, 30), 8), 3.5)
+        self.assertEqual(mesai_hesapla('izinli', time(9, 0), time(12, 30), 8), 0)
+
+    def test_vektorel_hesap_skaler_ile_ayni(self):
+        saatler = [None] + [time(s, d) for s in range(0, 24) for d in range(0, 60, 7)]
+        durumlar, girisler, cikislar, standartlar, beklenen = [], [], [], [], []
+        for i, giris in enumerate(saatler[::5]):
+            for j, cikis in enumerate(saatler[::3]):
+                durum = ('geldi', 'hafta_tatili', 'izinli')[(i + j) % 3]
+                standart = (7, 8, 9)[j % 3]
+                durumlar.append(durum)
+                girisler.append(saat_saniye(giris))
+                cikislar.append(saat_saniye(cikis))
+                standartlar.append(standart)
+                beklenen.append(mesai_hesapla(durum, giris, cikis, standart))
+
+        sonuc = mesai_hesapla_vektorel(durumlar, girisler, cikislar, standartlar)
+        self.assertEqual(sonuc.tolist(), [float(b) for b in beklenen])
+
+
+class TopluYoklamaTest(TestCase):
+    def setUp(self):
+        self.personeller = [personel_olustur(f'2000000000{i}') for i in range(3)]
+
+    def test_ay_tek_seferde_kaydedilir(self):
+        kayitlar = [
+            yoklama_satiri(p.id, date(2025, 3, gun), 'geldi', '08:00', '17:30')
+            for p in self.personeller for gun in range(1, 29)
+        ]
+        # 5 yazma sorgusu + aylık özetin yenilenmesi (2 toplam sorgusu + 1 upsert)
+        with self.assertNumQueries(8):
+            self.assertEqual(puantajlari_kaydet(kayitlar), (84, 0))
+        self.assertEqual(AylikOzet.objects.get(personel=self.personeller[0]).toplam_mesai, Decimal('42.00'))
+
+        kayitlar[0]['durum'] = 'gelmedi'
+        self.assertEqual(puantajlari_kaydet(kayitlar[:2]), (0, 2))
+        self.assertEqual(Puantaj.objects.count(), 84)
+        ilk = Puantaj.objects.get(personel=self.personeller[0], tarih=date(2025, 3, 1))
+        self.assertEqual(ilk.durum, 'gelmedi')
+        self.assertEqual(Puantaj.objects.get(personel=self.personeller[0], tarih=date(2025, 3, 2)).hesaplanan_mesai_saati, Decimal('1.5'))
+
+    def test_sadece_degisen_satirlar_kaydedilir(self):
+        self.client.force_login(User.objects.create_user('yoklamaci', password='x'))
+        a, b, c = self.personeller
+        veri = {
+            'kayit_tarihi': '2025-03-03', 'personel_id': [a.id, b.id, c.id],
+            f'durum_{a.id}': 'geldi', f'giris_saati_{a.id}': '08:00', f'cikis_saati_{a.id}': '18:00',
+            f'durum_{b.id}': 'geldi', f'giris_saati_{b.id}': '18:00', f'cikis_saati_{b.id}': '08:00',
+            f'durum_{c.id}': '',
+        }
+        sonuc = self.client.post('/yoklama/kaydet/', veri).json()
+
+        self.assertEqual((sonuc['kaydedilen'], list(sonuc['satirlar'])), (1, [str(a.id)]))
+        self.assertIn('value="18:00"', sonuc['satirlar'][str(a.id)])
+        self.assertIn('Çıkış saati', sonuc['hatalar'][str(b.id)])
+        self.assertEqual(list(Puantaj.objects.values_list('personel_id', flat=True)), [a.id])
+
+    def test_hatali_saat(self):
+        with self.assertRaises(ValueError):
+            yoklama_satiri(1, date(2025, 3, 1), 'geldi', '25:00', '17:00')
+        with self.assertRaises(ValueError):
+            yoklama_satiri(1, date(2025, 3, 1), 'geldi', '18:00', '17:00')
+        self.assertEqual(yoklama_satiri(1, date(2025, 3, 1), 'geldi', '2200', '0600', gece_vardiyasi=True)['cikis_saati'], time(6, 0))
+
+
+class YoklamaSenkronTest(TestCase):
+    def setUp(self):
+        self.personel = personel_olustur('21000000001')
+        self.client.force_login(User.objects.create_user('sorumlu', password='x'))
+
+    def _islem(self, durum, zaman, **kwargs):
+        return {'id': str(uuid.uuid4()), 'zaman': zaman, 'personel_id': self.personel.id, 'tarih': '2025-03-03',
+                'durum': durum, 'giris_saati': '08:00', 'cikis_saati': '17:00', **kwargs}
+
+    def _gonder(self, islemler, politika='son_yazan'):
+        yanit = self.client.post('/yoklama/senkron/', {'politika': politika, 'islemler': islemler},
+                                 content_type='application/json')
+        return [(s['sonuc'], s.get('tekrar', False)) for s in yanit.json()['sonuclar']]
+
+    def _durum(self):
+        return Puantaj.objects.get(personel=self.personel, tarih=date(2025, 3, 3)).durum
+
+    def test_son_yazan_kazanir_ve_tekrar_uygulanmaz(self):
+        yeni = self._islem('gelmedi', '2025-03-03T10:00:00+03:00')
+        eski = self._islem('geldi', '2025-03-03T09:00:00+03:00')
+        hatali = self._islem('geldi', '2025-03-03T09:30:00+03:00', cikis_saati='07:00')
+        self.assertEqual(self._gonder([yeni, hatali]), [('uygulandi', False), ('hata', False)])
+
+        # Bağlantı koptuğu için aynı parti tekrar gelir; geç ulaşan eski işlem yenisini ezmez
+        with self.assertNumQueries(3):  # oturum, kullanıcı, alınmış işlemler
+            self.assertEqual(self._gonder([yeni]), [('uygulandi', True)])
+        self.assertEqual(self._gonder([eski]), [('eski', False)])
+        self.assertEqual(self._durum(), 'gelmedi')
+        self.assertEqual(YoklamaSenkronu.objects.count(), 2)
+
+    def test_eszamanli_ayni_islem_tekrar_doner(self):
+        islem = self._islem('gelmedi', '2025-03-03T10:00:00+03:00')
+        # Eşzamanlı istek aynı işlemi ilk okumadan sonra kaydetmiş: ilk okuma onu görmez
+        YoklamaSenkronu.objects.create(
+            islem_id=islem['id'], personel=self.personel, tarih=date(2025, 3, 3), durum='geldi',
+            istemci_zamani=timezone.now(), sonuc='uygulandi')
+        okumalar = []
+
+        def ilk_okuma_gormez(islem_ids):
+            okumalar.append(islem_ids)
+            return {} if len(okumalar) == 1 else _alinmis_islemler(islem_ids)
+
+        with mock.patch('core.senkron._alinmis_islemler', side_effect=ilk_okuma_gormez):
+            self.assertEqual(self._gonder([islem]), [('uygulandi', True)])
+        self.assertFalse(Puantaj.objects.filter(personel=self.personel).exists())
+        self.assertEqual(YoklamaSenkronu.objects.count(), 1)
+
+    def test_reddet_politikasi_cakismayi_reddeder(self):
+        Puantaj.objects.create(personel=self.personel, tarih=date(2025, 3, 3), durum='izinli')
+        sonuclar = self.client.post('/yoklama/senkron/', {'politika': 'reddet', 'islemler': [
+            self._islem('geldi', '2025-03-03T09:00:00+03:00', beklenen=''),
+        ]}, content_type='application/json').json()['sonuclar']
+        self.assertEqual((sonuclar[0]['sonuc'], sonuclar[0]['sunucu']), ('cakisma', 'izinli'))
+        self.assertEqual(self._durum(), 'izinli')
+
+        # Aynı partide sırayla: ilki sunucudakini, ikincisi ilkinin yazdığını bekler
+        self.assertEqual(self._gonder([
+            self._islem('gelmedi', '2025-03-03T09:05:00+03:00', beklenen='izinli'),
+            self._islem('raporlu', '2025-03-03T09:10:00+03:00', beklenen='gelmedi'),
+        ], politika='reddet'), [('uygulandi', False), ('uygulandi', False)])
+        self.assertEqual(self._durum(), 'raporlu')
+
+
+class XlsxAkisTest(TestCase):
+    def test_openpyxl_ile_okunabilir(self):
+        satirlar = ((i, f'Ad <{i}> & Soyad', Decimal('1.50'), None) for i in range(1200))
+        veri = b''.join(xlsx_parcalari('Rapor 1/2', ['No', 'Ad', 'Tutar', 'Boş'], satirlar))
+
+        wb = load_workbook(io.BytesIO(veri), read_only=True)
+        ws = wb.active
+        self.assertEqual(ws.title, 'Rapor 1_2')
+        okunan = list(ws.iter_rows(values_only=True))
+        self.assertEqual(len(okunan), 1201)
+        self.assertEqual(okunan[0], ('No', 'Ad', 'Tutar', 'Boş'))
+        self.assertEqual(okunan[1200][:3], (1199, 'Ad <1199> & Soyad', 1.5))
+
+
+class PersonelIceAktarTest(TestCase):
+    BASLIKLAR = ['Ad', 'Soyad', 'TC No', 'Telefon', 'Çalışma Tipi', 'Maaş', 'Mesai Ücreti', 'Giriş Tarihi', 'IBAN', 'Banka']
+
+    def _excel(self, satirlar, basliklar=BASLIKLAR):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(basliklar)
+        for satir in satirlar:
+            ws.append(satir)
+        dosya = io.BytesIO()
+        wb.save(dosya)
+        dosya.seek(0)
+        return dosya
+
+    def test_ekleme_atlama_ve_hata_raporu(self):
+        personel_olustur('30000000001', ad='Eski')
+        dosya = self._excel([
+            ['Ali', 'Veli', 30000000001, '555', 'Aylık', 30000, None, None, None, None],
+            ['Ayşe', 'Kaya', 30000000002, 5551112233, 'Günlük', 1200, 300, '15.02.2024', 'TR00 0000', 'Ziraat'],
+            ['Can', 'Er', 30000000003, '555', 'Aylık', 'yok', None, None, None, None],
+            ['Tekrar', 'Kayıt', 30000000002, '555', 'Aylık', 1000, None, None, None, None],
+        ])
+        sonuc = personel_ice_aktar(dosya)
+
+        self.assertEqual((sonuc.eklenen, sonuc.guncellenen, sonuc.atlanan), (1, 0, 3))
+        self.assertEqual([h[0] for h in sonuc.hatalar], [2, 4, 5])
+        ayse = Personel.objects.get(tc_no='30000000002')
+        self.assertEqual(ayse.calisma_tipi, 'gunluk')
+        self.assertEqual(ayse.telefon, '5551112233')
+        self.assertEqual(ayse.ise_giris_tarihi, date(2024, 2, 15))
+        self.assertEqual(ayse.iban, 'TR000000')
+        self.assertEqual(Personel.objects.get(tc_no='30000000001').ad, 'Eski')
+
+    def test_guncelleme_modu(self):
+        personel_olustur('30000000001', ad='Eski')
+        dosya = self._excel([['Yeni', 'Ad', '30000000001', '555', 'Aylık', 45000, None, None, None, None]])
+        sonuc = personel_ice_aktar(dosya, guncelle=True)
+        self.assertEqual((sonuc.eklenen, sonuc.guncellenen), (0, 1))
+        p = Personel.objects.get(tc_no='30000000001')
+        self.assertEqual((p.ad, p.maas_tutari), ('Yeni', Decimal('45000.00')))
+
+    def test_guncellemede_eksik_ve_bos_secimli_alanlar_korunur(self):
+        alanlar = {'ozel_mesai_ucreti': Decimal('400.00'), 'iban': 'TR330006100519786457841326',
+                   'banka_adi': 'Ziraat', 'ise_giris_tarihi': date(2020, 1, 1)}
+        personel_olustur('30000000001', **alanlar)
+        personel_olustur('30000000002', **alanlar)
+        # Yalnızca zorunlu sütunlar
+        sonuc = personel_ice_aktar(self._excel([['Yeni', 'Ad', '30000000001', '555', 'Aylık', 45000]],
+                                               basliklar=self.BASLIKLAR[:6]), guncelle=True)
+        self.assertEqual(sonuc.guncellenen, 1)
+        # Sütunlar var, hücreler boş; dolu hücre yazılır
+        personel_ice_aktar(self._excel([['Yeni', 'Ad', '30000000002', '555', 'Aylık', 45000, None, None, None, 'Garanti']]),
+                           guncelle=True)
+
+        for tc_no, banka in (('30000000001', 'Ziraat'), ('30000000002', 'Garanti')):
+            p = Personel.objects.get(tc_no=tc_no)
+            self.assertEqual((p.ad, p.maas_tutari), ('Yeni', Decimal('45000.00')))
+            self.assertEqual((p.ozel_mesai_ucreti, p.iban, p.banka_adi, p.ise_giris_tarihi),
+                             (Decimal('400.00'), alanlar['iban'], banka, date(2020, 1, 1)))
+
+
+class PdksIceAktarTest(TestCase):
+    def setUp(self):
+        self.ali = personel_olustur('31000000001', gunluk_calisma_saati=9)
+        self.ayse = personel_olustur('31000000002', gunluk_calisma_saati=9)
+
+    def test_okutmalar_eslenir_ve_hatalar_raporlanir(self):
+        Puantaj.objects.create(personel=self.ayse, tarih=date(2024, 3, 5), durum='hafta_tatili')
+        Puantaj.objects.create(personel=self.ayse, tarih=date(2024, 3, 11), durum='raporlu')
+        satirlar = [
+            'TC No;Zaman',
+            '31000000001;04.03.2024 08:00',
+            '31000000001;04.03.2024 08:01',        # 3: çift okutma
+            '31000000001;04.03.2024 12:00',        # öğle arası
+            '31000000001;04.03.2024 13:00',
+            '31000000001;04.03.2024 18:30',
+            '31000000002;05.03.2024 22:00',
+            '31000000002;2024-03-06 06:00:00',     # gece yarısını geçen vardiya
+            '31000000002;07.03.2024 09:00',        # 9: çıkışsız giriş
+            '99999999999;07.03.2024 09:00',        # 10: kayıtsız personel
+            '31000000001;07.03.2024 25:00',        # 11: hatalı zaman
+            '31000000001;08/03/2024 08:00',
+            '31000000001;08.03.2024 17:00',
+            '31000000002;11.03.2024 08:00',        # 14: raporlu gün
+            '31000000002;11.03.2024 17:00',
+        ]
+        sonuc = pdks_ice_aktar(io.BytesIO('\n'.join(satirlar).encode('utf-8-sig')))
+
+        self.assertEqual((sonuc.eklenen, sonuc.guncellenen, sonuc.atlanan), (2, 1, 4))
+        self.assertEqual([h[0] for h in sonuc.hatalar], [9, 10, 11, 14])
+        self.assertEqual(sonuc.hatalar[3][2], "Gün 'Raporlu' olarak işaretli, okutma yazılmadı.")
+        p = Puantaj.objects.get(personel=self.ali, tarih=date(2024, 3, 4))
+        self.assertEqual((p.giris_saati, p.cikis_saati, p.hesaplanan_mesai_saati), (time(8, 0), time(18, 30), Decimal('1.50')))
+        # Hafta tatili durumu korunur, saatler yazılır (tüm saatler mesai)
+        gece = Puantaj.objects.get(personel=self.ayse, tarih=date(2024, 3, 5))
+        self.assertEqual((gece.durum, gece.giris_saati, gece.cikis_saati, gece.hesaplanan_mesai_saati),
+                         ('hafta_tatili', time(22, 0), time(6, 0), Decimal('8.00')))
+        rapor = Puantaj.objects.get(personel=self.ayse, tarih=date(2024, 3, 11))
+        self.assertEqual((rapor.durum, rapor.giris_saati), ('raporlu', None))
+        self.assertEqual(AylikOzet.objects.get(personel=self.ali, donem=date(2024, 3, 1)).calistigi_gun, 2)
+
+    def test_xlsx_ayri_tarih_saat_sutunlari(self):
+        wb = Workbook()
+        wb.active.append(['Sicil', 'TC No', 'Tarih', 'Saat'])
+        wb.active.append([1, 31000000001, datetime(2024, 3, 4), time(8, 0)])
+        wb.active.append([1, 31000000001, '04.03.2024', '17:00'])
+        dosya = io.BytesIO()
+        wb.save(dosya)
+        dosya.seek(0)
+        sonuc = pdks_ice_aktar(dosya)
+        self.assertEqual((sonuc.eklenen, sonuc.hatalar), (1, []))
+        self.assertEqual(Puantaj.objects.get().cikis_saati, time(17, 0))
+
+        with self.assertRaisesMessage(ValueError, 'Eksik başlık'):
+            pdks_ice_aktar(io.BytesIO(b'TC No;Saat\n1;08:00\n'))
+
+
+class ArkaPlanIsiTest(TestCase):
+    def setUp(self):
+        self.klasor = tempfile.TemporaryDirectory()
+        self.addCleanup(self.klasor.cleanup)
+        ayar = override_settings(ISLER_KLASORU=self.klasor.name, ISLER_SENKRON=False)
+        ayar.enable()
+        self.addCleanup(ayar.disable)
+
+        self.yonetici = User.objects.create_superuser('yonetici', password='x')
+        self.client.force_login(self.yonetici)
+        personel_olustur('40000000001')
+
+    def test_view_kuyruga_ekler_worker_calistirir(self):
+        yanit = self.client.get('/maas-raporu-indir/?ay=3&yil=2024')
+        is_kaydi = ArkaPlanIsi.objects.get()
+        self.assertRedirects(yanit, f'/is/{is_kaydi.id}/')
+        self.assertEqual((is_kaydi.tur, is_kaydi.durum, is_kaydi.olusturan), ('maas_raporu', 'bekliyor', self.yonetici))
+
+        call_command('is_calistir', '--bir-kez', stdout=io.StringIO())
+
+        is_kaydi.refresh_from_db()
+        self.assertEqual((is_kaydi.durum, is_kaydi.ilerleme), ('tamamlandi', 100))
+        self.assertTrue(os.path.exists(os.path.join(self.klasor.name, is_kaydi.sonuc_dosyasi)))
+        self.assertEqual(self.client.get(f'/is/{is_kaydi.id}/durum/').json()['dosya_var'], True)
+
+        yanit = self.client.get(f'/is/{is_kaydi.id}/indir/')
+        ws = load_workbook(io.BytesIO(b''.join(yanit.streaming_content)), read_only=True).active
+        self.assertEqual(len(list(ws.iter_rows(values_only=True))), 2)
+
+        # Başka bir kullanıcı dosyaya erişemez
+        self.client.force_login(User.objects.create_user('diger', password='x'))
+        self.assertEqual(self.client.get(f'/is/{is_kaydi.id}/indir/').status_code, 403)
+
+    def test_hatali_is_ve_tekrar_alinmama(self):
+        is_kaydi = is_kuyruga_ekle('personel_ice_aktar', self.yonetici, girdi_dosyasi='olmayan.xlsx')
+        alinan = siradaki_isi_al()
+        self.assertEqual((alinan.id, alinan.durum), (is_kaydi.id, 'calisiyor'))
+        self.assertIsNone(siradaki_isi_al())
+
+        call_command('is_calistir', '--bir-kez', stdout=io.StringIO())
+        is_kaydi.refresh_from_db()
+        self.assertEqual(is_kaydi.durum, 'calisiyor')  # Sadece bekleyen işler alınır
+
+        ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(durum='bekliyor')
+        call_command('is_calistir', '--bir-kez', stdout=io.StringIO(), stderr=io.StringIO())
+        is_kaydi.refresh_from_db()
+        self.assertEqual(is_kaydi.durum, 'hata')
+        self.assertIsNotNone(is_kaydi.bitis_tarihi)
+
+    def test_yarim_kalan_is_kurtarilir(self):
+        is_kaydi = is_kuyruga_ekle('maas_raporu', self.yonetici, yil=2024, ay=3)
+        siradaki_isi_al()  # Worker işi aldı ve öldü
+        ArkaPlanIsi.objects.filter(id=is_kaydi.id).update(baslama_tarihi=timezone.now() - timedelta(hours=3))
+        yeni = is_kuyruga_ekle('maas_raporu', self.yonetici, yil=2024, ay=4)
+        siradaki_isi_al()  # Süre dolmamış, çalışmaya devam eden iş
+
+        self.assertEqual(yarim_kalan_isleri_kurtar(), (1, 0))
+        is_kaydi.refresh_from_db()
+        self.assertEqual((is_kaydi.durum, is_kaydi.baslama_tarihi), ('bekliyor', None))
+        self.assertEqual(ArkaPlanIsi.objects.get(id=yeni.id).durum, 'calisiyor')
+
+        # Açılışta yeniden kuyruğa alınan iş tamamlanır
+        call_command('is_calistir', '--bir-kez', stdout=io.StringIO(), stderr=io.StringIO())
+        is_kaydi.refresh_from_db()
+        self.assertEqual(is_kaydi.durum, 'tamamlandi')
+
+        # İkinci kez yarım kalan iş hata ile kapanır
+        ArkaPlanIsi.objects.filter(id=yeni.id).update(parametreler={'yarim_kalma': 1}, baslama_tarihi=None)
+        self.assertEqual(yarim_kalan_isleri_kurtar(), (0, 1))
+        self.assertEqual(ArkaPlanIsi.objects.get(id=yeni.id).durum, 'hata')
+
+    @override_settings(ISLER_SENKRON=True)
+    def test_senkron_donem_kapat(self):
+        yanit = self.client.post('/maas-bordrosu-olustur/', {'yil': 2024, 'ay': 3})
+        is_kaydi = ArkaPlanIsi.objects.get()
+        self.assertRedirects(yanit, f'/is/{is_kaydi.id}/')
+        self.assertEqual(is_kaydi.durum, 'tamamlandi')
+        self.assertEqual(MaasBordrosu.objects.count(), 1)
+
+
+    @override_settings(ISLER_SENKRON=True, TOPLU_PUSULA_SENKRON_SINIR=0)
+    def test_buyuk_kadroda_toplu_pusula_worker_da(self):
+        # Pusulalar istekte hesaplanmaz, yalnızca worker'da
+        with mock.patch('core.views.pusulalari_hesapla') as istekte_hesap:
+            yanit = self.client.get('/maas-raporu/pusulalar/?ay=3&yil=2024&bicim=zip')
+        istekte_hesap.assert_not_called()
+        is_kaydi = ArkaPlanIsi.objects.get()
+        self.assertRedirects(yanit, f'/is/{is_kaydi.id}/')
+        self.assertEqual((is_kaydi.tur, is_kaydi.durum), ('toplu_pusula', 'tamamlandi'))
+        self.assertEqual(is_kaydi.get_tur_display(), 'Toplu Maaş Pusulası')
+        is_kaydi.full_clean()
+
+        yanit = self.client.get(f'/is/{is_kaydi.id}/indir/')
+        self.assertEqual(yanit['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(yanit.streaming_content))) as zf:
+            self.assertEqual(len(zf.namelist()), 1)
+
+
+class PerformansButcesiTest(TestCase):
+    """Her URL'nin sorgu sayısı bütçe içinde ve veri boyutundan bağımsız olmalı (N+1 koruması)."""
+
+    def setUp(self):
+        klasor = tempfile.TemporaryDirectory()
+        self.addCleanup(klasor.cleanup)
+        ayar = override_settings(
+            ISLER_KLASORU=klasor.name, ISLER_SENKRON=False,
+            CACHES={**settings.CACHES, settings.RAPOR_ONBELLEGI: OLCUM_RAPOR_ONBELLEGI},
+        )
+        ayar.enable()
+        self.addCleanup(ayar.disable)
+        self.kullanici = olcum_kullanicisi()
+
+    def _olc(self, personel_sayisi):
+        ornek_veri_olustur(personel_sayisi, ay_sayisi=2)
+        return {s['ad']: s for s in senaryolari_olc(self.kullanici, url_senaryolari(self.kullanici))}
+
+    def test_sorgu_butcesi(self):
+        from avlu_backend.urls import urlpatterns
+
+        kucuk = self._olc(3)
+        buyuk = self._olc(6)
+
+        self.assertEqual(butce_asimlari(buyuk.values(), butceyi_oku()), [])
+        self.assertEqual({ad: s['sorgu'] for ad, s in kucuk.items()},
+                         {ad: s['sorgu'] for ad, s in buyuk.items()})
+
+        senaryo_urlleri = {s['url_adi'] for s in url_senaryolari(self.kullanici)}
+        for url in urlpatterns:
+            if getattr(url, 'name', None):
+                self.assertIn(url.name, senaryo_urlleri)
+
+    def test_sqlite_ayarlari_eszamanli_yazmada_kilit_hatasi_vermez(self):
+        with tempfile.TemporaryDirectory() as klasor:
+            sonuc = eszamanlilik_olc(os.path.join(klasor, 'olcum.sqlite3'), sqlite_ayarlari(),
+                                     okuyucu=2, yazici=3, sure=0.5, personel_sayisi=50, gun_sayisi=10)
+
+        self.assertEqual((sonuc['okuma_hata'], sonuc['yazma_hata']), (0, 0))
+        self.assertGreater(sonuc['yazma'], 0)
+        self.assertGreater(sonuc['okuma'], 0)
+
+
+
+class VeritabaniYedekTest(TestCase):
+    def setUp(self):
+        gecici = tempfile.TemporaryDirectory()
+        self.addCleanup(gecici.cleanup)
+        self.klasor = os.path.join(gecici.name, 'yedekler')
+        self.kaynak = os.path.join(gecici.name, 'kaynak.sqlite3')
+        self.cikti = os.path.join(gecici.name, 'geri.sqlite3')
+
+        with sqlite3.connect(self.kaynak) as db:
+            db.execute('CREATE TABLE kayit (id INTEGER PRIMARY KEY, metin TEXT)')
+            db.executemany('INSERT INTO kayit (metin) VALUES (?)', [(f'satir {i}' * 20,) for i in range(2000)])
+        db.close()
+
+    def _kayitlar(self, yol):
+        with closing(sqlite3.connect(yol)) as db:
+            return db.execute('SELECT id, metin FROM kayit ORDER BY id').fetchall()
+
+    def test_tam_ve_artimli_yedek_geri_yuklenir(self):
+        tam = yedek_al(self.klasor, kaynak=self.kaynak)
+        self.assertEqual(tam.tur, 'tam')
+
+        with closing(sqlite3.connect(self.kaynak)) as db, db:
+            db.execute("UPDATE kayit SET metin = 'degisti' WHERE id = 5")
+            db.execute("INSERT INTO kayit (metin) VALUES ('yeni')")
+        artimli = yedek_al(self.klasor, kaynak=self.kaynak, artimli=True)
+
+        self.assertEqual((artimli.tur, artimli.temel), ('artimli', os.path.basename(tam.yol)))
+        self.assertLess(artimli.degisen_sayfa, artimli.toplam_sayfa // 10)
+        self.assertLess(artimli.boyut, tam.boyut)
+
+        geri_yukle(artimli.yol, self.cikti)
+        self.assertEqual(self._kayitlar(self.cikti), self._kayitlar(self.kaynak))
+        geri_yukle(tam.yol, self.cikti)
+        self.assertEqual(len(self._kayitlar(self.cikti)), 2000)
+
+    def test_eski_yedekler_ve_artimlilari_silinir(self):
+        ilk = yedek_al(self.klasor, kaynak=self.kaynak)
+        ilk_artimli = yedek_al(self.klasor, kaynak=self.kaynak, artimli=True)
+        son = yedek_al(self.klasor, kaynak=self.kaynak)
+
+        silinen = eski_yedekleri_temizle(self.klasor, sakla=1)
+
+        self.assertCountEqual(silinen, [ilk.yol, ilk_artimli.yol])
+        self.assertEqual(sorted(os.listdir(self.klasor)), [os.path.basename(son.yol)])
+
+    @override_settings(EMAIL_HOST_USER='yedek@example.com')
+    def test_komut_yedegi_eposta_ile_gonderir(self):
+        call_command('db_yedekle', '--kaynak', self.kaynak, '--klasor', self.klasor, '--hedef', 'eposta',
+                     stdout=io.StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        ek_adi, icerik, tur = mail.outbox[0].attachments[0]
+        self.assertEqual(ek_adi, os.listdir(self.klasor)[0])
+        self.assertEqual(gzip.decompress(icerik)[:16], b'SQLite format 3\x00')
+
+    @override_settings(YEDEK_EPOSTA_SINIRI=1024)
+    def test_buyuk_yedek_epostaya_eklenmez(self):
+        sonuc = yedek_al(self.klasor, kaynak=self.kaynak)
+        self.assertIn('sınırını', hedeflere_gonder(sonuc, ['eposta'])['eposta'])
+        self.assertEqual(mail.outbox, [])
+
+
+class VeritabaniTasimaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Kaynak şablonu: migrate edilmiş test veritabanının boş kopyası.
+        # TestCase transaction'ı açılmadan alınmalı.
+        cls.gecici = tempfile.TemporaryDirectory()
+        cls.sablon = os.path.join(cls.gecici.name, 'sablon.sqlite3')
+        connection.ensure_connection()
+        with closing(sqlite3.connect(cls.sablon)) as db:
+            connection.connection.backup(db)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.gecici.cleanup()
+
+    def setUp(self):
+        self.kaynak = os.path.join(self.gecici.name, f'{self._testMethodName}.sqlite3')
+        shutil.copyfile(self.sablon, self.kaynak)
+
+        alias = sqlite_kaynagi_ekle(self.kaynak, alias='tasima_testi')
+        try:
+            kullanici = User.objects.db_manager(alias).create_user('eski', password='x')
+            # Hedefte migrate izin id'lerini yeniden üretir; kaynakta farklı id ile
+            izin = Permission.objects.using(alias).get(codename='change_personel')
+            Permission.objects.using(alias).filter(pk=izin.pk).update(id=izin.pk + 1000)
+            grup = Group.objects.using(alias).create(name='Muhasebe')
+            grup.permissions.add(izin.pk + 1000)
+            kullanici.user_permissions.add(izin.pk + 1000)
+            personel = Personel.objects.using(alias).create(
+                ad='Ayşe', soyad='Kaya', tc_no='70000000001', telefon='5550000000',
+                maas_tutari=Decimal('30000.00'), ozel_mesai_ucreti=Decimal('250.00'),
+            )
+            Puantaj.objects.using(alias).bulk_create(
+                Puantaj(personel_id=personel.id, tarih=date(2024, 3, gun), durum='geldi') for gun in range(1, 29)
+            )
+            IslemLog.objects.using(alias).create(kullanici=kullanici, islem_turu='bilgi', konu='Test', detay='-')
+            ArkaPlanIsi.objects.using(alias).create(tur='maas_raporu', parametreler={'yil': 2024, 'ay': 3})
+        finally:
+            sqlite_kaynagini_kaldir(alias)
+
+    def test_tum_tablolar_kopyalanir(self):
+        call_command('migrate_sqlite_to_postgres', '--kaynak', self.kaynak, '--parca', '10', stdout=io.StringIO())
+
+        self.assertEqual(Puantaj.objects.count(), 28)
+        log = IslemLog.objects.select_related('kullanici').get()
+        self.assertEqual(log.kullanici.username, 'eski')
+        self.assertTrue(log.kullanici.check_password('x'))
+        self.assertEqual(ArkaPlanIsi.objects.get().parametreler, {'yil': 2024, 'ay': 3})
+        self.assertEqual(list(log.kullanici.user_permissions.values_list('codename', flat=True)), ['change_personel'])
+        self.assertEqual(list(Group.objects.get(name='Muhasebe').permissions.values_list('codename', flat=True)),
+                         ['change_personel'])
+        # Taşınan id'lerden sonra yeni kayıt çakışmadan eklenebilmeli
+        self.assertGreater(personel_olustur('70000000002').id, Personel.objects.get(tc_no='70000000001').id)
+
+    def test_dolu_hedefe_kopyalamaz(self):
+        personel_olustur('70000000009')
+        with self.assertRaisesMessage(CommandError, 'core.Personel'):
+            call_command('migrate_sqlite_to_postgres', '--kaynak', self.kaynak, stdout=io.StringIO())
+        self.assertEqual(Personel.objects.count(), 1)
+
+    def test_hedefte_olmayan_izin_reddedilir(self):
+        alias = sqlite_kaynagi_ekle(self.kaynak, alias='tasima_testi')
+        try:
+            izin = Permission.objects.using(alias).create(
+                codename='eski_izin', name='Eski izin',
+                content_type=ContentType.objects.db_manager(alias).get_for_model(Personel))
+            User.objects.using(alias).get(username='eski').user_permissions.add(izin)
+        finally:
+            sqlite_kaynagini_kaldir(alias)
+        with self.assertRaisesMessage(CommandError, 'core.eski_izin'):
+            call_command('migrate_sqlite_to_postgres', '--kaynak', self.kaynak, stdout=io.StringIO())
+        self.assertFalse(Personel.objects.exists())
+
+
+@override_settings(CACHES={**settings.CACHES, settings.RAPOR_ONBELLEGI: OLCUM_RAPOR_ONBELLEGI})
+class RaporOnbellegiTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('yonetici', password='x'))
+        self.personel = personel_olustur('80000000001')
+        onbellegi_temizle()
+
+    def _rapor(self, ay=3):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(f'/maas-raporu/?ay={ay}&yil=2024')
+
+    def test_taslak_veri_degisince_gecersiz_olur(self):
+        self.assertEqual(self._rapor()['X-Rapor-Onbellek'], 'iska')
+        self.assertEqual(self._rapor()['X-Rapor-Onbellek'], 'isabet')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            FinansalHareket.objects.create(personel=self.personel, islem_tipi='prim', tutar=Decimal('1234.00'),
+                                           tarih=date(2024, 3, 10))
+        # Başka bir ayın raporu etkilenmez
+        self.assertEqual(self._rapor(ay=4)['X-Rapor-Onbellek'], 'iska')
+        self.assertEqual(self._rapor(ay=4)['X-Rapor-Onbellek'], 'isabet')
+
+        yanit = self._rapor()
+        self.assertEqual(yanit['X-Rapor-Onbellek'], 'iska')
+        self.assertContains(yanit, '+1234.00 TL')
+
+        for degisiklik in (
+            lambda: Personel.objects.filter(id=self.personel.id).get().save(),
+            lambda: TaksitliAvans.objects.create(personel=self.personel, toplam_tutar=Decimal('300'), taksit_sayisi=3),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                degisiklik()
+            self.assertEqual(self._rapor()['X-Rapor-Onbellek'], 'iska')
+
+        self.assertEqual(sayaclar(), {'isabet': 2, 'iska': 5})
+
+    def test_kapali_donem_taksit_degisikliginden_etkilenmez(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            donemi_kapat(2024, 3)
+        self.assertEqual(self._rapor()['X-Rapor-Onbellek'], 'iska')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TaksitliAvans.objects.create(personel=self.personel, tarih=date(2024, 3, 1), toplam_tutar=Decimal('300'),
+                                         taksit_sayisi=3)
+        self.assertEqual(self._rapor()['X-Rapor-Onbellek'], 'isabet')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            donemi_kapat(2024, 3)
+        self.assertEqual(self._rapor()['X-Rapor-Onbellek'], 'iska')
+
+
+
+@override_settings(CACHES={**settings.CACHES, settings.RAPOR_ONBELLEGI: OLCUM_RAPOR_ONBELLEGI})
+class PanoTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('yonetici', password='x'))
+        self.personel = personel_olustur('80000000011')
+        personel_olustur('80000000012')
+        self.bugun = timezone.now().date()
+        onbellegi_temizle()
+
+    def _pano(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get('/')
+
+    def test_metrikler_onbellekten_gelir_ve_yazinca_yenilenir(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Puantaj.objects.create(personel=self.personel, tarih=self.bugun, durum='geldi')
+            FinansalHareket.objects.create(personel=self.personel, islem_tipi='basit_avans', tutar=Decimal('150'),
+                                           tarih=self.bugun)
+            FinansalHareket.objects.create(personel=self.personel, islem_tipi='prim', tutar=Decimal('99'),
+                                           tarih=self.bugun)
+        yanit = self._pano()
+        self.assertEqual(yanit['X-Pano-Onbellek'], 'iska')
+        self.assertEqual((yanit.context['bugun_gelen'], yanit.context['gelmeyen']), (1, 1))
+        self.assertEqual(yanit.context['bu_ay_avans'], Decimal('150'))
+        self.assertEqual(len(yanit.context['yoklama_trendi']), 30)
+        self.assertEqual(yanit.context['yoklama_trendi'][-1]['gelen'], 1)
+        self.assertEqual(len(yanit.context['bordro_trendi']), 12)
+
+        with self.assertNumQueries(2):  # oturum + kullanıcı
+            self.assertEqual(self._pano()['X-Pano-Onbellek'], 'isabet')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Puantaj.objects.create(personel=Personel.objects.get(tc_no='80000000012'), tarih=self.bugun,
+                                   durum='hafta_tatili')
+        yanit = self._pano()
+        self.assertEqual(yanit['X-Pano-Onbellek'], 'iska')
+        self.assertEqual((yanit.context['bugun_gelen'], yanit.context['gelmeyen']), (2, 0))
+
+    def test_bordro_trendi_kapanan_ayi_gosterir(self):
+        donem = self.bugun.replace(day=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            donemi_kapat(donem.year, donem.month)
+        seri = self._pano().context['bordro_trendi']
+        self.assertEqual(seri[-1]['donem'], donem)
+        self.assertEqual(seri[-1]['kisi'], 2)
+        self.assertIsNone(seri[0]['net'])
+
+
+
+class BankaOdemeDosyasiTest(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('yonetici', password='x'))
+        personel_olustur('81000000001', ad='Ayşe', iban='TR33 0006 1005 1978 6457 8413 26', banka_adi='Ziraat Bankası')
+        personel_olustur('81000000002', ad='Cem', iban='TR320010009999901234567890', banka_adi=' ziraat  bankası')
+        personel_olustur('81000000003', ad='Deniz', iban='TR330006100519786457841327', banka_adi='Garanti')
+        personel_olustur('81000000004', ad='Ece', iban='GB82WEST12345698765432', banka_adi='Garanti')
+
+    def _zip(self, **sorgu):
+        yanit = self.client.get('/maas-raporu/banka-odeme/', {'ay': 3, 'yil': 2024, **sorgu})
+        self.assertEqual(yanit['Content-Type'], 'application/zip')
+        zf = zipfile.ZipFile(io.BytesIO(b''.join(yanit.streaming_content)))
+        return {ad: zf.read(ad) for ad in zf.namelist()}
+
+    def test_iban_kontrolu(self):
+        self.assertIsNone(iban_hatasi('tr33 0006 1005 1978 6457 8413 26'))
+        self.assertEqual(iban_hatasi('TR330006100519786457841327'), "IBAN kontrol basamağı hatalı.")
+        self.assertEqual(iban_hatasi('TR3300061005'), "IBAN biçimi geçersiz.")
+        self.assertEqual(iban_hatasi(None), "IBAN girilmemiş.")
+
+    def test_banka_bazinda_dosyalar(self):
+        self.assertRedirects(self.client.get('/maas-raporu/banka-odeme/?ay=3&yil=2024'),
+                             '/maas-raporu/?ay=3&yil=2024', fetch_redirect_response=False)
+        donemi_kapat(2024, 3)
+
+        with self.assertNumQueries(4):  # oturum + kullanıcı + dönem kontrolü + ödeme satırları
+            dosyalar = self._zip()
+        self.assertEqual(sorted(dosyalar), ['garanti_202403.csv', 'hatali_ibanlar.csv', 'ozet.csv',
+                                            'ziraat-bankasi_202403.csv'])
+        ziraat = dosyalar['ziraat-bankasi_202403.csv'].decode('utf-8-sig').splitlines()
+        self.assertEqual(ziraat[0], 'Sıra;Alıcı Adı Soyadı;TC Kimlik No;IBAN;Tutar;Açıklama')
+        # Yazım farkı olan banka adları aynı dosyada toplanır
+        self.assertEqual(len(ziraat), 3)
+        self.assertIn('Ayşe 81000000001;81000000001;TR330006100519786457841326;30000.00;03/2024 MAAS ODEMESI',
+                      [satir.split(';', 1)[1] for satir in ziraat[1:]])
+        self.assertIn('Deniz', dosyalar['hatali_ibanlar.csv'].decode('utf-8-sig'))
+        self.assertIn('TOPLAM;3;90000.00', dosyalar['ozet.csv'].decode('utf-8-sig'))
+
+        with override_settings(BANKA_SABLONLARI={'GARANTİ': 'sabit_genislik'}):
+            garanti = self._zip()['garanti_202403.txt'].decode('ascii').split('\r\n')
+        self.assertEqual(garanti[0][:32], '000001GB82WEST12345698765432    ')
+        self.assertEqual(garanti[0][32:72].rstrip(), 'ECE 81000000004')
+        self.assertEqual(garanti[0][83:98], '000000003000000')
+        self.assertEqual({len(satir) for satir in garanti if satir}, {128})
+
+    def test_sigmayan_satir_ve_bos_banka_dosyasi(self):
+        personel_olustur('81000000005', ad='Bora', iban='TR33 0006 1005 1978 6457 8413 26', banka_adi='Garanti',
+                         maas_tutari=Decimal('100000.00'))
+        personel_olustur('81000000006', ad='Fatma', iban='TR330006100519786457841327', banka_adi='Akbank')
+        donemi_kapat(2024, 3)
+
+        sabit = settings.BANKA_ODEME_SABLONLARI['sabit_genislik']
+        dar = {**sabit, 'alanlar': [a if a[0] != 'tutar_kurus' else ('tutar_kurus', 7, 'sag', '0')
+                                    for a in sabit['alanlar']]}
+        with override_settings(BANKA_ODEME_SABLONLARI={**settings.BANKA_ODEME_SABLONLARI, 'dar': dar},
+                               BANKA_SABLONLARI={'Garanti': 'dar'}):
+            dosyalar = self._zip()
+        # Akbank'ın bütün satırları hatalı: dosyası yazılmaz
+        self.assertEqual(sorted(dosyalar), ['garanti_202403.txt', 'hatali_ibanlar.csv', 'ozet.csv',
+                                            'ziraat-bankasi_202403.csv'])
+        garanti = [satir for satir in dosyalar['garanti_202403.txt'].decode('ascii').split('\r\n') if satir]
+        self.assertEqual([satir[:6] for satir in garanti], ['000001'])
+        self.assertIn('ECE', garanti[0])
+        hatalilar = dosyalar['hatali_ibanlar.csv'].decode('utf-8-sig')
+        self.assertIn("Bora 81000000005;81000000005;Garanti;TR33 0006 1005 1978 6457 8413 26;100000.00;"
+                      "'tutar_kurus' alanı 7 karaktere sığmıyor.", hatalilar)
+        self.assertIn('Fatma', hatalilar)
+        ozet = dosyalar['ozet.csv'].decode('utf-8-sig')
+        self.assertNotIn('AKBANK', ozet)
+        self.assertIn('TOPLAM;3;90000.00', ozet)
+
+
+class DenetimKaydiTest(TestCase):
+    def setUp(self):
+        self.kullanici = User.objects.create_superuser('yonetici', password='x')
+        self.personel = personel_olustur('90000000001')
+        self.klasor = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.klasor)
+        self.tasma = os.path.join(self.klasor, 'tasma.jsonl')
+
+    @override_settings(DENETIM_SENKRON=True)
+    def test_kayit_commit_sonrasi_yazilir(self):
+        islem = FinansalHareket.objects.create(personel=self.personel, islem_tipi='prim', tutar=Decimal('500.00'),
+                                               tarih=date(2024, 3, 10))
+        self.client.force_login(self.kullanici)
+        with self.captureOnCommitCallbacks() as geri_cagrilar:
+            self.client.get(f'/islem-sil/{islem.id}/')
+            # İstek sırasında yazılmaz
+            self.assertFalse(IslemLog.objects.exists())
+        for geri_cagri in geri_cagrilar:
+            geri_cagri()
+
+        log = IslemLog.objects.get()
+        self.assertEqual((log.kullanici, log.islem_turu, log.ilgili_personel), (self.kullanici, 'silme', self.personel))
+
+    def test_kuyruk_toplu_yazar_ve_zamani_korur(self):
+        kuyruk = DenetimKuyrugu()
+        kuyruk._baslat = lambda: None  # thread yerine elle boşaltılır
+        with mock.patch('core.denetim._kuyruk', kuyruk), self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                denetim_kaydi(self.kullanici, 'bilgi', 'Test', f'kayıt {i}', self.personel)
+        zaman = kuyruk._kuyruk.queue[0]['tarih']
+        self.assertFalse(IslemLog.objects.exists())
+
+        with self.assertNumQueries(3):  # personel + kullanıcı kontrolü, tek INSERT
+            self.assertEqual(kuyruk.bosalt(), 5)
+        self.assertEqual(IslemLog.objects.count(), 5)
+        self.assertEqual(IslemLog.objects.order_by('id').first().tarih, zaman)
+
+    def test_veritabani_hatasinda_tasma_dosyasina_yazar(self):
+        kuyruk = DenetimKuyrugu()
+        kuyruk._baslat = lambda: None
+        kayit_ekle = lambda d: denetim_kaydi(self.kullanici, 'bilgi', 'Test', d)
+        with override_settings(DENETIM_TASMA_DOSYASI=self.tasma), mock.patch('core.denetim._kuyruk', kuyruk):
+            with self.captureOnCommitCallbacks(execute=True):
+                kayit_ekle('ilk')
+                kayit_ekle('ikinci')
+            with mock.patch('core.denetim.IslemLog.objects.bulk_create', side_effect=RuntimeError('kilit')), \
+                    self.assertLogs('core.denetim', 'ERROR'):
+                kuyruk.bosalt()
+            self.assertFalse(IslemLog.objects.exists())
+            with open(self.tasma) as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+            # Sonraki başarılı yazma taşma dosyasını da aktarır
+            with self.captureOnCommitCallbacks(execute=True):
+                kayit_ekle('üçüncü')
+            kuyruk.bosalt()
+            self.assertFalse(os.path.exists(self.tasma))
+            self.assertEqual(sorted(IslemLog.objects.values_list('detay', flat=True)), ['ikinci', 'ilk', 'üçüncü'])
+            self.assertEqual(tasmayi_yukle(), 0)
+
+
+class IslemGecmisiTest(TestCase):
+    def setUp(self):
+        self.kullanici = User.objects.create_superuser('yonetici', password='x')
+        self.personel = personel_olustur('91000000001', ad='Ayşe')
+        zaman = timezone.make_aware(datetime(2024, 3, 10, 12, 0))
+        detaylar = ['Avans ödemesi yapıldı', 'Prim eklendi', 'Kasa açığı silindi', 'Avans iptal',
+                    'Bordro kesildi', 'Prim düzeltildi', 'Mesai güncellendi']
+        # Aynı zamanlı kayıtlar sıralamada id ile ayrılır
+        self.loglar = [
+            IslemLog.objects.create(kullanici=self.kullanici, islem_turu='ekleme', konu='Test', detay=detay,
+                                    ilgili_personel=self.personel if i % 2 == 0 else None,
+                                    tarih=zaman + timedelta(minutes=i // 2))
+            for i, detay in enumerate(detaylar)
+        ]
+
+    def test_keyset_sayfalama(self):
+        beklenen = sorted(self.loglar, key=lambda l: (l.tarih, l.id), reverse=True)
+        gorulen, sonra, sayfalar = [], None, []
+        while True:
+            sayfa = sayfa_getir(IslemLog.objects.all(), sonra=sonra, boyut=3)
+            sayfalar.append(sayfa)
+            gorulen += sayfa['kayitlar']
+            sonra = sayfa['sonraki']
+            if not sonra:
+                break
+        self.assertEqual(gorulen, beklenen)
+        self.assertEqual([len(s['kayitlar']) for s in sayfalar], [3, 3, 1])
+        self.assertIsNone(sayfalar[0]['onceki'])
+
+        # Geri dönüş aynı sayfaları verir
+        geri = sayfa_getir(IslemLog.objects.all(), once=sayfalar[2]['onceki'], boyut=3)
+        self.assertEqual(geri['kayitlar'], sayfalar[1]['kayitlar'])
+        geri = sayfa_getir(IslemLog.objects.all(), once=geri['onceki'], boyut=3)
+        self.assertEqual((geri['kayitlar'], geri['onceki']), (sayfalar[0]['kayitlar'], None))
+
+        with self.assertNumQueries(1):
+            sayfa_getir(IslemLog.objects.all(), sonra=imlec(beklenen[2]), boyut=3)
+
+    def test_metin_arama_ve_filtreler(self):
+        def ara(**parametreler):
+            return set(islem_gecmisi_sorgusu(parametreler)[0].values_list('detay', flat=True))
+
+        self.assertEqual(ara(q='avans'), {'Avans ödemesi yapıldı', 'Avans iptal'})
+        self.assertEqual(ara(q='avans', personel=str(self.personel.id)), {'Avans ödemesi yapıldı'})
+        self.assertEqual(ara(q='"; DROP'), set())
+        self.assertEqual(len(ara(baslangic='2024-03-10', bitis='2024-03-10', tur='ekleme')), 7)
+        self.assertEqual(ara(bitis='2024-03-09'), set())
+
+        # Dizin güncelleme ve silmeyi izler
+        self.loglar[1].detay = 'Yemek kartı'
+        self.loglar[1].save()
+        self.loglar[3].delete()
+        self.assertEqual(ara(q='prim'), {'Prim düzeltildi'})
+        self.assertEqual(ara(q='yemek'), {'Yemek kartı'})
+        self.assertEqual(ara(q='avans'), {'Avans ödemesi yapıldı'})
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 ve EXPLAIN QUERY PLAN SQLite\'a özgü')
+    def test_sorgu_plani(self):
+        self.assertIn(FTS_TABLOSU, connection.introspection.table_names())
+        qs, _ = islem_gecmisi_sorgusu({'q': 'avans'})
+        self.assertIn('VIRTUAL TABLE INDEX', qs.explain())
+        self.assertNotIn('LIKE', str(qs.query))
+        # Önek ve aksansız eşleşme (unicode61 remove_diacritics)
+        self.assertEqual(list(islem_gecmisi_sorgusu({'q': 'odeme'})[0].values_list('detay', flat=True)),
+                         ['Avans ödemesi yapıldı'])
+
+        for parametreler, indeks in (({}, 'islemlog_tarih_idx'),
+                                     ({'kullanici': str(self.kullanici.id)}, 'islemlog_kullanici_tarih_idx')):
+            qs, _ = islem_gecmisi_sorgusu(parametreler)
+            plan = qs.filter(tarih__lt=self.loglar[3].tarih).order_by('-tarih', '-id')[:51].explain()
+            self.assertIn(f'INDEX {indeks}', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_gorunum_ve_disa_aktarim(self):
+        self.client.force_login(self.kullanici)
+        yanit = self.client.get('/islem-gecmisi/', {'q': 'avans'})
+        self.assertContains(yanit, 'Avans iptal')
+        self.assertNotContains(yanit, 'Prim eklendi')
+
+        yanit = self.client.get('/islem-gecmisi/indir/', {'q': 'avans'})
+        icerik = b''.join(yanit.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(icerik[0], 'Tarih;Kullanıcı;İşlem Türü;Konu;İlgili Personel;Detay')
+        self.assertEqual(len(icerik), 3)
+        self.assertIn('Ayşe', icerik[2])
+
+        yanit = self.client.get('/islem-gecmisi/indir/', {'bicim': 'xlsx'})
+        sayfa = load_workbook(io.BytesIO(b''.join(yanit.streaming_content))).active
+        self.assertEqual(sayfa.max_row, 8)
+
+        self.client.force_login(User.objects.create_user('personel', password='x'))
+        self.assertEqual(self.client.get('/islem-gecmisi/').status_code, 403)
+
+
+class ArsivTest(TestCase):
+    databases = {'default', 'arsiv'}
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('yonetici', password='x'))
+        self.personel = personel_olustur('92000000001', ad='Ayşe')
+        Puantaj.objects.bulk_create(
+            Puantaj(personel=self.personel, tarih=date(2024, 3, gun), durum='geldi',
+                    giris_saati=time(8, 0), cikis_saati=time(19, 0), hesaplanan_mesai_saati=Decimal('2.00'))
+            for gun in range(1, 21)
+        )
+        Puantaj.objects.create(personel=self.personel, tarih=date(2024, 4, 1), durum='geldi')
+        ozetleri_yenile([(self.personel.id, date(2024, 3, 1)), (self.personel.id, date(2024, 4, 1))])
+        donemi_kapat(2024, 3)
+        self.ozet = AylikOzet.objects.get(personel=self.personel, donem=date(2024, 3, 1))
+
+    def test_donem_arsivlenir_ve_okunur(self):
+        self.assertEqual(donemi_arsivle(date(2024, 3, 1)), 20)
+
+        self.assertFalse(Puantaj.objects.filter(tarih__month=3).exists())
+        self.assertEqual(ArsivPuantaj.objects.count(), 20)
+        self.assertEqual(Puantaj.objects.count(), 1)
+        self.assertEqual(ArsivDonemi.objects.get().puantaj_sayisi, 20)
+        ozet = AylikOzet.objects.get(personel=self.personel, donem=date(2024, 3, 1))
+        self.assertEqual((ozet.calistigi_gun, ozet.toplam_mesai), (self.ozet.calistigi_gun, self.ozet.toplam_mesai))
+        self.assertEqual(ozetleri_dogrula(onar=False), {'eksik': 0, 'hatali': 0, 'fazla': 0})
+        self.assertEqual(donem_puantajlari(2024, 3).count(), 20)
+
+        # Arşivlenmiş döneme hareket eklenince özet ham kayıtlardan (arşivden) yeniden hesaplanır
+        FinansalHareket.objects.create(personel=self.personel, islem_tipi='prim', tutar=Decimal('100.00'),
+                                       tarih=date(2024, 3, 5))
+        ozet = AylikOzet.objects.get(personel=self.personel, donem=date(2024, 3, 1))
+        self.assertEqual((ozet.calistigi_gun, ozet.toplam_prim), (20, Decimal('100.00')))
+
+        yanit = self.client.get('/giris-cikis-raporu/', {'yil': 2024, 'ay': 3, 'personel_id': self.personel.id})
+        self.assertEqual(len(yanit.context['kayitlar']), 20)
+        self.assertContains(yanit, 'Ayşe')
+
+        yanit = self.client.get('/giris-cikis-raporu-indir/', {'baslangic': '2024-03-15', 'bitis': '2024-04-30'})
+        sayfa = load_workbook(io.BytesIO(b''.join(yanit.streaming_content))).active
+        tarihler = [satir[0] for satir in sayfa.iter_rows(min_row=2, values_only=True) if satir[0]]
+        self.assertEqual(tarihler[:6], ['15.03.2024', '16.03.2024', '17.03.2024', '18.03.2024',
+                                        '19.03.2024', '20.03.2024'])
+        self.assertIn('01.04.2024', tarihler)
+
+    def test_arsivlenmis_doneme_yazilamaz(self):
+        donemi_arsivle(date(2024, 3, 1))
+        yanit = self.client.post(f'/personel/{self.personel.id}/toplu-puantaj/?ay=3&yil=2024',
+                                 {'durum_2024-03-21': 'geldi'})
+        self.assertEqual(yanit.status_code, 302)
+        self.assertFalse(Puantaj.objects.filter(tarih=date(2024, 3, 21)).exists())
+
+        # Geri alınınca dönem asıl tabloya döner
+        self.assertEqual(donemi_geri_al(date(2024, 3, 1)), 20)
+        self.assertEqual(Puantaj.objects.filter(tarih__month=3).count(), 20)
+        self.assertFalse(ArsivPuantaj.objects.exists())
+        self.assertFalse(ArsivDonemi.objects.exists())
+
+    def test_kapanmamis_donem_arsivlenmez(self):
+        with self.assertRaises(ValueError):
+            donemi_arsivle(date(2024, 4, 1))
+        with self.assertRaises(ValueError):
+            donemi_arsivle(timezone.localdate())
+        self.assertEqual(Puantaj.objects.count(), 21)
+
+    def test_log_arsivi_ve_saklama(self):
+        eski = IslemLog.objects.create(islem_turu='bilgi', konu='Eski', detay='-',
+                                       tarih=timezone.now() - timedelta(days=400))
+        IslemLog.objects.create(islem_turu='bilgi', konu='Yeni', detay='-')
+        self.assertEqual(loglari_arsivle(gun=180), 1)
+        self.assertEqual(list(IslemLog.objects.values_list('konu', flat=True)), ['Yeni'])
+        self.assertEqual(ArsivIslemLog.objects.get().id, eski.id)
+
+        donemi_arsivle(date(2024, 3, 1))
+        self.assertEqual(arsivi_temizle(yil=0), {'puantaj': 0, 'log': 0})
+        self.assertEqual(arsivi_temizle(yil=1), {'puantaj': 20, 'log': 1})
+
+    def test_arsiv_tablolari_ayri_veritabaninda(self):
+        self.assertNotIn('core_arsivpuantaj', connection.introspection.table_names())
+        self.assertIn('core_arsivpuantaj', connections['arsiv'].introspection.table_names())
+        self.assertNotIn('core_personel', connections['arsiv'].introspection.table_names())
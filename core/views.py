@@ -1,5 +1,6 @@
 import os
 import hmac
+import mimetypes
 import hashlib
 from typing import Optional
 
@@ -10,20 +11,42 @@ except ImportError:
 
 from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.safestring import mark_safe
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
 from django.utils import timezone
-from django.db.models import Sum, Q, Prefetch
-from django.http import HttpResponse, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, FileResponse, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
-from .models import Personel, Puantaj, FinansalHareket, TaksitliAvans, MaasBordrosu, IslemLog
+from .models import Personel, Puantaj, FinansalHareket, MaasBordrosu, ArkaPlanIsi, IslemLog
 from .forms import PuantajForm, FinansalIslemForm, TaksitliAvansForm
-
-from datetime import datetime
+from .bordro import donem_hesapla, donemler_hesapla, yillik_toplamlar
+from .donem import donem_filtresi
+from .yoklama import yoklama_satiri, puantajlari_kaydet
+from .disa_aktar import (
+    csv_yanit, xlsx_yanit, XLSX_CONTENT_TYPE,
+    MAAS_GECMISI_BASLIKLARI, YILLIK_TOPLAM_BASLIKLARI, maas_gecmisi_satirlari, yillik_toplam_satirlari,
+)
+from .isler import is_kuyruga_ekle, is_klasoru, yeni_dosya_yolu
+from .onbellek import rapor_getir
+from .pano import pano_metrikleri
+from .banka import odeme_dosyasi_parcalari
+from .pusula import (
+    BICIMLER as PUSULA_BICIMLERI, HTML_CONTENT_TYPE, ZIP_CONTENT_TYPE,
+    pusula_sayisi, pusula_zip_parcalari, pusulalari_hesapla, toplu_pusula_parcalari,
+)
+from .arsiv import aralik_puantajlari, donem_arsivde_mi, donem_puantajlari, personelli
+from .denetim import denetim_kaydi
+from .senkron import AZAMI_ISLEM, POLITIKALAR, islemleri_uygula
+from .denetim_arama import DISA_AKTARIM_BASLIKLARI, disa_aktarim_satirlari, islem_gecmisi_sorgusu, sayfa_getir
+
+from datetime import datetime, timedelta
 import calendar
-import pandas as pd
-import io
+import heapq
+import json
 
 # --- YARDIMCI FONKSİYONLAR ---
 
@@ -74,145 +97,30 @@ def update_server(request):
 
 def _log_kaydet(request, tur, konu, detay, personel=None):
     """
-    Sistemdeki önemli işlemleri veritabanına log olarak kaydeder.
+    Sistemdeki önemli işlemleri denetim kaydına (IslemLog) ekler.
+    Yazma arka planda toplu yapılır; istek veritabanını beklemez (core/denetim.py).
     """
     if request.user.is_authenticated:
-        try:
-            IslemLog.objects.create(
-                kullanici=request.user,
-                islem_turu=tur,
-                konu=konu,
-                detay=detay,
-                ilgili_personel=personel
-            )
-        except Exception as e:
-            print(f"Log kaydı hatası: {e}")
+        denetim_kaydi(request.user, tur, konu, detay, personel)
 
 def _maas_verilerini_hesapla(yil, ay):
     """
     Verilen yıl ve ay için maaş verilerini getirir.
-    Önce MaasBordrosu tablosuna bakar (Sabitlenmiş mi?),
-    Yoksa canlı hesaplama yapar.
+    Hesap motoru: core/bordro.py (Kayıtlı bordro varsa onu, yoksa canlı hesabı döner).
 
     Dönüş: (bordro_var_mi, rapor_listesi)
     """
-    # 1. Önce veritabanında kesinleşmiş bordro var mı diye bak
-    kayitli_bordrolar = MaasBordrosu.objects.filter(donem__year=yil, donem__month=ay).select_related('personel')
-
-    if kayitli_bordrolar.exists():
-        # --- KAYITLI VERİDEN OKUMA (SNAPSHOT) ---
-        rapor_listesi = []
-        for b in kayitli_bordrolar:
-            # Geriye dönük ana hakediş tahmini (Gösterim tutarlılığı için)
-            ana_hakedis_tahmini = float(b.net_odenecek) + float(b.toplam_kesinti) - float(b.toplam_prim) - float(b.mesai_ucreti)
-
-            rapor_listesi.append({
-                'personel': b.personel,
-                'calistigi_gun': b.calistigi_gun,
-                'gelmedigi_gun': b.gelmedigi_gun,
-                'ana_hakedis': ana_hakedis_tahmini,
-                'toplam_mesai': float(b.mesai_saati),
-                'mesai_ucreti': float(b.mesai_ucreti),
-                'toplam_prim': float(b.toplam_prim),
-                'toplam_kesinti': float(b.toplam_kesinti),
-                'net_maas': float(b.net_odenecek),
-                'durum': 'kesinlesmis'
-            })
-        return True, rapor_listesi
-
-    else:
-        # --- CANLI HESAPLAMA (LIVE CALCULATION) ---
-        puantaj_query = Puantaj.objects.filter(tarih__year=yil, tarih__month=ay)
-        hareket_query = FinansalHareket.objects.filter(tarih__year=yil, tarih__month=ay)
-        taksit_query = TaksitliAvans.objects.filter(tamamlandi=False)
-
-        personeller = Personel.objects.filter(aktif_mi=True).prefetch_related(
-            Prefetch('puantajlar', queryset=puantaj_query, to_attr='aylik_puantajlar'),
-            Prefetch('finansal_hareketler', queryset=hareket_query, to_attr='aylik_hareketler'),
-            Prefetch('taksitli_avanslar', queryset=taksit_query, to_attr='aktif_taksitler')
-        )
-
-        rapor_listesi = []
-        for p in personeller:
-            # Puantaj
-            calistigi_gun = 0
-            gelmedigi_gun = 0
-            toplam_mesai = 0.0
-
-            for pt in p.aylik_puantajlar:
-                if pt.durum in ['geldi', 'hafta_tatili']:
-                    calistigi_gun += 1
-                elif pt.durum in ['gelmedi', 'ucretsiz_izin']:
-                    gelmedigi_gun += 1
-                toplam_mesai += float(pt.hesaplanan_mesai_saati)
-
-            mesai_ucreti = toplam_mesai * float(p.ozel_mesai_ucreti)
-
-            # Ana Hakediş
-            ana_hakedis = 0
-            if p.calisma_tipi == 'aylik':
-                gunluk_maliyet = float(p.maas_tutari) / 30
-                maas_kesintisi = gunluk_maliyet * gelmedigi_gun
-                ana_hakedis = float(p.maas_tutari) - maas_kesintisi
-            else:
-                ana_hakedis = float(p.maas_tutari) * calistigi_gun
-
-            # Finansal Hareketler
-            toplam_prim = 0.0
-            diger_kesintiler = 0.0
-            for h in p.aylik_hareketler:
-                if h.islem_tipi == 'prim':
-                    toplam_prim += float(h.tutar)
-                else:
-                    diger_kesintiler += float(h.tutar)
-
-            # Taksitler
-            taksit_kesintisi = sum(float(t.aylik_kesinti) for t in p.aktif_taksitler)
-
-            toplam_kesinti = diger_kesintiler + taksit_kesintisi
-            net_maas = ana_hakedis + mesai_ucreti + toplam_prim - toplam_kesinti
-
-            rapor_listesi.append({
-                'personel': p,
-                'calistigi_gun': calistigi_gun,
-                'gelmedigi_gun': gelmedigi_gun,
-                'ana_hakedis': ana_hakedis,
-                'toplam_mesai': toplam_mesai,
-                'mesai_ucreti': mesai_ucreti,
-                'toplam_prim': toplam_prim,
-                'toplam_kesinti': toplam_kesinti,
-                'net_maas': net_maas,
-                'durum': 'taslak'
-            })
-
-        return False, rapor_listesi
+    return donem_hesapla(yil, ay)
 
 # --- VIEW FONKSİYONLARI ---
 
 @login_required
 def ana_sayfa(request):
     bugun = timezone.now().date()
-
-    toplam_personel = Personel.objects.filter(aktif_mi=True).count()
-    bugun_gelen = Puantaj.objects.filter(tarih=bugun, durum__in=['geldi', 'hafta_tatili']).count()
-    gelmeyen = toplam_personel - bugun_gelen
-
-    bu_ay_avans = FinansalHareket.objects.filter(
-        tarih__year=bugun.year,
-        tarih__month=bugun.month,
-        islem_tipi__in=['basit_avans', 'kasa_acigi', 'alisveris']
-    ).aggregate(Sum('tutar'))['tutar__sum'] or 0
-
-    son_hareketler = FinansalHareket.objects.select_related('personel').order_by('-id')[:5]
-
-    return render(request, 'core/ana_sayfa.html', {
-        'toplam_personel': toplam_personel,
-        'bugun_gelen': bugun_gelen,
-        'gelmeyen': gelmeyen,
-        'bu_ay_avans': bu_ay_avans,
-        'son_hareketler': son_hareketler,
-        'bugun': bugun,
-    })
+    metrikler, isabet = pano_metrikleri(bugun)
+    yanit = render(request, 'core/ana_sayfa.html', {**metrikler, 'bugun': bugun})
+    yanit['X-Pano-Onbellek'] = 'isabet' if isabet else 'iska'
+    return yanit
 
 @login_required
 def personel_listesi(request):
@@ -262,10 +170,7 @@ def personel_detay(request, personel_id):
         finans_form = FinansalIslemForm(initial={'personel': personel})
 
     # 4. VERİLERİ SADECE O AY İÇİN ÇEK (FİLTRELEME)
-    hareketler = personel.finansal_hareketler.filter(
-        tarih__year=yil,
-        tarih__month=ay
-    ).order_by('-tarih')
+    hareketler = personel.finansal_hareketler.filter(donem_filtresi(yil, ay)).order_by('-tarih')
 
     # Avanslar genelde uzun vadeli olduğu için hepsi görünebilir veya filtrelenebilir.
     avanslar = personel.taksitli_avanslar.all()
@@ -291,9 +196,8 @@ def finansal_hareket_sil(request, islem_id):
 
     # --- GÜVENLİK: BORDRO KONTROLÜ ---
     if MaasBordrosu.objects.filter(
+        donem_filtresi(islem.tarih.year, islem.tarih.month, 'donem'),
         personel=personel,
-        donem__year=islem.tarih.year,
-        donem__month=islem.tarih.month
     ).exists():
         messages.error(request, f"⛔ HATA: {islem.tarih.strftime('%B %Y')} dönemi kapatıldığı için bu işlem silinemez!")
         return redirect('personel_detay', personel_id=personel.id)
@@ -307,6 +211,35 @@ def finansal_hareket_sil(request, islem_id):
     messages.success(request, 'İşlem başarıyla silindi.')
     return redirect('personel_detay', personel_id=personel.id)
 
+def _yoklama_kayitlari(veri, personel_ids, kayit_tarihi):
+    """
+    Yoklama formundaki (durum_<id>, giris_saati_<id>, cikis_saati_<id>) satırları okur.
+    Durumu seçilmemiş satırlar atlanır.
+    Dönüş: (secilenler {id: Personel}, kayitlar, hatalar {personel_id: mesaj})
+    """
+    secilenler = Personel.objects.in_bulk([pid for pid in personel_ids if str(pid).isdigit()])
+
+    kayitlar = []
+    hatalar = {}
+    for pid in personel_ids:
+        personel = secilenler.get(int(pid)) if str(pid).isdigit() else None
+        if personel is None:
+            hatalar[pid] = f"Personel bulunamadı ({pid})"
+            continue
+
+        durum = (veri.get(f'durum_{pid}') or '').strip()
+        # Durum seçilmediyse kayıt yapma
+        if not durum:
+            continue
+
+        try:
+            kayitlar.append(yoklama_satiri(
+                personel.id, kayit_tarihi, durum, veri.get(f'giris_saati_{pid}'), veri.get(f'cikis_saati_{pid}')
+            ))
+        except ValueError as e:
+            hatalar[pid] = f"{personel.ad} {personel.soyad}: {e}"
+    return secilenler, kayitlar, hatalar
+
 def yoklama_al(request):
     secilen_tarih_str = request.GET.get('tarih')
     if secilen_tarih_str:
@@ -320,23 +253,7 @@ def yoklama_al(request):
 
     personeller = Personel.objects.filter(aktif_mi=True)
 
-    def _parse_hhmm(value: str):
-        """'HH:MM' -> datetime.time. Boş/None gelirse None döner."""
-        if not value:
-            return None
-        value = value.strip()
-        # Kullanıcı '0900' gibi girerse '09:00' yap
-        only_digits = ''.join(ch for ch in value if ch.isdigit())
-        if len(only_digits) == 4 and ':' not in value:
-            value = only_digits[:2] + ':' + only_digits[2:]
-        return datetime.strptime(value, '%H:%M').time()
-
     if request.method == 'POST':
-        personel_id = request.POST.get('personel_id')
-        durum = (request.POST.get('durum') or '').strip()
-        giris_raw = (request.POST.get('giris_saati') or '').strip()
-        cikis_raw = (request.POST.get('cikis_saati') or '').strip()
-
         kayit_tarihi_str = request.POST.get('kayit_tarihi') or ''
         try:
             kayit_tarihi = datetime.strptime(kayit_tarihi_str, '%Y-%m-%d').date()
@@ -344,51 +261,39 @@ def yoklama_al(request):
             messages.error(request, "Kayıt tarihi okunamadı. Lütfen tekrar deneyin.")
             return redirect(f'/yoklama/?tarih={secilen_tarih}')
 
-        if not personel_id:
-            messages.error(request, "Personel seçimi bulunamadı.")
+        if donem_arsivde_mi(kayit_tarihi.year, kayit_tarihi.month):
+            messages.error(request, f"⛔ {kayit_tarihi.strftime('%m.%Y')} dönemi arşivlendiği için yoklama değiştirilemez.")
             return redirect(f'/yoklama/?tarih={kayit_tarihi}')
 
-        personel = get_object_or_404(Personel, id=personel_id)
-
-        # Durum seçilmediyse kayıt yapma
-        if not durum:
-            messages.warning(request, f"{personel.ad} için durum seçilmedi. Kayıt yapılmadı.")
+        # Tek satır kaydı ('tek_kayit' butonu) veya tüm günün kaydı ('Tümünü Kaydet')
+        tek_kayit = request.POST.get('tek_kayit')
+        personel_ids = [tek_kayit] if tek_kayit else request.POST.getlist('personel_id')
+        if not personel_ids:
+            messages.error(request, "Personel seçimi bulunamadı.")
             return redirect(f'/yoklama/?tarih={kayit_tarihi}')
 
-        puantaj, _created = Puantaj.objects.get_or_create(
-            personel=personel,
-            tarih=kayit_tarihi
-        )
-        puantaj.durum = durum
+        secilenler, kayitlar, hatalar = _yoklama_kayitlari(request.POST, personel_ids, kayit_tarihi)
+        if tek_kayit and not kayitlar and not hatalar:
+            personel = secilenler[int(tek_kayit)]
+            messages.warning(request, f"{personel.ad} için durum seçilmedi. Kayıt yapılmadı.")
+        hatalar = list(hatalar.values())
 
-        # Saatler sadece belirli durumlarda aktif olsun
-        saat_gerekli = durum in ('geldi', 'hafta_tatili')
+        puantajlari_kaydet(kayitlar)
 
-        if saat_gerekli:
-            try:
-                giris = _parse_hhmm(giris_raw)
-                cikis = _parse_hhmm(cikis_raw)
-            except ValueError:
-                messages.error(request, "Saat formatı hatalı. Örn: 09:00")
-                return redirect(f'/yoklama/?tarih={kayit_tarihi}')
-
-            # Basit mantık kontrolü
-            if giris and cikis and cikis <= giris:
-                messages.error(request, "Çıkış saati, giriş saatinden sonra olmalıdır.")
-                return redirect(f'/yoklama/?tarih={kayit_tarihi}')
-
-            puantaj.giris_saati = giris
-            puantaj.cikis_saati = cikis
-        else:
-            puantaj.giris_saati = None
-            puantaj.cikis_saati = None
-
-        puantaj.save()
-
-        messages.success(request, f'{personel.ad} için {kayit_tarihi.strftime("%d/%m/%Y")} yoklaması kaydedildi.')
+        for hata in hatalar:
+            messages.error(request, hata)
+        if kayitlar:
+            if tek_kayit:
+                personel = secilenler[int(tek_kayit)]
+                messages.success(request, f'{personel.ad} için {kayit_tarihi.strftime("%d/%m/%Y")} yoklaması kaydedildi.')
+            else:
+                messages.success(request, f'{len(kayitlar)} personel için {kayit_tarihi.strftime("%d/%m/%Y")} yoklaması kaydedildi.')
         return redirect(f'/yoklama/?tarih={kayit_tarihi}')
 
-    gunun_kayitlari = {p.personel_id: p for p in Puantaj.objects.filter(tarih=secilen_tarih)}
+    gunun_kayitlari = {
+        p.personel_id: p
+        for p in donem_puantajlari(secilen_tarih.year, secilen_tarih.month).filter(tarih=secilen_tarih)
+    }
 
     list_data = []
     for p in personeller:
@@ -400,6 +305,90 @@ def yoklama_al(request):
         'secilen_tarih': secilen_tarih
     })
 
+@login_required
+def yoklama_kaydet(request):
+    """
+    Yoklama ekranının sayfa yenilemeden kaydı: sadece değişen satırlar gönderilir
+    (yoklama_al formuyla aynı alanlar), tek transaction'da yazılır ve yanıtta
+    yalnızca kaydedilen satırların HTML'i döner. Maliyet değişen satır sayısıyla orantılıdır.
+    Dönüş: {'kaydedilen', 'satirlar': {personel_id: html}, 'hatalar': {personel_id: mesaj}}
+    """
+    if request.method != 'POST':
+        return redirect('yoklama_al')
+
+    try:
+        kayit_tarihi = datetime.strptime(request.POST.get('kayit_tarihi') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return JsonResponse({'hata': "Kayıt tarihi okunamadı. Lütfen sayfayı yenileyin."}, status=400)
+    if donem_arsivde_mi(kayit_tarihi.year, kayit_tarihi.month):
+        return JsonResponse(
+            {'hata': f"{kayit_tarihi.strftime('%m.%Y')} dönemi arşivlendiği için yoklama değiştirilemez."}, status=400
+        )
+
+    secilenler, kayitlar, hatalar = _yoklama_kayitlari(request.POST, request.POST.getlist('personel_id'), kayit_tarihi)
+    puantajlari_kaydet(kayitlar)
+
+    kaydedilenler = Puantaj.objects.filter(
+        tarih=kayit_tarihi, personel_id__in=[k['personel_id'] for k in kayitlar]
+    ) if kayitlar else []
+    satirlar = {
+        kayit.personel_id: render_to_string('core/yoklama_satiri.html', {
+            'item': {'personel': secilenler[kayit.personel_id], 'kayit': kayit},
+        }, request=request)
+        for kayit in kaydedilenler
+    }
+    return JsonResponse({'kaydedilen': len(satirlar), 'satirlar': satirlar, 'hatalar': hatalar})
+
+@login_required
+def yoklama_cevrimdisi(request):
+    """
+    Bağlantısı zayıf yerler için yoklama ekranı: değişiklikler tarayıcıda kuyruğa
+    alınır ve bağlantı gelince yoklama_senkron'a toplu gönderilir. Sayfa servis
+    çalışanı (yoklama_servis_calisani) ile önbelleğe alınır, çevrimdışı da açılır.
+    """
+    try:
+        secilen_tarih = datetime.strptime(request.GET.get('tarih') or '', '%Y-%m-%d').date()
+    except ValueError:
+        secilen_tarih = timezone.now().date()
+
+    gunun_kayitlari = {
+        p.personel_id: p
+        for p in donem_puantajlari(secilen_tarih.year, secilen_tarih.month).filter(tarih=secilen_tarih)
+    }
+    return render(request, 'core/yoklama_cevrimdisi.html', {
+        'list_data': [{'personel': p, 'kayit': gunun_kayitlari.get(p.id)} for p in Personel.objects.filter(aktif_mi=True)],
+        'secilen_tarih': secilen_tarih,
+        'azami_islem': AZAMI_ISLEM,
+    })
+
+def yoklama_servis_calisani(request):
+    """Çevrimdışı yoklama sayfasının servis çalışanı; kapsamı /yoklama/ olsun diye buradan sunulur."""
+    return render(request, 'core/yoklama_sw.js', content_type='application/javascript')
+
+@login_required
+def yoklama_senkron(request):
+    """
+    Çevrimdışı kuyruktan gelen yoklama işlemlerini toplu ve tekrar-güvenli uygular (core/senkron.py).
+    Gövde (JSON): {'politika': 'son_yazan' | 'reddet', 'islemler': [...]}
+    Dönüş: {'sonuclar': [...]} (işlem sırasıyla)
+    """
+    if request.method != 'POST':
+        return JsonResponse({'hata': "Sadece POST isteği kabul edilir."}, status=405)
+    try:
+        govde = json.loads(request.body)
+        islemler = govde['islemler']
+        politika = govde.get('politika') or 'son_yazan'
+        if not isinstance(islemler, list) or politika not in POLITIKALAR:
+            raise ValueError
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'hata': "İstek gövdesi okunamadı."}, status=400)
+
+    try:
+        sonuclar = islemleri_uygula(islemler, request.user, politika)
+    except ValueError as e:
+        return JsonResponse({'hata': str(e)}, status=400)
+    return JsonResponse({'sonuclar': sonuclar})
+
 @login_required
 def toplu_puantaj(request, personel_id):
     personel = get_object_or_404(Personel, id=personel_id)
@@ -415,9 +404,15 @@ def toplu_puantaj(request, personel_id):
     _, son_gun = calendar.monthrange(yil, ay)
 
     if request.method == 'POST':
+        if donem_arsivde_mi(yil, ay):
+            messages.error(request, f"⛔ {ay}/{yil} dönemi arşivlendiği için puantaj değiştirilemez.")
+            return redirect(f'/personel/{personel.id}/toplu-puantaj/?ay={ay}&yil={yil}')
+
+        kayitlar = []
+        hatalar = []
         for day in range(1, son_gun + 1):
             tarih_str = f"{yil}-{ay:02d}-{day:02d}"
-            tarih_obj = datetime.strptime(tarih_str, '%Y-%m-%d').date()
+            tarih_obj = datetime(yil, ay, day).date()
 
             durum = request.POST.get(f'durum_{tarih_str}')
             giris = request.POST.get(f'giris_{tarih_str}')
@@ -425,21 +420,23 @@ def toplu_puantaj(request, personel_id):
 
             if not durum: continue
 
-            puantaj, created = Puantaj.objects.get_or_create(
-                personel=personel,
-                tarih=tarih_obj
-            )
-            puantaj.durum = durum
-            puantaj.giris_saati = giris if giris else None
-            puantaj.cikis_saati = cikis if cikis else None
-            puantaj.save()
+            try:
+                # Gece vardiyası (çıkış < giriş) burada serbest, mesai ertesi güne taşınarak hesaplanır
+                kayitlar.append(yoklama_satiri(personel.id, tarih_obj, durum, giris, cikis, gece_vardiyasi=True))
+            except ValueError as e:
+                hatalar.append(f"{tarih_obj.strftime('%d.%m')}: {e}")
 
+        # Tüm ay tek seferde yazılır (toplu upsert)
+        puantajlari_kaydet(kayitlar)
+
+        if hatalar:
+            messages.warning(request, "Kaydedilmeyen günler: " + " | ".join(hatalar))
         messages.success(request, f'{personel.ad} için {ay}/{yil} kayıtları güncellendi.')
         return redirect(f'/personel/{personel.id}/toplu-puantaj/?ay={ay}&yil={yil}')
 
     mevcut_kayitlar = {
         p.tarih.day: p
-        for p in Puantaj.objects.filter(personel=personel, tarih__year=yil, tarih__month=ay)
+        for p in donem_puantajlari(yil, ay).filter(personel=personel)
     }
 
     gunler_listesi = []
@@ -462,6 +459,17 @@ def toplu_puantaj(request, personel_id):
         'ay_adi': calendar.month_name[ay]
     })
 
+def _maas_raporu_verisi(yil, ay):
+    """Rapor sayfasının önbelleğe alınan kısmı: tablo HTML'i ve toplam."""
+    bordro_var_mi, rapor_listesi = _maas_verilerini_hesapla(yil, ay)
+    return {
+        'bordro_var_mi': bordro_var_mi,
+        'genel_toplam': sum(item['net_maas'] for item in rapor_listesi),
+        'tablo': render_to_string('core/maas_raporu_tablosu.html', {
+            'rapor_listesi': rapor_listesi, 'yil': yil, 'ay': ay,
+        }),
+    }
+
 @login_required
 def maas_raporu(request):
     bugun = timezone.now().date()
@@ -472,18 +480,120 @@ def maas_raporu(request):
         yil = bugun.year
         ay = bugun.month
 
-    # Tek merkezden verileri çek (Kayıtlı mı yoksa Canlı mı otomatik anlar)
-    bordro_var_mi, rapor_listesi = _maas_verilerini_hesapla(yil, ay)
+    # Kapalı dönemler süresiz, taslaklar veri değişene kadar önbellekten gelir (core/onbellek.py)
+    veri, isabet = rapor_getir(yil, ay, lambda: _maas_raporu_verisi(yil, ay))
 
-    genel_toplam_odenecek = sum(item['net_maas'] for item in rapor_listesi)
-
-    return render(request, 'core/maas_raporu.html', {
-        'rapor_listesi': rapor_listesi,
-        'genel_toplam': genel_toplam_odenecek,
+    response = render(request, 'core/maas_raporu.html', {
+        'rapor_tablosu': mark_safe(veri['tablo']),
+        'genel_toplam': veri['genel_toplam'],
         'yil': yil,
         'ay': ay,
         'ay_adi': calendar.month_name[ay],
-        'bordro_var_mi': bordro_var_mi
+        'bordro_var_mi': veri['bordro_var_mi']
+    })
+    response['X-Rapor-Onbellek'] = 'isabet' if isabet else 'iska'
+    return response
+
+MAAS_GECMISI_AZAMI_AY = 60
+
+def _maas_gecmisi_parametreleri(request):
+    """
+    'baslangic' ve 'bitis' (YYYY-AA, dahil) ile çoklu 'personel' parametrelerini okur.
+    Varsayılan: bu yılın başından bu aya. Gelecek aylar ve MAAS_GECMISI_AZAMI_AY'dan uzun aralıklar kırpılır.
+    """
+    bu_ay = timezone.now().date().replace(day=1)
+
+    def ay_coz(deger, varsayilan):
+        try:
+            return datetime.strptime(deger or '', '%Y-%m').date()
+        except ValueError:
+            return varsayilan
+
+    bitis = min(ay_coz(request.GET.get('bitis'), bu_ay), bu_ay)
+    baslangic = min(ay_coz(request.GET.get('baslangic'), bitis.replace(month=1)), bitis)
+    en_erken = bitis
+    for _ in range(MAAS_GECMISI_AZAMI_AY - 1):
+        en_erken = (en_erken - timedelta(days=1)).replace(day=1)
+    baslangic = max(baslangic, en_erken)
+
+    personel_ids = sorted({int(p) for p in request.GET.getlist('personel') if p.isdigit()}) or None
+    return baslangic, bitis, personel_ids
+
+@login_required
+def maas_gecmisi(request):
+    """
+    Bir tarih aralığındaki tüm dönemlerin bordro/taslak maaşları ve personel bazında
+    yıllık toplamlar. Dönem sayısından bağımsız sabit sayıda sorgu (core/bordro.py).
+    Aylık döküm sadece personel seçildiğinde gösterilir; tamamı için Excel/CSV indirilir.
+    """
+    baslangic, bitis, personel_ids = _maas_gecmisi_parametreleri(request)
+    satirlar = donemler_hesapla(baslangic, bitis, personel_ids)
+    toplamlar = yillik_toplamlar(satirlar)
+
+    return render(request, 'core/maas_gecmisi.html', {
+        'baslangic': baslangic,
+        'bitis': bitis,
+        'secilen_personeller': personel_ids or [],
+        'personeller': Personel.objects.order_by('ad', 'soyad').only('id', 'ad', 'soyad', 'aktif_mi'),
+        'toplamlar': toplamlar,
+        'genel_toplam': sum(t['net_maas'] for t in toplamlar),
+        'satirlar': satirlar if personel_ids else None,
+        'filtre_sorgusu': request.GET.urlencode(),
+    })
+
+@login_required
+def maas_gecmisi_indir(request):
+    """
+    Maaş geçmişini Excel (varsayılan) veya CSV ('bicim=csv') olarak akış halinde indirir.
+    'kapsam=yillik' ile aylık döküm yerine yıllık toplamlar indirilir.
+    """
+    baslangic, bitis, personel_ids = _maas_gecmisi_parametreleri(request)
+    satirlar = donemler_hesapla(baslangic, bitis, personel_ids)
+    if request.GET.get('kapsam') == 'yillik':
+        basliklar, sayfa_satirlari, ad = YILLIK_TOPLAM_BASLIKLARI, yillik_toplam_satirlari(yillik_toplamlar(satirlar)), 'Yillik_Toplamlar'
+    else:
+        basliklar, sayfa_satirlari, ad = MAAS_GECMISI_BASLIKLARI, maas_gecmisi_satirlari(satirlar), 'Maas_Gecmisi'
+
+    dosya_adi = f"{ad}_{baslangic:%Y%m}_{bitis:%Y%m}"
+    if request.GET.get('bicim') == 'csv':
+        return csv_yanit(f'{dosya_adi}.csv', basliklar, sayfa_satirlari)
+    return xlsx_yanit(f'{dosya_adi}.xlsx', ad, basliklar, sayfa_satirlari)
+
+@login_required
+def maas_gecmisi_json(request):
+    """Maaş geçmişi API'si: aylık satırlar ve yıllık toplamlar (tutarlar 2 haneye yuvarlanır)."""
+    baslangic, bitis, personel_ids = _maas_gecmisi_parametreleri(request)
+    satirlar = donemler_hesapla(baslangic, bitis, personel_ids)
+
+    def personel_bilgisi(p):
+        return {'id': p.id, 'ad_soyad': f"{p.ad} {p.soyad}"}
+
+    return JsonResponse({
+        'baslangic': f'{baslangic:%Y-%m}',
+        'bitis': f'{bitis:%Y-%m}',
+        'donemler': [
+            {
+                'donem': f"{s['donem']:%Y-%m}",
+                'personel': personel_bilgisi(s['personel']),
+                'durum': s['durum'],
+                'calistigi_gun': s['calistigi_gun'],
+                'gelmedigi_gun': s['gelmedigi_gun'],
+                **{alan: round(s[alan], 2) for alan in (
+                    'ana_hakedis', 'toplam_mesai', 'mesai_ucreti', 'toplam_prim', 'toplam_kesinti', 'net_maas')},
+            }
+            for s in satirlar
+        ],
+        'yillik': [
+            {
+                'personel': personel_bilgisi(t['personel']),
+                'yil': t['yil'],
+                'donem_sayisi': t['donem_sayisi'],
+                'kesinlesmis': t['kesinlesmis'],
+                **{alan: round(t[alan], 2) for alan in (
+                    'toplam_mesai', 'mesai_ucreti', 'toplam_prim', 'toplam_kesinti', 'net_maas')},
+            }
+            for t in yillik_toplamlar(satirlar)
+        ],
     })
 
 @login_required
@@ -507,84 +617,10 @@ def maas_bordrosu_olustur(request):
     except ValueError:
         return redirect('maas_raporu')
 
-    # Canlı hesaplama yaparak kaydet (Snapshot)
-    puantaj_query = Puantaj.objects.filter(tarih__year=yil, tarih__month=ay)
-    hareket_query = FinansalHareket.objects.filter(tarih__year=yil, tarih__month=ay)
-    taksit_query = TaksitliAvans.objects.filter(tamamlandi=False)
-
-    personeller = Personel.objects.filter(aktif_mi=True).prefetch_related(
-        Prefetch('puantajlar', queryset=puantaj_query, to_attr='aylik_puantajlar'),
-        Prefetch('finansal_hareketler', queryset=hareket_query, to_attr='aylik_hareketler'),
-        Prefetch('taksitli_avanslar', queryset=taksit_query, to_attr='aktif_taksitler')
-    )
-
-    donem_tarihi = datetime(yil, ay, 1).date()
-    created_count = 0
-    updated_count = 0
-
-    for p in personeller:
-        # --- HESAPLAMA (LIVE) ---
-        calistigi_gun = 0
-        gelmedigi_gun = 0
-        toplam_mesai = 0.0
-
-        for pt in p.aylik_puantajlar:
-            if pt.durum in ['geldi', 'hafta_tatili']:
-                calistigi_gun += 1
-            elif pt.durum in ['gelmedi', 'ucretsiz_izin']:
-                gelmedigi_gun += 1
-            toplam_mesai += float(pt.hesaplanan_mesai_saati)
-
-        mesai_ucreti = toplam_mesai * float(p.ozel_mesai_ucreti)
-
-        # Finansal
-        toplam_prim = 0.0
-        diger_kesintiler = 0.0
-        for h in p.aylik_hareketler:
-            if h.islem_tipi == 'prim':
-                toplam_prim += float(h.tutar)
-            else:
-                diger_kesintiler += float(h.tutar)
-
-        taksit_kesintisi = sum(float(t.aylik_kesinti) for t in p.aktif_taksitler)
-        toplam_kesinti = diger_kesintiler + taksit_kesintisi
-
-        # Maaş
-        if p.calisma_tipi == 'aylik':
-            gunluk_maliyet = float(p.maas_tutari) / 30
-            maas_kesintisi = gunluk_maliyet * gelmedigi_gun
-            ana_hakedis = float(p.maas_tutari) - maas_kesintisi
-        else:
-            ana_hakedis = float(p.maas_tutari) * calistigi_gun
-
-        net_maas = ana_hakedis + mesai_ucreti + toplam_prim - toplam_kesinti
-
-        # --- KAYDETME (SNAPSHOT) ---
-        obj, created = MaasBordrosu.objects.update_or_create(
-            personel=p,
-            donem=donem_tarihi,
-            defaults={
-                'brut_maas': p.maas_tutari,
-                'calistigi_gun': calistigi_gun,
-                'gelmedigi_gun': gelmedigi_gun,
-                'mesai_saati': toplam_mesai,
-                'mesai_ucreti': mesai_ucreti,
-                'toplam_prim': toplam_prim,
-                'toplam_kesinti': toplam_kesinti,
-                'net_odenecek': net_maas
-            }
-        )
-        if created:
-            created_count += 1
-        else:
-            updated_count += 1
-
-    # --- LOG EKLE ---
-    _log_kaydet(request, 'kritik', 'Bordro Kesinleştirme',
-               f"{calendar.month_name[ay]} {yil} dönemi kapatıldı. ({created_count} yeni, {updated_count} güncellendi)")
-
-    messages.success(request, f"{calendar.month_name[ay]} {yil} dönemi için Bordro oluşturuldu. ({created_count} yeni, {updated_count} güncellendi)")
-    return redirect(f'/maas-raporu/?ay={ay}&yil={yil}')
+    # Dönem kapatma büyük kadrolarda uzun sürebilir; worker'da çalışır (core/isler.py)
+    is_kaydi = is_kuyruga_ekle('donem_kapat', request.user, yil=yil, ay=ay)
+    messages.info(request, f"{calendar.month_name[ay]} {yil} dönemi kapatma işi başlatıldı.")
+    return redirect('is_durumu', is_id=is_kaydi.id)
 
 @login_required
 def maas_raporu_indir(request):
@@ -596,99 +632,115 @@ def maas_raporu_indir(request):
         yil = bugun.year
         ay = bugun.month
 
-    # Helper'ı kullan (Bordro varsa onu getirir)
-    _, rapor_listesi = _maas_verilerini_hesapla(yil, ay)
-
-    data = []
-    for item in rapor_listesi:
-        p = item['personel']
-        data.append({
-            'Ad Soyad': f"{p.ad} {p.soyad}",
-            'Çalışma Tipi': p.get_calisma_tipi_display(),
-            'Çalıştığı Gün': item['calistigi_gun'],
-            'Gelmediği Gün': item['gelmedigi_gun'],
-            'Ana Hakediş': item['ana_hakedis'],
-            'Mesai Saati': item['toplam_mesai'],
-            'Mesai Ücreti': item['mesai_ucreti'],
-            'Primler': item['toplam_prim'],
-            'Kesintiler': item['toplam_kesinti'],
-            'NET ÖDENECEK': item['net_maas']
-        })
+    # Rapor worker'da dosyaya yazılır, hazır olunca iş sayfasından indirilir
+    is_kaydi = is_kuyruga_ekle('maas_raporu', request.user, yil=yil, ay=ay)
+    return redirect('is_durumu', is_id=is_kaydi.id)
 
-    df = pd.DataFrame(data)
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name=f'{ay}-{yil} Maas Raporu')
+@login_required
+def banka_odeme_dosyasi(request):
+    """
+    Kapanmış dönemin banka toplu ödeme dosyaları (banka başına bir dosya, ZIP).
+    SADECE SÜPER YÖNETİCİLER (is_superuser=True) YAPABİLİR.
+    """
+    if not request.user.is_superuser:
+        messages.error(request, "Bu işlemi yapmak için 'Süper Yönetici' yetkisine sahip olmalısınız!")
+        return redirect('maas_raporu')
 
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename="Maas_Raporu_{ay}_{yil}.xlsx"'
+    bugun = timezone.now().date()
+    try:
+        yil = int(request.GET.get('yil', bugun.year))
+        ay = int(request.GET.get('ay', bugun.month))
+    except ValueError:
+        return redirect('maas_raporu')
+    sablon = request.GET.get('sablon') or None
+    if sablon is not None and sablon not in settings.BANKA_ODEME_SABLONLARI:
+        sablon = None
+
+    # Ödeme yalnızca kesinleşmiş bordrodan yapılır
+    if not MaasBordrosu.objects.filter(donem_filtresi(yil, ay, 'donem')).exists():
+        messages.error(request, f"{ay}/{yil} dönemi kapatılmadan banka ödeme dosyası oluşturulamaz.")
+        return redirect(f"{reverse('maas_raporu')}?ay={ay}&yil={yil}")
+
+    _log_kaydet(request, 'kritik', 'Banka Ödeme Dosyası', f"{calendar.month_name[ay]} {yil} dönemi banka ödeme dosyası indirildi.")
+    response = StreamingHttpResponse(odeme_dosyasi_parcalari(yil, ay, sablon), content_type=ZIP_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename="Banka_Odeme_{ay}_{yil}.zip"'
     return response
 
 @login_required
 def personel_import(request):
     if request.method == 'POST' and request.FILES.get('excel_file'):
-        excel_file = request.FILES['excel_file']
-
-        try:
-            df = pd.read_excel(excel_file)
-            basarili = 0
-            atlanan = 0
-
-            for index, row in df.iterrows():
-                try:
-                    tc = str(row['TC No']).strip()
-                    if Personel.objects.filter(tc_no=tc).exists():
-                        atlanan += 1
-                        continue
-
-                    c_tipi_raw = str(row['Çalışma Tipi']).lower()
-                    c_tipi = 'gunluk' if 'gün' in c_tipi_raw else 'aylik'
-
-                    tarih_val = row['Giriş Tarihi']
-                    if pd.isna(tarih_val):
-                        tarih_obj = timezone.now().date()
-                    else:
-                        tarih_obj = pd.to_datetime(tarih_val).date()
-
-                    Personel.objects.create(
-                        ad=row['Ad'],
-                        soyad=row['Soyad'],
-                        tc_no=tc,
-                        telefon=row['Telefon'],
-                        calisma_tipi=c_tipi,
-                        maas_tutari=row['Maaş'],
-                        ozel_mesai_ucreti=row.get('Mesai Ücreti', 250),
-                        iban=row.get('IBAN', ''),
-                        banka_adi=row.get('Banka', ''),
-                        ise_giris_tarihi=tarih_obj
-                    )
-                    basarili += 1
-                except Exception as e:
-                    print(f"Satır hatası: {e}")
-                    atlanan += 1
-
-            messages.success(request, f"{basarili} personel başarıyla eklendi. {atlanan} kayıt atlandı.")
-            return redirect('personel_listesi')
-
-        except Exception as e:
-            messages.error(request, f"Dosya okuma hatası: {e}")
+        # Yüklenen dosya iş klasörüne kaydedilir, içe aktarım worker'da yapılır
+        yol, dosya_adi = yeni_dosya_yolu('.xlsx')
+        with open(yol, 'wb') as f:
+            for parca in request.FILES['excel_file'].chunks():
+                f.write(parca)
+
+        is_kaydi = is_kuyruga_ekle(
+            'personel_ice_aktar', request.user,
+            girdi_dosyasi=dosya_adi, guncelle=bool(request.POST.get('guncelle')),
+        )
+        return redirect('is_durumu', is_id=is_kaydi.id)
 
     return render(request, 'core/personel_import.html')
 
 @login_required
-def download_excel_template(request):
-    columns = ['Ad', 'Soyad', 'TC No', 'Telefon', 'Çalışma Tipi', 'Maaş', 'Mesai Ücreti', 'Giriş Tarihi', 'IBAN', 'Banka']
-    df = pd.DataFrame(columns=columns)
+def pdks_import(request):
+    dosya = request.FILES.get('okutma_dosyasi')
+    if request.method == 'POST' and dosya:
+        # Kart okuyucu dökümü (CSV/XLSX) iş klasörüne kaydedilir, eşleme ve yazma worker'da yapılır
+        uzanti = '.xlsx' if dosya.name.lower().endswith(('.xlsx', '.xlsm')) else '.csv'
+        yol, dosya_adi = yeni_dosya_yolu(uzanti)
+        with open(yol, 'wb') as f:
+            for parca in dosya.chunks():
+                f.write(parca)
 
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Personel Listesi')
+        is_kaydi = is_kuyruga_ekle('pdks_ice_aktar', request.user, girdi_dosyasi=dosya_adi)
+        return redirect('is_durumu', is_id=is_kaydi.id)
 
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename="personel_sablon.xlsx"'
-    return response
+    return render(request, 'core/pdks_import.html')
+
+def _is_erisimi_var(user, is_kaydi):
+    return user.is_superuser or is_kaydi.olusturan_id == user.id
+
+@login_required
+def is_durumu(request, is_id):
+    is_kaydi = get_object_or_404(ArkaPlanIsi, id=is_id)
+    if not _is_erisimi_var(request.user, is_kaydi):
+        return HttpResponseForbidden("Bu işe erişim yetkiniz yok.")
+    return render(request, 'core/is_durumu.html', {'is_kaydi': is_kaydi})
+
+@login_required
+def is_durumu_json(request, is_id):
+    is_kaydi = get_object_or_404(ArkaPlanIsi, id=is_id)
+    if not _is_erisimi_var(request.user, is_kaydi):
+        return HttpResponseForbidden("Bu işe erişim yetkiniz yok.")
+    return JsonResponse({
+        'durum': is_kaydi.durum,
+        'durum_adi': is_kaydi.get_durum_display(),
+        'ilerleme': is_kaydi.ilerleme,
+        'sonuc_mesaji': is_kaydi.sonuc_mesaji if is_kaydi.durum != 'hata' else is_kaydi.sonuc_mesaji.split('\n', 1)[0],
+        'dosya_var': bool(is_kaydi.sonuc_dosyasi),
+    })
+
+@login_required
+def is_dosyasi_indir(request, is_id):
+    is_kaydi = get_object_or_404(ArkaPlanIsi, id=is_id, durum='tamamlandi')
+    if not _is_erisimi_var(request.user, is_kaydi) or not is_kaydi.sonuc_dosyasi:
+        return HttpResponseForbidden("Bu dosyaya erişim yetkiniz yok.")
+
+    yol = os.path.join(is_klasoru(), os.path.basename(is_kaydi.sonuc_dosyasi))
+    if not os.path.exists(yol):
+        raise Http404("Dosya bulunamadı.")
+    indirme_adi = is_kaydi.parametreler.get('indirme_adi', os.path.basename(yol))
+    return FileResponse(
+        open(yol, 'rb'), as_attachment=True, filename=indirme_adi,
+        content_type=mimetypes.guess_type(indirme_adi)[0] or XLSX_CONTENT_TYPE,
+    )
+
+@login_required
+def download_excel_template(request):
+    columns = ['Ad', 'Soyad', 'TC No', 'Telefon', 'Çalışma Tipi', 'Maaş', 'Mesai Ücreti', 'Giriş Tarihi', 'IBAN', 'Banka']
+    return xlsx_yanit('personel_sablon.xlsx', 'Personel Listesi', columns, [])
 
 @login_required
 def personel_pusula(request, personel_id):
@@ -701,73 +753,36 @@ def personel_pusula(request, personel_id):
         yil = bugun.year
         ay = bugun.month
 
-    # Pusula için de önce bordro kontrolü (Bordro varsa ondan oku, yoksa canlı hesapla)
-    bordro = MaasBordrosu.objects.filter(personel=personel, donem__year=yil, donem__month=ay).first()
-
-    if bordro:
-        # --- BORDRODAN OKUMA ---
-        calistigi_gun = bordro.calistigi_gun
-        gelmedigi_gun = bordro.gelmedigi_gun
-        toplam_mesai = bordro.mesai_saati
-        mesai_ucreti = bordro.mesai_ucreti
-
-        ana_hakedis = float(bordro.net_odenecek) + float(bordro.toplam_kesinti) - float(bordro.toplam_prim) - float(bordro.mesai_ucreti)
-        toplam_prim = bordro.toplam_prim
-        toplam_kesinti = bordro.toplam_kesinti
-        net_maas = bordro.net_odenecek
+    # Kesinleşmiş bordro varsa ondan, yoksa canlı hesaptan (core/pusula.py)
+    pusula = pusulalari_hesapla(yil, ay, [personel.id])[0]
+    return render(request, 'core/personel_pusula.html', pusula)
 
-        # Detay listeler için yine hareket tablosuna bakıyoruz
-        tum_hareketler = FinansalHareket.objects.filter(personel=personel, tarih__year=yil, tarih__month=ay).order_by('tarih')
-        primler_listesi = tum_hareketler.filter(islem_tipi='prim')
-        kesintiler_listesi = tum_hareketler.exclude(islem_tipi='prim')
-        taksitler = TaksitliAvans.objects.filter(personel=personel, tamamlandi=False)
-        taksit_kesintisi = 0 # Toplama zaten dahil
-
-    else:
-        # --- CANLI HESAPLAMA ---
-        calistigi_gun = Puantaj.objects.filter(personel=personel, tarih__year=yil, tarih__month=ay, durum__in=['geldi', 'hafta_tatili']).count()
-        gelmedigi_gun = Puantaj.objects.filter(personel=personel, tarih__year=yil, tarih__month=ay, durum__in=['gelmedi', 'ucretsiz_izin']).count()
-        toplam_mesai = Puantaj.objects.filter(personel=personel, tarih__year=yil, tarih__month=ay).aggregate(Sum('hesaplanan_mesai_saati'))['hesaplanan_mesai_saati__sum'] or 0
-        mesai_ucreti = float(toplam_mesai) * float(personel.ozel_mesai_ucreti)
-
-        if personel.calisma_tipi == 'aylik':
-            gunluk_maliyet = float(personel.maas_tutari) / 30
-            maas_kesintisi = gunluk_maliyet * gelmedigi_gun
-            ana_hakedis = float(personel.maas_tutari) - maas_kesintisi
-        else:
-            ana_hakedis = float(personel.maas_tutari) * calistigi_gun
-
-        tum_hareketler = FinansalHareket.objects.filter(personel=personel, tarih__year=yil, tarih__month=ay).order_by('tarih')
-        primler_listesi = tum_hareketler.filter(islem_tipi='prim')
-        toplam_prim = primler_listesi.aggregate(Sum('tutar'))['tutar__sum'] or 0
+@login_required
+def toplu_pusula(request):
+    """Dönemin bütün pusulaları: yazdırılabilir tek HTML belge veya personel başına dosyalı ZIP."""
+    bugun = timezone.now().date()
+    try:
+        yil = int(request.GET.get('yil', bugun.year))
+        ay = int(request.GET.get('ay', bugun.month))
+    except ValueError:
+        yil = bugun.year
+        ay = bugun.month
+    bicim = request.GET.get('bicim', 'html')
+    if bicim not in PUSULA_BICIMLERI:
+        bicim = 'html'
 
-        kesintiler_listesi = tum_hareketler.exclude(islem_tipi='prim')
-        diger_kesintiler = kesintiler_listesi.aggregate(Sum('tutar'))['tutar__sum'] or 0
+    if pusula_sayisi(yil, ay) > settings.TOPLU_PUSULA_SENKRON_SINIR:
+        # Büyük kadroda belge worker'da hesaplanıp dosyaya yazılır, hazır olunca iş sayfasından indirilir
+        is_kaydi = is_kuyruga_ekle('toplu_pusula', request.user, yil=yil, ay=ay, bicim=bicim)
+        return redirect('is_durumu', is_id=is_kaydi.id)
 
-        taksitler = TaksitliAvans.objects.filter(personel=personel, tamamlandi=False)
-        taksit_kesintisi = taksitler.aggregate(Sum('aylik_kesinti'))['aylik_kesinti__sum'] or 0
+    pusulalar = pusulalari_hesapla(yil, ay)
 
-        toplam_kesinti = float(diger_kesintiler) + float(taksit_kesintisi)
-        net_maas = ana_hakedis + mesai_ucreti + float(toplam_prim) - toplam_kesinti
-
-    return render(request, 'core/personel_pusula.html', {
-        'personel': personel,
-        'ay': ay,
-        'yil': yil,
-        'ay_adi': calendar.month_name[ay],
-        'calistigi_gun': calistigi_gun,
-        'gelmedigi_gun': gelmedigi_gun,
-        'ana_hakedis': ana_hakedis,
-        'toplam_mesai': toplam_mesai,
-        'mesai_ucreti': mesai_ucreti,
-        'primler_listesi': primler_listesi,
-        'toplam_prim': toplam_prim,
-        'kesintiler_listesi': kesintiler_listesi,
-        'taksitler': taksitler,
-        'taksit_kesintisi': taksit_kesintisi,
-        'toplam_kesinti': toplam_kesinti,
-        'net_maas': net_maas
-    })
+    if bicim == 'zip':
+        response = StreamingHttpResponse(pusula_zip_parcalari(yil, ay, pusulalar), content_type=ZIP_CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="Pusulalar_{ay}_{yil}.zip"'
+        return response
+    return StreamingHttpResponse(toplu_pusula_parcalari(yil, ay, pusulalar), content_type=HTML_CONTENT_TYPE)
 
 @login_required
 def giris_cikis_raporu(request):
@@ -785,11 +800,9 @@ def giris_cikis_raporu(request):
     kayitlar = Puantaj.objects.none()
 
     if secilen_personel_id:
-        kayitlar = Puantaj.objects.filter(
-            tarih__year=yil,
-            tarih__month=ay,
-            personel_id=secilen_personel_id
-        ).select_related('personel').order_by('tarih')
+        kayitlar = personelli(
+            donem_puantajlari(yil, ay).filter(personel_id=secilen_personel_id)
+        ).order_by('tarih')
 
         try:
             secilen_personel_id = int(secilen_personel_id)
@@ -805,8 +818,37 @@ def giris_cikis_raporu(request):
         'secilen_personel_id': secilen_personel_id
     })
 
+def _giris_cikis_satirlari(sorgular):
+    """
+    Puantaj kayıtlarını (asıl tablo ve arşiv) veritabanından parça parça okuyup
+    tarih, personel sırasıyla Excel satırı olarak üretir.
+    """
+    durum_adlari = dict(Puantaj.DURUMLAR)
+    # Arşiv başka veritabanında; personel adları JOIN yerine tek sorguyla
+    adlar = {pid: f"{ad} {soyad}" for pid, ad, soyad in Personel.objects.values_list('id', 'ad', 'soyad')}
+    alanlar = ('tarih', 'personel_id', 'durum', 'giris_saati', 'cikis_saati', 'hesaplanan_mesai_saati')
+    akislar = [
+        qs.order_by('tarih', 'personel_id').values_list(*alanlar).iterator(chunk_size=2000)
+        for qs in sorgular
+    ]
+    for tarih, personel_id, durum, giris, cikis, mesai in heapq.merge(*akislar, key=lambda s: (s[0], s[1])):
+        yield (
+            tarih.strftime('%d.%m.%Y'),
+            tarih.strftime('%A'),
+            adlar.get(personel_id, '-'),
+            durum_adlari.get(durum, durum),
+            giris.strftime('%H:%M') if giris else '-',
+            cikis.strftime('%H:%M') if cikis else '-',
+            mesai,
+        )
+
 @login_required
 def giris_cikis_raporu_indir(request):
+    """
+    Giriş-çıkış kayıtlarını Excel olarak indirir (akış halinde, bellek kullanımı sabit).
+    Varsayılan: seçilen ay. 'baslangic' ve 'bitis' (YYYY-AA-GG) verilirse o aralık.
+    personel_id boş bırakılırsa tüm personel dahil edilir.
+    """
     bugun = timezone.now().date()
     try:
         yil = int(request.GET.get('yil', bugun.year))
@@ -815,37 +857,67 @@ def giris_cikis_raporu_indir(request):
         yil = bugun.year
         ay = bugun.month
 
-    secilen_personel_id = request.GET.get('personel_id')
-    kayitlar = Puantaj.objects.none()
+    try:
+        baslangic = datetime.strptime(request.GET.get('baslangic', ''), '%Y-%m-%d').date()
+        bitis = datetime.strptime(request.GET.get('bitis', ''), '%Y-%m-%d').date()
+        dosya_eki = f"{baslangic:%Y%m%d}_{bitis:%Y%m%d}"
+    except ValueError:
+        _, son_gun = calendar.monthrange(yil, ay)
+        baslangic = datetime(yil, ay, 1).date()
+        bitis = datetime(yil, ay, son_gun).date()
+        dosya_eki = f"{ay}_{yil}"
 
+    sorgular = aralik_puantajlari(baslangic, bitis)
+
+    secilen_personel_id = request.GET.get('personel_id')
     if secilen_personel_id:
-        kayitlar = Puantaj.objects.filter(
-            tarih__year=yil,
-            tarih__month=ay,
-            personel_id=secilen_personel_id
-        ).select_related('personel').order_by('tarih')
-
-    data = []
-    for k in kayitlar:
-        giris = k.giris_saati.strftime('%H:%M') if k.giris_saati else '-'
-        cikis = k.cikis_saati.strftime('%H:%M') if k.cikis_saati else '-'
-        data.append({
-            'Tarih': k.tarih.strftime('%d.%m.%Y'),
-            'Gün': k.tarih.strftime('%A'),
-            'Personel': f"{k.personel.ad} {k.personel.soyad}",
-            'Durum': k.get_durum_display(),
-            'Giriş Saati': giris,
-            'Çıkış Saati': cikis,
-            'Mesai (Saat)': k.hesaplanan_mesai_saati
-        })
+        sorgular = [qs.filter(personel_id=secilen_personel_id) for qs in sorgular]
+
+    basliklar = ['Tarih', 'Gün', 'Personel', 'Durum', 'Giriş Saati', 'Çıkış Saati', 'Mesai (Saat)']
+    return xlsx_yanit(
+        f"Giris_Cikis_Raporu_{dosya_eki}.xlsx",
+        f'Giris_Cikis_{dosya_eki}',
+        basliklar,
+        _giris_cikis_satirlari(sorgular),
+    )
 
-    df = pd.DataFrame(data)
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        sheet_name = f'Giris_Cikis_{ay}_{yil}'
-        df.to_excel(writer, index=False, sheet_name=sheet_name)
 
-    buffer.seek(0)
-    response = HttpResponse(buffer, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename="Giris_Cikis_Raporu_{ay}_{yil}.xlsx"'
-    return response
+@login_required
+def islem_gecmisi(request):
+    """
+    İşlem logları (audit): kullanıcı, personel, işlem türü, tarih aralığı ve
+    detay içinde tam metin araması. (tarih, id) imleciyle sayfalanır; COUNT yapılmaz.
+    """
+    if not request.user.is_staff:
+        return HttpResponseForbidden("İşlem geçmişini sadece yöneticiler görebilir.")
+
+    qs, secimler = islem_gecmisi_sorgusu(request.GET)
+    sayfa = sayfa_getir(qs, sonra=request.GET.get('sonra'), once=request.GET.get('once'))
+
+    # Sayfa bağlantıları filtreleri korur
+    filtreler = request.GET.copy()
+    for anahtar in ('sonra', 'once'):
+        filtreler.pop(anahtar, None)
+
+    context = {
+        **sayfa,
+        'secimler': secimler,
+        'filtre_sorgusu': filtreler.urlencode(),
+        'kullanicilar': User.objects.order_by('username').only('id', 'username'),
+        'personeller': Personel.objects.order_by('ad', 'soyad').only('id', 'ad', 'soyad'),
+        'islem_turleri': IslemLog.ISLEM_TURLERI,
+    }
+    return render(request, 'core/islem_gecmisi.html', context)
+
+@login_required
+def islem_gecmisi_indir(request):
+    """Filtrelenmiş işlem loglarını CSV (varsayılan) veya Excel olarak akış halinde indirir."""
+    if not request.user.is_staff:
+        return HttpResponseForbidden("İşlem geçmişini sadece yöneticiler görebilir.")
+
+    qs, _ = islem_gecmisi_sorgusu(request.GET)
+    satirlar = disa_aktarim_satirlari(qs)
+    dosya_adi = f"Islem_Gecmisi_{timezone.localtime():%Y%m%d_%H%M}"
+    if request.GET.get('bicim') == 'xlsx':
+        return xlsx_yanit(f'{dosya_adi}.xlsx', 'Islem_Gecmisi', DISA_AKTARIM_BASLIKLARI, satirlar)
+    return csv_yanit(f'{dosya_adi}.csv', DISA_AKTARIM_BASLIKLARI, satirlar)
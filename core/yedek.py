@@ -0,0 +1,293 @@
+"""
+SQLite veritabanı yedekleme.
+
+Yedek, canlı dosya okunarak değil SQLite'ın çevrimiçi yedekleme API'si
+(sqlite3.Connection.backup) ile alınır: sayfalar küçük adımlarla kopyalanır,
+adımlar arasında kilit bırakıldığı için yazan istekler beklemez; kopyalama
+sırasında veritabanı değişirse SQLite yedeği baştan alarak tutarlı bir anlık
+görüntü üretir.
+
+Anlık görüntü önce hedef klasörde geçici bir dosyaya alınır, ardından gzip ile
+parça parça sıkıştırılır; dosya hiçbir zaman bütün olarak belleğe okunmaz.
+
+İki yedek türü vardır:
+  - Tam yedek:    db_yedek_<zaman>.sqlite3.gz
+  - Artımlı yedek: db_yedek_<zaman>.delta.gz - en son tam yedeğe göre
+    değişen sayfalar. Geri yüklemek için tam yedek + bu dosya yeterlidir.
+
+Yerel klasör dışındaki hedefler (e-posta vb.) @yedek_hedefi ile kaydedilir.
+"""
+import gzip
+import os
+import shutil
+import sqlite3
+import struct
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+TAM_UZANTI = '.sqlite3.gz'
+ARTIMLI_UZANTI = '.delta.gz'
+ON_EK = 'db_yedek_'
+
+_ARTIMLI_IMZA = b'AVLUDLT1'
+_ADIM_SAYFA = 256
+
+YEDEK_HEDEFLERI = {}
+
+
+def yedek_hedefi(ad):
+    """Bir fonksiyonu verilen adla yedek gönderim hedefi olarak kaydeder."""
+    def kaydet(fonksiyon):
+        YEDEK_HEDEFLERI[ad] = fonksiyon
+        return fonksiyon
+    return kaydet
+
+
+@dataclass
+class YedekSonucu:
+    yol: str
+    tur: str  # 'tam' | 'artimli'
+    boyut: int
+    degisen_sayfa: int = 0
+    toplam_sayfa: int = 0
+    temel: str = ''
+
+
+def veritabani_yolu():
+    db = settings.DATABASES['default']
+    if 'sqlite3' not in db['ENGINE']:
+        raise ValueError('Yedekleme yalnızca SQLite veritabanı için desteklenir.')
+    return str(db['NAME'])
+
+
+def _yedekler(klasor, uzanti):
+    if not os.path.isdir(klasor):
+        return []
+    return sorted(
+        os.path.join(klasor, ad) for ad in os.listdir(klasor)
+        if ad.startswith(ON_EK) and ad.endswith(uzanti)
+    )
+
+
+def tam_yedekler(klasor):
+    """Klasördeki tam yedekler, eskiden yeniye."""
+    return _yedekler(klasor, TAM_UZANTI)
+
+
+def artimli_yedekler(klasor):
+    return _yedekler(klasor, ARTIMLI_UZANTI)
+
+
+def _yeni_ad(klasor, uzanti):
+    zaman = timezone.localtime().strftime('%Y-%m-%d_%H%M%S_%f')
+    return os.path.join(klasor, f'{ON_EK}{zaman}{uzanti}')
+
+
+def anlik_goruntu_al(kaynak, hedef, adim_sayfa=_ADIM_SAYFA):
+    """
+    kaynak veritabanının tutarlı bir kopyasını hedef dosyaya alır ve sayfa
+    boyutunu döner. Her adımda adim_sayfa sayfa kopyalanır; adımlar arasında
+    yazanlar kilitlenmez.
+    """
+    kaynak_baglanti = sqlite3.connect(f'file:{kaynak}?mode=ro', uri=True)
+    hedef_baglanti = sqlite3.connect(hedef)
+    try:
+        kaynak_baglanti.backup(hedef_baglanti, pages=adim_sayfa, sleep=0.005)
+        sayfa_boyutu = hedef_baglanti.execute('PRAGMA page_size').fetchone()[0]
+    finally:
+        hedef_baglanti.close()
+        kaynak_baglanti.close()
+    return sayfa_boyutu
+
+
+def _sikistir(kaynak, hedef):
+    gecici = hedef + '.tmp'
+    with open(kaynak, 'rb') as f, gzip.open(gecici, 'wb', compresslevel=6) as gz:
+        shutil.copyfileobj(f, gz, 1024 * 1024)
+    os.replace(gecici, hedef)
+
+
+def _sayfalar(dosya, sayfa_boyutu):
+    while True:
+        sayfa = dosya.read(sayfa_boyutu)
+        if not sayfa:
+            return
+        yield sayfa
+
+
+def _artimli_yaz(goruntu, temel, hedef, sayfa_boyutu):
+    """
+    goruntu ile temel (tam yedek) sayfa sayfa karşılaştırılır, farklı olanlar
+    hedefe yazılır. Dönüş: (degisen_sayfa, toplam_sayfa)
+    """
+    toplam = os.path.getsize(goruntu) // sayfa_boyutu
+    degisen = 0
+    gecici = hedef + '.tmp'
+    with open(goruntu, 'rb') as yeni, gzip.open(temel, 'rb') as eski, \
+            gzip.open(gecici, 'wb', compresslevel=6) as gz:
+        temel_adi = os.path.basename(temel).encode()
+        gz.write(_ARTIMLI_IMZA)
+        gz.write(struct.pack('>IIH', sayfa_boyutu, toplam, len(temel_adi)))
+        gz.write(temel_adi)
+        for sayfa_no, sayfa in enumerate(_sayfalar(yeni, sayfa_boyutu), start=1):
+            if eski.read(sayfa_boyutu) != sayfa:
+                gz.write(struct.pack('>I', sayfa_no))
+                gz.write(sayfa)
+                degisen += 1
+    os.replace(gecici, hedef)
+    return degisen, toplam
+
+
+def _artimli_basligi(gz):
+    if gz.read(len(_ARTIMLI_IMZA)) != _ARTIMLI_IMZA:
+        raise ValueError('Geçersiz artımlı yedek dosyası.')
+    sayfa_boyutu, toplam, ad_uzunlugu = struct.unpack('>IIH', gz.read(10))
+    return sayfa_boyutu, toplam, gz.read(ad_uzunlugu).decode()
+
+
+def artimli_temeli(yol):
+    """Artımlı yedeğin dayandığı tam yedeğin dosya adı."""
+    with gzip.open(yol, 'rb') as gz:
+        return _artimli_basligi(gz)[2]
+
+
+def yedek_al(klasor, kaynak=None, artimli=False, adim_sayfa=_ADIM_SAYFA):
+    """
+    Veritabanının yedeğini klasöre alır. artimli=True ise en son tam yedeğe göre
+    değişen sayfalar yazılır; tam yedek yoksa veya sayfa boyutu değişmişse tam
+    yedek alınır.
+    """
+    kaynak = kaynak or veritabani_yolu()
+    if not os.path.exists(kaynak):
+        raise FileNotFoundError(f'Veritabanı dosyası bulunamadı: {kaynak}')
+    os.makedirs(klasor, exist_ok=True)
+
+    goruntu = _yeni_ad(klasor, '.sqlite3.tmp')
+    try:
+        sayfa_boyutu = anlik_goruntu_al(kaynak, goruntu, adim_sayfa)
+
+        temeller = tam_yedekler(klasor)
+        if artimli and temeller:
+            temel = temeller[-1]
+            with gzip.open(temel, 'rb') as gz:
+                temel_sayfa_boyutu = _sqlite_sayfa_boyutu(gz.read(100))
+            if temel_sayfa_boyutu == sayfa_boyutu:
+                hedef = _yeni_ad(klasor, ARTIMLI_UZANTI)
+                degisen, toplam = _artimli_yaz(goruntu, temel, hedef, sayfa_boyutu)
+                return YedekSonucu(hedef, 'artimli', os.path.getsize(hedef), degisen, toplam,
+                                   os.path.basename(temel))
+
+        hedef = _yeni_ad(klasor, TAM_UZANTI)
+        _sikistir(goruntu, hedef)
+        toplam = os.path.getsize(goruntu) // sayfa_boyutu
+        return YedekSonucu(hedef, 'tam', os.path.getsize(hedef), toplam, toplam)
+    finally:
+        if os.path.exists(goruntu):
+            os.remove(goruntu)
+
+
+def _sqlite_sayfa_boyutu(baslik):
+    # SQLite dosya başlığında 16. bayttan itibaren 2 bayt; 1 değeri 65536 demektir
+    boyut = struct.unpack('>H', baslik[16:18])[0]
+    return 65536 if boyut == 1 else boyut
+
+
+def geri_yukle(yedek, hedef):
+    """
+    Tam veya artımlı yedeği hedef dosyaya açar. Artımlı yedeğin tam yedeği aynı
+    klasörde bulunmalıdır.
+    """
+    gecici = hedef + '.tmp'
+    if yedek.endswith(ARTIMLI_UZANTI):
+        with gzip.open(yedek, 'rb') as gz:
+            sayfa_boyutu, toplam, temel_adi = _artimli_basligi(gz)
+            temel = os.path.join(os.path.dirname(yedek), temel_adi)
+            if not os.path.exists(temel):
+                raise FileNotFoundError(f'Artımlı yedeğin tam yedeği bulunamadı: {temel_adi}')
+            with gzip.open(temel, 'rb') as t, open(gecici, 'wb') as f:
+                shutil.copyfileobj(t, f, 1024 * 1024)
+            with open(gecici, 'r+b') as f:
+                while True:
+                    no = gz.read(4)
+                    if not no:
+                        break
+                    f.seek((struct.unpack('>I', no)[0] - 1) * sayfa_boyutu)
+                    f.write(gz.read(sayfa_boyutu))
+                f.truncate(toplam * sayfa_boyutu)
+    else:
+        with gzip.open(yedek, 'rb') as gz, open(gecici, 'wb') as f:
+            shutil.copyfileobj(gz, f, 1024 * 1024)
+    os.replace(gecici, hedef)
+    return hedef
+
+
+def eski_yedekleri_temizle(klasor, sakla):
+    """
+    En yeni `sakla` tam yedek dışındakileri ve onlara dayanan artımlı yedekleri
+    siler. Silinen dosya yollarını döner.
+    """
+    tamlar = tam_yedekler(klasor)
+    silinecek = tamlar[:-sakla] if sakla > 0 else tamlar
+    kalan_temeller = {os.path.basename(y) for y in tamlar if y not in silinecek}
+    for yol in artimli_yedekler(klasor):
+        try:
+            temel = artimli_temeli(yol)
+        except (OSError, EOFError, ValueError, struct.error):
+            temel = None
+        if temel not in kalan_temeller:
+            silinecek.append(yol)
+    for yol in silinecek:
+        os.remove(yol)
+    return silinecek
+
+
+def hedeflere_gonder(sonuc, hedefler):
+    """Yedeği verilen hedeflere gönderir. Dönüş: {hedef: hata mesajı veya None}"""
+    durum = {}
+    for ad in hedefler:
+        if ad not in YEDEK_HEDEFLERI:
+            durum[ad] = f'Bilinmeyen yedek hedefi: {ad}'
+            continue
+        try:
+            YEDEK_HEDEFLERI[ad](sonuc)
+        except Exception as e:
+            durum[ad] = str(e)
+        else:
+            durum[ad] = None
+    return durum
+
+
+# --- HEDEFLER ---
+
+@yedek_hedefi('eposta')
+def _eposta(sonuc):
+    sinir = settings.YEDEK_EPOSTA_SINIRI
+    if sonuc.boyut > sinir:
+        raise ValueError(
+            f'Yedek ({sonuc.boyut // 1024} KB) e-posta sınırını ({sinir // 1024} KB) aşıyor; '
+            f'sadece yerel klasörde saklandı.'
+        )
+
+    zaman = timezone.localtime()
+    tur = 'artımlı' if sonuc.tur == 'artimli' else 'tam'
+    mesaj = f"""
+        Merhaba,
+
+        Avlu Personel sisteminin {zaman:%Y-%m-%d} tarihli otomatik veritabanı yedeği ({tur}) ektedir.
+        Bu dosyayı güvenli bir yerde saklayınız.
+        """
+    if sonuc.temel:
+        mesaj += f"\n        Geri yüklemek için tam yedek gerekir: {sonuc.temel}\n"
+    mesaj += f"\n        Sistem Saati: {zaman:%H:%M:%S}\n        "
+
+    mail = EmailMessage(
+        subject=f"💾 Otomatik Yedek: Avlu Personel - {zaman:%Y-%m-%d}",
+        body=mesaj,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[settings.EMAIL_HOST_USER],  # Kendine gönder
+    )
+    mail.attach_file(sonuc.yol, 'application/gzip')
+    mail.send()
@@ -0,0 +1,173 @@
+"""
+Toplu yoklama (Puantaj) kaydı.
+
+Kayıtlar bellekte hazırlanır, mesai core/mesai.py ile (vektörel) hesaplanır ve tüm liste
+(personel, tarih) tekil anahtarı üzerinden tek bir toplu upsert ile yazılır.
+Satır başına get_or_create + save yapılmaz.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from .mesai import MESAI_DURUMLARI, saat_coz, saat_saniye, mesai_hesapla_vektorel
+from .models import Personel, Puantaj
+from .ozet import ozet_donemi, ozetleri_yenile
+
+GECERLI_DURUMLAR = {kod for kod, _ in Puantaj.DURUMLAR}
+GUNCELLENEN_ALANLAR = ('durum', 'giris_saati', 'cikis_saati', 'hesaplanan_mesai_saati')
+
+
+def yoklama_satiri(personel_id, tarih, durum, giris=None, cikis=None, gece_vardiyasi=False):
+    """
+    Formdan gelen ham değerleri doğrulayıp kayıt sözlüğüne çevirir.
+    Hatalı veride kullanıcıya gösterilecek mesajla ValueError fırlatır.
+    """
+    durum = (durum or '').strip()
+    if durum not in GECERLI_DURUMLAR:
+        raise ValueError("Geçersiz durum seçimi.")
+
+    # Saatler sadece belirli durumlarda aktif olsun
+    if durum in MESAI_DURUMLARI:
+        try:
+            giris = saat_coz(giris)
+            cikis = saat_coz(cikis)
+        except ValueError:
+            raise ValueError("Saat formatı hatalı. Örn: 09:00")
+
+        # Basit mantık kontrolü (gece vardiyası açıkça istenmediyse)
+        if not gece_vardiyasi and giris and cikis and cikis <= giris:
+            raise ValueError("Çıkış saati, giriş saatinden sonra olmalıdır.")
+    else:
+        giris = cikis = None
+
+    return {
+        'personel_id': int(personel_id),
+        'tarih': tarih,
+        'durum': durum,
+        'giris_saati': giris,
+        'cikis_saati': cikis,
+    }
+
+
+def puantajlari_kaydet(kayitlar, batch_size=500):
+    """
+    Yoklama kayıtlarını toplu olarak yazar (yoksa ekler, varsa günceller).
+
+    kayitlar: yoklama_satiri() çıktısı gibi sözlükler
+        {'personel_id', 'tarih', 'durum', 'giris_saati', 'cikis_saati'}
+
+    Personellerin günlük çalışma saati tek sorguda okunur, mevcut kayıtlar tek
+    sorguda bulunur ve tüm liste tek transaction içinde
+    bulk_create(update_conflicts=True) ile yazılır.
+
+    Dönüş: (yeni_sayisi, guncellenen_sayisi)
+    """
+    # Aynı (personel, tarih) için son gelen kayıt geçerlidir
+    kayitlar = list({(k['personel_id'], k['tarih']): k for k in kayitlar}.values())
+    if not kayitlar:
+        return 0, 0
+
+    personel_ids = {k['personel_id'] for k in kayitlar}
+    tarihler = [k['tarih'] for k in kayitlar]
+
+    standart_saatler = dict(
+        Personel.objects.filter(id__in=personel_ids).values_list('id', 'gunluk_calisma_saati')
+    )
+
+    eksik = {k['personel_id'] for k in kayitlar} - standart_saatler.keys()
+    if eksik:
+        raise Personel.DoesNotExist(f"Personel bulunamadı: {min(eksik)}")
+
+    # Tüm listenin mesaisi tek vektörel çağrıyla (mesai_hesapla ile birebir aynı sonuç)
+    mesailer = mesai_hesapla_vektorel(
+        [k['durum'] for k in kayitlar],
+        [saat_saniye(k['giris_saati']) for k in kayitlar],
+        [saat_saniye(k['cikis_saati']) for k in kayitlar],
+        [standart_saatler[k['personel_id']] for k in kayitlar],
+    ).tolist()
+    puantajlar = [
+        Puantaj(
+            personel_id=k['personel_id'],
+            tarih=k['tarih'],
+            durum=k['durum'],
+            giris_saati=k['giris_saati'],
+            cikis_saati=k['cikis_saati'],
+            hesaplanan_mesai_saati=mesai,
+        )
+        for k, mesai in zip(kayitlar, mesailer)
+    ]
+
+    with transaction.atomic():
+        mevcutlar = set(
+            Puantaj.objects.filter(
+                personel_id__in=personel_ids, tarih__gte=min(tarihler), tarih__lte=max(tarihler)
+            ).values_list('personel_id', 'tarih')
+        )
+        Puantaj.objects.bulk_create(
+            puantajlar,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=('personel', 'tarih'),
+            update_fields=GUNCELLENEN_ALANLAR,
+        )
+        # bulk_create sinyal üretmez; etkilenen aylık özetler burada yenilenir
+        ozetleri_yenile({(k['personel_id'], ozet_donemi(k['tarih'])) for k in kayitlar})
+
+    guncellenen = sum(1 for k in kayitlar if (k['personel_id'], k['tarih']) in mevcutlar)
+    return len(kayitlar) - guncellenen, guncellenen
+
+
+def mesaileri_yeniden_hesapla(baslangic, bitis, personel_ids=None, parca_boyutu=5000):
+    """
+    [baslangic, bitis] aralığındaki tüm Puantaj kayıtlarının hesaplanan mesaisini
+    güncel kurallara ve güncel günlük çalışma saatine göre yeniden hesaplar.
+
+    Kayıtlar id sırasıyla parça parça okunur, her parça tek vektörel çağrıyla
+    hesaplanır ve sadece değeri değişen satırlar, yeni değere göre gruplanmış
+    toplu UPDATE sorgularıyla yazılır. Etkilenen aylık özetler de yenilenir.
+
+    Dönüş: (incelenen_sayisi, guncellenen_sayisi)
+    """
+    qs = Puantaj.objects.filter(tarih__gte=baslangic, tarih__lte=bitis)
+    if personel_ids is not None:
+        qs = qs.filter(personel_id__in=list(personel_ids))
+
+    incelenen = 0
+    guncellenen = 0
+    son_id = 0
+    while True:
+        parca = list(
+            qs.filter(id__gt=son_id).order_by('id').values_list(
+                'id', 'durum', 'giris_saati', 'cikis_saati',
+                'personel__gunluk_calisma_saati', 'hesaplanan_mesai_saati', 'personel_id', 'tarih',
+            )[:parca_boyutu]
+        )
+        if not parca:
+            break
+        son_id = parca[-1][0]
+        incelenen += len(parca)
+
+        sonuclar = mesai_hesapla_vektorel(
+            [s[1] for s in parca],
+            [saat_saniye(s[2]) for s in parca],
+            [saat_saniye(s[3]) for s in parca],
+            [s[4] for s in parca],
+        )
+
+        # Mesai değerleri az sayıda farklı değer alır (0, 0.5, 1, ...);
+        # değişen satırlar yeni değere göre gruplanıp değer başına tek UPDATE atılır.
+        degisenler = defaultdict(list)
+        ozet_anahtarlari = set()
+        for satir, sonuc in zip(parca, sonuclar.tolist()):
+            yeni_deger = Decimal(repr(sonuc)).quantize(Decimal('0.01'))
+            if satir[5] != yeni_deger:
+                degisenler[yeni_deger].append(satir[0])
+                ozet_anahtarlari.add((satir[6], ozet_donemi(satir[7])))
+
+        with transaction.atomic():
+            for yeni_deger, ids in degisenler.items():
+                guncellenen += Puantaj.objects.filter(id__in=ids).update(hesaplanan_mesai_saati=yeni_deger)
+            ozetleri_yenile(ozet_anahtarlari)
+
+    return incelenen, guncellenen